@@ -0,0 +1,235 @@
+"""
+HTTP client for the dashboard backend, used by the Streamlit UI (app.py).
+GET responses are cached per client (one client per browser session) and revalidated
+with ETag/If-None-Match, so an unchanged table costs a 304 instead of a full payload.
+Writes (POST/PUT/DELETE) are never cached and invalidate the GETs they can affect.
+get_many() runs a render's GETs concurrently over a pooled keep-alive session and
+records per-call timings, so a page load costs the slowest call rather than the sum.
+sync_changes() follows the backend's change feed (/events/changes): only the tables named in new
+events are dropped from the cache, and while the feed is followed cached outreaches/meetings/deals
+are trusted for FEED_MAX_AGE instead of being revalidated on every render.
+fetch_frame() downloads a whole table for analysis: columnar pages (?format=columnar, compressed on the
+wire) decoded by to_frame() into one pandas DataFrame.
+Easy to change: Tune UI_CACHE_MAX_AGE / UI_FEED_MAX_AGE / UI_HTTP_POOL_SIZE, or what a write invalidates in ApiClient.invalidate().
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Seconds a cached GET is served without revalidating (covers Streamlit's rapid reruns)
+DEFAULT_MAX_AGE = float(os.getenv("UI_CACHE_MAX_AGE", "5"))
+# Seconds a cached GET of a FEED_RESOURCES table is trusted while sync_changes() is being called
+# (bounded, because events are invalidation hints rather than a guaranteed-complete log)
+FEED_MAX_AGE = float(os.getenv("UI_FEED_MAX_AGE", "60"))
+FEED_RESOURCES = ("outreaches", "meetings", "deals")
+# Concurrent requests (and kept-alive connections) per client
+POOL_SIZE = int(os.getenv("UI_HTTP_POOL_SIZE", "8"))
+PAGE_LIMIT = 500  # the list endpoints' maximum page size
+
+@dataclass
+class CacheEntry:
+    etag: str
+    data: object
+    headers: CaseInsensitiveDict
+    fetched_at: float = field(default_factory=time.monotonic)
+
+class ApiClient:
+    """
+    Backend client with a version-aware GET cache.
+    base_url: API root, e.g. http://localhost:8000/api/v1
+    session: requests.Session-compatible object (anything with .request()).
+    """
+    def __init__(self, base_url: str, session=None, max_age: float = DEFAULT_MAX_AGE, pool_size: int = POOL_SIZE,
+                 feed_max_age: float = FEED_MAX_AGE):
+        self.base_url = base_url.rstrip("/")
+        self.session = session or pooled_session(pool_size)
+        self.max_age = max_age
+        self.feed_max_age = feed_max_age
+        self.feed_cursor = None  # last change-feed event applied (None = not following the feed)
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="api-client")
+        self.stats = {"fresh_hits": 0, "not_modified": 0, "fetched": 0, "writes": 0, "events": 0}
+        self.last_load = None  # timings of the most recent get_many()
+
+    def get(self, endpoint: str, params: dict = None):
+        """
+        GET with caching. Returns: (json data, response headers).
+        Within max_age the cached copy is returned without a request; after that it is
+        revalidated with If-None-Match and reused on 304.
+        """
+        return self._get(endpoint, params)[:2]
+
+    def get_many(self, calls: dict) -> dict:
+        """
+        Run several GETs concurrently (each goes through the cache like get()).
+        calls: {name: (endpoint, params)}
+        Returns: {name: (data, headers)}, or {name: exception} for failed calls.
+        Timings land in self.last_load: wall time vs. summed call time, plus each call.
+        """
+        started = time.perf_counter()
+        futures = {name: self._executor.submit(self._get, endpoint, params) for name, (endpoint, params) in calls.items()}
+        results, timings = {}, []
+        for name, future in futures.items():
+            endpoint = calls[name][0]
+            try:
+                data, headers, outcome, elapsed_ms = future.result()
+                results[name] = (data, headers)
+            except Exception as e:
+                results[name], outcome, elapsed_ms = e, "error", None
+            timings.append({"name": name, "endpoint": endpoint, "outcome": outcome, "ms": elapsed_ms})
+        self.last_load = {
+            "wall_ms": round((time.perf_counter() - started) * 1000, 1),
+            "sum_ms": round(sum(t["ms"] or 0 for t in timings), 1),
+            "calls": timings,
+        }
+        return results
+
+    def _get(self, endpoint: str, params: dict = None):
+        """Cached GET. Returns: (data, headers, outcome, elapsed ms); outcome is fresh/304/200."""
+        started = time.perf_counter()
+        key = self._key(endpoint, params)
+        following = self.feed_cursor is not None and _resource(endpoint) in FEED_RESOURCES
+        max_age = max(self.max_age, self.feed_max_age) if following else self.max_age
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and time.monotonic() - entry.fetched_at < max_age:
+                self.stats["fresh_hits"] += 1
+                return entry.data, entry.headers, "fresh", _elapsed_ms(started)
+
+        headers = {"If-None-Match": entry.etag} if entry else {}
+        response = self.session.request("GET", self.base_url + endpoint, params=params, headers=headers)
+        if entry and response.status_code == 304:
+            with self._lock:
+                entry.fetched_at = time.monotonic()
+                self.stats["not_modified"] += 1
+            return entry.data, entry.headers, "304", _elapsed_ms(started)
+
+        response.raise_for_status()
+        data = response.json()
+        response_headers = CaseInsensitiveDict(response.headers)
+        etag = response.headers.get("ETag")
+        with self._lock:
+            self.stats["fetched"] += 1
+            if etag:
+                self._cache[key] = CacheEntry(etag=etag, data=data, headers=response_headers)
+        return data, response_headers, "200", _elapsed_ms(started)
+
+    def write(self, method: str, endpoint: str, json_data: dict = None):
+        """Send a POST/PUT/DELETE (never cached) and invalidate affected GETs. Returns: json data."""
+        response = self.session.request(method, self.base_url + endpoint, json=json_data)
+        response.raise_for_status()
+        with self._lock:
+            self.stats["writes"] += 1
+        self.invalidate(endpoint)
+        return response.json()
+
+    def stream(self, endpoint: str, json_data: dict = None):
+        """POST and yield the (text) response body as it arrives, e.g. a draft being written. Never cached."""
+        with self.session.request("POST", self.base_url + endpoint, json=json_data, stream=True) as response:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size=None, decode_unicode=True)
+
+    def sync_changes(self, wait: float = 0) -> list:
+        """
+        Apply change-feed events since the last call: drop cached GETs of the tables they name (plus
+        analytics). The first call (or the first after an error) only fetches the cursor and drops the
+        feed tables, since changes in between were not seen.
+        wait: seconds the backend may hold the request open for a new event (long poll).
+        Returns: the events applied.
+        """
+        params = {"wait": wait}
+        if self.feed_cursor is not None:
+            params["cursor"] = self.feed_cursor
+        try:
+            response = self.session.request("GET", self.base_url + "/events/changes", params=params)
+            response.raise_for_status()
+            batch = response.json()
+        except Exception:
+            self.feed_cursor = None  # stop trusting the cache until the feed is back
+            raise
+        if self.feed_cursor is None or batch["reset"]:
+            for resource in FEED_RESOURCES:
+                self.invalidate(f"/{resource}/")
+        for table in {event["table"] for event in batch["events"]}:
+            self.invalidate(f"/{table}/")
+        with self._lock:
+            self.feed_cursor = batch["cursor"]
+            self.stats["events"] += len(batch["events"])
+        return batch["events"]
+
+    def invalidate(self, endpoint: str = None):
+        """
+        Drop cached GETs for the endpoint's resource and for analytics (which aggregate
+        every resource). With no endpoint, drop everything.
+        """
+        with self._lock:
+            if endpoint is None:
+                self._cache.clear()
+                return
+            affected = {_resource(endpoint), "analytics"}
+            for key in [key for key in self._cache if _resource(key[0]) in affected]:
+                del self._cache[key]
+
+    @staticmethod
+    def _key(endpoint: str, params: dict = None):
+        return endpoint, tuple(sorted((params or {}).items()))
+
+def pooled_session(pool_size: int = POOL_SIZE) -> requests.Session:
+    """requests.Session whose connection pool can keep one connection per concurrent call."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def to_frame(*pages):
+    """
+    pandas DataFrame from one or more ?format=columnar pages of the same list; dictionary-encoded columns
+    become categoricals. Pages are merged column by column first: one DataFrame build instead of a concat.
+    """
+    import pandas as pd  # only analysis code needs pandas
+    columns, dictionaries = pages[0]["columns"], pages[0]["dictionaries"]
+    merged = [[] for _ in columns]
+    for page in pages:
+        for values, data in zip(merged, page["data"]):
+            values.extend(data)
+    return pd.DataFrame({
+        name: pd.Categorical.from_codes(values, categories=dictionaries[name]) if name in dictionaries else _array(values)
+        for name, values in zip(columns, merged)
+    }, columns=columns)
+
+def _array(values: list):
+    """Numeric columns as numpy arrays (pandas' per-value type inference on a list is ~10x slower)."""
+    import numpy as np
+    if not values or type(values[0]) not in (int, float):
+        return values
+    array = np.array(values)
+    return array if array.dtype.kind in "if" else values  # nulls or mixed types: let pandas infer
+
+def fetch_frame(base_url: str, resource: str, session=None, **params):
+    """Walk every page of /<resource>/ (filters in params) in columnar form. Returns: one DataFrame."""
+    session = session or requests.Session()
+    params = {**params, "format": "columnar", "limit": PAGE_LIMIT}
+    pages = []
+    while True:
+        response = session.get(f"{base_url.rstrip('/')}/{resource}/", params=params)
+        response.raise_for_status()
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return to_frame(*pages)
+        params["after_id"] = cursor
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+def _resource(endpoint: str) -> str:
+    """'/outreaches/3/response' -> 'outreaches'."""
+    return endpoint.strip("/").split("/", 1)[0]
@@ -1,57 +1,160 @@
 """
 Streamlit UI for JV Partner Identification Dashboard (Plotly-Free Version - Fixed Forms).
-Guided 7-step workflow via tabs. Uses Streamlit charts.
+Guided 7-step workflow. Uses Streamlit charts.
 Forms fixed: No buttons inside forms; research/enrich buttons outside.
+Data lives in the backend API: only the active step renders, and tables load one page at a time.
 Run: streamlit run app.py
 """
 import streamlit as st
 import requests
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, time
 import os
-import json
-from dotenv import load_dotenv
+import time as time_module
+import config
+from api_client import ApiClient
+from services.ratelimit import provider_call, checked
 
-load_dotenv()
+config.load()
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 GOOGLE_SEARCH_KEY = os.getenv("GOOGLE_SEARCH_KEY")
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
+PAGE_SIZE = int(os.getenv("UI_PAGE_SIZE", "25"))
+# Live updates: wait on the backend's change feed after rendering and rerun when something changes
+LIVE_UPDATES = os.getenv("UI_LIVE_UPDATES", "false").lower() == "true"
+LIVE_WAIT_SECONDS = float(os.getenv("UI_LIVE_WAIT", "1"))  # also how quickly clicks interrupt the wait
 
-# Session state for workflow progress and mock data
-if 'step_progress' not in st.session_state:
-    st.session_state.step_progress = {
-        'products': False, 'companies': False, 'stakeholders': False,
-        'outreach': False, 'meetings': False, 'deals': False
-    }
-if 'data_store' not in st.session_state:
-    st.session_state.data_store = {
-        'products': [], 'companies': [], 'stakeholders': [], 'outreaches': [],
-        'meetings': [], 'deals': []
-    }
+STEPS = ["1. Products", "2. Companies", "3. Stakeholders", "4. Outreach", "5. Meetings", "6. Deals", "7. Analytics"]
+DEAL_STAGES = ["intro", "negotiation", "mou", "established"]
+
+# Session state holds UI state only (page cursors + HTTP cache); table data is always read from the API
+if 'cursors' not in st.session_state:
+    st.session_state.cursors = {}  # table key -> stack of after_id cursors (None = first page)
+if 'api' not in st.session_state:
+    st.session_state.api = ApiClient(f"{BACKEND_URL}/api/v1")  # per-session ETag cache
 if 'gmail_connected' not in st.session_state:
     st.session_state.gmail_connected = False
 
-# Helper: API call to backend (fallback to session state if backend not ready)
-@st.cache_data(ttl=300)
-def api_call(endpoint, method="GET", json_data=None):
+# Helper: API call to backend (GETs cached + revalidated with ETags; writes invalidate them)
+def api_call(endpoint, method="GET", json_data=None, params=None):
     try:
-        url = f"{BACKEND_URL}/api/v1{endpoint}"
         if method == "GET":
-            response = requests.get(url)
-        elif method == "POST":
-            response = requests.post(url, json=json_data)
-        elif method == "PUT":
-            response = requests.put(url, json=json_data)
-        response.raise_for_status()
-        return response.json()
+            return st.session_state.api.get(endpoint, params)[0]
+        return st.session_state.api.write(method, endpoint, json_data)
+    except requests.HTTPError as e:
+        # 4xx carry a reason worth showing (e.g. a 409 meeting overlap); 5xx do not
+        try:
+            detail = e.response.json()["detail"] if e.response.status_code < 500 else None
+        except (ValueError, KeyError, TypeError):
+            detail = None
+        if isinstance(detail, dict):
+            detail = detail.get("message")
+        st.warning(detail if isinstance(detail, str) else "Backend not available.")
+        return []
     except (requests.RequestException, ValueError):
-        # Fallback to session state for MVP (no backend dependency)
-        if method == "GET" and endpoint == "/products":
-            return st.session_state.data_store['products']
-        # Add more fallbacks as needed
-        st.warning("Backend not available; using local mock data.")
+        st.warning("Backend not available.")
         return []
 
+# Helper: Fetch one page of a paginated list endpoint -> (rows, next_cursor)
+def api_page(endpoint, params=None):
+    try:
+        rows, headers = st.session_state.api.get(endpoint, params)
+        return rows, headers.get("X-Next-Cursor")
+    except (requests.RequestException, ValueError):
+        st.warning("Backend not available.")
+        return [], None
+
+# Helper: Prev/Next pager over a list endpoint; returns only the visible page
+def paged_table(key, endpoint, params=None):
+    stack = st.session_state.cursors.setdefault(key, [None])
+    rows, next_cursor = api_page(endpoint, page_params(key, params))
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    if col_prev.button("◀ Prev", key=f"{key}_prev", disabled=len(stack) == 1):
+        stack.pop()
+        st.rerun()
+    col_page.caption(f"Page {len(stack)}")
+    if col_next.button("Next ▶", key=f"{key}_next", disabled=next_cursor is None):
+        stack.append(int(next_cursor))
+        st.rerun()
+    return rows
+
+# Helper: Search box + select over the first page of matches (no full-table loads)
+def pick_record(label, endpoint, key, format_func=lambda r: r.get("name", ""), params=None):
+    st.text_input(f"Search {label}", key=f"{key}_search")
+    rows, _ = api_page(endpoint, picker_params(key, params))
+    if not rows:
+        st.caption(f"No matching {label.lower()} found.")
+        return None
+    return st.selectbox(label, rows, format_func=format_func, key=f"{key}_select")
+
+# Helper: Query params for the visible page of a paged_table / the matches of a pick_record
+def page_params(key, params=None):
+    cursor = st.session_state.cursors.get(key, [None])[-1]
+    query = dict(params or {}, limit=PAGE_SIZE)
+    if cursor is not None:
+        query["after_id"] = cursor
+    return query
+
+def picker_params(key, params=None):
+    query = dict(params or {}, limit=PAGE_SIZE)
+    search = st.session_state.get(f"{key}_search")
+    if search:
+        query["q"] = search
+    return query
+
+# Helper: Every GET a step renders, as {name: (endpoint, params)}; keep in sync with the step bodies
+def step_data_requests(step):
+    calls = {"progress": ("/analytics/progress", None)}
+    if step == STEPS[0]:
+        calls["products"] = ("/products/", page_params("products"))
+    elif step == STEPS[1]:
+        calls["product_picker"] = ("/products/", picker_params("company_product"))
+        calls["companies"] = ("/companies/", page_params("companies"))
+    elif step == STEPS[2]:
+        calls["company_picker"] = ("/companies/", picker_params("stakeholder_company"))
+        calls["stakeholders"] = ("/stakeholders/", page_params("stakeholders"))
+    elif step == STEPS[3]:
+        calls["stakeholder_picker"] = ("/stakeholders/", picker_params("outreach_stakeholder"))
+        calls["outreaches"] = ("/outreaches/", page_params("outreaches"))
+    elif step == STEPS[4]:
+        calls["outreach_picker"] = ("/outreaches/", picker_params("meeting_outreach"))
+        calls["meetings"] = ("/meetings/", page_params("meetings"))
+    elif step == STEPS[5]:
+        calls["meeting_picker"] = ("/meetings/", picker_params("deal_meeting"))
+        for stage in DEAL_STAGES:
+            calls[f"deals_{stage}"] = ("/deals/", page_params(f"deals_{stage}", {"stage": stage}))
+    elif step == STEPS[6]:
+        calls["kpis"] = ("/analytics/kpis", None)
+        calls["funnel"] = ("/analytics/funnel", None)
+        calls["breakdown"] = ("/analytics/outreach_breakdown", None)
+        calls["over_time"] = ("/analytics/outreach_over_time", None)
+        calls["cohorts"] = ("/analytics/cohorts", {"by": st.session_state.get("cohort_by", "week")})
+    return calls
+
+# Helper: Fetch everything the step needs in parallel; the render below then reads the warm cache
+def prefetch(step):
+    st.session_state.api.get_many(step_data_requests(step))
+    return st.session_state.api.last_load
+
+# Helper: Apply changes made elsewhere (change feed) so only their tables are refetched
+def sync_changes(wait=0):
+    try:
+        return st.session_state.api.sync_changes(wait)
+    except (requests.RequestException, ValueError, KeyError):
+        return None
+
+# Helper: After a write, send the table back to its first page so the new row shows up
+def reset_pages(*keys):
+    for key in keys:
+        st.session_state.cursors.pop(key, None)
+
+# Helper: Which workflow steps have data (cheap EXISTS probes on the backend)
+def load_progress():
+    try:
+        return st.session_state.api.get("/analytics/progress")[0]
+    except (requests.RequestException, ValueError):
+        return {step: False for step in ["products", "companies", "stakeholders", "outreach", "meetings", "deals"]}
+
 # Helper: Google Custom Search for product research
 def research_product_on_google(query):
     if not GOOGLE_SEARCH_KEY or not GOOGLE_CSE_ID:
@@ -60,8 +163,7 @@ def research_product_on_google(query):
     url = "https://www.googleapis.com/customsearch/v1"
     params = {"key": GOOGLE_SEARCH_KEY, "cx": GOOGLE_CSE_ID, "q": query}
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
+        response = provider_call("google_cse", "search", lambda: checked(requests.get(url, params=params)), quota=1)
         items = response.json().get("items", [])
         return [item["snippet"] for item in items[:5]]
     except Exception as e:
@@ -105,43 +207,59 @@ def connect_gmail():
     except Exception as e:
         st.error(f"Gmail Connection Error: {e}")
 
-# Helper: AI Outreach (OpenAI if available, else mock)
-def generate_ai_outreach(stakeholder_name, company_name, product_name):
+# Helper: AI Outreach from the stakeholder's segment template (one cached AI call per segment, filled in by the backend),
+# shown as it streams in: a new segment's first words appear while OpenAI is still writing
+def generate_ai_outreach(stakeholder, company_name, product_name):
+    placeholder, body = st.empty(), ""
     try:
-        from services.openai_service import generate_ai_email
-        return generate_ai_email(stakeholder_name, company_name, product_name)
-    except ImportError:
-        return f"Dear {stakeholder_name},\n\nWe're excited about potential JV opportunities with {company_name} regarding our {product_name} technology.\n\nLet's discuss how we can collaborate.\n\nBest regards,\nYour JV Team"
+        for text in st.session_state.api.stream("/outreaches/draft/stream", {"stakeholder_id": stakeholder["id"], "product": product_name}):
+            body += text
+            placeholder.text(body)
+    except requests.RequestException:
+        st.warning("Backend not available.")
+    placeholder.empty()
+    if body:
+        return body
+    stakeholder_name = stakeholder["name"]
+    return f"Dear {stakeholder_name},\n\nWe're excited about potential JV opportunities with {company_name} regarding our {product_name} technology.\n\nLet's discuss how we can collaborate.\n\nBest regards,\nYour JV Team"
+
+# Step selector: unlike st.tabs, only the selected step's body runs (and fetches data)
+render_started = time_module.perf_counter()
+active_step = st.session_state.get("active_step", STEPS[0])
+sync_changes()
+page_load = prefetch(active_step)
 
 # Sidebar: Navigation & Progress
+progress = load_progress()
 st.sidebar.title("JV Workflow Progress")
-progress_value = sum(st.session_state.step_progress.values()) / 6
+progress_value = sum(progress.values()) / 6
 st.sidebar.progress(progress_value)
-for step, complete in st.session_state.step_progress.items():
+for step, complete in progress.items():
     st.sidebar.checkbox(f"{step.title()}", value=complete, disabled=True)
 
 # Main Title
 st.title("🛡️ Joint Venture Partner Identification Dashboard")
-st.markdown("Guided 7-Step Workflow: Follow the tabs to identify and engage JV partners.")
+st.markdown("Guided 7-Step Workflow: Follow the steps to identify and engage JV partners.")
 
-# Tabs for Steps
-tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["1. Products", "2. Companies", "3. Stakeholders", "4. Outreach", "5. Meetings", "6. Deals", "7. Analytics"])
+active_step = st.radio("Workflow step", STEPS, horizontal=True, key="active_step", label_visibility="collapsed")
 
-with tab1:
+if active_step == STEPS[0]:
     st.header("Step 1: Research & Add Products/Technologies")
-    if not st.session_state.step_progress['products']:
-        # Standalone Research Button (OUTSIDE form)
-        research_query = st.text_input("Research Query (e.g., 'AI manufacturing tech')")
-        if st.button("Research on Google"):
-            results = research_product_on_google(research_query)
-            if results:
-                st.subheader("Research Results:")
-                for result in results:
-                    st.write(f"• {result}")
-            else:
-                st.info("No results found or API not configured.")
+    if progress['products']:
+        st.success("✅ Products complete. View data below.")
+    # Standalone Research Button (OUTSIDE form)
+    research_query = st.text_input("Research Query (e.g., 'AI manufacturing tech')")
+    if st.button("Research on Google"):
+        results = research_product_on_google(research_query)
+        if results:
+            st.subheader("Research Results:")
+            for result in results:
+                st.write(f"• {result}")
+        else:
+            st.info("No results found or API not configured.")
 
-        # Form for Adding Product (button inside form only)
+    # Form for Adding Product (button inside form only)
+    with st.expander("Add Product", expanded=not progress['products']):
         with st.form("add_product"):
             name = st.text_input("Product Name", placeholder="e.g., AI Manufacturing Tech")
             description = st.text_area("Description", placeholder="Brief overview...")
@@ -150,24 +268,21 @@ with tab1:
             submitted = st.form_submit_button("Add Product")
             if submitted and name:
                 new_product = {
-                    "id": len(st.session_state.data_store['products']) + 1,
                     "name": name, "description": description,
                     "market_alignment": market_alignment, "revenue_potential": revenue_potential
                 }
-                st.session_state.data_store['products'].append(new_product)
-                st.session_state.step_progress['products'] = True
-                st.success("Product added! Next step unlocked. 🚀")
-                st.rerun()
-    else:
-        st.success("✅ Products complete. View data below.")
-    # Display products
-    products = api_call("/products")  # Or from session state
+                if api_call("/products/", "POST", new_product):
+                    reset_pages("products")
+                    st.success("Product added! Next step unlocked. 🚀")
+                    st.rerun()
+    # Display products (current page only)
+    products = paged_table("products", "/products/")
     if products:
         st.dataframe(pd.DataFrame(products))
 
-with tab2:
+elif active_step == STEPS[1]:
     st.header("Step 2: Identify & Enrich Companies")
-    if st.session_state.step_progress['products']:
+    if progress['products']:
         # Standalone Enrich Button
         company_name_input = st.text_input("Company Name for Enrichment")
         if st.button("Enrich Company"):
@@ -177,7 +292,8 @@ with tab2:
             else:
                 st.warning("Enter a company name first.")
 
-        # Form for Adding Company
+        # Product lookup lives outside the form so searching reruns immediately
+        product = pick_record("Product", "/products/", "company_product")
         with st.form("add_company"):
             name = st.text_input("Company Name", placeholder="e.g., Tech Corp")
             industry = st.text_input("Industry", placeholder="e.g., Manufacturing")
@@ -186,23 +302,23 @@ with tab2:
             submitted = st.form_submit_button("Add Company")
             if submitted and name:
                 new_company = {
-                    "id": len(st.session_state.data_store['companies']) + 1,
-                    "name": name, "industry": industry, "size": size, "revenue": revenue
+                    "name": name, "industry": industry, "size": size, "revenue": revenue,
+                    "product_technology_id": product["id"] if product else None
                 }
-                st.session_state.data_store['companies'].append(new_company)
-                st.session_state.step_progress['companies'] = True
-                st.success("Company added & enriched! 👇")
-                st.rerun()
+                if api_call("/companies/", "POST", new_company):
+                    reset_pages("companies")
+                    st.success("Company added & enriched! 👇")
+                    st.rerun()
     else:
         st.warning("Complete Products first.")
     # Display companies
-    companies = api_call("/companies")
+    companies = paged_table("companies", "/companies/")
     if companies:
         st.dataframe(pd.DataFrame(companies))
 
-with tab3:
+elif active_step == STEPS[2]:
     st.header("Step 3: Add & Verify Stakeholders")
-    if st.session_state.step_progress['companies']:
+    if progress['companies']:
         # Standalone Verify Button
         email_input = st.text_input("Email for Verification")
         linkedin_url = st.text_input("LinkedIn URL (optional)")
@@ -211,54 +327,53 @@ with tab3:
                 status, result = verify_stakeholder_email(email_input)
                 st.write(f"**Email Status:** {status}")
                 if linkedin_url:
-                    try:
-                        from services.linkedin_service import fetch_profile
-                        profile_data = fetch_profile(linkedin_url)
-                        st.json(json.loads(profile_data) if profile_data else {"error": "No data"})
-                    except ImportError:
-                        st.info("LinkedIn service not available.")
+                    # Served from the backend's profile cache; Proxycurl is only called on a miss
+                    profile_data = api_call("/stakeholders/linkedin-profile", params={"url": linkedin_url})
+                    st.json(profile_data or {"error": "No data"})
             else:
                 st.warning("Enter an email first.")
 
         # Form for Adding Stakeholder
+        company = pick_record("Company", "/companies/", "stakeholder_company")
         with st.form("add_stakeholder"):
-            company_name = st.selectbox("Company", [c["name"] for c in st.session_state.data_store.get('companies', [])])
             name = st.text_input("Name", placeholder="e.g., John Doe")
             title = st.text_input("Title", placeholder="e.g., CEO")
             email = st.text_input("Email", placeholder="e.g., john@company.com")
             phone = st.text_input("Phone", placeholder="e.g., 123-456-7890")
             role = st.selectbox("Role", ["decision-maker", "influencer", "technical"])
+            profile_url = st.text_input("LinkedIn URL", placeholder="e.g., linkedin.com/in/john-doe")
             submitted = st.form_submit_button("Add Stakeholder")
-            if submitted and name and email:
-                status, _ = verify_stakeholder_email(email)
+            if submitted and name and email and company:
+                status, result = verify_stakeholder_email(email)
                 new_stakeholder = {
-                    "id": len(st.session_state.data_store['stakeholders']) + 1,
-                    "name": name, "title": title, "email": email, "phone": phone,
-                    "role": role, "company": company_name, "email_status": status
+                    "company_id": company["id"], "name": name, "title": title, "email": email,
+                    "phone": phone, "role": role, "linkedin_url": profile_url or None,
+                    "status": "verified" if result.get("result") == "deliverable" else "identified"
                 }
-                st.session_state.data_store['stakeholders'].append(new_stakeholder)
-                st.success(f"Stakeholder added! Email: {status}")
-                st.rerun()
+                if api_call("/stakeholders/", "POST", new_stakeholder):
+                    reset_pages("stakeholders")
+                    st.success(f"Stakeholder added! Email: {status}")
+                    st.rerun()
     else:
         st.warning("Complete Companies first.")
     # Display stakeholders
-    stakeholders = api_call("/stakeholders")
-    if stakeholders:
-        for s in stakeholders:
-            st.write(f"**{s.get('name', '')}** ({s.get('title', '')}) - {s.get('email_status', 'Unknown')}")
+    stakeholders = paged_table("stakeholders", "/stakeholders/")
+    for s in stakeholders:
+        st.write(f"**{s.get('name', '')}** ({s.get('title', '')}, {s.get('company') or 'no company'}) - {s.get('status', 'Unknown')}")
+        if s.get("linkedin_headline"):
+            st.caption(f"LinkedIn: {s['linkedin_headline']} · {s.get('linkedin_location') or ''}")
 
-with tab4:
+elif active_step == STEPS[3]:
     st.header("Step 4: Outreach & AI Assistance")
     connect_gmail()
-    if st.session_state.step_progress['stakeholders'] and st.session_state.gmail_connected:
+    if progress['stakeholders'] and st.session_state.gmail_connected:
         # Standalone AI Generate Button
-        stakeholder_name = st.selectbox("Stakeholder", [s["name"] for s in st.session_state.data_store.get('stakeholders', [])])
+        stakeholder = pick_record("Stakeholder", "/stakeholders/", "outreach_stakeholder")
         product_name = st.text_input("Related Product", placeholder="e.g., AI Tech")
         if st.button("Generate AI Email"):
-            if stakeholder_name and product_name:
-                stakeholder = next((s for s in st.session_state.data_store.get('stakeholders', []) if s["name"] == stakeholder_name), {})
-                company_name = stakeholder.get("company", "Unknown Co")
-                email_body = generate_ai_outreach(stakeholder_name, company_name, product_name)
+            if stakeholder and product_name:
+                company_name = stakeholder.get("company") or "Unknown Co"
+                email_body = generate_ai_outreach(stakeholder, company_name, product_name)
                 st.text_area("AI-Generated Email", email_body, height=200, key="ai_email")
             else:
                 st.warning("Select stakeholder and product first.")
@@ -267,78 +382,171 @@ with tab4:
         with st.form("add_outreach"):
             message = st.text_area("Custom Message (or use AI above)", height=150)
             submitted = st.form_submit_button("Send Outreach")
-            if submitted and message:
-                # Mock send
-                try:
-                    from services.gmail_service import send_email
-                    stakeholder = next((s for s in st.session_state.data_store.get('stakeholders', []) if s["name"] == stakeholder_name), {})
-                    to_email = stakeholder.get("email", "")
-                    subject = f"JV Opportunity: {product_name}"
-                    if send_email(to_email, subject, message):
-                        new_outreach = {"id": len(st.session_state.data_store['outreaches']) + 1, "message": message, "stakeholder": stakeholder_name}
-                        st.session_state.data_store['outreaches'].append(new_outreach)
-                        st.session_state.step_progress['outreach'] = True
-                        st.success("Outreach sent! 📧")
-                        st.rerun()
-                    else:
-                        st.error("Failed to send email.")
-                except Exception as e:
-                    st.error(f"Send Error: {e} (Mock sent for demo).")
-                    # Still "send" for demo
-                    st.session_state.step_progress['outreach'] = True
+            if submitted and message and stakeholder:
+                # The backend records the outreach and queues the email in one transaction;
+                # the outbox dispatcher (python outbox.py) sends it, retrying on Gmail errors
+                new_outreach = {
+                    "stakeholder_id": stakeholder["id"], "message": message,
+                    "send_email": bool(stakeholder.get("email")), "subject": f"JV Opportunity: {product_name}",
+                }
+                if not new_outreach["send_email"]:
+                    new_outreach["notes"] = "Not emailed: stakeholder has no email"
+                if api_call("/outreaches/", "POST", new_outreach):
+                    reset_pages("outreaches")
+                    st.success("Outreach saved; email queued 📧" if new_outreach["send_email"] else "Outreach saved (no email address).")
                     st.rerun()
     else:
         st.warning("Complete Stakeholders and connect Gmail first.")
-    # Display outreaches with classification
-    outreaches = st.session_state.data_store.get('outreaches', [])
+    # Display outreaches (current page) with classification
+    outreaches = paged_table("outreaches", "/outreaches/")
     for o in outreaches:
         col1, col2 = st.columns(2)
         with col1:
-            st.write(f"**To:** {o['stakeholder']}")
+            st.write(f"**To:** {o.get('stakeholder') or o['stakeholder_id']} — {o['response']}")
         with col2:
             response_text = st.text_input("Response Text", key=f"resp_{o['id']}")
         if st.button("Classify Response (AI)", key=f"class_{o['id']}") and response_text:
             try:
                 from services.openai_service import classify_response
                 classification = classify_response(response_text)
-                st.success(f"AI Classification: {classification}")
             except ImportError:
-                st.success("AI Classification: Mock - Interested")
+                classification = "interested"
+            api_call(f"/outreaches/{o['id']}/response", "PUT", {"response": classification, "notes": response_text})
+            st.success(f"AI Classification: {classification}")
 
-with tab5:
+elif active_step == STEPS[4]:
     st.header("Step 5: Schedule Meetings")
-    if st.session_state.step_progress['outreach']:
+    if progress['outreach']:
+        outreach = pick_record(
+            "Outreach", "/outreaches/", "meeting_outreach",
+            format_func=lambda o: f"#{o['id']} → {o.get('stakeholder') or o['stakeholder_id']} ({o['response']})"
+        )
         # Form for Adding Meeting
         with st.form("add_meeting"):
-            outreach_stakeholder = st.selectbox("From Outreach", [o["stakeholder"] for o in st.session_state.data_store.get('outreaches', [])])
             scheduled_date = st.date_input("Scheduled Date")
+            scheduled_time = st.time_input("Scheduled Time (UTC)", value=time(10, 0))
+            duration = st.number_input("Duration (minutes)", min_value=15, max_value=480, value=30, step=15)
             participants = st.text_input("Participants", placeholder="e.g., John Doe, Team Lead")
             agenda = st.text_area("Agenda", placeholder="Discuss JV opportunities...")
+            allow_conflicts = st.checkbox("Allow overlapping meetings")
             submitted = st.form_submit_button("Schedule Meeting")
-            if submitted:
+            if submitted and outreach:
                 new_meeting = {
-                    "id": len(st.session_state.data_store['meetings']) + 1,
-                    "stakeholder": outreach_stakeholder, "date": scheduled_date.isoformat(),
-                    "participants": participants, "agenda": agenda
+                    "outreach_id": outreach["id"],
+                    "scheduled_date": datetime.combine(scheduled_date, scheduled_time).isoformat(),
+                    "duration_minutes": int(duration), "participants": participants, "agenda": agenda,
+                    "allow_conflicts": allow_conflicts
                 }
-                st.session_state.data_store['meetings'].append(new_meeting)
-                st.success("Meeting scheduled! (Calendly link would appear here in full integration.)")
-                st.session_state.step_progress['meetings'] = True
-                st.rerun()
+                result = api_call("/meetings/", "POST", new_meeting)
+                if result:
+                    reset_pages("meetings")
+                    if result.get("conflicts"):
+                        st.warning(f"Scheduled, but overlaps {len(result['conflicts'])} meeting(s).")
+                    st.success("Meeting scheduled!")
+                    st.rerun()
+        with st.expander("Find common free time"):
+            people = st.text_input("Participants (comma-separated emails or names)", key="free_slot_people")
+            if people and st.button("Show free slots"):
+                slots = api_call("/meetings/free-slots", params={"participants": people, "limit": 10})
+                for slot in slots or []:
+                    st.write(f"{slot['start'][:16].replace('T', ' ')} → {slot['end'][11:16]} UTC")
+        # Bulk scheduling: one Calendly slot per interested outreach without a meeting
+        if st.button("📅 Schedule all interested via Calendly"):
+            result = api_call("/meetings/calendly/schedule", "POST", {})
+            if result:
+                if result.get("error"):
+                    st.warning(result["error"])
+                else:
+                    st.success(f"Booked {result['scheduled']} of {result['candidates']} "
+                               f"({result['failed']} failed, {result['no_slot']} without a free slot).")
+                    if result["scheduled"]:
+                        reset_pages("meetings")
     else:
         st.warning("Complete Outreach first.")
     # Display meetings
-    meetings = api_call("/meetings")
+    meetings = paged_table("meetings", "/meetings/")
     if meetings:
         st.dataframe(pd.DataFrame(meetings))
 
-with tab6:
+elif active_step == STEPS[5]:
     st.header("Step 6: Deal Pipeline (Kanban View)")
-    if st.session_state.step_progress['meetings']:
-        # Mock deals if none
-        if not st.session_state.data_store['deals']:
-            st.session_state.data_store['deals'] = [{"id": 1, "stage": "intro", "notes": "Test Deal from Meeting", "assigned_to": "user@example.com"}]
-        deals = st.session_state.data_store['deals']
-        df = pd.DataFrame(deals)
-        if not df.empty:
-            col1, col2, col3, col4 = st.columns
\ No newline at end of file
+    if progress['meetings']:
+        meeting = pick_record(
+            "Meeting", "/meetings/", "deal_meeting",
+            format_func=lambda m: f"#{m['id']} {m['scheduled_date'][:16]} — {m['participants']}"
+        )
+        with st.form("add_deal"):
+            stage = st.selectbox("Stage", DEAL_STAGES)
+            notes = st.text_area("Notes")
+            assigned_to = st.text_input("Assigned To", placeholder="e.g., user@example.com")
+            submitted = st.form_submit_button("Create Deal")
+            if submitted and meeting:
+                new_deal = {"meeting_id": meeting["id"], "stage": stage, "notes": notes, "assigned_to": assigned_to}
+                if api_call("/deals/", "POST", new_deal):
+                    reset_pages(f"deals_{stage}")
+                    st.success("Deal created!")
+                    st.rerun()
+
+        # One column per stage, each showing its own page of deals
+        for stage, column in zip(DEAL_STAGES, st.columns(len(DEAL_STAGES))):
+            with column:
+                st.subheader(stage.title())
+                for deal in paged_table(f"deals_{stage}", "/deals/", {"stage": stage}):
+                    st.markdown(f"**Deal #{deal['id']}** · {deal.get('assigned_to') or 'unassigned'}")
+                    st.caption(deal.get("notes") or "")
+                    move_to = st.selectbox("Move to", DEAL_STAGES, index=DEAL_STAGES.index(stage), key=f"move_{deal['id']}")
+                    if move_to != stage and st.button("Move", key=f"move_btn_{deal['id']}"):
+                        api_call(f"/deals/{deal['id']}/stage", "PUT", {"stage": move_to})
+                        reset_pages(f"deals_{stage}", f"deals_{move_to}")
+                        st.rerun()
+    else:
+        st.warning("Complete Meetings first.")
+
+elif active_step == STEPS[6]:
+    st.header("Step 7: Analytics")
+    kpis = api_call("/analytics/kpis")
+    if kpis:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Outreaches", kpis["total_outreach"])
+        col2.metric("Response Rate", f"{kpis['response_rate_percent']}%")
+        col3.metric("Interested Leads", kpis["interested_leads"])
+        col4.metric("Meetings Scheduled", kpis["meetings_scheduled"])
+
+    funnel = api_call("/analytics/funnel")
+    if funnel:
+        st.subheader("Pipeline Funnel")
+        st.bar_chart(pd.DataFrame(funnel["stages"]).set_index("stage")["count"])
+
+    breakdown = api_call("/analytics/outreach_breakdown")
+    if breakdown:
+        st.subheader("Responses")
+        st.bar_chart(pd.Series(breakdown, name="count"))
+
+    over_time = api_call("/analytics/outreach_over_time")
+    if over_time:
+        st.subheader("Outreach Over Time (30 days)")
+        st.line_chart(pd.DataFrame(over_time).set_index("date")["count"])
+
+    cohort_by = st.selectbox("Cohorts by", ["week", "product", "assigned_to"], key="cohort_by")
+    cohorts = api_call("/analytics/cohorts", params={"by": cohort_by})
+    if cohorts and cohorts["cohorts"]:
+        st.dataframe(pd.DataFrame(cohorts["cohorts"]))
+
+# Page-load timings: concurrent data load (wall vs. summed) and total render time
+with st.sidebar.expander("⏱️ Page load timings"):
+    st.write(f"Data: {page_load['wall_ms']} ms wall for {len(page_load['calls'])} calls ({page_load['sum_ms']} ms if sequential)")
+    st.write(f"Render: {round((time_module.perf_counter() - render_started) * 1000, 1)} ms total")
+    st.dataframe(pd.DataFrame(page_load["calls"]), hide_index=True)
+
+# Live updates: long-poll the change feed; a change reruns the script, which refetches only the
+# affected tables and analytics. Any widget interaction interrupts the loop at the next status update.
+if st.sidebar.toggle("Live updates", value=LIVE_UPDATES, key="live_updates"):
+    live_status = st.sidebar.empty()
+    while True:
+        events = sync_changes(wait=LIVE_WAIT_SECONDS)
+        if events is None:
+            live_status.caption("Live updates unavailable (backend unreachable).")
+            break
+        if events:
+            st.rerun()
+        live_status.caption(f"Live · checked {datetime.now():%H:%M:%S}")
@@ -1,6 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import deals, outreaches, meetings, analytics
+from fastapi.responses import PlainTextResponse
+import database
+from compression import CompressionMiddleware
+from metrics import MetricsMiddleware, instrument_engine, render_prometheus, PROMETHEUS_CONTENT_TYPE
+from routers import products, companies, stakeholders, deals, outreaches, meetings, analytics, exports, reports, events
 
 app = FastAPI(title="JV Partner Dashboard API")
 
@@ -10,13 +14,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+# Per-route latency and per-request SQL counts/durations, scraped from /metrics
+app.add_middleware(MetricsMiddleware)
+instrument_engine(database.engine)
+# br/gzip for JSON and CSV bodies above COMPRESSION_MIN_BYTES (outermost: metrics see uncompressed sizes)
+app.add_middleware(CompressionMiddleware)
 
-app.include_router(deals.router, prefix="/deals", tags=["deals"])
-app.include_router(outreaches.router, prefix="/outreaches", tags=["outreaches"])
-app.include_router(meetings.router, prefix="/meetings", tags=["meetings"])
-app.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+# Routers carry their own resource prefix; the Streamlit client calls /api/v1/<resource>
+API_PREFIX = "/api/v1"
+app.include_router(products.router, prefix=API_PREFIX)
+app.include_router(companies.router, prefix=API_PREFIX)
+app.include_router(stakeholders.router, prefix=API_PREFIX)
+app.include_router(deals.router, prefix=API_PREFIX)
+app.include_router(outreaches.router, prefix=API_PREFIX)
+app.include_router(meetings.router, prefix=API_PREFIX)
+app.include_router(analytics.router, prefix=API_PREFIX)
+app.include_router(exports.router, prefix=API_PREFIX)
+app.include_router(reports.router, prefix=API_PREFIX)
+app.include_router(events.router, prefix=API_PREFIX)
 
 @app.get("/")
 async def root():
     return {"message": "JV Partner Dashboard API"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
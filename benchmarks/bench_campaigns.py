@@ -0,0 +1,87 @@
+"""
+Benchmark: a campaign to every stakeholder of a synthetic data set, generated per segment (campaigns.py).
+Template generation is simulated (--llm-ms per call, no OpenAI) and counted, so the report shows LLM calls
+per-recipient generation would have made vs per-segment, the local render rate (emails/s), and the full
+run_campaign() time cold (templates generated) and warm (all cached), dry run and with writes.
+Run: python benchmarks/bench_campaigns.py [--scale 25000] [--llm-ms 800]   (stakeholders = scale / 5)
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import campaigns
+from database import Base
+from services import openai_service
+from synthetic_data import generate
+
+def run(engine, llm_ms: float) -> dict:
+    """Returns: {'recipients', 'segments', 'llm_calls', 'render_per_s', 'cold_s', 'warm_s', 'write_s'}."""
+    calls = []
+
+    async def generate_template(segment):
+        calls.append(segment)
+        await asyncio.sleep(llm_ms / 1000)
+        return "Dear {{first_name}},\n\nAs {{title}} at {{company}} you know the " + segment.industry + \
+               " market; our {{product}} could help. Could we talk next week?\n\nBest regards,\nYour JV Team"
+
+    original = campaigns.generate_template
+    campaigns.generate_template = generate_template
+    Session = sessionmaker(bind=engine)
+    try:
+        with Session() as db:
+            started = time.perf_counter()
+            cold = campaigns.run_campaign(db, dry_run=True)
+            cold_s = time.perf_counter() - started
+            started = time.perf_counter()
+            campaigns.run_campaign(db, dry_run=True)
+            warm_s = time.perf_counter() - started
+
+            recipients = campaigns.recipients_query(db).all()
+            templates, _ = campaigns.templates_for(db, [campaigns.segment_of("outreach", row) for row in recipients])
+            started = time.perf_counter()
+            for row in recipients:
+                templates[campaigns.segment_of("outreach", row)].render(campaigns.recipient_fields(
+                    row.name, row.title, row.company, row.industry, row.product))
+            render_s = time.perf_counter() - started
+
+            started = time.perf_counter()
+            written = campaigns.run_campaign(db, send_email=True)
+            write_s = time.perf_counter() - started
+    finally:
+        campaigns.generate_template = original
+    return {"recipients": cold["recipients"], "segments": cold["segments"], "llm_calls": len(calls),
+            "emails_queued": written["emails_queued"], "render_per_s": round(len(recipients) / render_s),
+            "cold_s": round(cold_s, 2), "warm_s": round(warm_s, 2), "write_s": round(write_s, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=25_000, help="outreaches in the synthetic data set")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--llm-ms", type=float, default=800, help="simulated latency of one template generation")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/campaigns.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+        print(f"loaded {generate(engine, args.scale, args.seed)}")
+        result = run(engine, args.llm_ms)
+        engine.dispose()
+
+    per_recipient_s = result["recipients"] * args.llm_ms / 1000 / openai_service.CONCURRENCY
+    print(f"\nrecipients {result['recipients']}, segments {result['segments']}")
+    print(f"LLM calls: per recipient {result['recipients']} (~{per_recipient_s:.0f} s at {openai_service.CONCURRENCY} concurrent), "
+          f"per segment {result['llm_calls']}")
+    print(f"render: {result['render_per_s']:,} emails/s")
+    print(f"run_campaign dry run: cold {result['cold_s']} s, warm (cached) {result['warm_s']} s; "
+          f"with writes {result['write_s']} s ({result['emails_queued']} emails queued)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: whole-table transfer of /outreaches/ as JSON rows vs ?format=columnar, with and without
+compression. Walks every page (limit=500) over a synthetic data set through the full FastAPI stack
+in-process and reports bytes on the wire, the ratio to plain JSON, the time to fetch all pages and
+the time to decode them into one pandas DataFrame (pd.DataFrame(rows) vs api_client.to_frame()).
+Run: python benchmarks/bench_columnar.py [--scale 100000] [--table outreaches] [--encodings identity,gzip,br]
+     (--scale 1000000 is the million-row case; br needs the optional brotli package)
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import database
+from api_client import PAGE_LIMIT, to_frame
+from compression import negotiate
+from database import Base
+from routers.pagination import NEXT_CURSOR_HEADER
+from synthetic_data import generate
+
+def walk(client, table: str, format: str, encoding: str) -> tuple:
+    """Fetch every page. Returns: (decoded bodies, bytes on the wire, seconds)."""
+    bodies, wire = [], 0
+    params = {"limit": PAGE_LIMIT, "format": format}
+    started = time.perf_counter()
+    while True:
+        response = client.get(f"/api/v1/{table}/", params=params, headers={"Accept-Encoding": encoding})
+        response.raise_for_status()
+        wire += response.num_bytes_downloaded
+        bodies.append(response.content)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return bodies, wire, time.perf_counter() - started
+        params["after_id"] = cursor
+
+def decode(bodies: list, format: str) -> tuple:
+    """Returns: (DataFrame of all pages, seconds); both paths build one DataFrame from all pages."""
+    import pandas as pd
+    started = time.perf_counter()
+    if format == "columnar":
+        frame = to_frame(*[json.loads(body) for body in bodies])
+    else:
+        rows = []
+        for body in bodies:
+            rows.extend(json.loads(body))
+        frame = pd.DataFrame(rows)
+    return frame, time.perf_counter() - started
+
+def run(engine, table: str, encodings: list) -> list:
+    """Returns: [{'format', 'encoding', 'rows', 'wire_bytes', 'ratio', 'fetch_s', 'decode_s'}]."""
+    from fastapi.testclient import TestClient
+    from backend import app
+
+    Session = sessionmaker(bind=engine)
+
+    def get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    results = []
+    app.dependency_overrides[database.get_db] = get_db
+    try:
+        with TestClient(app) as client:
+            walk(client, table, "json", "identity")  # warm-up
+            for format in ("json", "columnar"):
+                decode_s = None
+                for encoding in encodings:
+                    bodies, wire, fetch_s = walk(client, table, format, encoding)
+                    if decode_s is None:  # bodies are identical after decompression
+                        frame, decode_s = decode(bodies, format)
+                    results.append({"format": format, "encoding": encoding, "rows": len(frame), "wire_bytes": wire,
+                                    "fetch_s": round(fetch_s, 2), "decode_s": round(decode_s, 3)})
+    finally:
+        app.dependency_overrides.pop(database.get_db, None)
+    plain = next(result["wire_bytes"] for result in results if result["format"] == "json")
+    for result in results:
+        result["ratio"] = round(plain / result["wire_bytes"], 1)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=100_000, help="outreaches in the synthetic data set")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--table", default="outreaches", choices=("outreaches", "stakeholders", "meetings", "deals"))
+    parser.add_argument("--encodings", default="identity,gzip,br")
+    args = parser.parse_args()
+    encodings = [encoding for encoding in args.encodings.split(",") if encoding == "identity" or negotiate(encoding) == encoding]
+    skipped = set(args.encodings.split(",")) - set(encodings)
+    if skipped:
+        print(f"skipping {', '.join(sorted(skipped))} (not available here)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/columnar.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+        print(f"loaded {generate(engine, args.scale, args.seed)}")
+        results = run(engine, args.table, encodings)
+        engine.dispose()
+
+    print(f"\n{'format':10s} {'encoding':9s} {'rows':>9s} {'wire MB':>9s} {'x smaller':>10s} {'fetch s':>8s} {'decode s':>9s}")
+    for result in results:
+        print(f"{result['format']:10s} {result['encoding']:9s} {result['rows']:9d} {result['wire_bytes'] / 1e6:9.2f} "
+              f"{result['ratio']:10.1f} {result['fetch_s']:8.2f} {result['decode_s']:9.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: streaming CSV / Parquet / Arrow exports (utils.stream_csv, utils.stream_columnar).
+Builds a throwaway SQLite DB with N outreaches and reports MB/s (and, with --memory, peak
+Python memory; tracing slows Python down, so throughput is not comparable in that mode).
+Run: python benchmarks/bench_exports.py --rows 1000000 [--memory]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from database import Base
+from models import Outreach, OutreachResponse, readable_select, store_message_bodies
+from utils import stream_csv, stream_columnar
+
+def load_outreaches(engine, rows: int):
+    responses = list(OutreachResponse)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for start in range(0, rows, 50_000):
+            hashes = store_message_bodies(conn, [f"Hello #{i}, we'd like to discuss a JV on our manufacturing tech."
+                                                 for i in range(start, min(start + 50_000, rows))])
+            conn.execute(insert(Outreach), [
+                {
+                    "stakeholder_id": i % 5000 + 1,
+                    "message_sha256": hashes[i - start],
+                    "response": responses[i % len(responses)],
+                    "date": now - timedelta(minutes=i),
+                    "notes": "",
+                }
+                for i in range(start, min(start + 50_000, rows))
+            ])
+
+def measure(label, chunks, rows: int, trace_memory: bool = False):
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    total = sum(len(chunk) for chunk in chunks)
+    elapsed = time.perf_counter() - started
+    line = f"{label:8s} {total / 1e6:8.1f} MB  {elapsed:6.2f} s  {total / 1e6 / elapsed:7.1f} MB/s  {rows / elapsed:10,.0f} rows/s"
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        line += f"  peak {peak / 1e6:6.1f} MB"
+    print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--memory", action="store_true", help="trace peak Python memory (slower)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(engine)
+        load_outreaches(engine, args.rows)
+        statement = readable_select(Outreach.__table__).order_by(Outreach.id)
+        print(f"{args.rows} outreaches, chunk size {args.chunk_size}")
+        with Session(engine) as db:
+            measure("csv", stream_csv(db, statement, args.chunk_size), args.rows, args.memory)
+            measure("parquet", stream_columnar(db, statement, "parquet", args.chunk_size), args.rows, args.memory)
+            measure("arrow", stream_columnar(db, statement, "arrow", args.chunk_size), args.rows, args.memory)
+
+if __name__ == "__main__":
+    main()
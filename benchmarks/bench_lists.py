@@ -0,0 +1,96 @@
+"""
+Benchmark: rows/second of the paginated list endpoints at their largest page size.
+Walks every page of each list (?limit=500 and X-Next-Cursor) over a synthetic data set (synthetic_data.py),
+through the full FastAPI stack in-process, and reports rows/s, bytes per row and the time per page.
+Run: python benchmarks/bench_lists.py [--scale 20000] [--runs 3] [--only outreaches]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import database
+from database import Base
+from routers.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from synthetic_data import generate
+
+LISTS = ("products", "companies", "stakeholders", "outreaches", "meetings", "deals")
+
+def walk(client, name: str) -> tuple:
+    """Fetch every page of /api/v1/<name>/. Returns: (rows, bytes, pages)."""
+    rows = size = pages = 0
+    params = {"limit": MAX_PAGE_SIZE}
+    while True:
+        response = client.get(f"/api/v1/{name}/", params=params)
+        response.raise_for_status()
+        rows += len(response.json())
+        size += len(response.content)
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return rows, size, pages
+        params["after_id"] = cursor
+
+def run(engine, runs: int = 3, only: str = None) -> dict:
+    """Returns: {list name: {'rows', 'rows_per_s', 'bytes_per_row', 'ms_per_page'}} (best of `runs`)."""
+    from fastapi.testclient import TestClient
+    from backend import app
+
+    Session = sessionmaker(bind=engine)
+
+    def get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    results = {}
+    app.dependency_overrides[database.get_db] = get_db
+    try:
+        with TestClient(app) as client:
+            for name in LISTS:
+                if only and only != name:
+                    continue
+                walk(client, name)  # warm-up
+                best = None
+                for _ in range(runs):
+                    started = time.perf_counter()
+                    rows, size, pages = walk(client, name)
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+                results[name] = {
+                    "rows": rows, "rows_per_s": round(rows / best) if best else 0,
+                    "bytes_per_row": round(size / rows, 1) if rows else 0.0, "ms_per_page": round(best * 1000 / pages, 2),
+                }
+    finally:
+        app.dependency_overrides.pop(database.get_db, None)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=20_000, help="outreaches in the synthetic data set")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--only", choices=LISTS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/lists.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+        print(f"loaded {generate(engine, args.scale, args.seed)}")
+        results = run(engine, args.runs, args.only)
+        engine.dispose()
+
+    print(f"\n{'list':14s} {'rows':>8s} {'rows/s':>10s} {'bytes/row':>10s} {'ms/page':>9s}")
+    for name, result in results.items():
+        print(f"{name:14s} {result['rows']:8d} {result['rows_per_s']:10d} {result['bytes_per_row']:10.1f} {result['ms_per_page']:9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: outreaches table size and scan time before and after migration 0012 (message_bodies).
+Builds a SQLite database at revision 0011 with `--scale` outreaches whose bodies come from `--templates`
+campaign texts (`--unique` adds that share of one-off bodies), measures, runs `alembic upgrade head`
+(timed) and VACUUM, and measures again. Sizes are pages used per table (SQLite dbstat); scans read every
+row with all columns (exports), with the list endpoint's columns, and in SQL (a per-response count
+that reads every page of the table, like the analytics queries).
+Run: python benchmarks/bench_message_bodies.py [--scale 200000] [--templates 20] [--unique 0.05]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIST_COLUMNS = "id, stakeholder_id, notes, date, response, follow_up_date, follow_up_count, next_action_at"
+PARAGRAPH = ("We manufacture {product} at scale and are looking for a partner with distribution in your markets. "
+             "Our pilot lines have been running for two years, unit costs are down 30% since launch, and we can "
+             "share volumes, certifications and the joint roadmap we have in mind. ")
+
+def alembic(database_url: str, *args):
+    subprocess.run([sys.executable, "-m", "alembic", *args], cwd=ROOT, check=True, capture_output=True,
+                   env={**os.environ, "DATABASE_URL": database_url})
+
+def load(path: str, scale: int, templates: int, unique: float, seed: int):
+    """Insert `scale` outreaches in the 0011 schema (message stored inline)."""
+    rng = random.Random(seed)
+    campaigns = ["Hello,\n\n" + PARAGRAPH.format(product=f"product line {n}") * 4 + "\nBest regards" for n in range(templates)]
+    with sqlite3.connect(path) as connection:
+        connection.executemany(
+            "INSERT INTO outreaches (id, stakeholder_id, date, message, response, notes, follow_up_count) "
+            "VALUES (?, ?, '2026-01-01 00:00:00', ?, 'NO_RESPONSE', '', 0)",
+            ((n, n % 5000 + 1, f"Hi #{n},\n\n" + PARAGRAPH.format(product="our membranes") * 3 if rng.random() < unique
+              else rng.choice(campaigns)) for n in range(1, scale + 1)),
+        )
+
+def measure(path: str) -> dict:
+    """Returns: {'outreaches_mb', 'bodies_mb', 'scan_all_s', 'scan_list_s', 'scan_sql_s'} (scans: best of three)."""
+    with sqlite3.connect(path) as connection:
+        connection.execute("VACUUM")
+        sizes = dict(connection.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+        timings = {}
+        for name, sql in (("scan_all_s", "SELECT * FROM outreaches"), ("scan_list_s", f"SELECT {LIST_COLUMNS} FROM outreaches"),
+                          ("scan_sql_s", "SELECT response, COUNT(*) FROM outreaches NOT INDEXED GROUP BY response")):
+            best = None
+            for _ in range(3):
+                started = time.perf_counter()
+                for _ in connection.execute(sql):
+                    pass
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = round(best, 3)
+    return {"outreaches_mb": round(sizes.get("outreaches", 0) / 1e6, 2),
+            "bodies_mb": round(sizes.get("message_bodies", 0) / 1e6, 2), **timings}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=200_000, help="outreaches")
+    parser.add_argument("--templates", type=int, default=20, help="distinct campaign texts")
+    parser.add_argument("--unique", type=float, default=0.05, help="share of outreaches with a one-off body")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bodies.db")
+        url = f"sqlite:///{path}"
+        alembic(url, "upgrade", "0011")
+        load(path, args.scale, args.templates, args.unique, args.seed)
+        before = measure(path)
+        started = time.perf_counter()
+        alembic(url, "upgrade", "head")
+        migrate_s = time.perf_counter() - started
+        after = measure(path)
+
+    print(f"{args.scale} outreaches, {args.templates} campaign texts, {args.unique:.0%} one-off bodies; "
+          f"migration took {migrate_s:.1f} s\n")
+    print(f"{'':8s} {'outreaches MB':>14s} {'bodies MB':>10s} {'scan all s':>11s} {'scan list s':>12s} {'scan sql s':>11s}")
+    for label, result in (("before", before), ("after", after)):
+        print(f"{label:8s} {result['outreaches_mb']:14.2f} {result['bodies_mb']:10.2f} "
+              f"{result['scan_all_s']:11.3f} {result['scan_list_s']:12.3f} {result['scan_sql_s']:11.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: overhead of MetricsMiddleware + SQL hooks (metrics.py) on real endpoints.
+Serves the app in-process against a throwaway SQLite DB and alternates rounds with
+instrumentation on and off (noisy at the ~1% level), then times the middleware and the
+SQL hooks in isolation. The budget is < 5% added latency.
+Run: python benchmarks/bench_metrics.py --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from bench_exports import load_outreaches
+import database
+import metrics
+from database import Base
+from backend import app
+
+ENDPOINTS = ["/api/v1/outreaches/?limit=50", "/api/v1/analytics/kpis", "/api/v1/analytics/outreach_breakdown"]
+
+def set_instrumented(engine, enabled: bool):
+    metrics.METRICS_ENABLED = enabled
+    if enabled:
+        metrics.instrument_engine(engine)
+    elif event.contains(engine, "before_cursor_execute", metrics._before_cursor_execute):
+        event.remove(engine, "before_cursor_execute", metrics._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", metrics._after_cursor_execute)
+
+def run_round(client, requests: int) -> float:
+    started = time.perf_counter()
+    for i in range(requests):
+        client.get(ENDPOINTS[i % len(ENDPOINTS)]).raise_for_status()
+    return time.perf_counter() - started
+
+def isolated_costs(calls: int = 100_000):
+    """Returns: (middleware µs per request, SQL hooks µs per statement)."""
+    class Route:
+        path_format = "/api/v1/deals/"
+
+    async def endpoint(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    async def serve(asgi_app):
+        scope = {"type": "http", "method": "GET", "route": Route()}
+        started = time.perf_counter()
+        for _ in range(calls):
+            await asgi_app(scope, None, send)
+        return time.perf_counter() - started
+
+    metrics.METRICS_ENABLED = True
+    middleware = (asyncio.run(serve(metrics.MetricsMiddleware(endpoint))) - asyncio.run(serve(endpoint))) / calls
+
+    class Context:
+        pass
+
+    context = Context()
+    started = time.perf_counter()
+    for _ in range(calls):
+        metrics._before_cursor_execute(None, None, "SELECT 1", (), context, False)
+        metrics._after_cursor_execute(None, None, "SELECT 1", (), context, False)
+    hooks = (time.perf_counter() - started) / calls
+    return middleware * 1e6, hooks * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1500, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=5_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+        load_outreaches(engine, args.rows)
+        Session = sessionmaker(bind=engine)
+
+        def get_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[database.get_db] = get_db
+        with TestClient(app) as client:
+            timings = {True: [], False: []}
+            run_round(client, 100)  # warm-up
+            for round_number in range(args.rounds):
+                # Alternate which mode goes first; the second run of a round tends to be slower
+                for enabled in ((True, False) if round_number % 2 else (False, True)):
+                    set_instrumented(engine, enabled)
+                    timings[enabled].append(run_round(client, args.requests))
+        off, on = min(timings[False]), min(timings[True])
+        print(f"{args.requests} requests/round, best of {args.rounds}")
+        print(f"uninstrumented {off / args.requests * 1e3:7.3f} ms/request")
+        print(f"instrumented   {on / args.requests * 1e3:7.3f} ms/request")
+        print(f"end-to-end     {(on - off) / off * 100:+6.2f} %  (budget 5 %)")
+        exposition = metrics.render_prometheus().splitlines()
+        queries = sum(int(line.split()[-1]) for line in exposition if line.startswith("http_request_sql_queries_sum"))
+        requests = sum(int(line.split()[-1]) for line in exposition if line.startswith("http_request_sql_queries_count"))
+        middleware_us, hook_us = isolated_costs()
+        per_request_us = middleware_us + hook_us * queries / requests
+        print(f"isolated       middleware {middleware_us:.1f} µs/request, SQL hooks {hook_us:.1f} µs/statement, "
+              f"{queries / requests:.1f} statements/request")
+        print(f"               = {per_request_us:.1f} µs/request = {per_request_us / (off / args.requests * 1e6) * 100:.2f} %")
+
+if __name__ == "__main__":
+    main()
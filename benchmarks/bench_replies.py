@@ -0,0 +1,87 @@
+"""
+Benchmark: reply ingestion (replies.py) cost vs mailbox size.
+Serves fake_providers (Gmail mailbox preloaded with --mailbox messages, OpenAI classifying), loads a
+synthetic data set, then for each count in --new receives that many replies from stakeholders and runs
+sync_replies(): Gmail requests, OpenAI calls and seconds per sync. For comparison it times what a sync
+that rescans the inbox would cost (list every message, batch-get every one).
+Run: python benchmarks/bench_replies.py [--mailbox 20000] [--new 10,100,1000] [--scale 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load_test import configure_env, serve
+
+def gmail_calls(fake_url: str) -> tuple:
+    """Returns: (Gmail requests, OpenAI calls) served by the stand-in so far."""
+    import requests
+    calls = requests.get(f"{fake_url}/_stats").json()["calls"]
+    gmail = sum(count for call, count in calls.items() if "/gmail/" in call)
+    return gmail, sum(count for call, count in calls.items() if "/openai/" in call)
+
+def receive(store, senders: list, count: int, rng: random.Random):
+    replies = ("We are interested, send details.", "Not interested, thanks.", "Ask me again next quarter.",
+               "Out of office until Monday.")
+    for _ in range(count):
+        store.add(f"From: {rng.choice(senders)}\nTo: me@example.com\nSubject: Re: JV\n\n{rng.choice(replies)}\n\n"
+                  f"On Mon, Team wrote:\n> Dear partner", ["INBOX", "UNREAD"])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mailbox", type=int, default=20_000, help="messages already in the inbox")
+    parser.add_argument("--new", default="10,100,1000", help="replies received before each sync")
+    parser.add_argument("--scale", type=int, default=10_000, help="outreaches in the synthetic data set")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    import fake_providers
+    fake_providers.GMAIL_HISTORY_RETENTION = args.mailbox + 100_000
+    fake_url, fake_server = serve(fake_providers.app)
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_env(fake_url, os.path.join(tmp, "replies.db"), unthrottled=True)
+        import database
+        import replies
+        from database import Base
+        from models import Stakeholder
+        from services import gmail_service
+        from synthetic_data import generate
+        Base.metadata.create_all(database.engine)
+        generate(database.engine, args.scale, args.seed)
+        with database.SessionLocal() as db:
+            senders = [email for (email,) in db.query(Stakeholder.email).filter(Stakeholder.email.isnot(None))]
+            receive(fake_providers.gmail_store, [f"newsletter{n}@elsewhere.example.com" for n in range(50)], args.mailbox, rng)
+            service = gmail_service.get_gmail_service()
+            replies.sync_replies(db, service=service)  # first sync: records the cursor
+
+            rows = []
+            for count in (int(n) for n in args.new.split(",")):
+                receive(fake_providers.gmail_store, senders, count, rng)
+                before = gmail_calls(fake_url)
+                started = time.perf_counter()
+                stats = replies.sync_replies(db, service=service)
+                elapsed = time.perf_counter() - started
+                after = gmail_calls(fake_url)
+                rows.append((count, after[0] - before[0], after[1] - before[1], stats["updated"], elapsed))
+
+            before = gmail_calls(fake_url)
+            started = time.perf_counter()
+            everything = gmail_service.list_messages("in:inbox", service=service)
+            gmail_service.get_messages([message["id"] for message in everything], "metadata", service=service)
+            rescan = (len(everything), gmail_calls(fake_url)[0] - before[0], time.perf_counter() - started)
+        database.engine.dispose()
+    fake_server.should_exit = True
+
+    print(f"\ninbox of {args.mailbox:,} messages, {gmail_service.BATCH_SIZE} gets per batch request\n")
+    print(f"{'new replies':>11} {'gmail requests':>15} {'openai calls':>13} {'updated':>8} {'seconds':>8}")
+    for count, gmail, openai, updated, elapsed in rows:
+        print(f"{count:>11,} {gmail:>15,} {openai:>13,} {updated:>8,} {elapsed:>8.2f}")
+    print(f"\nrescanning the inbox instead: {rescan[0]:,} messages, {rescan[1]:,} Gmail requests, {rescan[2]:.2f} s per sync")
+
+if __name__ == "__main__":
+    main()
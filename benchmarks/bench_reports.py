@@ -0,0 +1,44 @@
+"""
+Benchmark: PDF report generation (reports.generate_report) in pages/sec.
+Builds a throwaway SQLite DB with N outreaches and renders it single-pass and with a process pool.
+Run: python benchmarks/bench_reports.py --rows 100000 --workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+
+from bench_exports import load_outreaches
+from database import Base
+from reports import generate_report, ROWS_PER_PAGE, PAGES_PER_TASK
+
+def measure(label, engine, path, workers, rows_per_page, pages_per_task):
+    started = time.perf_counter()
+    pages = generate_report(engine, "outreaches", path, workers=workers, rows_per_page=rows_per_page, pages_per_task=pages_per_task)
+    elapsed = time.perf_counter() - started
+    size = os.path.getsize(path) / 1e6
+    print(f"{label:14s} {pages:6d} pages  {elapsed:6.2f} s  {pages / elapsed:7.1f} pages/s  {size:6.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=40_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--rows-per-page", type=int, default=ROWS_PER_PAGE)
+    parser.add_argument("--pages-per-task", type=int, default=PAGES_PER_TASK)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(engine)
+        load_outreaches(engine, args.rows)
+        print(f"{args.rows} outreaches, {args.rows_per_page} rows/page, {os.cpu_count()} CPUs")
+        measure("single pass", engine, f"{tmp}/single.pdf", 1, args.rows_per_page, args.pages_per_task)
+        measure(f"{args.workers} workers", engine, f"{tmp}/parallel.pdf", args.workers, args.rows_per_page, args.pages_per_task)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: cold-start import time of the API and the worker/CLI entry points.
+Each module is imported in a fresh interpreter under `python -X importtime`; the median cumulative
+time is compared with BUDGET_MS, and the slowest imports are listed. tests/test_startup.py enforces
+the same budgets (scaled by STARTUP_BUDGET_SCALE on slow machines) and keeps HEAVY packages out.
+Run: python benchmarks/bench_startup.py [--runs 5] [--top 15] [module ...]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time (ms) allowed per entry point (fastapi and sqlalchemy account for most of it)
+BUDGET_MS = {
+    "backend": 1500,
+    "outbox": 800,
+    "followups": 800,
+    "hubspot_sync": 800,
+    "calendly_scheduler": 800,
+    "utils": 800,
+}
+# Imported only by the code paths that need them, never by the entry points above
+HEAVY = ("openai", "pandas", "reportlab", "googleapiclient", "google_auth_oauthlib", "pyarrow", "streamlit")
+
+def import_profile(module: str) -> list:
+    """Import `module` in a fresh interpreter; returns [(cumulative_us, self_us, depth, name)] from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    profile = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        profile.append((int(cumulative_us), int(self_us), depth, name.strip()))
+    return profile
+
+def import_ms(module: str, runs: int = 3) -> tuple:
+    """Median cumulative import time of `module` in ms over `runs` fresh interpreters, and the last profile."""
+    samples = []
+    for _ in range(runs):
+        profile = import_profile(module)
+        samples.append(next(cumulative for cumulative, _, _, name in profile if name == module) / 1000)
+    return statistics.median(samples), profile
+
+def heavy_imports(profile: list) -> list:
+    """HEAVY packages that appear in an import profile."""
+    return sorted({name.split(".")[0] for _, _, _, name in profile} & set(HEAVY))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("modules", nargs="*", default=list(BUDGET_MS))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    over = False
+    for module in args.modules:
+        elapsed, profile = import_ms(module, args.runs)
+        budget = BUDGET_MS.get(module)
+        heavy = heavy_imports(profile)
+        status = "ok" if budget is None or elapsed <= budget else "OVER BUDGET"
+        over = over or status != "ok" or bool(heavy)
+        print(f"{module:20s} {elapsed:8.1f} ms  (budget {budget or '-'} ms)  {status}"
+              + (f"  heavy: {', '.join(heavy)}" if heavy else ""))
+    if args.top and args.modules:
+        print(f"\nslowest imports under {args.modules[0]} (cumulative ms, self ms):")
+        for cumulative, self_us, depth, name in sorted(import_profile(args.modules[0]), reverse=True)[:args.top]:
+            print(f"  {cumulative / 1000:8.1f} {self_us / 1000:8.1f}  {'  ' * depth}{name}")
+    sys.exit(1 if over else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: how soon a drafted email starts to show, and async batch generation of segment templates.
+Serves fake_providers (OpenAI answering after --latency-ms, then --token-ms per ~4-character chunk) and the
+backend with uvicorn, then for --drafts new segments (uncached, so OpenAI writes each one) compares
+  POST /api/v1/outreaches/draft         the whole body in one response
+  POST /api/v1/outreaches/draft/stream  time to the first text and to the end of the stream
+and times campaigns.generate_templates() for --segments segments one at a time vs --concurrency at a time
+(the app's OpenAI rate limit is set to --rate calls/s so it does not hide the concurrency).
+Run: python benchmarks/bench_streaming.py [--latency-ms 400] [--token-ms 15] [--drafts 5] [--segments 16]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load_test import configure_env, serve
+
+def time_drafts(base_url: str, stakeholder_id: int, drafts: int) -> dict:
+    """Returns: median seconds {'blocking_s', 'first_text_s', 'stream_s'} over `drafts` uncached segments each."""
+    import requests
+    session = requests.Session()
+    blocking, first_text, streamed = [], [], []
+    for n in range(drafts):
+        started = time.perf_counter()
+        session.post(f"{base_url}/api/v1/outreaches/draft",
+                     json={"stakeholder_id": stakeholder_id, "product": f"blocking {n}"}).raise_for_status()
+        blocking.append(time.perf_counter() - started)
+
+        started, first = time.perf_counter(), None
+        with session.post(f"{base_url}/api/v1/outreaches/draft/stream", stream=True,
+                          json={"stakeholder_id": stakeholder_id, "product": f"streamed {n}"}) as response:
+            response.raise_for_status()
+            for _ in response.iter_content(chunk_size=None):
+                first = first or time.perf_counter() - started
+        first_text.append(first)
+        streamed.append(time.perf_counter() - started)
+    return {"blocking_s": statistics.median(blocking), "first_text_s": statistics.median(first_text),
+            "stream_s": statistics.median(streamed)}
+
+def time_batch(segments: int, concurrency: int) -> dict:
+    """Returns: {limit: seconds} for generating `segments` new templates with 1 and `concurrency` calls in flight."""
+    import campaigns
+    from services import openai_service
+    results = {}
+    for limit in (1, concurrency):
+        openai_service.CONCURRENCY = limit
+        batch = [campaigns.Segment("outreach", f"batch {limit}", f"role {n}", "Energy") for n in range(segments)]
+        started = time.perf_counter()
+        templates = asyncio.run(campaigns.generate_templates(batch))
+        results[limit] = time.perf_counter() - started
+        assert all(templates), "a template generation failed"
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=400, help="OpenAI stand-in: time to the first chunk")
+    parser.add_argument("--token-ms", type=float, default=15, help="OpenAI stand-in: time per generated chunk")
+    parser.add_argument("--drafts", type=int, default=5, help="uncached drafts per mode (medians are reported)")
+    parser.add_argument("--segments", type=int, default=16, help="templates in the batch")
+    parser.add_argument("--concurrency", type=int, default=8, help="async generations in flight")
+    parser.add_argument("--rate", type=float, default=50, help="app rate limit for OpenAI (calls/s and burst)")
+    args = parser.parse_args()
+
+    from fake_providers import app as fake_app
+    fake_url, fake_server = serve(fake_app)
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_env(fake_url, os.path.join(tmp, "streaming.db"), unthrottled=False)
+        os.environ["RATE_LIMIT_OPENAI"] = f"{args.rate}/{args.rate}"
+        import requests
+        requests.post(f"{fake_url}/_config", json={"openai": {"latency_ms": args.latency_ms, "token_ms": args.token_ms}})
+
+        import database
+        from database import Base
+        from synthetic_data import generate
+        Base.metadata.create_all(database.engine)
+        generate(database.engine, 50, 7)
+        from backend import app
+        base_url, server = serve(app)
+        drafts = time_drafts(base_url, 1, args.drafts)
+        batch = time_batch(args.segments, args.concurrency)
+        server.should_exit = True
+        database.engine.dispose()
+    fake_server.should_exit = True
+
+    print(f"OpenAI stand-in: {args.latency_ms:.0f} ms to first chunk, {args.token_ms:.0f} ms per chunk\n")
+    print(f"draft, blocking:  {drafts['blocking_s'] * 1000:7.0f} ms until anything shows")
+    print(f"draft, streamed:  {drafts['first_text_s'] * 1000:7.0f} ms to first text, "
+          f"{drafts['stream_s'] * 1000:.0f} ms to the end")
+    print(f"\n{args.segments} templates: one at a time {batch[1]:.2f} s, {args.concurrency} in flight "
+          f"{batch[args.concurrency]:.2f} s ({batch[1] / batch[args.concurrency]:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Benchmark suite: the list, analytics and export endpoints and the bulk utilities (CSV streaming, meeting
+index build, follow-up scan) against a synthetic data set (synthetic_data.py) at a chosen scale.
+Per case it records best-of-N latency (the least noisy estimate), SQL statements of one run and peak
+Python memory (measured in a separate pass: tracing slows Python down). Results are compared with
+benchmarks/baseline.json for the same scale; a metric worse than its baseline by more than its
+THRESHOLDS entry (relative, plus an absolute slack so sub-millisecond noise does not count) is a
+regression and the run exits with status 1. Statement counts are deterministic: any increase fails.
+Run: python benchmarks/bench_suite.py --scale 10000 [--runs 5] [--only analytics] [--save]
+     (--save records this run as the baseline for its scale)
+Provider-bound flows (HubSpot, Calendly, Proxycurl) are not included: they are dominated by the provider.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import bindparam, create_engine, delete, event, select, update
+from sqlalchemy.orm import sessionmaker
+
+import campaigns
+import database
+import followups
+from database import Base
+from meeting_index import MeetingIndex
+from models import OutboxEvent, Outreach
+from synthetic_data import DEAL_OWNERS, generate
+from utils import stream_csv
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# metric: (allowed relative increase, absolute slack); --threshold overrides the latency one
+THRESHOLDS = {"latency_ms": (0.5, 2.0), "queries": (0.0, 0), "peak_kb": (0.3, 256)}
+
+@dataclass
+class Case:
+    name: str
+    run: Callable  # run(client, db); timed
+    prepare: Optional[Callable] = None  # prepare(db) before every run, untimed (cases that consume data)
+
+def endpoint(path: str, method: str = "GET", json_body: dict = None, **params) -> Case:
+    def run(client, db):
+        client.request(method, path, params=params, json=json_body).raise_for_status()
+    return Case(f"{method} {path}" + (f"?{urlencode(params, doseq=True)}" if params else ""), run)
+
+class _DueFollowUps:
+    """Scan the same follow-up backlog on every run: prepare() puts the due rows back as they were."""
+    def __init__(self, now: datetime = None):
+        self.now = now or datetime.utcnow()  # the data set's clock, so the backlog does not grow with wall time
+        self.snapshot = None
+
+    def prepare(self, db):
+        table = Outreach.__table__
+        if self.snapshot is None:
+            query = select(table.c.id.label("row_id"), table.c.next_action_at.label("b_next"),
+                           table.c.follow_up_count.label("b_count"), table.c.follow_up_date.label("b_date"),
+                           table.c.response.label("b_response")).where(table.c.next_action_at <= self.now)
+            self.snapshot = [dict(row._mapping) for row in db.execute(query)]
+        elif self.snapshot:
+            db.execute(update(table).where(table.c.id == bindparam("row_id")).values(
+                next_action_at=bindparam("b_next"), follow_up_count=bindparam("b_count"),
+                follow_up_date=bindparam("b_date"), response=bindparam("b_response"),
+            ).execution_options(synchronize_session=False), self.snapshot)
+            db.execute(delete(OutboxEvent.__table__))
+        db.commit()
+
+    def run(self, client, db):
+        followups.run_due_followups(db, now=self.now)
+
+def cases(now: datetime = None) -> list:
+    """Return every benchmark case (order matters: later cases see earlier writes); now: the data set's clock."""
+    due = _DueFollowUps(now)
+    return [
+        endpoint("/api/v1/products/", limit=50),
+        endpoint("/api/v1/companies/", limit=50),
+        endpoint("/api/v1/companies/", q="Apex", limit=50),
+        endpoint("/api/v1/stakeholders/", limit=50),
+        endpoint("/api/v1/stakeholders/", q="Chen", limit=50),
+        endpoint("/api/v1/outreaches/", limit=50),
+        endpoint("/api/v1/outreaches/", status="interested", limit=50),
+        endpoint("/api/v1/meetings/", limit=50),
+        endpoint("/api/v1/deals/", limit=50),
+        endpoint("/api/v1/deals/", stage="mou", limit=50),
+        endpoint("/api/v1/analytics/kpis"),
+        endpoint("/api/v1/analytics/outreach_breakdown"),
+        endpoint("/api/v1/analytics/outreach_over_time", days=90),
+        endpoint("/api/v1/analytics/progress"),
+        endpoint("/api/v1/analytics/funnel", refresh="true"),
+        endpoint("/api/v1/analytics/funnel"),
+        endpoint("/api/v1/analytics/cohorts", by="product"),
+        endpoint("/api/v1/analytics/outbox"),
+        endpoint("/api/v1/meetings/free-slots", participants=DEAL_OWNERS[:2]),
+        endpoint("/api/v1/exports/outreaches", format="csv"),
+        endpoint("/api/v1/exports/stakeholders", format="csv"),
+        endpoint("/api/v1/outreaches/", method="POST", json_body={
+            "stakeholder_id": 1, "message": "Benchmark outreach", "send_email": False}),
+        Case("utils.stream_csv(outreaches)", lambda client, db: sum(1 for _ in stream_csv(db, select(Outreach.__table__)))),
+        Case("MeetingIndex.sync (full build)", lambda client, db: MeetingIndex().sync(db)),
+        Case("followups.run_due_followups", due.run, due.prepare),
+    ]
+
+def run_suite(engine, runs: int = 5, only: str = None, memory: bool = True, now: datetime = None) -> dict:
+    """Run the cases against `engine`. Returns: {case name: {'latency_ms', 'queries', 'peak_kb'}} (peak_kb None without memory)."""
+    from fastapi.testclient import TestClient
+    from backend import app
+
+    Session = sessionmaker(bind=engine)
+
+    def get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+
+    results = {}
+    original_template = campaigns.generate_template
+
+    async def template(segment):  # no OpenAI calls from a benchmark
+        return "Hi {{first_name}}, following up on our JV note about {{product}}."
+    campaigns.generate_template = template
+    app.dependency_overrides[database.get_db] = get_db
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        with TestClient(app) as client, Session() as db:
+            for case in cases(now):
+                if only and only not in case.name:
+                    continue
+                timings = []
+                for attempt in range(runs + 1):  # the first run warms caches and is not counted
+                    if case.prepare:
+                        case.prepare(db)
+                    statements[0] = 0
+                    started = time.perf_counter()
+                    case.run(client, db)
+                    if attempt:
+                        timings.append((time.perf_counter() - started) * 1000)
+                queries = statements[0]  # of the last timed run
+                peak_kb = None
+                if memory:
+                    if case.prepare:
+                        case.prepare(db)
+                    tracemalloc.start()
+                    case.run(client, db)
+                    peak_kb = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+                    tracemalloc.stop()
+                results[case.name] = {"latency_ms": round(min(timings), 3),
+                                      "queries": queries, "peak_kb": peak_kb}
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+        app.dependency_overrides.pop(database.get_db, None)
+        campaigns.generate_template = original_template
+    return results
+
+def compare(baseline: dict, results: dict, thresholds: dict = None) -> list:
+    """Return one message per metric that got worse than baseline * (1 + relative) + slack."""
+    thresholds = {**THRESHOLDS, **(thresholds or {})}
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for metric, (relative, slack) in thresholds.items():
+            if current.get(metric) is None or before.get(metric) is None:
+                continue
+            if current[metric] > before[metric] * (1 + relative) + slack:
+                regressions.append(f"{name}: {metric} {before[metric]} -> {current[metric]}")
+    return regressions
+
+def load_baseline(scale: int) -> dict:
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE) as f:
+        return json.load(f).get(str(scale), {})
+
+def save_baseline(scale: int, results: dict):
+    data = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            data = json.load(f)
+    data[str(scale)] = results
+    with open(BASELINE_FILE, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=10_000, help="outreaches in the synthetic data set")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--only", help="run only cases whose name contains this")
+    parser.add_argument("--threshold", type=float, default=THRESHOLDS["latency_ms"][0],
+                        help="allowed relative latency regression")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak-memory pass")
+    parser.add_argument("--save", action="store_true", help="write the results as the baseline for this scale")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+        now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)  # generate() truncates to the hour too
+        started = time.perf_counter()
+        counts = generate(engine, args.scale, args.seed, now=now)
+        print(f"loaded {counts} in {time.perf_counter() - started:.1f} s")
+        results = run_suite(engine, args.runs, args.only, memory=not args.no_memory, now=now)
+        engine.dispose()
+
+    baseline = load_baseline(args.scale)
+    width = max(map(len, results), default=4)
+    print(f"\n{'case':{width}s} {'ms':>9s} {'base':>9s} {'queries':>8s} {'peak KB':>9s}")
+    for name, result in results.items():
+        before = baseline.get(name, {}).get("latency_ms")
+        print(f"{name:{width}s} {result['latency_ms']:9.2f} {before if before is not None else '-':>9} "
+              f"{result['queries']:8d} {result['peak_kb'] if result['peak_kb'] is not None else '-':>9}")
+    if args.save:
+        save_baseline(args.scale, results)
+        print(f"\nbaseline for scale {args.scale} written to {BASELINE_FILE}")
+        return
+    if not baseline:
+        print(f"\nno baseline for scale {args.scale}: run with --save to record one")
+        return
+    regressions = compare(baseline, results, {"latency_ms": (args.threshold, THRESHOLDS["latency_ms"][1])})
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"\n{len(regressions)} regression(s) against the baseline")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Load test: drive the API end to end against local provider stand-ins (fake_providers.py), so campaign
+and follow-up flows can be pushed hard without real accounts, quota or sent mail.
+Starts fake_providers and the backend with uvicorn in this process (temporary SQLite DB loaded with
+synthetic_data.py), points every service at the stand-ins, then runs the scenarios:
+  outreaches   concurrent POST /api/v1/outreaches/ with send_email, then the outbox drains to Gmail
+  stakeholders concurrent POST /api/v1/stakeholders/ with a LinkedIn URL (HubSpot sync + Proxycurl fetch)
+  calendly     POST /api/v1/meetings/calendly/schedule for interested outreaches
+  followups    followups.run_due_followups (OpenAI drafts) and the outbox drain of the emails it queued
+Per scenario: requests, errors, throughput and latency percentiles, outbox outcomes, provider calls and
+the 503s/429s the stand-ins injected. Provider behaviour comes from --latency-ms/--jitter-ms/--error-rate/
+--rate-limit (every provider) and --provider-config '{"openai": {"latency_ms": 800}}' (per provider).
+The app's own rate limits (services.ratelimit) stay in force unless --unthrottled is given.
+Run: python benchmarks/load_test.py [--scale 2000] [--requests 200] [--concurrency 16] [--latency-ms 50]
+     [--error-rate 0.02] [--rate-limit 20] [--only outreaches] [--json results.json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCENARIOS = ("outreaches", "stakeholders", "calendly", "followups")
+
+def serve(app) -> tuple:
+    """Serve an ASGI app with uvicorn on a free local port in a daemon thread. Returns: (base URL, server)."""
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}", server
+
+def configure_env(fake_url: str, db_path: str, unthrottled: bool):
+    """Point the app at the stand-ins; must run before the app modules are imported (they read env at import)."""
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "HUBSPOT_BASE_URL": f"{fake_url}/hubspot/crm/v3", "HUBSPOT_API_KEY": "load-test",
+        "PROXYCURL_BASE_URL": f"{fake_url}/proxycurl/api/linkedin", "PROXYCURL_API_KEY": "load-test",
+        "CALENDLY_BASE_URL": f"{fake_url}/calendly", "CALENDLY_TOKEN": "load-test",
+        "HUNTER_BASE_URL": f"{fake_url}/hunter/v2", "HUNTER_API_KEY": "load-test",
+        "OPENAI_BASE_URL": f"{fake_url}/openai/v1", "OPENAI_API_KEY": "sk-load-test",
+        "GMAIL_BASE_URL": fake_url,
+    })
+    os.environ.setdefault("RATE_LIMIT_BACKEND", "memory")  # one process: no need for shared buckets
+    os.environ.setdefault("OUTBOX_RETRY_BASE_SECONDS", "0.5")  # injected errors retry within the run
+    os.environ.setdefault("METRICS_SLOW_QUERY_MS", "2000")  # SQLite write-lock waits under load are expected
+    if unthrottled:
+        for provider in ("gmail", "calendly", "openai", "hunter", "proxycurl", "hubspot"):
+            os.environ[f"RATE_LIMIT_{provider.upper()}"] = "1000/1000"
+
+def percentile(samples: list, share: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))]
+
+def fire(base_url: str, batch: list, concurrency: int) -> dict:
+    """Send [(method, path, json body)] with `concurrency` threads. Returns: counts, throughput and latency (ms)."""
+    import requests
+    local = threading.local()
+    latencies, errors = [], []
+
+    def send(request):
+        method, path, body = request
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        session = local.session
+        started = time.perf_counter()
+        try:
+            response = session.request(method, base_url + path, json=body, timeout=120)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        latencies.append((time.perf_counter() - started) * 1000)
+        if not ok:
+            errors.append(path)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, batch))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(batch), "errors": len(errors), "seconds": round(elapsed, 2),
+        "rps": round(len(batch) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.5), 1), "p95_ms": round(percentile(latencies, 0.95), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+        "mean_ms": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+    }
+
+def drain(timeout: float) -> dict:
+    """Dispatch the outbox until nothing is pending or processing (or timeout). Returns: summed counts and seconds."""
+    from sqlalchemy import func, select
+    import database
+    from models import OutboxEvent
+    from outbox import dispatch_once
+
+    totals = {"claimed": 0, "delivered": 0, "retrying": 0, "failed": 0}
+    started = time.perf_counter()
+    table = OutboxEvent.__table__
+    while time.perf_counter() - started < timeout:
+        counts = dispatch_once(database.engine)
+        for key in totals:
+            totals[key] += counts[key]
+        if not counts["claimed"]:
+            with database.engine.connect() as connection:
+                open_events = connection.execute(select(func.count()).select_from(table)
+                                                 .where(table.c.status.in_(("pending", "processing")))).scalar()
+            if not open_events:
+                break
+            time.sleep(0.2)  # only retries with a future available_at are left
+    totals["seconds"] = round(time.perf_counter() - started, 2)
+    return totals
+
+def provider_stats(fake_url: str, before: dict) -> dict:
+    """Provider calls and injected failures since `before` (a previous /_stats snapshot)."""
+    import requests
+    now = requests.get(f"{fake_url}/_stats").json()
+    calls = {}
+    for endpoint, count in now["calls"].items():
+        provider = endpoint.split(" ", 1)[1].strip("/").split("/", 1)[0]
+        calls[provider] = calls.get(provider, 0) + count - before["calls"].get(endpoint, 0)
+    injected = {}
+    for provider, counts in now["injected"].items():
+        for kind, count in counts.items():
+            delta = count - before["injected"].get(provider, {}).get(kind, 0)
+            if delta:
+                injected[f"{provider}.{kind}"] = delta
+    return {"calls": {provider: count for provider, count in calls.items() if count}, "injected": injected}
+
+def scenario_requests(name: str, args, rng: random.Random) -> list:
+    """Return the HTTP requests of a scenario (empty for the ones driven in-process)."""
+    import database
+    from models import Outreach, OutreachResponse, Stakeholder, TargetCompany
+
+    with database.SessionLocal() as db:
+        if name == "outreaches":
+            ids = [row.id for row in db.query(Stakeholder.id).filter(Stakeholder.email != "").limit(args.requests * 5)]
+            return [("POST", "/api/v1/outreaches/", {"stakeholder_id": rng.choice(ids), "send_email": True,
+                                                     "message": f"Load test outreach {number}"})
+                    for number in range(args.requests)]
+        if name == "stakeholders":
+            ids = [row.id for row in db.query(TargetCompany.id).limit(200)]
+            return [("POST", "/api/v1/stakeholders/", {
+                "company_id": rng.choice(ids), "name": f"Load Test {number}", "email": f"load{number}@example.com",
+                "linkedin_url": f"https://www.linkedin.com/in/load-test-{number}"}) for number in range(args.requests)]
+        if name == "calendly":
+            ids = [row.id for row in db.query(Outreach.id).filter(Outreach.response == OutreachResponse.INTERESTED)
+                   .order_by(Outreach.id.desc()).limit(args.meetings)]
+            return [("POST", "/api/v1/meetings/calendly/schedule", {"outreach_ids": ids})]
+    return []
+
+def run(args) -> dict:
+    from fake_providers import app as fake_app
+
+    for knob in ("latency_ms", "jitter_ms", "error_rate", "rate_limit"):
+        if getattr(args, knob) is not None:
+            os.environ[f"FAKE_{knob.upper()}"] = str(getattr(args, knob))
+    fake_url, fake_server = serve(fake_app)
+
+    import requests
+    requests.post(f"{fake_url}/_reset")
+    if args.provider_config:
+        requests.post(f"{fake_url}/_config", json=json.loads(args.provider_config)).raise_for_status()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_env(fake_url, os.path.join(tmp, "load.db"), args.unthrottled)
+        import database
+        import followups
+        from backend import app
+        from synthetic_data import generate
+
+        database.Base.metadata.create_all(database.engine)
+        started = time.perf_counter()
+        counts = generate(database.engine, args.scale, args.seed)
+        print(f"loaded {counts} in {time.perf_counter() - started:.1f} s; providers at {fake_url}")
+        api_url, api_server = serve(app)
+        rng = random.Random(args.seed)
+
+        results = {}
+        try:
+            for name in SCENARIOS:
+                if args.only and args.only != name:
+                    continue
+                before = requests.get(f"{fake_url}/_stats").json()
+                result = {}
+                if name == "followups":
+                    started = time.perf_counter()
+                    with database.SessionLocal() as db:
+                        result["run"] = followups.run_due_followups(db)
+                    result["run"]["seconds"] = round(time.perf_counter() - started, 2)
+                else:
+                    result["http"] = fire(api_url, scenario_requests(name, args, rng), args.concurrency)
+                result["outbox"] = drain(args.drain_timeout)
+                result["providers"] = provider_stats(fake_url, before)
+                results[name] = result
+                print(f"\n{name}:")
+                for part, values in result.items():
+                    print(f"  {part:9s} {json.dumps(values)}")
+        finally:
+            api_server.should_exit = True
+            fake_server.should_exit = True
+            database.engine.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=2_000, help="outreaches in the synthetic data set")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--requests", type=int, default=200, help="HTTP requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--meetings", type=int, default=40, help="interested outreaches to schedule on Calendly")
+    parser.add_argument("--only", choices=SCENARIOS)
+    parser.add_argument("--latency-ms", type=float, help="added provider latency")
+    parser.add_argument("--jitter-ms", type=float, help="+/- variation of the latency")
+    parser.add_argument("--error-rate", type=float, help="share of provider calls answered 503")
+    parser.add_argument("--rate-limit", type=float, help="provider requests/second before 429s")
+    parser.add_argument("--provider-config", help='per-provider knobs as JSON, e.g. \'{"openai": {"latency_ms": 800}}\'')
+    parser.add_argument("--unthrottled", action="store_true", help="lift the app's own provider rate limits")
+    parser.add_argument("--drain-timeout", type=float, default=120, help="seconds to wait for the outbox")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    failed = any(result.get("http", {}).get("errors") or result["outbox"]["failed"] for result in results.values())
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
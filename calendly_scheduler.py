@@ -0,0 +1,190 @@
+"""
+Campaign scheduling through Calendly.
+schedule_outreaches() books one slot per interested outreach that has no meeting yet: event types and
+available times come from short-lived in-process caches, invites are created concurrently over the
+service's pooled connection (throttled by the shared calendly rate limit). Each Meeting row is committed as
+pending before its invite is created, then confirmed, or removed if Calendly certainly did not book it
+(not sent, or rejected with a 4xx). An invite that may have been booked (timeout, 5xx) or a run that dies
+midway leaves the meeting pending, so the outreach is never booked twice: every run lists those meetings
+under 'unconfirmed' for someone to check in Calendly (then fix the agenda, or delete the meeting to rebook).
+Run: python calendly_scheduler.py [--days 7] [--event-type URI]
+Easy to change: CALENDLY_EVENT_TYPE picks the event type (default: the first active one); tune the TTLs below.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+
+from models import Meeting, MeetingStatus, Outreach, OutreachResponse, Stakeholder
+from services import calendly_service
+from services.ratelimit import send_outcome
+
+EVENT_TYPE_URI = os.getenv("CALENDLY_EVENT_TYPE")
+EVENT_TYPES_TTL = float(os.getenv("CALENDLY_EVENT_TYPES_TTL", "3600"))
+AVAILABILITY_TTL = float(os.getenv("CALENDLY_AVAILABILITY_TTL", "60"))
+WINDOW_DAYS = 7
+MAX_WINDOW_DAYS = 7  # Calendly's limit per availability request
+WORKERS = 8
+PENDING_EVENT = "pending"  # Calendly event of a meeting whose invite was not confirmed (check it in Calendly)
+
+class TTLCache:
+    """Thread-safe {key: value} whose entries expire `ttl` seconds after being stored."""
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, ttl: float, load):
+        """Return the cached value, calling load() (outside the lock) when missing or expired. Empty results are not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+        value = load()
+        if value:
+            with self._lock:
+                self._entries[key] = (time.monotonic() + ttl, value)
+        return value
+
+    def discard(self, key=None):
+        """Drop one entry, or everything when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+CACHE = TTLCache()
+
+def event_types() -> list:
+    """Return the token owner's active event types (cached for CALENDLY_EVENT_TYPES_TTL)."""
+    def load():
+        user = calendly_service.get_current_user()
+        return calendly_service.list_event_types(user["uri"]) if user.get("uri") else []
+    return CACHE.get_or_load("event_types", EVENT_TYPES_TTL, load)
+
+def resolve_event_type(event_type_uri: str = None) -> dict:
+    """Return the requested event type (default: CALENDLY_EVENT_TYPE, else the first active one), or {}."""
+    types = event_types()
+    wanted = event_type_uri or EVENT_TYPE_URI
+    if wanted:
+        return next((t for t in types if t["uri"] == wanted), {})
+    return types[0] if types else {}
+
+def available_slots(event_type_uri: str, days: int = WINDOW_DAYS) -> list:
+    """
+    Return the open start times (ISO strings, one entry per remaining invitee seat) over the next `days`,
+    cached for CALENDLY_AVAILABILITY_TTL. Windows longer than Calendly's 7 days are fetched in chunks.
+    """
+    def load():
+        start = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(minutes=1)
+        end = start + timedelta(days=days)
+        slots = []
+        while start < end:
+            chunk_end = min(end, start + timedelta(days=MAX_WINDOW_DAYS))
+            for slot in calendly_service.list_available_times(event_type_uri, _iso(start), _iso(chunk_end)):
+                if slot.get("status") == "available":
+                    slots.extend([slot["start_time"]] * max(1, slot.get("invitees_remaining", 1)))
+            start = chunk_end
+        return slots
+    return CACHE.get_or_load(("availability", event_type_uri, days), AVAILABILITY_TTL, load)
+
+def pending_outreaches(db: Session, outreach_ids: list = None) -> list:
+    """Return (outreach, stakeholder) pairs that answered 'interested', have an email and no meeting yet."""
+    query = (
+        db.query(Outreach, Stakeholder)
+        .join(Stakeholder, Stakeholder.id == Outreach.stakeholder_id)
+        .filter(
+            Outreach.response == OutreachResponse.INTERESTED,
+            Stakeholder.email.isnot(None), Stakeholder.email != "",
+            ~exists().where(Meeting.outreach_id == Outreach.id),
+        )
+        .order_by(Outreach.id)
+    )
+    if outreach_ids:
+        query = query.filter(Outreach.id.in_(outreach_ids))
+    return query.all()
+
+def unconfirmed_meetings(db: Session) -> list:
+    """Return the ids of meetings still waiting for their Calendly invite to be confirmed."""
+    pending = db.query(Meeting.id).filter(Meeting.agenda.endswith(f"Calendly event: {PENDING_EVENT}")).order_by(Meeting.id)
+    return [meeting_id for (meeting_id,) in pending]
+
+def schedule_outreaches(db: Session, outreach_ids: list = None, event_type_uri: str = None,
+                        days: int = WINDOW_DAYS, workers: int = WORKERS) -> dict:
+    """
+    Book the earliest free slots for pending outreaches (see pending_outreaches) and add their meetings.
+    Returns: {'candidates', 'scheduled', 'failed', 'no_slot', 'meeting_ids', 'unconfirmed'}; 'error' if there
+    is no event type. unconfirmed: ids of the meetings (from this run or earlier ones) Calendly may or may not have booked.
+    """
+    candidates = pending_outreaches(db, outreach_ids)
+    stats = {"candidates": len(candidates), "scheduled": 0, "failed": 0, "no_slot": 0, "meeting_ids": []}
+    if not candidates:
+        return {**stats, "unconfirmed": unconfirmed_meetings(db)}
+    event_type = resolve_event_type(event_type_uri)
+    if not event_type:
+        return {**stats, "error": "No Calendly event type available", "unconfirmed": unconfirmed_meetings(db)}
+
+    slots = available_slots(event_type["uri"], days)
+    planned = list(zip(candidates, slots))
+    stats["no_slot"] = len(candidates) - len(planned)
+
+    title = event_type.get("name", "Calendly meeting")
+    invites = [(start_time, stakeholder.email, stakeholder.name) for (_, stakeholder), start_time in planned]
+    meetings = [Meeting(
+        outreach_id=outreach.id,
+        scheduled_date=_parse(start_time),
+        duration_minutes=event_type.get("duration") or 30,
+        participants=f"{stakeholder.name} <{stakeholder.email}>",
+        agenda=f"{title}\nCalendly event: {PENDING_EVENT}",
+        status=MeetingStatus.SCHEDULED,
+    ) for (outreach, stakeholder), start_time in planned]
+    db.add_all(meetings)
+    db.commit()
+
+    def book(invite):
+        """Returns: (invitee, None) or ({}, the error)."""
+        start_time, email, name = invite
+        try:
+            return calendly_service.book_invitee(event_type["uri"], start_time, email, name), None
+        except Exception as e:
+            print(f"Calendly error: {e}")
+            return {}, e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(invites) or 1))) as pool:
+        for meeting, (invitee, error) in zip(meetings, pool.map(book, invites)):
+            if error is None:
+                meeting.agenda = f"{title}\nCalendly event: {invitee.get('event', '')}"
+                stats["meeting_ids"].append(meeting.id)
+            elif send_outcome(error) != "unknown":  # certainly not booked: free the outreach for the next run
+                db.delete(meeting)
+                stats["failed"] += 1
+            else:
+                stats["failed"] += 1  # stays pending (unconfirmed)
+            db.commit()  # per booking: what Calendly accepted is never lost
+
+    # Booked (or contested) slots are no longer free: refetch availability next time
+    CACHE.discard(("availability", event_type["uri"], days))
+    stats["scheduled"] = len(stats["meeting_ids"])
+    return {**stats, "unconfirmed": unconfirmed_meetings(db)}
+
+def _iso(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.000000Z")
+
+def _parse(value: str) -> datetime:
+    """ISO-8601 from Calendly -> naive UTC (how DateTime columns are stored here)."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc).replace(tzinfo=None)
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Book Calendly meetings for interested outreaches.")
+    parser.add_argument("--days", type=int, default=WINDOW_DAYS, help="look this many days ahead for slots")
+    parser.add_argument("--event-type", help="Calendly event type URI (default: CALENDLY_EVENT_TYPE or the first)")
+    args = parser.parse_args()
+    with SessionLocal() as session:
+        print(schedule_outreaches(session, event_type_uri=args.event_type, days=args.days))
@@ -0,0 +1,293 @@
+"""
+Segment-level AI email generation for campaigns and follow-ups.
+Recipients are grouped into segments (kind × product × stakeholder role × company industry). Each segment
+gets one AI-written template with {{placeholders}} (openai_service.generate_email_template), cached in
+email_templates for EMAIL_TEMPLATE_TTL_DAYS, and every recipient's email is rendered locally from the
+compiled template, so a 5,000-person campaign costs one LLM call per segment (none once cached) instead
+of one per person. Missing templates are generated concurrently on an event loop (openai_service.gather_limited),
+and draft_stream() streams a new segment's template to the reader while OpenAI writes it.
+Run: python campaigns.py [--product-id 1] [--send] [--dry-run]
+Easy to change: FIELDS (the placeholders), FALLBACK_TEMPLATES (used without OpenAI), EMAIL_TEMPLATE_TTL_DAYS;
+bump PROMPT_VERSION after editing the prompt so cached templates are regenerated.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import (EmailTemplate, Outreach, OutreachResponse, ProductTechnology, Stakeholder, TargetCompany,
+                    store_message_bodies)
+from outbox import enqueue
+from services import openai_service
+
+TEMPLATE_TTL_DAYS = int(os.getenv("EMAIL_TEMPLATE_TTL_DAYS", "30"))
+PROMPT_VERSION = 1
+DEFAULT_SUBJECT = "JV Opportunity: {{product}}"
+FIELDS = ("first_name", "name", "title", "company", "industry", "product", "round")
+FALLBACK_TEMPLATES = {
+    "outreach": "Dear {{first_name}},\n\nWe're excited about potential JV opportunities with {{company}} regarding our "
+                "{{product}} technology.\n\nLet's discuss how we can collaborate.\n\nBest regards,\nYour JV Team",
+    "follow-up": "Hi {{first_name}},\n\nFollowing up on my note about a joint venture between {{company}} and us around "
+                 "{{product}}. Would a short call next week work?\n\nBest regards,\nYour JV Team",
+}
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+class Segment(NamedTuple):
+    kind: str  # outreach | follow-up
+    product: str
+    role: str
+    industry: str
+
+class CompiledTemplate:
+    """
+    A {{placeholder}} template compiled once into a str.format_map pattern, so rendering is a single
+    C-level call per email. Placeholders outside FIELDS (an LLM may invent some) render as ''.
+    """
+    def __init__(self, source: str):
+        self.source = source
+        parts, position = [], 0
+        for match in _PLACEHOLDER.finditer(source):
+            parts.append(_escape(source[position:match.start()]))
+            field = match.group(1).lower()
+            if field in FIELDS:
+                parts.append("{" + field + "}")
+            position = match.end()
+        parts.append(_escape(source[position:]))
+        self.pattern = "".join(parts)
+        self.render = self.pattern.format_map  # render(fields) -> str; fields must hold every FIELDS key
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+def recipient_fields(name: str, title: str = None, company: str = None, industry: str = None,
+                     product: str = None, round_number: int = 0) -> dict:
+    """Return the placeholder values for one recipient (every FIELDS key, with neutral defaults)."""
+    name = (name or "").strip()
+    return {
+        "first_name": name.split()[0] if name else "there", "name": name or "there", "title": title or "",
+        "company": company or "your company", "industry": industry or "", "product": product or "our technology",
+        "round": round_number,
+    }
+
+def segment_of(kind: str, row, product: str = None) -> Segment:
+    """Segment of a recipient row (with product, role and industry columns); `product` overrides the row's."""
+    role = getattr(row.role, "value", row.role)
+    return Segment(kind, product or row.product or "", role or "", row.industry or "")
+
+def segment_key(segment: Segment) -> str:
+    """Return the email_templates key for a segment (changes with PROMPT_VERSION)."""
+    return hashlib.sha256(json.dumps([PROMPT_VERSION, *segment]).encode("utf-8")).hexdigest()
+
+async def generate_template(segment: Segment) -> str:
+    """Return an AI-written template for the segment, or None (OpenAI not configured or failing)."""
+    return await openai_service.agenerate_email_template(segment.kind, segment.product, segment.role, segment.industry)
+
+async def generate_templates(segments: list) -> list:
+    """Return generate_template() of each segment, openai_service.CONCURRENCY generations at a time."""
+    return await openai_service.gather_limited([generate_template(segment) for segment in segments])
+
+def cached_templates(db: Session, segments) -> dict:
+    """Return the stored template source of each segment that has one younger than TEMPLATE_TTL_DAYS."""
+    keys = {segment_key(segment): segment for segment in set(segments)}
+    if not keys:
+        return {}
+    fresh_after = datetime.utcnow() - timedelta(days=TEMPLATE_TTL_DAYS)
+    rows = db.execute(select(EmailTemplate.key, EmailTemplate.body)
+                      .where(EmailTemplate.key.in_(keys), EmailTemplate.generated_at >= fresh_after)).all()
+    return {keys[row.key]: row.body for row in rows}
+
+def templates_for(db: Session, segments, refresh: bool = False) -> tuple:
+    """
+    Return the compiled template of each segment: cached while younger than TEMPLATE_TTL_DAYS, else
+    generated (concurrently, see generate_templates()) and stored. Fallbacks (no OpenAI) are used but not
+    cached. Call from synchronous code: generation runs on its own event loop.
+    Returns: ({segment: CompiledTemplate}, {'segments', 'cached', 'generated', 'fallback'}).
+    """
+    segments = set(segments)
+    stats = {"segments": len(segments), "cached": 0, "generated": 0, "fallback": 0}
+    sources = {} if refresh else cached_templates(db, segments)
+    stats["cached"] = len(sources)
+    missing = [segment for segment in segments if segment not in sources]
+    if missing:
+        generated = dict(zip(missing, asyncio.run(generate_templates(missing))))
+        store = {segment: body for segment, body in generated.items() if body}
+        _store_templates(db, store)
+        stats["generated"] = len(store)
+        stats["fallback"] = len(missing) - len(store)
+        for segment, body in generated.items():
+            sources[segment] = body or FALLBACK_TEMPLATES[segment.kind]
+    return {segment: CompiledTemplate(source) for segment, source in sources.items()}, stats
+
+def _store_templates(db: Session, templates: dict):
+    """Upsert generated templates in the caller's transaction (concurrent writers: last one wins)."""
+    if not templates:
+        return
+    now = datetime.utcnow()
+    rows = [{"key": segment_key(segment), "kind": segment.kind, "product": segment.product, "role": segment.role,
+             "industry": segment.industry, "body": body, "generated_at": now} for segment, body in templates.items()]
+    table = EmailTemplate.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(table)
+        db.execute(stmt.on_conflict_do_update(index_elements=[table.c.key],
+                                              set_={"body": stmt.excluded.body, "generated_at": stmt.excluded.generated_at}), rows)
+        return
+    existing = set(db.execute(select(table.c.key).where(table.c.key.in_([row["key"] for row in rows]))).scalars())
+    for row in rows:
+        if row["key"] in existing:
+            db.execute(update(table).where(table.c.key == row["key"]).values(body=row["body"], generated_at=now))
+    missing = [row for row in rows if row["key"] not in existing]
+    if missing:
+        db.execute(table.insert(), missing)
+
+def personalize(db: Session, kind: str, recipients: list, product: str = None) -> tuple:
+    """
+    Render one email body per recipient row (id, name, title, company, industry, product, role and,
+    for follow-ups, round_number) from its segment's template.
+    Returns: ({row id: body}, template stats as in templates_for()).
+    """
+    segments = [segment_of(kind, row, product) for row in recipients]
+    templates, stats = templates_for(db, segments)
+    bodies = {}
+    for row, segment in zip(recipients, segments):
+        bodies[row.id] = templates[segment].render(recipient_fields(
+            row.name, row.title, row.company, row.industry, segment.product, getattr(row, "round_number", 0)))
+    return bodies, stats
+
+def recipients_query(db: Session):
+    """Stakeholder columns personalize() and segment_of() read (one row per stakeholder)."""
+    return (
+        db.query(Stakeholder.id, Stakeholder.name, Stakeholder.title, Stakeholder.email, Stakeholder.role,
+                 TargetCompany.name.label("company"), TargetCompany.industry, ProductTechnology.name.label("product"))
+        .outerjoin(TargetCompany, TargetCompany.id == Stakeholder.company_id)
+        .outerjoin(ProductTechnology, ProductTechnology.id == TargetCompany.product_technology_id)
+    )
+
+def draft_email(db: Session, stakeholder_id: int, product: str = None, subject: str = DEFAULT_SUBJECT) -> dict:
+    """
+    Return {'subject', 'body', 'segment', 'cached'} for one stakeholder from their segment's template,
+    or None for an unknown stakeholder.
+    """
+    row = recipients_query(db).filter(Stakeholder.id == stakeholder_id).first()
+    if row is None:
+        return None
+    bodies, stats = personalize(db, "outreach", [row], product)
+    db.commit()  # keep a freshly generated template
+    segment = segment_of("outreach", row, product)
+    fields = recipient_fields(row.name, row.title, row.company, row.industry, segment.product)
+    return {"subject": CompiledTemplate(subject).render(fields), "body": bodies[row.id],
+            "segment": segment._asdict(), "cached": bool(stats["cached"])}
+
+def draft_stream(db: Session, stakeholder_id: int, product: str = None):
+    """
+    Streaming draft_email() body: None for an unknown stakeholder, else an async iterator of text.
+    A cached template is rendered at once; otherwise the segment's template is streamed from OpenAI and
+    each piece is rendered as it arrives, then the template is cached for the next draft.
+    """
+    row = recipients_query(db).filter(Stakeholder.id == stakeholder_id).first()
+    if row is None:
+        return None
+    segment = segment_of("outreach", row, product)
+    fields = recipient_fields(row.name, row.title, row.company, row.industry, segment.product)
+    return _stream_body(db.get_bind(), segment, fields, cached_templates(db, [segment]).get(segment))
+
+async def _stream_body(bind, segment: Segment, fields: dict, cached: str = None):
+    if cached is not None:
+        yield CompiledTemplate(cached).render(fields)
+        return
+    source, pending = [], ""
+    try:
+        async for text in openai_service.stream_email_template(*segment):
+            source.append(text)
+            pending += text
+            ready = _renderable(pending)
+            if ready:
+                yield CompiledTemplate(pending[:ready]).render(fields)
+                pending = pending[ready:]
+    except Exception as e:  # the reader already has part of the email: end it there, cache nothing
+        print(f"Template stream error ({segment.kind}/{segment.role}): {e}")
+        return
+    if not source:
+        yield CompiledTemplate(FALLBACK_TEMPLATES[segment.kind]).render(fields)
+        return
+    if pending:
+        yield CompiledTemplate(pending).render(fields)
+    await asyncio.to_thread(_store_streamed, bind, segment, "".join(source).strip())
+
+def _renderable(text: str) -> int:
+    """Length of the prefix of a partial template that can be rendered: up to an unfinished {{placeholder}}."""
+    start = text.rfind("{{")
+    if start != -1 and "}}" not in text[start:]:
+        return start
+    return len(text) - 1 if text.endswith("{") else len(text)
+
+def _store_streamed(bind, segment: Segment, source: str):
+    with Session(bind=bind) as db:
+        _store_templates(db, {segment: source})
+        db.commit()
+
+def run_campaign(db: Session, product_id: int = None, stakeholder_ids: list = None, product: str = None,
+                 subject: str = DEFAULT_SUBJECT, send_email: bool = False, dry_run: bool = False) -> dict:
+    """
+    Create one outreach per stakeholder in the audience (stakeholder_ids, else every stakeholder of a
+    company matched to product_id, else everyone) with a segment-personalized body, and with send_email
+    queue each email in the outbox (stakeholders without an address are recorded but not emailed).
+    All rows are written in one transaction. dry_run renders without writing and returns a sample.
+    Returns: template stats plus 'recipients', 'outreaches', 'emails_queued' (and 'sample' for dry runs).
+    """
+    query = recipients_query(db)
+    if stakeholder_ids:
+        query = query.filter(Stakeholder.id.in_(stakeholder_ids))
+    if product_id is not None:
+        query = query.filter(TargetCompany.product_technology_id == product_id)
+    recipients = query.order_by(Stakeholder.id).all()
+    bodies, stats = personalize(db, "outreach", recipients, product)
+    stats.update(recipients=len(recipients), outreaches=0, emails_queued=0)
+    subject_template = CompiledTemplate(subject)
+    subjects = {row.id: subject_template.render(recipient_fields(
+        row.name, row.title, row.company, row.industry, product or row.product)) for row in recipients}
+    if dry_run:
+        db.commit()  # keep freshly generated templates
+        if recipients:
+            first = recipients[0]
+            stats["sample"] = {"stakeholder_id": first.id, "subject": subjects[first.id], "body": bodies[first.id]}
+        return stats
+
+    hashes = store_message_bodies(db.connection(), [bodies[row.id] for row in recipients])
+    now = datetime.utcnow()
+    outreaches = [Outreach(stakeholder_id=row.id, message_sha256=message_sha256, date=now, response=OutreachResponse.NO_RESPONSE,
+                           notes="" if not send_email or row.email else "Not emailed: stakeholder has no email")
+                  for row, message_sha256 in zip(recipients, hashes)]
+    db.add_all(outreaches)
+    db.flush()  # outreach ids go into the email events (the outbox records each email's Gmail thread)
+    for row, outreach in zip(recipients, outreaches):
+        if send_email and row.email:
+            enqueue(db, "email.send", {"to": row.email, "subject": subjects[row.id], "body": bodies[row.id],
+                                       "outreach_id": outreach.id})
+            stats["emails_queued"] += 1
+    db.commit()
+    stats["outreaches"] = len(recipients)
+    return stats
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--product-id", type=int, help="audience: stakeholders of companies matched to this product")
+    parser.add_argument("--subject", default=DEFAULT_SUBJECT)
+    parser.add_argument("--send", action="store_true", help="queue the emails (delivered by python outbox.py)")
+    parser.add_argument("--dry-run", action="store_true", help="render without writing; print a sample")
+    args = parser.parse_args()
+    with SessionLocal() as session:
+        print(run_campaign(session, product_id=args.product_id, subject=args.subject, send_email=args.send,
+                           dry_run=args.dry_run))
@@ -0,0 +1,155 @@
+"""
+Live change feed over change_events (written with every outreach/meeting/deal change, see models.py).
+Clients hold a cursor (the last event id they saw) and either stream events over SSE (/events/) or
+long-poll for them (/events/changes), then refresh only the tables the events name.
+One poller per process checks max(change_events.id) every EVENTS_POLL_SECONDS while any client is
+waiting and wakes them all, so idle clients cost no per-client queries.
+Ids can commit out of order on PostgreSQL, so treat events as invalidation hints and keep a bounded
+cache lifetime on the client (api_client.FEED_MAX_AGE).
+Events older than EVENTS_RETENTION_HOURS are pruned by the outbox dispatcher (outbox.py), web or not.
+Easy to change: Add tables to models.FEED_TABLES; tune EVENTS_POLL_SECONDS / EVENTS_RETENTION_HOURS.
+"""
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+from starlette.concurrency import run_in_threadpool
+
+import database
+from models import ChangeEvent
+
+POLL_SECONDS = float(os.getenv("EVENTS_POLL_SECONDS", "1"))
+HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+RETENTION_HOURS = int(os.getenv("EVENTS_RETENTION_HOURS", "24"))
+MAX_BATCH = 500
+
+# Engine the feed reads (None = database.engine); tests point this elsewhere
+feed_bind = None
+
+@dataclass
+class ChangeBatch:
+    """Events after a cursor. cursor: where to resume next; reset: the client must reload everything."""
+    cursor: int
+    events: list = field(default_factory=list)
+    reset: bool = False
+
+def read_changes(cursor: int = None, tables: list = None, limit: int = MAX_BATCH, bind=None) -> ChangeBatch:
+    """
+    Return the events after `cursor` (optionally only for `tables`).
+    A missing cursor starts at the current head without replay; a cursor older than the retained
+    events (or past the head, e.g. after a DB reset) returns reset=True.
+    """
+    table = ChangeEvent.__table__
+    with (bind or feed_bind or database.engine).connect() as connection:
+        head, oldest = connection.execute(select(func.max(table.c.id), func.min(table.c.id))).one()
+        head = head or 0
+        if cursor is None:
+            return ChangeBatch(cursor=head)
+        if cursor > head or (oldest is not None and cursor < oldest - 1):
+            return ChangeBatch(cursor=head, reset=True)
+        query = select(table).where(table.c.id > cursor, table.c.id <= head).order_by(table.c.id).limit(limit)
+        if tables:
+            query = query.where(table.c.table_name.in_(tables))
+        rows = connection.execute(query).all()
+    events = [{"id": row.id, "table": row.table_name, "op": row.op, "row_id": row.row_id} for row in rows]
+    # A full page resumes after its last row; otherwise everything up to head has been seen
+    return ChangeBatch(cursor=events[-1]["id"] if len(events) == limit else head, events=events)
+
+def prune(bind=None, hours: int = RETENTION_HOURS) -> int:
+    """Delete events older than `hours`, always keeping the newest (so ids are never reused). Returns: rows deleted."""
+    cutoff = datetime.utcnow() - timedelta(hours=hours)
+    newest = select(func.max(ChangeEvent.id)).scalar_subquery()
+    with (bind or feed_bind or database.engine).begin() as connection:
+        return connection.execute(
+            delete(ChangeEvent).where(ChangeEvent.created_at < cutoff, ChangeEvent.id < newest)
+        ).rowcount
+
+class ChangeFeed:
+    """Wakes waiting clients when change_events grows; polls only while someone is waiting."""
+    def __init__(self, poll_seconds: float = POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.head = None
+        self.waiters = 0
+        self._loop = None
+        self._changed = None
+        self._task = None
+
+    async def wait(self, cursor: int, timeout: float) -> bool:
+        """Wait until an event after `cursor` exists. Returns: False on timeout."""
+        self._bind_loop()
+        self.waiters += 1
+        if self._task is None:
+            self.head = None  # unknown until the poller's first read
+            self._task = asyncio.ensure_future(self._poll())
+        deadline = time.monotonic() + timeout
+        try:
+            while self.head is None or self.head <= cursor:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                try:
+                    await asyncio.wait_for(self._changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return False
+            return True
+        finally:
+            self.waiters -= 1
+
+    async def _poll(self):
+        try:
+            while self.waiters:
+                head = await run_in_threadpool(self._read_head)
+                if head != self.head:
+                    self.head = head
+                    changed, self._changed = self._changed, asyncio.Event()
+                    changed.set()
+                await asyncio.sleep(self.poll_seconds)
+        except Exception as e:  # DB hiccup: waiters time out and retry
+            print(f"Change feed poll error: {e}")
+        finally:
+            self._task = None
+
+    def _read_head(self) -> int:
+        with (feed_bind or database.engine).connect() as connection:
+            return connection.execute(select(func.max(ChangeEvent.id))).scalar() or 0
+
+    def _bind_loop(self):
+        # asyncio primitives belong to one event loop (each TestClient starts its own)
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop, self._changed, self._task, self.head = loop, asyncio.Event(), None, None
+
+FEED = ChangeFeed()
+
+async def long_poll(cursor: int = None, tables: list = None, wait: float = 0, feed: ChangeFeed = FEED) -> ChangeBatch:
+    """read_changes(), waiting up to `wait` seconds for new events when there are none yet."""
+    batch = await run_in_threadpool(read_changes, cursor, tables)
+    if batch.events or batch.reset or cursor is None or wait <= 0:
+        return batch
+    if await feed.wait(batch.cursor, wait):
+        batch = await run_in_threadpool(read_changes, batch.cursor, tables)
+    return batch
+
+async def sse_stream(cursor: int, tables: list, is_disconnected, feed: ChangeFeed = FEED,
+                     heartbeat: float = HEARTBEAT_SECONDS):
+    """
+    Yield Server-Sent Events: first everything after `cursor`, then live changes.
+    Each change is 'event: change' with the event id as SSE id (so Last-Event-ID resumes);
+    'event: reset' tells the client to reload everything; ': ping' comments keep proxies from timing out.
+    """
+    yield "retry: 3000\n\n"
+    batch = await run_in_threadpool(read_changes, cursor, tables)
+    if cursor is None:
+        yield f"id: {batch.cursor}\nevent: ready\ndata: {json.dumps({'cursor': batch.cursor})}\n\n"
+    while not await is_disconnected():
+        if batch.reset:
+            yield f"id: {batch.cursor}\nevent: reset\ndata: {json.dumps({'cursor': batch.cursor})}\n\n"
+        for change in batch.events:
+            yield f"id: {change['id']}\nevent: change\ndata: {json.dumps(change, separators=(',', ':'))}\n\n"
+        if len(batch.events) < MAX_BATCH and not await feed.wait(batch.cursor, heartbeat):
+            yield ": ping\n\n"
+        batch = await run_in_threadpool(read_changes, batch.cursor, tables)
@@ -0,0 +1,119 @@
+"""
+Negotiated response compression (Accept-Encoding: br or gzip) for JSON, CSV and other text bodies.
+Brotli is used when the optional `brotli` package is installed and the client accepts it, else gzip.
+Bodies smaller than COMPRESSION_MIN_BYTES are sent as is (not worth the CPU or the header); streamed
+bodies (CSV exports) are compressed chunk by chunk, so nothing is buffered. Already-encoded and binary
+types (Parquet, Arrow, PDF) pass through untouched.
+Easy to change: COMPRESSION_MIN_BYTES, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY, or
+COMPRESSION_ENABLED=false.
+"""
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+import config
+
+config.load()
+ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() != "false"
+MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))  # 11 is far slower for a few % more
+COMPRESSIBLE = ("application/json", "text/", "application/x-ndjson")
+
+def _brotli():
+    try:
+        import brotli  # optional dependency: ~20% smaller than gzip on JSON at similar speed
+        return brotli
+    except ImportError:
+        return None
+
+def negotiate(accept_encoding: str) -> str:
+    """Return 'br', 'gzip' or None for an Accept-Encoding header (q=0 refuses a coding)."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+    wildcard = accepted.get("*", 0.0)
+    if accepted.get("br", wildcard) > 0 and _brotli() is not None:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+class _Compressor:
+    """Incremental br/gzip encoder: every chunk is flushed so a streamed body is readable as it arrives."""
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self.engine = _brotli().Compressor(quality=BROTLI_QUALITY)
+        else:
+            self.engine = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, chunk: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            return self.engine.process(chunk) + (self.engine.finish() if final else self.engine.flush())
+        return self.engine.compress(chunk) + self.engine.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class CompressionMiddleware:
+    """Pure ASGI middleware (like metrics.MetricsMiddleware): streaming responses stay streaming."""
+    def __init__(self, app, minimum_size: int = None):
+        self.app = app
+        self.minimum_size = MIN_BYTES if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", "")) if scope["type"] == "http" and ENABLED else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _Responder(send, encoding, self.minimum_size).send)
+
+class _Responder:
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self.downstream = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start = None
+        self.compressor = None  # set once the response is being compressed
+        self.passthrough = False
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message  # held until the first body chunk shows the size
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+        body, more = message.get("body", b""), message.get("more_body", False)
+        if self.compressor is None:
+            headers = MutableHeaders(raw=self.start["headers"])
+            if not self._compressible(headers) or (not more and len(body) < self.minimum_size):
+                self.passthrough = True
+                await self.downstream(self.start)
+                await self.downstream(message)
+                return
+            self.compressor = _Compressor(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            del headers["Content-Length"]
+            if not more:
+                body = self.compressor.compress(body, final=True)
+                headers["Content-Length"] = str(len(body))
+                await self.downstream(self.start)
+                await self.downstream({"type": "http.response.body", "body": body})
+                return
+            await self.downstream(self.start)
+        await self.downstream({"type": "http.response.body", "body": self.compressor.compress(body, final=not more),
+                               "more_body": more})
+
+    def _compressible(self, headers) -> bool:
+        if self.start["status"] < 200 or self.start["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE)
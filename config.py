@@ -0,0 +1,20 @@
+"""
+Process configuration: .env is read into os.environ once, by the first module that needs a setting.
+Variables already set in the environment take precedence over .env.
+Easy to change: modules read settings with os.getenv after calling load().
+"""
+import threading
+
+_loaded = False
+_lock = threading.Lock()
+
+def load():
+    """Load .env (first call only; later calls are free)."""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+            load_dotenv()  # searches upwards from this file, like the per-module calls it replaces
+            _loaded = True
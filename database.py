@@ -4,10 +4,10 @@ Change DB: Update DATABASE_URL in .env (e.g., postgresql://...).
 """
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+import config
 import os
 
-load_dotenv()
+config.load()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./jv_dashboard.db")
 
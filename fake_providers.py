@@ -0,0 +1,639 @@
+"""
+Local stand-ins for external providers, for tests and load runs without real accounts or quota.
+HubSpot: the contact batch endpoints (create/update/read by email) under /hubspot/crm/v3, backed by
+an in-memory store and enforcing HubSpot's 100-input batch limit and duplicate-email conflicts.
+Proxycurl: GET /proxycurl/api/linkedin/profile returning a deterministic, realistically sized
+profile per URL (404 for slugs starting with 'missing').
+Calendly: /calendly users/me, event_types, event_type_available_times (weekdays 09:00-17:00 UTC in
+30-minute slots, 7-day window limit) and POST /invitees (400 when the slot is taken).
+Hunter: /hunter/v2 email-verifier (addresses starting with 'bounce' are undeliverable) and domain-search.
+OpenAI: POST /openai/v1/chat/completions (deterministic text per prompt, token usage included; with
+"stream": true, server-sent chunks of a few characters each).
+Gmail: a mailbox under /gmail/v1/users/{userId}: messages/send (400 without a To: header), messages
+(insert, e.g. a reply: {"raw", "threadId"}, labelled INBOX), messages list (q: in:inbox, after:<epoch>) and
+get, profile and history (messageAdded records; 404 once startHistoryId is older than GMAIL_HISTORY_RETENTION
+records), plus POST /batch/gmail/v1 (multipart batch of message gets, at most GMAIL_BATCH_LIMIT).
+Every provider (first path segment) has knobs, from FAKE_* env vars or POST /_config at runtime:
+latency_ms (+/- jitter_ms) added per request, error_rate (share answered 503) and rate_limit
+(requests/second; beyond it 429 with Retry-After); token_ms is OpenAI's time per generated chunk.
+GET /_stats returns calls per endpoint and the injected errors/429s per provider; POST /_reset clears
+data and restores the env knobs.
+Run: uvicorn fake_providers:app --port 9000, then point the services at it:
+  HUBSPOT_BASE_URL=http://localhost:9000/hubspot/crm/v3  PROXYCURL_BASE_URL=http://localhost:9000/proxycurl/api/linkedin
+  CALENDLY_BASE_URL=http://localhost:9000/calendly       HUNTER_BASE_URL=http://localhost:9000/hunter/v2
+  OPENAI_BASE_URL=http://localhost:9000/openai/v1        GMAIL_BASE_URL=http://localhost:9000
+(benchmarks/load_test.py does this for you).
+Easy to change: Add a router per provider, mirroring only the endpoints services/ actually call.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from urllib.parse import parse_qs
+
+from fastapi import APIRouter, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+BATCH_LIMIT = 100
+GMAIL_BATCH_LIMIT = 100
+GMAIL_HISTORY_RETENTION = 10_000  # history records kept; older startHistoryIds get 404 like Gmail's expired history
+
+app = FastAPI(title="Fake providers")
+hubspot = APIRouter(prefix="/hubspot/crm/v3", tags=["HubSpot"])
+proxycurl = APIRouter(prefix="/proxycurl/api/linkedin", tags=["Proxycurl"])
+calendly = APIRouter(prefix="/calendly", tags=["Calendly"])
+hunter = APIRouter(prefix="/hunter/v2", tags=["Hunter"])
+openai = APIRouter(prefix="/openai/v1", tags=["OpenAI"])
+gmail = APIRouter(prefix="/gmail/v1", tags=["Gmail"])
+
+@dataclass
+class Knobs:
+    """Injected behaviour for one provider."""
+    latency_ms: float = 0.0   # added to every request
+    jitter_ms: float = 0.0    # latency varies uniformly by +/- this
+    error_rate: float = 0.0   # share of requests answered 503
+    rate_limit: float = 0.0   # requests per second (burst of one second's worth); 0 = unlimited
+    token_ms: float = 0.0     # OpenAI: generation time per completion chunk (streamed as it is "generated")
+
+    @classmethod
+    def from_env(cls, provider: str = None) -> "Knobs":
+        """FAKE_LATENCY_MS etc. for every provider, FAKE_<PROVIDER>_LATENCY_MS etc. for one."""
+        knobs = cls()
+        for field in fields(cls):
+            for prefix in ("FAKE_", f"FAKE_{provider.upper()}_" if provider else None):
+                value = os.getenv(f"{prefix}{field.name.upper()}") if prefix else None
+                if value:
+                    setattr(knobs, field.name, float(value))
+        return knobs
+
+class ProviderBehaviour:
+    """Knobs, token buckets and injected-failure counts per provider (first path segment)."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rng = random.Random(os.getenv("FAKE_SEED", "7"))
+        self.reset()
+
+    def reset(self):
+        self.knobs = {}
+        self.buckets = {}  # provider -> [tokens, updated_at]
+        self.injected = defaultdict(Counter)
+
+    def knobs_for(self, provider: str) -> Knobs:
+        if provider not in self.knobs:
+            self.knobs[provider] = Knobs.from_env(provider)
+        return self.knobs[provider]
+
+    def configure(self, provider: str, values: dict):
+        knobs = self.knobs_for(provider)
+        for name, value in values.items():
+            if name not in Knobs.__dataclass_fields__:
+                raise HTTPException(status_code=400, detail=f"Unknown knob: {name}")
+            setattr(knobs, name, float(value))
+        self.buckets.pop(provider, None)
+
+    def decide(self, provider: str) -> tuple:
+        """Returns: (delay seconds, status to inject or None, Retry-After seconds)."""
+        with self.lock:
+            knobs = self.knobs_for(provider)
+            delay = max(0.0, knobs.latency_ms + self.rng.uniform(-knobs.jitter_ms, knobs.jitter_ms)) / 1000
+            if knobs.rate_limit > 0:
+                now = time.monotonic()
+                burst = max(1.0, knobs.rate_limit)
+                tokens, updated_at = self.buckets.get(provider, (burst, now))
+                tokens = min(burst, tokens + (now - updated_at) * knobs.rate_limit)
+                if tokens < 1:
+                    self.buckets[provider] = (tokens, now)
+                    self.injected[provider]["throttled"] += 1
+                    return delay, 429, math.ceil((1 - tokens) / knobs.rate_limit)
+                self.buckets[provider] = (tokens - 1, now)
+            if knobs.error_rate > 0 and self.rng.random() < knobs.error_rate:
+                self.injected[provider]["errors"] += 1
+                return delay, 503, None
+        return delay, None, None
+
+class HubSpotStore:
+    """Contacts keyed by id, with a lowercase-email index."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.contacts = {}
+        self.by_email = {}
+        self.next_id = 1
+
+    def save(self, contact_id: str, properties: dict) -> dict:
+        contact = self.contacts.setdefault(contact_id, {"id": contact_id, "properties": {}, "createdAt": _now()})
+        old_email = contact["properties"].get("email")
+        contact["properties"].update(properties)
+        contact["updatedAt"] = _now()
+        email = (contact["properties"].get("email") or "").lower()
+        if old_email and old_email.lower() != email:
+            self.by_email.pop(old_email.lower(), None)
+        if email:
+            self.by_email[email] = contact_id
+        return contact
+
+class GmailStore:
+    """One mailbox: messages by id, and the history of additions (each one bumps historyId)."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.messages = {}
+        self.history = []  # [(history id, message id)], oldest first
+        self.history_id = 1000
+        self.floor = self.history_id  # startHistoryIds below this have expired
+
+    def add(self, raw: str, label_ids: list, thread_id: str = None) -> dict:
+        """Store a raw RFC 822 message. Returns: the message resource."""
+        head, _, body = raw.replace("\r\n", "\n").partition("\n\n")
+        headers = [{"name": name, "value": value} for name, _, value in
+                   (line.partition(": ") for line in head.splitlines() if ": " in line)]
+        with self.lock:
+            self.history_id += 1
+            message_id = f"{self.history_id:016x}"
+            self.messages[message_id] = {
+                "id": message_id, "threadId": thread_id or message_id, "labelIds": label_ids,
+                "snippet": " ".join(body.split())[:200], "historyId": str(self.history_id),
+                "internalDate": str(int(time.time() * 1000)), "sizeEstimate": len(raw),
+                "payload": {"mimeType": "text/plain", "headers": headers, "body": {
+                    "size": len(body), "data": base64.urlsafe_b64encode(body.encode("utf-8")).decode()}},
+            }
+            self.history.append((self.history_id, message_id))
+            if len(self.history) > GMAIL_HISTORY_RETENTION:
+                dropped = self.history[:len(self.history) - GMAIL_HISTORY_RETENTION]
+                del self.history[:len(dropped)]
+                self.floor = dropped[-1][0]
+            return self.messages[message_id]
+
+    def get(self, message_id: str, format: str = "full") -> dict:
+        message = self.messages.get(message_id)
+        if message is None:
+            raise HTTPException(status_code=404, detail="Requested entity was not found.")
+        if format == "minimal":
+            return {key: value for key, value in message.items() if key != "payload"}
+        if format == "metadata":
+            return {**message, "payload": {**message["payload"], "body": {"size": message["payload"]["body"]["size"]}}}
+        return message
+
+hubspot_store = HubSpotStore()
+calendly_bookings = {}  # (event type uri, start time) -> invitee
+calendly_lock = threading.Lock()
+gmail_sent = Counter()  # recipient -> messages
+gmail_store = GmailStore()
+behaviour = ProviderBehaviour()
+calls = Counter()
+
+@app.middleware("http")
+async def provider_behaviour(request: Request, call_next):
+    """Count the call, then apply the provider's latency, rate limit and error injection."""
+    path = request.url.path
+    if path.startswith("/_"):
+        return await call_next(request)
+    calls[f"{request.method} {path}"] += 1
+    provider = path.strip("/").split("/", 2)
+    delay, status, retry_after = behaviour.decide(provider[1] if provider[0] == "batch" and len(provider) > 1 else provider[0])
+    if delay:
+        await asyncio.sleep(delay)
+    if status == 429:
+        return JSONResponse({"error": "rate limit exceeded (injected)"}, status_code=429,
+                            headers={"Retry-After": str(retry_after)})
+    if status:
+        return JSONResponse({"error": "service unavailable (injected)"}, status_code=status)
+    return await call_next(request)
+
+@app.get("/_stats")
+def stats():
+    return {
+        "calls": dict(calls), "hubspot_contacts": len(hubspot_store.contacts),
+        "calendly_bookings": len(calendly_bookings), "gmail_sent": sum(gmail_sent.values()),
+        "injected": {provider: dict(counts) for provider, counts in behaviour.injected.items()},
+    }
+
+@app.get("/_config")
+def get_config():
+    return {provider: asdict(knobs) for provider, knobs in behaviour.knobs.items()}
+
+@app.post("/_config")
+def set_config(body: dict):
+    """body: {provider: {knob: value}}, e.g. {"openai": {"latency_ms": 800, "error_rate": 0.02}}."""
+    with behaviour.lock:
+        for provider, values in body.items():
+            behaviour.configure(provider, values)
+    return get_config()
+
+@app.post("/_reset")
+def reset():
+    calls.clear()
+    with hubspot_store.lock:
+        hubspot_store.reset()
+    with calendly_lock:
+        calendly_bookings.clear()
+    gmail_sent.clear()
+    gmail_store.reset()
+    with behaviour.lock:
+        behaviour.reset()
+    return {"message": "reset"}
+
+def _inputs(body: dict) -> list:
+    inputs = body.get("inputs") or []
+    if len(inputs) > BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"Batch size must be <= {BATCH_LIMIT}")
+    return inputs
+
+def _batch_response(results: list, errors: list):
+    body = {"status": "COMPLETE", "results": results, "startedAt": _now(), "completedAt": _now()}
+    if errors:
+        body["errors"] = errors
+        body["numErrors"] = len(errors)
+    return JSONResponse(body, status_code=207 if errors else 200)
+
+@hubspot.post("/objects/contacts")
+def create_contact(body: dict):
+    with hubspot_store.lock:
+        email = (body.get("properties", {}).get("email") or "").lower()
+        if email in hubspot_store.by_email:
+            raise HTTPException(status_code=409, detail=f"Contact already exists. Existing ID: {hubspot_store.by_email[email]}")
+        contact = hubspot_store.save(str(hubspot_store.next_id), body.get("properties", {}))
+        hubspot_store.next_id += 1
+    return JSONResponse(contact, status_code=201)
+
+@hubspot.post("/objects/contacts/batch/create")
+def batch_create(body: dict):
+    inputs = _inputs(body)
+    with hubspot_store.lock:
+        emails = [(item.get("properties", {}).get("email") or "").lower() for item in inputs]
+        conflicts = [email for email in emails if email and email in hubspot_store.by_email]
+        if conflicts or len(set(filter(None, emails))) < len(list(filter(None, emails))):
+            raise HTTPException(status_code=409, detail="Contact already exists")
+        results = []
+        for item in inputs:
+            results.append(hubspot_store.save(str(hubspot_store.next_id), item.get("properties", {})))
+            hubspot_store.next_id += 1
+    return JSONResponse({"status": "COMPLETE", "results": results}, status_code=201)
+
+@hubspot.post("/objects/contacts/batch/update")
+def batch_update(body: dict):
+    inputs = _inputs(body)
+    results, errors = [], []
+    with hubspot_store.lock:
+        for item in inputs:
+            contact_id = str(item.get("id"))
+            if contact_id in hubspot_store.contacts:
+                results.append(hubspot_store.save(contact_id, item.get("properties", {})))
+            else:
+                errors.append({"status": "error", "category": "OBJECT_NOT_FOUND", "context": {"ids": [contact_id]}})
+    return _batch_response(results, errors)
+
+@hubspot.post("/objects/contacts/batch/read")
+def batch_read(body: dict):
+    inputs = _inputs(body)
+    by_email = body.get("idProperty") == "email"
+    results, errors = [], []
+    with hubspot_store.lock:
+        for item in inputs:
+            key = str(item.get("id"))
+            contact_id = hubspot_store.by_email.get(key.lower()) if by_email else key
+            if contact_id in hubspot_store.contacts:
+                results.append(hubspot_store.contacts[contact_id])
+            else:
+                errors.append({"status": "error", "category": "OBJECT_NOT_FOUND", "context": {"ids": [key]}})
+    return _batch_response(results, errors)
+
+_WORDS = ("platform", "growth", "partnerships", "energy", "storage", "strategy", "operations", "cloud",
+          "manufacturing", "licensing", "joint", "venture", "markets", "engineering", "product", "sales")
+
+@proxycurl.get("/profile")
+def linkedin_profile(linkedin_profile_url: str):
+    slug = linkedin_profile_url.rstrip("/").rsplit("/", 1)[-1]
+    if slug.startswith("missing"):
+        raise HTTPException(status_code=404, detail="Person not found")
+    return fake_profile(slug)
+
+def fake_profile(slug: str) -> dict:
+    """Return a Proxycurl-shaped profile (~17 KB of JSON) seeded by the slug."""
+    rng = random.Random(slug)
+    name = " ".join(part.capitalize() for part in slug.split("-")[:2])
+
+    def sentence(words: int) -> str:
+        return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+    def date(year: int) -> dict:
+        return {"day": rng.randint(1, 28), "month": rng.randint(1, 12), "year": year}
+
+    experiences = [
+        {
+            "company": f"{rng.choice(_WORDS).capitalize()} {rng.choice(('Corp', 'Labs', 'Group', 'Systems'))}",
+            "title": f"{rng.choice(('VP', 'Head of', 'Director of'))} {rng.choice(_WORDS).capitalize()}",
+            "description": " ".join(sentence(14) for _ in range(4)),
+            "location": rng.choice(("Berlin, Germany", "Austin, Texas", "Singapore")),
+            "company_linkedin_profile_url": f"https://www.linkedin.com/company/{rng.choice(_WORDS)}-{n}",
+            "starts_at": date(2020 - 3 * n), "ends_at": None if n == 0 else date(2023 - 3 * n),
+        }
+        for n in range(8)
+    ]
+    return {
+        "public_identifier": slug,
+        "full_name": name, "first_name": name.split(" ")[0], "last_name": name.split(" ")[-1],
+        "headline": f"{experiences[0]['title']} at {experiences[0]['company']} | {sentence(6)}",
+        "summary": " ".join(sentence(16) for _ in range(10)),
+        "city": "Berlin", "country": "DE", "country_full_name": "Germany",
+        "profile_pic_url": f"https://media.licdn.com/dms/image/{slug}/profile-displayphoto.jpg",
+        "follower_count": rng.randint(100, 20000), "connections": 500,
+        "experiences": experiences,
+        "education": [{"school": f"University of {rng.choice(_WORDS).capitalize()}", "degree_name": "MSc",
+                       "field_of_study": rng.choice(_WORDS), "starts_at": date(2000 + n), "ends_at": date(2002 + n)}
+                      for n in range(3)],
+        "activities": [{"title": sentence(12), "link": f"https://www.linkedin.com/posts/{slug}-{n}",
+                        "activity_status": "Shared by " + name} for n in range(20)],
+        "people_also_viewed": [{"name": f"Person {n}", "summary": sentence(8), "location": "Germany",
+                                "link": f"https://www.linkedin.com/in/person-{rng.randint(1, 10 ** 6)}"} for n in range(10)],
+        "similarly_named_profiles": [{"name": name, "summary": sentence(8), "location": "Germany",
+                                      "link": f"https://www.linkedin.com/in/{slug}-{n}"} for n in range(5)],
+        "skills": [rng.choice(_WORDS) for _ in range(40)],
+        "languages": ["English", "German"], "certifications": [], "recommendations": [sentence(40) for _ in range(4)],
+    }
+
+CALENDLY_SLOT_MINUTES = 30
+
+def _calendly_uri(request: Request, path: str) -> str:
+    return f"{str(request.base_url).rstrip('/')}/calendly/{path}"
+
+def _calendly_slots(start: datetime, end: datetime):
+    """Yield weekday 09:00-17:00 UTC slot starts in [start, end)."""
+    moment = start.replace(minute=0, second=0, microsecond=0)
+    while moment < end:
+        if moment >= start and moment.weekday() < 5 and 9 <= moment.hour < 17:
+            yield moment
+        moment += timedelta(minutes=CALENDLY_SLOT_MINUTES)
+
+def _calendly_error(status_code: int, message: str):
+    return JSONResponse({"title": "Invalid Argument", "message": message}, status_code=status_code)
+
+@calendly.get("/users/me")
+def calendly_user(request: Request):
+    return {"resource": {"uri": _calendly_uri(request, "users/ME"), "name": "JV Team", "timezone": "UTC"}}
+
+@calendly.get("/event_types")
+def calendly_event_types(request: Request, user: str):
+    uri = _calendly_uri(request, "event_types/INTRO30")
+    return {
+        "collection": [{"uri": uri, "name": "JV Intro Call", "duration": CALENDLY_SLOT_MINUTES, "active": True,
+                        "kind": "solo", "scheduling_url": "https://calendly.com/jv-team/intro", "profile": {"owner": user}}],
+        "pagination": {"count": 1, "next_page": None},
+    }
+
+@calendly.get("/event_type_available_times")
+def calendly_available_times(event_type: str, start_time: str, end_time: str):
+    start, end = _utc(start_time), _utc(end_time)
+    if start < datetime.now(timezone.utc) or end <= start or end - start > timedelta(days=7):
+        return _calendly_error(400, "start_time must be in the future and the range at most 7 days")
+    with calendly_lock:
+        taken = {when for uri, when in calendly_bookings if uri == event_type}
+    collection = [
+        {"status": "available", "invitees_remaining": 1, "start_time": _calendly_time(moment),
+         "scheduling_url": f"https://calendly.com/jv-team/intro/{_calendly_time(moment)}"}
+        for moment in _calendly_slots(start, end) if _calendly_time(moment) not in taken
+    ]
+    return {"collection": collection}
+
+@calendly.post("/invitees")
+def calendly_create_invitee(request: Request, body: dict):
+    event_type, start_time = body.get("event_type", ""), body.get("start_time", "")
+    invitee = body.get("invitee") or {}
+    try:
+        start = _utc(start_time)
+    except ValueError:
+        return _calendly_error(400, "start_time is invalid")
+    if not invitee.get("email") or next(_calendly_slots(start, start + timedelta(seconds=1)), None) != start:
+        return _calendly_error(400, "The selected time is not available")
+    key = (event_type, _calendly_time(start))
+    with calendly_lock:
+        if key in calendly_bookings:
+            return _calendly_error(400, "The selected time is no longer available")
+        number = len(calendly_bookings) + 1
+        resource = {
+            "uri": _calendly_uri(request, f"scheduled_events/EV{number}/invitees/INV{number}"),
+            "event": _calendly_uri(request, f"scheduled_events/EV{number}"),
+            "email": invitee["email"], "name": invitee.get("name", ""), "status": "active",
+            "timezone": invitee.get("timezone", "UTC"), "created_at": _now(),
+        }
+        calendly_bookings[key] = resource
+    return JSONResponse({"resource": resource}, status_code=201)
+
+def _utc(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+def _calendly_time(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.000000Z")
+
+def _digest(*parts) -> int:
+    return int(hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:8], 16)
+
+@hunter.get("/email-verifier")
+def hunter_verify(email: str, api_key: str = None):
+    if not api_key:
+        return JSONResponse({"errors": [{"id": "authentication_failed", "code": 401}]}, status_code=401)
+    deliverable = not email.lower().startswith("bounce")
+    return {
+        "data": {"status": "valid" if deliverable else "invalid", "result": "deliverable" if deliverable else "undeliverable",
+                 "score": 60 + _digest(email) % 40 if deliverable else 5, "email": email, "regexp": True,
+                 "gibberish": False, "disposable": False, "webmail": False, "mx_records": True, "smtp_server": True,
+                 "smtp_check": deliverable, "accept_all": False, "block": False, "sources": []},
+        "meta": {"params": {"email": email}},
+    }
+
+@hunter.get("/domain-search")
+def hunter_domain_search(domain: str, api_key: str = None, limit: int = 10):
+    if not api_key:
+        return JSONResponse({"errors": [{"id": "authentication_failed", "code": 401}]}, status_code=401)
+    rng = random.Random(domain)
+    people = [(rng.choice(("anna", "ben", "carla", "david", "elena", "farid")), rng.choice(("chen", "evans", "ito", "patel")))
+              for _ in range(min(limit, 5))]
+    return {
+        "data": {"domain": domain, "organization": domain.split(".")[0].capitalize(), "pattern": "{first}.{last}",
+                 "emails": [{"value": f"{first}.{last}@{domain}", "type": "personal", "confidence": rng.randint(70, 99),
+                             "first_name": first.capitalize(), "last_name": last.capitalize(),
+                             "position": rng.choice(("CEO", "CTO", "Head of Partnerships"))} for first, last in people]},
+        "meta": {"results": len(people), "limit": limit, "offset": 0},
+    }
+
+_LABELS = ("interested", "not-interested", "no-response", "follow-up-needed")
+_WORDS = ("partnership", "joint", "venture", "growth", "market", "team", "opportunity", "together", "value",
+          "pilot", "customers", "regional", "scale", "discuss", "call", "next", "week", "happy", "share", "plan")
+
+@openai.post("/chat/completions")
+async def openai_chat(body: dict, authorization: Optional[str] = Header(None)):
+    if not (authorization or "").startswith("Bearer "):
+        return JSONResponse({"error": {"message": "Missing API key", "type": "invalid_request_error"}}, status_code=401)
+    messages = body.get("messages") or []
+    prompt = " ".join(str(message.get("content", "")) for message in messages)
+    if any("classify" in str(message.get("content", "")).lower() for message in messages if message.get("role") == "system"):
+        content = _LABELS[_digest(prompt) % len(_LABELS)]
+    else:
+        rng = random.Random(prompt)
+        words = max(5, int(body.get("max_tokens", 250) * 0.6))
+        content = " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+        if "{{first_name}}" in prompt:  # a segment template: greet and mention the placeholders it was asked for
+            content = f"Dear {{{{first_name}}}},\n\n{content} {{{{company}}}} and our {{{{product}}}}."
+    chunks = [content[start:start + 4] for start in range(0, len(content), 4)]  # ~4 characters per token
+    token_s = behaviour.knobs_for("openai").token_ms / 1000
+    completion_id, model = f"chatcmpl-fake{_digest(prompt, time.time())}", body.get("model", "gpt-3.5-turbo")
+    if body.get("stream"):
+        return StreamingResponse(_openai_stream(completion_id, model, chunks, token_s), media_type="text/event-stream")
+    if token_s:
+        await asyncio.sleep(token_s * len(chunks))
+    prompt_tokens, completion_tokens = len(prompt.split()) * 4 // 3 + 8, len(content.split()) * 4 // 3 + 1
+    return {
+        "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+async def _openai_stream(completion_id: str, model: str, chunks: list, token_s: float):
+    """Server-sent chat.completion.chunk events, one per chunk (token_s apart), then [DONE]."""
+    def event(delta: dict, finish_reason: str = None) -> str:
+        return "data: " + json.dumps({
+            "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }) + "\n\n"
+    yield event({"role": "assistant", "content": ""})
+    for chunk in chunks:
+        if token_s:
+            await asyncio.sleep(token_s)
+        yield event({"content": chunk})
+    yield event({}, "stop")
+    yield "data: [DONE]\n\n"
+
+@gmail.post("/users/{user_id}/messages/send")
+def gmail_send(user_id: str, body: dict):
+    try:
+        message = base64.urlsafe_b64decode(body.get("raw", "")).decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid raw message")
+    headers = dict(line.split(": ", 1) for line in message.split("\n\n", 1)[0].splitlines() if ": " in line)
+    if not headers.get("To"):
+        raise HTTPException(status_code=400, detail="Recipient address required")
+    gmail_sent[headers["To"]] += 1
+    sent = gmail_store.add(message, ["SENT"], body.get("threadId"))
+    return {"id": sent["id"], "threadId": sent["threadId"], "labelIds": sent["labelIds"]}
+
+@gmail.post("/users/{user_id}/messages")
+def gmail_insert(user_id: str, body: dict):
+    """messages.insert: put a message (e.g. a reply) straight into the mailbox, INBOX by default."""
+    try:
+        message = base64.urlsafe_b64decode(body.get("raw", "")).decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid raw message")
+    inserted = gmail_store.add(message, body.get("labelIds") or ["INBOX", "UNREAD"], body.get("threadId"))
+    return {"id": inserted["id"], "threadId": inserted["threadId"], "labelIds": inserted["labelIds"]}
+
+@gmail.get("/users/{user_id}/profile")
+def gmail_profile(user_id: str):
+    return {"emailAddress": "me@example.com", "messagesTotal": len(gmail_store.messages),
+            "threadsTotal": len({message["threadId"] for message in gmail_store.messages.values()}),
+            "historyId": str(gmail_store.history_id)}
+
+@gmail.get("/users/{user_id}/history")
+def gmail_history(user_id: str, startHistoryId: int, labelId: Optional[str] = None,
+                  historyTypes: Optional[List[str]] = Query(None), pageToken: Optional[str] = None,
+                  maxResults: int = Query(100, ge=1, le=500)):
+    with gmail_store.lock:
+        if startHistoryId < gmail_store.floor:
+            raise HTTPException(status_code=404, detail="Requested entity was not found.")
+        records = [(history_id, gmail_store.messages[message_id]) for history_id, message_id in gmail_store.history
+                   if history_id > startHistoryId]
+        current = str(gmail_store.history_id)
+    if labelId:
+        records = [(history_id, message) for history_id, message in records if labelId in message["labelIds"]]
+    offset = int(pageToken or 0)
+    page = records[offset:offset + maxResults]
+    response = {"historyId": current}
+    if page:
+        response["history"] = [{"id": str(history_id), "messages": [{"id": message["id"], "threadId": message["threadId"]}],
+                                "messagesAdded": [{"message": {"id": message["id"], "threadId": message["threadId"],
+                                                               "labelIds": message["labelIds"]}}]}
+                               for history_id, message in page]
+    if offset + maxResults < len(records):
+        response["nextPageToken"] = str(offset + maxResults)
+    return response
+
+@gmail.get("/users/{user_id}/messages")
+def gmail_list(user_id: str, q: str = "", labelIds: Optional[List[str]] = Query(None), pageToken: Optional[str] = None,
+               maxResults: int = Query(100, ge=1, le=500)):
+    """Newest first; q understands in:inbox and after:<epoch seconds>."""
+    labels = set(labelIds or [])
+    after = None
+    for term in q.split():
+        if term == "in:inbox":
+            labels.add("INBOX")
+        elif term.startswith("after:"):
+            after = int(term[6:]) * 1000
+    messages = [message for message in reversed(list(gmail_store.messages.values()))
+                if labels <= set(message["labelIds"]) and (after is None or int(message["internalDate"]) > after)]
+    offset = int(pageToken or 0)
+    response = {"messages": [{"id": message["id"], "threadId": message["threadId"]}
+                             for message in messages[offset:offset + maxResults]],
+                "resultSizeEstimate": len(messages)}
+    if offset + maxResults < len(messages):
+        response["nextPageToken"] = str(offset + maxResults)
+    return response
+
+@gmail.get("/users/{user_id}/messages/{message_id}")
+def gmail_get(user_id: str, message_id: str, format: str = "full"):
+    return gmail_store.get(message_id, format)
+
+@app.post("/batch/gmail/v1")
+async def gmail_batch(request: Request):
+    """Gmail's multipart/mixed batch: each part is an HTTP request; only message gets are supported."""
+    boundary = request.headers.get("content-type", "").partition("boundary=")[2].strip('"')
+    if not boundary:
+        raise HTTPException(status_code=400, detail="multipart/mixed boundary required")
+    body = (await request.body()).decode("utf-8").replace("\r\n", "\n")
+    parts = [part.strip("\n") for part in body.split(f"--{boundary}")]
+    parts = [part for part in parts if part and part != "--"]
+    if len(parts) > GMAIL_BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"Too many requests in batch (max {GMAIL_BATCH_LIMIT})")
+    answers = []
+    for part in parts:
+        headers, _, http = part.partition("\n\n")
+        content_id = next((line.split(":", 1)[1].strip() for line in headers.splitlines()
+                           if line.lower().startswith("content-id:")), "<0>")
+        method, target = (http.splitlines() or [""])[0].split(" ")[:2]
+        path, _, query = target.partition("?")
+        segments = path.strip("/").split("/")  # gmail v1 users {userId} messages {id}
+        try:
+            if method != "GET" or len(segments) != 6 or segments[:2] != ["gmail", "v1"] or segments[4] != "messages":
+                raise HTTPException(status_code=400, detail=f"Unsupported batch request: {method} {path}")
+            status, payload = 200, gmail_store.get(segments[5], parse_qs(query).get("format", ["full"])[0])
+        except HTTPException as e:
+            status, payload = e.status_code, {"error": {"code": e.status_code, "message": e.detail}}
+        answers.append(f"Content-Type: application/http\r\nContent-ID: <response-{content_id.strip('<>')}>\r\n\r\n"
+                       f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                       f"Content-Type: application/json; charset=UTF-8\r\n\r\n{json.dumps(payload)}\r\n")
+    reply_boundary = f"batch_{uuid.uuid4().hex}"
+    content = "".join(f"--{reply_boundary}\r\n{answer}" for answer in answers) + f"--{reply_boundary}--\r\n"
+    return Response(content, media_type=f"multipart/mixed; boundary={reply_boundary}")
+
+app.include_router(hubspot)
+app.include_router(proxycurl)
+app.include_router(calendly)
+app.include_router(hunter)
+app.include_router(openai)
+app.include_router(gmail)
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
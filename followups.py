@@ -0,0 +1,115 @@
+"""
+Follow-up scheduling for outreaches that got no reply.
+Every outreach awaiting a reply carries next_action_at, which models.py keeps in step with its response
+and date on each ORM write (FOLLOW_UP_CADENCE_DAYS rounds, then NULL). The scanner reads only rows
+whose next_action_at has passed, through its index, so a run costs O(due rows), not O(outreaches):
+  - each batch is claimed under a lease (next_action_at pushed FOLLOWUP_LEASE_MINUTES ahead), so
+    concurrent scanners never take the same rows and a crashed run's rows come back after the lease;
+  - within a run a keyset watermark (next_action_at, id) means no row is read twice;
+  - the email is queued in the outbox in the same transaction that advances the row to its next round,
+    and only if the row is still ours (a reply recorded meanwhile cancels the follow-up).
+Bodies come from one cached AI template per segment (product × role × industry, see campaigns.py),
+personalized locally, so a batch costs at most one OpenAI call per new segment.
+Run: python followups.py   (from cron every few minutes; `python outbox.py` delivers the emails)
+Easy to change: FOLLOW_UP_CADENCE_DAYS (env, e.g. "5,7,14") sets the rounds; campaigns.py has the wording.
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+import campaigns
+from models import Outreach, OutreachResponse, ProductTechnology, Stakeholder, TargetCompany, next_follow_up_at, record_changes
+from outbox import enqueue
+
+BATCH_SIZE = int(os.getenv("FOLLOWUP_BATCH_SIZE", "100"))
+LEASE_MINUTES = int(os.getenv("FOLLOWUP_LEASE_MINUTES", "15"))
+SUBJECT = "Follow-up: JV Partnership"
+
+def claim_due(db: Session, now: datetime, watermark: tuple = None, batch_size: int = BATCH_SIZE) -> tuple:
+    """
+    Lease the next batch of due outreaches after `watermark` ((next_action_at, id) of the last row read).
+    Returns: (lease_until, claimed ids, new watermark); no ids once nothing due is left.
+    """
+    table = Outreach.__table__
+    query = select(table.c.id, table.c.next_action_at).where(table.c.next_action_at <= now)
+    if watermark:
+        due_at, last_id = watermark
+        query = query.where(or_(table.c.next_action_at > due_at, and_(table.c.next_action_at == due_at, table.c.id > last_id)))
+    candidates = db.execute(query.order_by(table.c.next_action_at, table.c.id).limit(batch_size)).all()
+    if not candidates:
+        return None, [], watermark
+    ids = [row.id for row in candidates]
+    lease_until = max(now, datetime.utcnow()) + timedelta(minutes=LEASE_MINUTES)
+    db.execute(update(table).where(table.c.id.in_(ids), table.c.next_action_at <= now).values(next_action_at=lease_until))
+    claimed = db.execute(select(table.c.id).where(table.c.id.in_(ids), table.c.next_action_at == lease_until)).scalars().all()
+    record_changes(db.connection(), "outreaches", claimed)
+    db.commit()
+    last = candidates[-1]
+    return lease_until, claimed, (last.next_action_at, last.id)
+
+def process_batch(db: Session, lease_until: datetime, ids: list) -> dict:
+    """Queue one follow-up per claimed outreach and move it to its next round. Returns: counts."""
+    counts = {"queued": 0, "skipped": 0, "superseded": 0}
+    rows = (
+        db.query(Outreach.id, Outreach.date, Outreach.follow_up_count, (Outreach.follow_up_count + 1).label("round_number"),
+                 Stakeholder.name, Stakeholder.email, Stakeholder.title, Stakeholder.role,
+                 TargetCompany.name.label("company"), TargetCompany.industry, ProductTechnology.name.label("product"))
+        .outerjoin(Stakeholder, Stakeholder.id == Outreach.stakeholder_id)
+        .outerjoin(TargetCompany, TargetCompany.id == Stakeholder.company_id)
+        .outerjoin(ProductTechnology, ProductTechnology.id == TargetCompany.product_technology_id)
+        .filter(Outreach.id.in_(ids))
+        .all()
+    )
+    bodies, _ = campaigns.personalize(db, "follow-up", [row for row in rows if row.email])
+
+    table = Outreach.__table__
+    now = datetime.utcnow()
+    changed = []
+    for row in rows:
+        ours = (table.c.id == row.id, table.c.next_action_at == lease_until)
+        if not row.email:
+            if db.execute(update(table).where(*ours).values(next_action_at=None)).rowcount:  # nobody to follow up with
+                changed.append(row.id)
+            counts["skipped"] += 1
+            continue
+        rounds = row.follow_up_count + 1
+        result = db.execute(update(table).where(*ours).values(
+            follow_up_count=rounds, follow_up_date=now, response=OutreachResponse.FOLLOW_UP_NEEDED,
+            next_action_at=next_follow_up_at(row.date or now, rounds, now),
+        ))
+        if result.rowcount:
+            enqueue(db, "email.send", {"to": row.email, "subject": SUBJECT, "body": bodies[row.id], "outreach_id": row.id})
+            changed.append(row.id)
+            counts["queued"] += 1
+        else:
+            counts["superseded"] += 1  # replied or rescheduled while we were generating
+    record_changes(db.connection(), "outreaches", changed)
+    db.commit()
+    return counts
+
+def run_due_followups(db: Session, now: datetime = None, batch_size: int = BATCH_SIZE, max_batches: int = None) -> dict:
+    """
+    Scan everything due at `now` (default: the current time) batch by batch.
+    Returns: {'batches', 'claimed', 'queued', 'skipped', 'superseded'}.
+    """
+    now = now or datetime.utcnow()
+    stats = {"batches": 0, "claimed": 0, "queued": 0, "skipped": 0, "superseded": 0}
+    watermark = None
+    while max_batches is None or stats["batches"] < max_batches:
+        lease_until, ids, watermark = claim_due(db, now, watermark, batch_size)
+        if lease_until is None:
+            break
+        stats["batches"] += 1
+        stats["claimed"] += len(ids)
+        if ids:
+            for key, value in process_batch(db, lease_until, ids).items():
+                stats[key] += value
+    return stats
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    with SessionLocal() as session:
+        print(run_due_followups(session))
@@ -0,0 +1,185 @@
+"""
+Incremental stakeholder -> HubSpot contact sync.
+Each stakeholder's contact properties are hashed; only stakeholders whose hash differs from the one
+stored in hubspot_contact_sync are sent, via the batch endpoints (100 per call). New stakeholders are
+first looked up by email so contacts that already exist in HubSpot are updated, not duplicated.
+State is committed after every batch, so an interrupted sync resumes where it stopped and a
+re-run with no changes makes no API calls.
+Run: python hubspot_sync.py [--force]
+Easy to change: Edit contact_properties() to sync more fields (changed output re-syncs everyone once).
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import Deal, DealStage, HubSpotContactSync, Meeting, Outreach, Stakeholder, TargetCompany
+from services import hubspot_service
+
+@dataclass
+class PendingContact:
+    stakeholder_id: int
+    hubspot_id: str
+    properties: dict
+    content_hash: str
+
+# Furthest deal stage -> HubSpot lifecycle stage (stakeholders without a deal send none)
+LIFECYCLE_STAGES = {
+    DealStage.INTRO: "salesqualifiedlead",
+    DealStage.NEGOTIATION: "opportunity",
+    DealStage.MOU: "opportunity",
+    DealStage.ESTABLISHED: "customer",
+}
+_STAGE_ORDER = list(DealStage)
+
+def contact_properties(name: str, title: str, email: str, phone: str, company: str, deal_stage: DealStage = None) -> dict:
+    """Return the HubSpot contact properties for a stakeholder (standard properties only)."""
+    firstname, _, lastname = (name or "").strip().partition(" ")
+    properties = {
+        "email": (email or "").strip().lower(),
+        "firstname": firstname,
+        "lastname": lastname.strip(),
+        "jobtitle": title or "",
+        "phone": phone or "",
+        "company": company or "",
+    }
+    if deal_stage is not None:
+        properties["lifecyclestage"] = LIFECYCLE_STAGES[deal_stage]
+    return properties
+
+def content_hash(properties: dict) -> str:
+    """Return a stable sha256 of the properties (key order and whitespace independent)."""
+    canonical = json.dumps(properties, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def deal_stages(db: Session, stakeholder_ids: list = None) -> dict:
+    """Return {stakeholder_id: furthest DealStage} over the stakeholder's outreach -> meeting -> deal chain."""
+    query = (
+        select(Outreach.stakeholder_id, Deal.stage)
+        .join(Meeting, Meeting.outreach_id == Outreach.id)
+        .join(Deal, Deal.meeting_id == Meeting.id)
+        .where(Deal.stage.is_not(None))
+    )
+    if stakeholder_ids is not None:
+        query = query.where(Outreach.stakeholder_id.in_(stakeholder_ids))
+    furthest = {}
+    for stakeholder_id, stage in db.execute(query):
+        if stakeholder_id not in furthest or _STAGE_ORDER.index(stage) > _STAGE_ORDER.index(furthest[stakeholder_id]):
+            furthest[stakeholder_id] = stage
+    return furthest
+
+def changed_contacts(db: Session, force: bool = False, stakeholder_ids: list = None) -> tuple:
+    """
+    Find stakeholders whose contact properties changed since the last sync (all of them with force=True).
+    stakeholder_ids: only consider these (None = everyone).
+    Returns: (list of PendingContact, stakeholders checked, stakeholders skipped for having no email).
+    """
+    query = (
+        select(
+            Stakeholder.id, Stakeholder.name, Stakeholder.title, Stakeholder.email, Stakeholder.phone,
+            TargetCompany.name.label("company"), HubSpotContactSync.hubspot_id, HubSpotContactSync.content_hash,
+        )
+        .outerjoin(TargetCompany, TargetCompany.id == Stakeholder.company_id)
+        .outerjoin(HubSpotContactSync, HubSpotContactSync.stakeholder_id == Stakeholder.id)
+        .order_by(Stakeholder.id)
+    )
+    if stakeholder_ids is not None:
+        query = query.where(Stakeholder.id.in_(stakeholder_ids))
+    stages = deal_stages(db, stakeholder_ids)
+    pending, checked, skipped = [], 0, 0
+    for row in db.execute(query):
+        checked += 1
+        properties = contact_properties(row.name, row.title, row.email, row.phone, row.company, stages.get(row.id))
+        if not properties["email"]:
+            skipped += 1
+            continue
+        digest = content_hash(properties)
+        if force or digest != row.content_hash:
+            pending.append(PendingContact(row.id, row.hubspot_id, properties, digest))
+    return pending, checked, skipped
+
+def sync_stakeholders(db: Session, force: bool = False, batch_size: int = hubspot_service.BATCH_LIMIT,
+                      stakeholder_ids: list = None) -> dict:
+    """
+    Push new and changed stakeholders to HubSpot (only `stakeholder_ids` if given).
+    Returns: counts {'checked', 'unchanged', 'skipped', 'created', 'updated', 'failed', 'api_calls'}.
+    Failed contacts keep their old state and are retried on the next run.
+    """
+    batch_size = min(batch_size, hubspot_service.BATCH_LIMIT)
+    pending, checked, skipped = changed_contacts(db, force, stakeholder_ids)
+    stats = {
+        "checked": checked, "unchanged": checked - skipped - len(pending), "skipped": skipped,
+        "created": 0, "updated": 0, "failed": 0, "api_calls": 0,
+    }
+    for start in range(0, len(pending), batch_size):
+        _push_batch(db, pending[start:start + batch_size], stats)
+    return stats
+
+def _push_batch(db: Session, batch: list, stats: dict):
+    new = [contact for contact in batch if not contact.hubspot_id]
+    if new:
+        stats["api_calls"] += 1
+        found = hubspot_service.batch_read_contacts_by_email(sorted({contact.properties["email"] for contact in new}))
+        if "results" not in found:
+            stats["failed"] += len(new)
+            batch = [contact for contact in batch if contact.hubspot_id]
+            new = []
+        existing = _ids_by_email(found.get("results", []))
+        for contact in new:
+            contact.hubspot_id = existing.get(contact.properties["email"])
+
+    synced = {}  # stakeholder_id -> PendingContact
+    to_create = {}  # email -> contacts (stakeholders sharing an email share one HubSpot contact)
+    for contact in batch:
+        if not contact.hubspot_id:
+            to_create.setdefault(contact.properties["email"], []).append(contact)
+    if to_create:
+        stats["api_calls"] += 1
+        created = _ids_by_email(hubspot_service.batch_create_contacts([group[0].properties for group in to_create.values()]).get("results", []))
+        for email, group in to_create.items():
+            for contact in group:
+                contact.hubspot_id = created.get(email)
+                if contact.hubspot_id:
+                    synced[contact.stakeholder_id] = contact
+                    stats["created"] += 1
+                else:
+                    stats["failed"] += 1
+
+    updates = [contact for contact in batch if contact.hubspot_id and contact.stakeholder_id not in synced]
+    if updates:
+        stats["api_calls"] += 1
+        response = hubspot_service.batch_update_contacts({contact.hubspot_id: contact.properties for contact in updates})
+        updated = {str(result.get("id")) for result in response.get("results", [])}
+        for contact in updates:
+            if str(contact.hubspot_id) in updated:
+                synced[contact.stakeholder_id] = contact
+                stats["updated"] += 1
+            else:
+                stats["failed"] += 1
+
+    now = datetime.utcnow()
+    for contact in synced.values():
+        db.merge(HubSpotContactSync(
+            stakeholder_id=contact.stakeholder_id, hubspot_id=str(contact.hubspot_id),
+            content_hash=contact.content_hash, synced_at=now,
+        ))
+    db.commit()
+
+def _ids_by_email(results: list) -> dict:
+    return {
+        (result.get("properties") or {}).get("email", "").lower(): str(result["id"])
+        for result in results if result.get("id")
+    }
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Push new/changed stakeholders to HubSpot.")
+    parser.add_argument("--force", action="store_true", help="re-send every stakeholder")
+    args = parser.parse_args()
+    with SessionLocal() as session:
+        print(sync_stakeholders(session, force=args.force))
@@ -0,0 +1,114 @@
+"""
+LinkedIn profile cache in front of Proxycurl (billed per call, slow, tens of KB per profile).
+Profiles are keyed by normalized URL, refreshed after LINKEDIN_PROFILE_TTL_DAYS, and stored as
+compressed JSON (zstd when the optional `zstandard` package is installed, else zlib) next to a few
+projected columns, so listings never load the payload.
+Easy to change: Edit project() to surface more fields in lists; PROFILE_TTL_DAYS for freshness.
+"""
+import json
+import os
+import re
+import zlib
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from sqlalchemy.orm import Session, undefer
+
+from models import LinkedInProfile
+from services import linkedin_service
+
+PROFILE_TTL_DAYS = int(os.getenv("LINKEDIN_PROFILE_TTL_DAYS", "30"))
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+_PROFILE_PATH = re.compile(r"^/(in|pub)/([^/?#]+)")
+
+def normalize_url(url: str) -> str:
+    """
+    Return the canonical profile URL, e.g. 'linkedin.com/in/Jane-Doe/?utm=x' -> 'https://www.linkedin.com/in/jane-doe'.
+    Raises: ValueError if it is not a LinkedIn profile URL.
+    """
+    text = (url or "").strip()
+    parts = urlsplit(text if "://" in text else f"https://{text}")
+    host = (parts.hostname or "").lower()
+    match = _PROFILE_PATH.match(parts.path)
+    if not (host == "linkedin.com" or host.endswith(".linkedin.com")) or not match:
+        raise ValueError(f"Not a LinkedIn profile URL: {url!r}")
+    return f"https://www.linkedin.com/{match.group(1)}/{match.group(2).lower()}"
+
+def _zstd():
+    try:
+        import zstandard  # optional dependency: smaller than zlib and faster to decode
+        return zstandard
+    except ImportError:
+        return None
+
+def compress(data: dict) -> tuple:
+    """Return (codec, payload bytes, uncompressed size) for a profile dict."""
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    zstandard = _zstd()
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw), len(raw)
+    return "zlib", zlib.compress(raw, ZLIB_LEVEL), len(raw)
+
+def decompress(codec: str, payload: bytes) -> dict:
+    """Return the profile dict. Raises: ValueError for an unknown/unavailable codec."""
+    if codec == "zlib":
+        return json.loads(zlib.decompress(payload))
+    zstandard = _zstd() if codec == "zstd" else None
+    if zstandard is not None:
+        return json.loads(zstandard.ZstdDecompressor().decompress(payload))
+    raise ValueError(f"Cannot decode {codec!r} profile payload")
+
+def project(data: dict) -> dict:
+    """Return the columns stakeholder lists show (full name, headline, current company, location)."""
+    experiences = data.get("experiences") or []
+    current = next((e for e in experiences if not e.get("ends_at")), experiences[0] if experiences else {})
+    location = ", ".join(filter(None, (data.get("city"), data.get("country_full_name"))))
+    return {
+        "full_name": _clip(data.get("full_name"), 255),
+        "headline": _clip(data.get("headline"), 500),
+        "company": _clip(current.get("company"), 255),
+        "location": _clip(location, 255),
+    }
+
+def get_profile(db: Session, url: str, refresh: bool = False, ttl_days: int = PROFILE_TTL_DAYS) -> dict:
+    """
+    Return the profile for `url`: from the cache while younger than ttl_days, else from Proxycurl
+    (then cached). If Proxycurl fails, a stale cached copy is returned rather than nothing.
+    Returns: profile dict, or {} if unavailable. Raises: ValueError for a non-profile URL.
+    """
+    key = normalize_url(url)
+    cached = db.query(LinkedInProfile).options(undefer(LinkedInProfile.payload)).filter(LinkedInProfile.url == key).first()
+    fresh = cached and datetime.utcnow() - cached.fetched_at < timedelta(days=ttl_days)
+    if cached and fresh and not refresh:
+        try:
+            return decompress(cached.codec, cached.payload)
+        except ValueError as e:
+            print(f"LinkedIn cache: {e}; refetching")
+    data = linkedin_service.fetch_profile(key)
+    if not data:
+        return _safe_decompress(cached) if cached else {}
+    store_profile(db, key, data, existing=cached)
+    return data
+
+def store_profile(db: Session, url: str, data: dict, existing: LinkedInProfile = None) -> LinkedInProfile:
+    """Upsert a fetched profile (compressed) and commit. Returns: the cache row."""
+    codec, payload, raw_bytes = compress(data)
+    profile = existing or db.get(LinkedInProfile, url) or LinkedInProfile(url=url)
+    for column, value in project(data).items():
+        setattr(profile, column, value)
+    profile.codec, profile.payload, profile.raw_bytes = codec, payload, raw_bytes
+    profile.fetched_at = datetime.utcnow()
+    db.add(profile)
+    db.commit()
+    return profile
+
+def _safe_decompress(profile: LinkedInProfile) -> dict:
+    try:
+        return decompress(profile.codec, profile.payload)
+    except ValueError:
+        return {}
+
+def _clip(value, length: int):
+    return value[:length] if isinstance(value, str) and value else None
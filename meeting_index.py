@@ -0,0 +1,218 @@
+"""
+In-process interval index over upcoming scheduled meetings, for conflict checks and common free time.
+Each participant (normalized email or name, plus the outreach's stakeholder email) has a start-sorted
+array of (start, end, meeting_id); with the participant's longest meeting length bounding how far back
+an overlapping meeting can start, an overlap check is two bisects over that array (O(log n + k)).
+The index follows change_events (see models.py) so it only reloads meetings that changed, and is
+rebuilt when the feed was reset or every MEETING_INDEX_REBUILD_SECONDS as a safety net.
+Writers hold INDEX.booking() around check + commit, and confirm an empty check with overlapping_meetings()
+inside their transaction (other processes, or an index that has not seen their commit yet).
+Easy to change: Edit participant_keys() to change who counts as the same person.
+"""
+import heapq
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from models import ChangeEvent, Meeting, MeetingStatus, Outreach, Stakeholder
+
+REBUILD_SECONDS = float(os.getenv("MEETING_INDEX_REBUILD_SECONDS", "300"))
+HORIZON_DAYS = 1  # meetings that started more than this long ago are not indexed
+MAX_MEETING = timedelta(days=1)  # longest meeting the API accepts: bounds the database overlap query
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+def participant_keys(participants: str, stakeholder_email: str = None) -> set:
+    """Return normalized participant keys: emails (also inside 'Name <email>') or lowercased names."""
+    keys = set()
+    for part in (participants or "").split(","):
+        email = _EMAIL.search(part)
+        name = " ".join(part.split()).lower()
+        if email or name:
+            keys.add(email.group(0).lower() if email else name)
+    if stakeholder_email:
+        keys.add(stakeholder_email.strip().lower())
+    return keys
+
+def overlapping_meetings(db: Session, participants: set, start: datetime, end: datetime, exclude_id: int = None) -> list:
+    """
+    Database version of MeetingIndex.conflicts(): scheduled meetings of `participants` overlapping [start, end),
+    read FOR UPDATE (PostgreSQL) in the caller's transaction. Same result shape.
+    """
+    query = (
+        db.query(Meeting.id, Meeting.scheduled_date, Meeting.duration_minutes, Meeting.participants, Stakeholder.email)
+        .outerjoin(Outreach, Outreach.id == Meeting.outreach_id)
+        .outerjoin(Stakeholder, Stakeholder.id == Outreach.stakeholder_id)
+        .filter(Meeting.status == MeetingStatus.SCHEDULED, Meeting.scheduled_date < end,
+                Meeting.scheduled_date > start - MAX_MEETING)
+        .with_for_update(of=Meeting)
+    )
+    if exclude_id is not None:
+        query = query.filter(Meeting.id != exclude_id)
+    found = []
+    for meeting_id, other_start, minutes, other_participants, email in query:
+        other_end = other_start + timedelta(minutes=minutes or 30)
+        if other_end > start:
+            for key in sorted(participants & participant_keys(other_participants, email)):
+                found.append({"meeting_id": meeting_id, "participant": key, "start": other_start, "end": other_end})
+    return found
+
+class _Timeline:
+    """One participant's meetings sorted by start; max_length bounds how early an overlapping one can start."""
+    __slots__ = ("entries", "max_length")
+
+    def __init__(self):
+        self.entries = []
+        self.max_length = timedelta(0)
+
+class MeetingIndex:
+    """Thread-safe per-participant interval arrays over scheduled meetings; call sync(db) before reading."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._booking = threading.Lock()
+        self._clear()
+
+    def booking(self):
+        """Lock held around a conflict check and the commit it allows, so two requests cannot take one slot."""
+        return self._booking
+
+    def sync(self, db: Session):
+        """Apply meeting changes recorded since the last sync (full load on first use, reset or schedule)."""
+        with self._lock:
+            head = db.query(ChangeEvent.id, ChangeEvent.created_at).order_by(ChangeEvent.id.desc()).first()
+            if self._stamp is not None and not self._stamp_matches(db):
+                self._clear()  # DB was reset/rolled back, or our cursor was pruned
+            if self._stamp is None or time.monotonic() - self._built_at > REBUILD_SECONDS:
+                self._clear()
+                self._load(db)
+            else:
+                changed = {row_id for (row_id,) in db.query(ChangeEvent.row_id).filter(
+                    ChangeEvent.table_name == "meetings", ChangeEvent.id > self._stamp[0], ChangeEvent.id <= (head.id if head else 0)
+                )}
+                if changed:
+                    for meeting_id in changed:
+                        self._remove(meeting_id)
+                    self._load(db, changed)
+            self._stamp = (head.id, head.created_at) if head else (0, None)
+
+    def conflicts(self, participants: set, start: datetime, end: datetime, exclude_id: int = None) -> list:
+        """Return [{'meeting_id', 'participant', 'start', 'end'}] of indexed meetings overlapping [start, end)."""
+        found = []
+        with self._lock:
+            for key in sorted(participants):
+                timeline = self._timelines.get(key)
+                if not timeline:
+                    continue
+                lo = bisect_left(timeline.entries, (start - timeline.max_length,))
+                hi = bisect_left(timeline.entries, (end,))
+                for other_start, other_end, meeting_id in timeline.entries[lo:hi]:
+                    if other_end > start and meeting_id != exclude_id:
+                        found.append({"meeting_id": meeting_id, "participant": key, "start": other_start, "end": other_end})
+        return found
+
+    def free_slots(self, participants: set, start: datetime, end: datetime, duration: timedelta,
+                   day_start: int = 9, day_end: int = 17, weekdays_only: bool = True, limit: int = 20) -> list:
+        """
+        Return up to `limit` [start, end) gaps of at least `duration` inside working hours
+        (day_start-day_end, UTC) where none of the participants has a meeting.
+        """
+        busy = self._busy(participants, start, end)
+        gaps = []
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < end and len(gaps) < limit:
+            if not weekdays_only or day.weekday() < 5:
+                cursor = max(start, day + timedelta(hours=day_start))
+                day_close = min(end, day + timedelta(hours=day_end))
+                for busy_start, busy_end in _overlapping(busy, cursor, day_close):
+                    if busy_start - cursor >= duration:
+                        gaps.append((cursor, busy_start))
+                    cursor = max(cursor, busy_end)
+                if day_close - cursor >= duration:
+                    gaps.append((cursor, day_close))
+            day += timedelta(days=1)
+        return gaps[:limit]
+
+    def __len__(self):
+        return len(self._meetings)
+
+    def _busy(self, participants: set, start: datetime, end: datetime) -> list:
+        """Merged busy intervals of all participants overlapping [start, end)."""
+        with self._lock:
+            slices = []
+            for key in participants:
+                timeline = self._timelines.get(key)
+                if timeline:
+                    lo = bisect_left(timeline.entries, (start - timeline.max_length,))
+                    hi = bisect_left(timeline.entries, (end,))
+                    slices.append(timeline.entries[lo:hi])
+        merged = []
+        for busy_start, busy_end, _ in heapq.merge(*slices):
+            if busy_end <= start:
+                continue
+            if merged and busy_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], busy_end)
+            else:
+                merged.append([busy_start, busy_end])
+        return merged
+
+    def _load(self, db: Session, meeting_ids: set = None):
+        query = (
+            db.query(Meeting.id, Meeting.scheduled_date, Meeting.duration_minutes, Meeting.participants, Stakeholder.email)
+            .outerjoin(Outreach, Outreach.id == Meeting.outreach_id)
+            .outerjoin(Stakeholder, Stakeholder.id == Outreach.stakeholder_id)
+            .filter(Meeting.status == MeetingStatus.SCHEDULED, Meeting.scheduled_date.isnot(None),
+                    Meeting.scheduled_date >= datetime.utcnow() - timedelta(days=HORIZON_DAYS))
+        )
+        if meeting_ids is not None:
+            query = query.filter(Meeting.id.in_(meeting_ids))
+        for meeting_id, start, minutes, participants, email in query:
+            self._add(meeting_id, start, start + timedelta(minutes=minutes or 30), participant_keys(participants, email))
+        if meeting_ids is None:
+            self._built_at = time.monotonic()
+
+    def _add(self, meeting_id: int, start: datetime, end: datetime, keys: set):
+        self._meetings[meeting_id] = (start, end, keys)
+        for key in keys:
+            timeline = self._timelines.setdefault(key, _Timeline())
+            insort(timeline.entries, (start, end, meeting_id))
+            timeline.max_length = max(timeline.max_length, end - start)
+
+    def _remove(self, meeting_id: int):
+        indexed = self._meetings.pop(meeting_id, None)
+        if indexed is None:
+            return
+        start, end, keys = indexed
+        for key in keys:
+            entries = self._timelines[key].entries
+            position = bisect_left(entries, (start, end, meeting_id))
+            if position < len(entries) and entries[position][2] == meeting_id:
+                del entries[position]
+
+    def _stamp_matches(self, db: Session) -> bool:
+        cursor, created_at = self._stamp
+        if cursor == 0:
+            return True
+        row = db.query(ChangeEvent.created_at).filter(ChangeEvent.id == cursor).first()
+        return row is not None and row.created_at == created_at
+
+    def _clear(self):
+        self._timelines = {}
+        self._meetings = {}
+        self._stamp = None
+        self._built_at = 0.0
+
+def _overlapping(busy: list, start: datetime, end: datetime):
+    """Busy intervals (sorted, merged) that overlap [start, end)."""
+    position = bisect_left(busy, [start])
+    if position and busy[position - 1][1] > start:
+        position -= 1
+    while position < len(busy) and busy[position][0] < end:
+        yield busy[position]
+        position += 1
+
+INDEX = MeetingIndex()
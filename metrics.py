@@ -0,0 +1,253 @@
+"""
+Request and SQL instrumentation, exposed in Prometheus text format on /metrics.
+MetricsMiddleware times every request per route template (not raw path, so label cardinality stays
+bounded); SQLAlchemy cursor hooks count and time every statement against the current request and
+log slow statements with their parameters redacted.
+Easy to change: Tune METRICS_SLOW_QUERY_MS, the bucket lists below, or set METRICS_ENABLED=false.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() != "false"
+SLOW_QUERY_SECONDS = float(os.getenv("METRICS_SLOW_QUERY_MS", "200")) / 1000
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+QUERY_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+NO_ROUTE = "<unmatched>"
+OUTSIDE_REQUEST = "<background>"
+
+slow_query_log = logging.getLogger("jv.sql.slow")
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: tuple, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket", (*zip(self.label_names, labels), ("le", str(bound))), cumulative
+            yield f"{self.name}_sum", tuple(zip(self.label_names, labels)), series[-1]
+            yield f"{self.name}_count", tuple(zip(self.label_names, labels)), cumulative
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values."""
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            snapshot = dict(self._values)
+        for labels, value in sorted(snapshot.items()):
+            yield self.name, tuple(zip(self.label_names, labels)), value
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route", "status"), LATENCY_BUCKETS)
+REQUEST_QUERIES = Histogram(
+    "http_request_sql_queries", "SQL statements issued per HTTP request.",
+    ("method", "route"), QUERY_COUNT_BUCKETS)
+REQUEST_SQL_TIME = Histogram(
+    "http_request_sql_duration_seconds", "Total SQL time per HTTP request.",
+    ("method", "route"), LATENCY_BUCKETS)
+QUERY_LATENCY = Histogram(
+    "sql_query_duration_seconds", "Latency of individual SQL statements by route and statement type.",
+    ("route", "operation"), QUERY_LATENCY_BUCKETS)
+SLOW_QUERIES = Counter(
+    "sql_slow_queries_total", "SQL statements slower than METRICS_SLOW_QUERY_MS.",
+    ("route", "operation"))
+# External API calls (recorded by services/instrumentation.py)
+EXTERNAL_CALL_LATENCY = Histogram(
+    "external_call_duration_seconds", "External API call latency by provider, operation and outcome.",
+    ("provider", "operation", "outcome"), LATENCY_BUCKETS)
+EXTERNAL_TOKENS = Counter(
+    "external_tokens_total", "LLM tokens consumed by provider, model and kind (prompt/completion).",
+    ("provider", "model", "kind"))
+EXTERNAL_QUOTA = Counter(
+    "external_quota_units_total", "Provider quota units consumed (credits, searches, send units).",
+    ("provider",))
+# Rate limiting / circuit breaking (services/ratelimit.py)
+EXTERNAL_CALL_WAIT = Histogram(
+    "external_call_wait_seconds", "Time callers queued for a rate-limit token.",
+    ("provider",), LATENCY_BUCKETS)
+EXTERNAL_CALL_RETRIES = Counter(
+    "external_call_retries_total", "Retries after 429/5xx/connection errors.",
+    ("provider",))
+EXTERNAL_CALLS_REJECTED = Counter(
+    "external_calls_rejected_total", "Calls not attempted (circuit_open, rate_limit_timeout).",
+    ("provider", "reason"))
+# Outbox delivery (outbox.py)
+OUTBOX_EVENTS = Counter(
+    "outbox_events_total", "Outbox events processed by type and outcome (delivered, retrying, failed).",
+    ("event_type", "outcome"))
+REGISTRY = [
+    REQUEST_LATENCY, REQUEST_QUERIES, REQUEST_SQL_TIME, QUERY_LATENCY, SLOW_QUERIES,
+    EXTERNAL_CALL_LATENCY, EXTERNAL_TOKENS, EXTERNAL_QUOTA,
+    EXTERNAL_CALL_WAIT, EXTERNAL_CALL_RETRIES, EXTERNAL_CALLS_REJECTED, OUTBOX_EVENTS,
+]
+
+@dataclass
+class RequestStats:
+    """SQL totals for the request being served (shared with threadpool endpoints via contextvars)."""
+    method: str
+    scope: dict
+    queries: int = 0
+    sql_seconds: float = 0.0
+
+_current_request: ContextVar = ContextVar("metrics_request", default=None)
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no per-request task or body buffering, unlike BaseHTTPMiddleware),
+    so streaming responses are unaffected and the added cost is a few dict/list updates.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(method=scope["method"], scope=scope)
+        token = _current_request.set(stats)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_request.reset(token)
+            route = _route_template(scope)
+            REQUEST_LATENCY.observe((stats.method, route, str(status[0])), elapsed)
+            REQUEST_QUERIES.observe((stats.method, route), stats.queries)
+            REQUEST_SQL_TIME.observe((stats.method, route), stats.sql_seconds)
+
+def instrument_engine(engine):
+    """Attach the SQL timing hooks to an engine (idempotent)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
+def render_prometheus() -> str:
+    """Return every metric in Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            label_text = ",".join(f'{key}="{_escape_label(label)}"' for key, label in labels)
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+def reset_metrics():
+    """Clear all series (tests)."""
+    for metric in REGISTRY:
+        metric.reset()
+
+def redact_parameters(parameters) -> str:
+    """Describe bound parameters by type only, e.g. '(int, str[12], None)'; values never reach the log."""
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+        return f"{len(parameters)} x {redact_parameters(parameters[0])}"  # executemany
+    values = parameters.values() if isinstance(parameters, dict) else (parameters or ())
+    return "(" + ", ".join(_redact(value) for value in values) + ")"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # on the statement's own context: a statement that raises never reaches after_cursor_execute
+    context._metrics_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    stats = _current_request.get()
+    route = _route_template(stats.scope) if stats else OUTSIDE_REQUEST
+    if stats:
+        stats.queries += 1
+        stats.sql_seconds += elapsed
+    operation = _operation(statement)
+    QUERY_LATENCY.observe((route, operation), elapsed)
+    if elapsed >= SLOW_QUERY_SECONDS:
+        SLOW_QUERIES.inc((route, operation))
+        slow_query_log.warning(
+            "Slow query (%.1f ms, route %s): %s params=%s",
+            elapsed * 1000, route, " ".join(statement.split()), redact_parameters(parameters),
+        )
+
+_OPERATION = re.compile(r"\s*(\w+)")
+
+def _operation(statement: str) -> str:
+    match = _OPERATION.match(statement)
+    return match.group(1).upper() if match else "OTHER"
+
+def _route_template(scope) -> str:
+    """'/api/v1/deals/{deal_id}/stage' rather than '/api/v1/deals/42/stage' (set by the router)."""
+    route = scope.get("route")
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if path:
+        return scope.get("root_path", "") + path
+    return NO_ROUTE
+
+def _redact(value) -> str:
+    if value is None:
+        return "None"
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -0,0 +1,103 @@
+"""Initial migration: create JV tables
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-01-01 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+market_alignment = sa.Enum("HIGH", "MEDIUM", "LOW", name="marketalignment")
+company_size = sa.Enum("SMALL", "MEDIUM", "LARGE", name="companysize")
+stakeholder_role = sa.Enum("DECISION_MAKER", "INFLUENCER", "TECHNICAL", name="stakeholderrole")
+outreach_response = sa.Enum("INTERESTED", "NOT_INTERESTED", "NO_RESPONSE", "FOLLOW_UP_NEEDED", name="outreachresponse")
+meeting_status = sa.Enum("SCHEDULED", "COMPLETED", "CANCELLED", name="meetingstatus")
+deal_stage = sa.Enum("INTRO", "NEGOTIATION", "MOU", "ESTABLISHED", name="dealstage")
+
+
+def upgrade():
+    op.create_table(
+        "products",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("market_alignment", market_alignment),
+        sa.Column("manufacturing_suitability", market_alignment),
+        sa.Column("revenue_potential", sa.String(100)),
+        sa.Column("status", sa.String(50)),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_products_id", "products", ["id"])
+    op.create_table(
+        "companies",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("product_technology_id", sa.Integer(), sa.ForeignKey("products.id")),
+        sa.Column("industry", sa.String(255)),
+        sa.Column("size", company_size),
+        sa.Column("revenue", sa.String(100)),
+        sa.Column("contact_info", sa.String(255)),
+        sa.Column("status", sa.String(50)),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_companies_id", "companies", ["id"])
+    op.create_table(
+        "stakeholders",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("company_id", sa.Integer(), sa.ForeignKey("companies.id")),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("title", sa.String(255)),
+        sa.Column("email", sa.String(255)),
+        sa.Column("phone", sa.String(100)),
+        sa.Column("role", stakeholder_role),
+        sa.Column("status", sa.String(50)),
+        sa.Column("linkedin_data", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_stakeholders_id", "stakeholders", ["id"])
+    op.create_table(
+        "outreaches",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("stakeholder_id", sa.Integer(), sa.ForeignKey("stakeholders.id")),
+        sa.Column("date", sa.DateTime()),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("response", outreach_response),
+        sa.Column("notes", sa.Text()),
+        sa.Column("follow_up_date", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_outreaches_id", "outreaches", ["id"])
+    op.create_table(
+        "meetings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("outreach_id", sa.Integer(), sa.ForeignKey("outreaches.id")),
+        sa.Column("scheduled_date", sa.DateTime()),
+        sa.Column("participants", sa.String(255)),
+        sa.Column("agenda", sa.Text()),
+        sa.Column("status", meeting_status),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_meetings_id", "meetings", ["id"])
+    op.create_table(
+        "deals",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("meeting_id", sa.Integer(), sa.ForeignKey("meetings.id")),
+        sa.Column("stage", deal_stage),
+        sa.Column("notes", sa.Text()),
+        sa.Column("docs", sa.Text()),
+        sa.Column("assigned_to", sa.String(255)),
+        sa.Column("assigned_at", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_deals_id", "deals", ["id"])
+
+
+def downgrade():
+    for table in ("deals", "meetings", "outreaches", "stakeholders", "companies", "products"):
+        op.drop_table(table)
@@ -0,0 +1,54 @@
+"""Add funnel_rollups table and indexes on join/filter columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (index name, table, column) for the funnel/cohort joins and filters
+INDEXES = [
+    ("ix_companies_product_technology_id", "companies", "product_technology_id"),
+    ("ix_stakeholders_company_id", "stakeholders", "company_id"),
+    ("ix_outreaches_stakeholder_id", "outreaches", "stakeholder_id"),
+    ("ix_outreaches_date", "outreaches", "date"),
+    ("ix_outreaches_response", "outreaches", "response"),
+    ("ix_meetings_outreach_id", "meetings", "outreach_id"),
+    ("ix_deals_meeting_id", "deals", "meeting_id"),
+]
+
+
+def upgrade():
+    for name, table, column in INDEXES:
+        op.create_index(name, table, [column])
+
+    op.create_table(
+        "funnel_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("week_start", sa.String(10)),
+        sa.Column("product_id", sa.Integer()),
+        sa.Column("assigned_to", sa.String(255)),
+        sa.Column("outreach", sa.Integer()),
+        sa.Column("responded", sa.Integer()),
+        sa.Column("interested", sa.Integer()),
+        sa.Column("meeting", sa.Integer()),
+        sa.Column("deal", sa.Integer()),
+        sa.Column("established", sa.Integer()),
+        sa.Column("refreshed_at", sa.DateTime()),
+    )
+    op.create_index("ix_funnel_rollups_week_start", "funnel_rollups", ["week_start"])
+    op.create_index("ix_funnel_rollups_product_id", "funnel_rollups", ["product_id"])
+    op.create_index("ix_funnel_rollups_assigned_to", "funnel_rollups", ["assigned_to"])
+
+
+def downgrade():
+    op.drop_table("funnel_rollups")
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
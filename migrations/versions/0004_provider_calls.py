@@ -0,0 +1,39 @@
+"""Add provider_calls for external API instrumentation
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "provider_calls",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("provider", sa.String(30), nullable=False),
+        sa.Column("operation", sa.String(50), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("duration_ms", sa.Float(), nullable=False),
+        sa.Column("ok", sa.Boolean(), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("error", sa.String(100), nullable=True),
+        sa.Column("prompt_tokens", sa.Integer(), nullable=True),
+        sa.Column("completion_tokens", sa.Integer(), nullable=True),
+        sa.Column("quota_units", sa.Float(), nullable=True),
+    )
+    op.create_index("ix_provider_calls_started_at", "provider_calls", ["started_at"])
+    op.create_index("ix_provider_calls_provider_started_at", "provider_calls", ["provider", "started_at"])
+
+
+def downgrade():
+    op.drop_index("ix_provider_calls_provider_started_at", table_name="provider_calls")
+    op.drop_index("ix_provider_calls_started_at", table_name="provider_calls")
+    op.drop_table("provider_calls")
@@ -0,0 +1,28 @@
+"""Add hubspot_contact_sync for incremental HubSpot contact sync
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "hubspot_contact_sync",
+        sa.Column("stakeholder_id", sa.Integer(), sa.ForeignKey("stakeholders.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("hubspot_id", sa.String(50), nullable=False),
+        sa.Column("content_hash", sa.String(64), nullable=False),
+        sa.Column("synced_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("hubspot_contact_sync")
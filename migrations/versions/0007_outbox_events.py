@@ -0,0 +1,36 @@
+"""Add outbox_events for transactional delivery of external side effects
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("event_type", sa.String(50), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("available_at", sa.DateTime(), nullable=False),
+        sa.Column("claimed_by", sa.String(32)),
+        sa.Column("last_error", sa.String(500)),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("processed_at", sa.DateTime()),
+    )
+    op.create_index("ix_outbox_events_status_available_at", "outbox_events", ["status", "available_at"])
+
+
+def downgrade():
+    op.drop_index("ix_outbox_events_status_available_at", table_name="outbox_events")
+    op.drop_table("outbox_events")
@@ -0,0 +1,31 @@
+"""Add change_events feeding the /events live updates stream
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "change_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("table_name", sa.String(50), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.Column("op", sa.String(10), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_change_events_created_at", "change_events", ["created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_change_events_created_at", table_name="change_events")
+    op.drop_table("change_events")
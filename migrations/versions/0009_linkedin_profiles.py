@@ -0,0 +1,74 @@
+"""Add the compressed linkedin_profiles cache and stakeholders.linkedin_url
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 00:00:00
+
+Legacy stakeholders.linkedin_data JSON that names its profile (public_identifier) is moved into the
+cache (zlib) and linked via linkedin_url; the old column is kept but no longer written.
+"""
+from datetime import datetime
+import json
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "linkedin_profiles",
+        sa.Column("url", sa.String(255), primary_key=True),
+        sa.Column("full_name", sa.String(255)),
+        sa.Column("headline", sa.String(500)),
+        sa.Column("company", sa.String(255)),
+        sa.Column("location", sa.String(255)),
+        sa.Column("codec", sa.String(10), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("raw_bytes", sa.Integer(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+    )
+    op.add_column("stakeholders", sa.Column("linkedin_url", sa.String(255)))
+    op.create_index("ix_stakeholders_linkedin_url", "stakeholders", ["linkedin_url"])
+
+    connection = op.get_bind()
+    stakeholders = sa.table("stakeholders", sa.column("id", sa.Integer), sa.column("linkedin_data", sa.Text),
+                            sa.column("linkedin_url", sa.String))
+    profiles = sa.table("linkedin_profiles", *(sa.column(name) for name in (
+        "url", "full_name", "headline", "company", "location", "codec", "payload", "raw_bytes", "fetched_at")))
+    seen = set()
+    rows = connection.execute(sa.select(stakeholders.c.id, stakeholders.c.linkedin_data)
+                              .where(stakeholders.c.linkedin_data.is_not(None))).all()
+    for stakeholder_id, raw in rows:
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            continue
+        slug = data.get("public_identifier") if isinstance(data, dict) else None
+        if not slug:
+            continue
+        url = f"https://www.linkedin.com/in/{slug.lower()}"
+        if url not in seen:
+            seen.add(url)
+            experiences = data.get("experiences") or [{}]
+            encoded = json.dumps(data, separators=(",", ":")).encode("utf-8")
+            connection.execute(profiles.insert().values(
+                url=url, full_name=data.get("full_name"), headline=(data.get("headline") or "")[:500],
+                company=experiences[0].get("company"),
+                location=", ".join(filter(None, (data.get("city"), data.get("country_full_name")))) or None,
+                codec="zlib", payload=zlib.compress(encoded, 6), raw_bytes=len(encoded), fetched_at=datetime.utcnow(),
+            ))
+        connection.execute(stakeholders.update().where(stakeholders.c.id == stakeholder_id).values(linkedin_url=url))
+
+
+def downgrade():
+    op.drop_index("ix_stakeholders_linkedin_url", table_name="stakeholders")
+    with op.batch_alter_table("stakeholders") as batch:
+        batch.drop_column("linkedin_url")
+    op.drop_table("linkedin_profiles")
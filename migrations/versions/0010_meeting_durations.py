@@ -0,0 +1,27 @@
+"""Add meetings.duration_minutes and an index on meetings.scheduled_date
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 00:00:00
+
+Existing meetings get the 30-minute default.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("meetings", sa.Column("duration_minutes", sa.Integer(), nullable=False, server_default="30"))
+    op.create_index("ix_meetings_scheduled_date", "meetings", ["scheduled_date"])
+
+
+def downgrade():
+    op.drop_index("ix_meetings_scheduled_date", table_name="meetings")
+    with op.batch_alter_table("meetings") as batch:
+        batch.drop_column("duration_minutes")
@@ -0,0 +1,53 @@
+"""Add outreaches.next_action_at (indexed) and follow_up_count for incremental follow-up scanning
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 00:00:00
+
+Outreaches still awaiting a reply get their next follow-up time from the default cadence (5, 7, 14 days);
+ones already followed up once (follow_up_date set) are treated as round 1 sent.
+"""
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+CADENCE_DAYS = (5, 7, 14)  # models.FOLLOW_UP_CADENCE_DAYS default at the time of this migration
+
+
+def upgrade():
+    op.add_column("outreaches", sa.Column("follow_up_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("outreaches", sa.Column("next_action_at", sa.DateTime()))
+    op.create_index("ix_outreaches_next_action_at", "outreaches", ["next_action_at"])
+
+    connection = op.get_bind()
+    outreaches = sa.table("outreaches", sa.column("id", sa.Integer), sa.column("date", sa.DateTime),
+                          sa.column("response", sa.String), sa.column("follow_up_date", sa.DateTime),
+                          sa.column("follow_up_count", sa.Integer), sa.column("next_action_at", sa.DateTime))
+    rows = connection.execute(
+        sa.select(outreaches.c.id, outreaches.c.date, outreaches.c.follow_up_date)
+        .where(outreaches.c.response.in_(("NO_RESPONSE", "FOLLOW_UP_NEEDED")), outreaches.c.date.is_not(None))
+    ).all()
+    updates = [
+        {"row_id": outreach_id, "rounds": 1, "due": follow_up_date + timedelta(days=CADENCE_DAYS[1])} if follow_up_date
+        else {"row_id": outreach_id, "rounds": 0, "due": date + timedelta(days=CADENCE_DAYS[0])}
+        for outreach_id, date, follow_up_date in rows
+    ]
+    if updates:
+        connection.execute(
+            outreaches.update().where(outreaches.c.id == sa.bindparam("row_id"))
+            .values(follow_up_count=sa.bindparam("rounds"), next_action_at=sa.bindparam("due")),
+            updates,
+        )
+
+def downgrade():
+    op.drop_index("ix_outreaches_next_action_at", table_name="outreaches")
+    with op.batch_alter_table("outreaches") as batch:
+        batch.drop_column("next_action_at")
+        batch.drop_column("follow_up_count")
@@ -0,0 +1,91 @@
+"""Move outreach message text into the content-addressed message_bodies table
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 00:00:00
+
+Every distinct outreaches.message is stored once in message_bodies under its SHA-256, outreaches get
+message_sha256 (indexed, FK) and the message column is dropped. Rows are converted BATCH_SIZE at a time
+by id, so memory stays flat on large tables. On SQLite, run VACUUM afterwards to give the freed pages
+back to the filesystem.
+"""
+from datetime import datetime
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10_000
+FOREIGN_KEY = "fk_outreaches_message_sha256_message_bodies"
+
+
+def upgrade():
+    op.create_table(
+        "message_bodies",
+        sa.Column("sha256", sa.String(64), primary_key=True),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.add_column("outreaches", sa.Column("message_sha256", sa.String(64)))
+
+    connection = op.get_bind()
+    outreaches = sa.table("outreaches", sa.column("id", sa.Integer), sa.column("message", sa.Text),
+                          sa.column("message_sha256", sa.String))
+    bodies = sa.table("message_bodies", sa.column("sha256", sa.String), sa.column("body", sa.Text),
+                      sa.column("created_at", sa.DateTime))
+    now = datetime.utcnow()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(outreaches.c.id, outreaches.c.message).where(outreaches.c.id > last_id)
+            .order_by(outreaches.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        hashes = {outreach_id: hashlib.sha256(message.encode("utf-8")).hexdigest() for outreach_id, message in rows}
+        distinct = {hashes[outreach_id]: message for outreach_id, message in rows}
+        _insert_missing(connection, bodies, [{"sha256": key, "body": body, "created_at": now} for key, body in distinct.items()])
+        connection.execute(
+            outreaches.update().where(outreaches.c.id == sa.bindparam("row_id")).values(message_sha256=sa.bindparam("key")),
+            [{"row_id": outreach_id, "key": key} for outreach_id, key in hashes.items()],
+        )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table("outreaches") as batch:
+        batch.alter_column("message_sha256", existing_type=sa.String(64), nullable=False)
+        batch.create_foreign_key(FOREIGN_KEY, "message_bodies", ["message_sha256"], ["sha256"])
+        batch.drop_column("message")
+    op.create_index("ix_outreaches_message_sha256", "outreaches", ["message_sha256"])
+
+def _insert_missing(connection, bodies, rows):
+    """Insert body rows whose sha256 is not stored yet (earlier batches may have stored the same text)."""
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        connection.execute(insert(bodies).on_conflict_do_nothing(index_elements=["sha256"]), rows)
+        return
+    existing = set(connection.execute(
+        sa.select(bodies.c.sha256).where(bodies.c.sha256.in_([row["sha256"] for row in rows]))).scalars())
+    missing = [row for row in rows if row["sha256"] not in existing]
+    if missing:
+        connection.execute(bodies.insert(), missing)
+
+def downgrade():
+    op.add_column("outreaches", sa.Column("message", sa.Text()))
+    outreaches = sa.table("outreaches", sa.column("message", sa.Text), sa.column("message_sha256", sa.String))
+    bodies = sa.table("message_bodies", sa.column("sha256", sa.String), sa.column("body", sa.Text))
+    op.execute(outreaches.update().values(message=sa.select(bodies.c.body).where(
+        bodies.c.sha256 == outreaches.c.message_sha256).scalar_subquery()))
+    op.drop_index("ix_outreaches_message_sha256", table_name="outreaches")
+    with op.batch_alter_table("outreaches") as batch:
+        batch.drop_constraint(FOREIGN_KEY, type_="foreignkey")
+        batch.drop_column("message_sha256")
+        batch.alter_column("message", existing_type=sa.Text(), nullable=False)
+    op.drop_table("message_bodies")
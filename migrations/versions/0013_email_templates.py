@@ -0,0 +1,30 @@
+"""Add the email_templates cache of AI-generated campaign templates
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "email_templates",
+        sa.Column("key", sa.String(64), primary_key=True),
+        sa.Column("kind", sa.String(20), nullable=False),
+        sa.Column("product", sa.String(255)),
+        sa.Column("role", sa.String(50)),
+        sa.Column("industry", sa.String(255)),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("generated_at", sa.DateTime(), nullable=False),
+    )
+
+def downgrade():
+    op.drop_table("email_templates")
@@ -0,0 +1,37 @@
+"""Add outreach_threads, gmail_sync_state and an index on stakeholders.email for Gmail reply ingestion
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "outreach_threads",
+        sa.Column("thread_id", sa.String(64), primary_key=True),
+        sa.Column("outreach_id", sa.Integer(), sa.ForeignKey("outreaches.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_outreach_threads_outreach_id", "outreach_threads", ["outreach_id"])
+    op.create_table(
+        "gmail_sync_state",
+        sa.Column("mailbox", sa.String(255), primary_key=True),
+        sa.Column("history_id", sa.String(30), nullable=False),
+        sa.Column("synced_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_stakeholders_email", "stakeholders", ["email"])
+
+def downgrade():
+    op.drop_index("ix_stakeholders_email", table_name="stakeholders")
+    op.drop_table("gmail_sync_state")
+    op.drop_index("ix_outreach_threads_outreach_id", table_name="outreach_threads")
+    op.drop_table("outreach_threads")
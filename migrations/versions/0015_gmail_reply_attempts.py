@@ -0,0 +1,27 @@
+"""Add gmail_reply_attempts: failed reply classifications per Gmail message
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-19 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0015"
+down_revision = "0014"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "gmail_reply_attempts",
+        sa.Column("message_id", sa.String(64), primary_key=True),
+        sa.Column("mailbox", sa.String(255), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+def downgrade():
+    op.drop_table("gmail_reply_attempts")
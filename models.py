@@ -4,11 +4,16 @@ Each model represents a table/entity in the DB.
 Easy to change: Add fields/relationships here; run Alembic migration.
 Imports Base from database.py.
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+import hashlib
+import os
+from sqlalchemy import Column, Integer, Float, Boolean, String, Text, DateTime, ForeignKey, Index, LargeBinary, Enum as SQLEnum, event, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import deferred, relationship, Session
 from database import Base
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum as PyEnum
+from itertools import chain
 
 # Enums for type safety (easy to extend)
 class MarketAlignment(PyEnum):
@@ -63,7 +68,7 @@ class TargetCompany(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
-    product_technology_id = Column(Integer, ForeignKey("products.id"))
+    product_technology_id = Column(Integer, ForeignKey("products.id"), index=True)
     industry = Column(String(255))
     size = Column(SQLEnum(CompanySize), default=CompanySize.MEDIUM)
     revenue = Column(String(100))
@@ -79,42 +84,146 @@ class Stakeholder(Base):
     __tablename__ = "stakeholders"
     
     id = Column(Integer, primary_key=True, index=True)
-    company_id = Column(Integer, ForeignKey("companies.id"))
+    company_id = Column(Integer, ForeignKey("companies.id"), index=True)
     name = Column(String(255), nullable=False)
     title = Column(String(255))
-    email = Column(String(255))
+    email = Column(String(255), index=True)  # replies.py matches reply senders on it
     phone = Column(String(100))
     role = Column(SQLEnum(StakeholderRole), default=StakeholderRole.DECISION_MAKER)
     status = Column(String(50), default="identified")
-    linkedin_data = Column(Text)  # JSON string from Proxycurl
+    linkedin_url = Column(String(255), index=True)  # normalized; profile lives in linkedin_profiles
+    linkedin_data = deferred(Column(Text))  # legacy raw Proxycurl JSON (superseded by linkedin_profiles)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     company = relationship("TargetCompany", back_populates="stakeholders")
     outreaches = relationship("Outreach", back_populates="stakeholder")
 
+class MessageBody(Base):
+    """
+    Outreach message text, stored once per distinct body and keyed by its SHA-256 (content-addressed):
+    a campaign sending the same text thousands of times keeps one row here, and outreaches stay narrow.
+    Rows are immutable; write them with store_message_bodies().
+    """
+    __tablename__ = "message_bodies"
+
+    sha256 = Column(String(64), primary_key=True)
+    body = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+def message_hash(body: str) -> str:
+    """Return the message_bodies key for a body (hex SHA-256 of its UTF-8 bytes)."""
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+def store_message_bodies(connection, bodies) -> list:
+    """
+    Add the bodies not stored yet (safe under concurrent writers: same text, same key).
+    The ORM does this for Outreach(message=...); call it yourself before Core/bulk outreach inserts.
+    Returns: the message_sha256 of each body, in order.
+    """
+    hashes = [message_hash(body) for body in bodies]
+    rows = {key: body for key, body in zip(hashes, bodies)}
+    if not rows:
+        return hashes
+    table = MessageBody.__table__
+    now = datetime.utcnow()
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(table).on_conflict_do_nothing(index_elements=[table.c.sha256])
+        connection.execute(stmt, [{"sha256": key, "body": body, "created_at": now} for key, body in rows.items()])
+        return hashes
+    existing = set(connection.execute(select(table.c.sha256).where(table.c.sha256.in_(rows))).scalars())
+    missing = [{"sha256": key, "body": body, "created_at": now} for key, body in rows.items() if key not in existing]
+    if missing:
+        connection.execute(table.insert(), missing)
+    return hashes
+
 class Outreach(Base):
     __tablename__ = "outreaches"
     
     id = Column(Integer, primary_key=True, index=True)
-    stakeholder_id = Column(Integer, ForeignKey("stakeholders.id"))
-    date = Column(DateTime, default=datetime.utcnow)
-    message = Column(Text, nullable=False)
-    response = Column(SQLEnum(OutreachResponse), default=OutreachResponse.NO_RESPONSE)
+    stakeholder_id = Column(Integer, ForeignKey("stakeholders.id"), index=True)
+    date = Column(DateTime, default=datetime.utcnow, index=True)
+    message_sha256 = Column(String(64), ForeignKey("message_bodies.sha256"), nullable=False, index=True)  # see `message`
+    response = Column(SQLEnum(OutreachResponse), default=OutreachResponse.NO_RESPONSE, index=True)
     notes = Column(Text)
-    follow_up_date = Column(DateTime)
+    follow_up_date = Column(DateTime)  # when the last follow-up went out
+    follow_up_count = Column(Integer, nullable=False, default=0, server_default="0")
+    next_action_at = Column(DateTime, index=True)  # next follow-up due (NULL: none); see followups.py
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     stakeholder = relationship("Stakeholder", back_populates="outreaches")
     meetings = relationship("Meeting", back_populates="outreach")
+    message_body = relationship("MessageBody")
+
+    @hybrid_property
+    def message(self):
+        """The message text; set it like a column (the body is stored in message_bodies on flush)."""
+        pending = self.__dict__.get("_message")
+        if pending is not None:
+            return pending
+        return self.message_body.body if self.message_body is not None else None
+
+    @message.setter
+    def message(self, body):
+        self._message = body
+        self.message_sha256 = message_hash(body) if body is not None else None
+
+    @message.expression
+    def message(cls):
+        return select(MessageBody.body).where(MessageBody.sha256 == cls.message_sha256).scalar_subquery().label("message")
+
+# Days from the outreach to follow-up 1, then from each follow-up to the next; one entry per round
+FOLLOW_UP_CADENCE_DAYS = tuple(int(days) for days in os.getenv("FOLLOW_UP_CADENCE_DAYS", "5,7,14").split(","))
+AWAITING_REPLY = (OutreachResponse.NO_RESPONSE, OutreachResponse.FOLLOW_UP_NEEDED)
+
+def next_follow_up_at(outreach_date: datetime, rounds_sent: int, last_follow_up: datetime = None):
+    """Return when the next follow-up round is due, or None once the cadence is exhausted."""
+    if rounds_sent >= len(FOLLOW_UP_CADENCE_DAYS):
+        return None
+    base = last_follow_up if rounds_sent and last_follow_up else outreach_date
+    return base + timedelta(days=FOLLOW_UP_CADENCE_DAYS[rounds_sent])
+
+@event.listens_for(Outreach, "before_insert")
+@event.listens_for(Outreach, "before_update")
+def _schedule_follow_up(mapper, connection, outreach):
+    """Keep next_action_at in step with response/date for ORM writes (the scanner only reads next_action_at)."""
+    state = inspect(outreach)
+    attrs = state.attrs
+    if (outreach.response or OutreachResponse.NO_RESPONSE) not in AWAITING_REPLY:
+        outreach.next_action_at = None
+    elif attrs.next_action_at.history.has_changes():
+        return  # set explicitly
+    elif not state.has_identity or attrs.date.history.has_changes() or attrs.response.history.has_changes():
+        outreach.next_action_at = next_follow_up_at(
+            outreach.date or datetime.utcnow(), outreach.follow_up_count or 0, outreach.follow_up_date
+        )
+
+@event.listens_for(Outreach, "before_insert")
+@event.listens_for(Outreach, "before_update")
+def _store_message_body(mapper, connection, outreach):
+    """Write the body of a new or changed message before the row that references it."""
+    body = outreach.__dict__.get("_message")
+    if body is not None and inspect(outreach).attrs.message_sha256.history.has_changes():
+        store_message_bodies(connection, [body])
+
+def readable_select(table):
+    """select() of a whole table for exports and reports, with outreach bodies joined back in as 'message'."""
+    if table is not Outreach.__table__:
+        return select(table)
+    bodies = MessageBody.__table__
+    columns = [bodies.c.body.label("message") if column is table.c.message_sha256 else column for column in table.columns]
+    return select(*columns).select_from(table.outerjoin(bodies, bodies.c.sha256 == table.c.message_sha256))
 
 class Meeting(Base):
     __tablename__ = "meetings"
     
     id = Column(Integer, primary_key=True, index=True)
-    outreach_id = Column(Integer, ForeignKey("outreaches.id"))
-    scheduled_date = Column(DateTime)
+    outreach_id = Column(Integer, ForeignKey("outreaches.id"), index=True)
+    scheduled_date = Column(DateTime, index=True)
+    duration_minutes = Column(Integer, nullable=False, default=30, server_default="30")
     participants = Column(String(255))
     agenda = Column(Text)
     status = Column(SQLEnum(MeetingStatus), default=MeetingStatus.SCHEDULED)
@@ -128,7 +237,7 @@ class Deal(Base):
     __tablename__ = "deals"
     
     id = Column(Integer, primary_key=True, index=True)
-    meeting_id = Column(Integer, ForeignKey("meetings.id"))
+    meeting_id = Column(Integer, ForeignKey("meetings.id"), index=True)
     stage = Column(SQLEnum(DealStage), default=DealStage.INTRO)
     notes = Column(Text)
     docs = Column(Text)  # JSON list of file paths/URLs
@@ -137,4 +246,241 @@ class Deal(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    meeting = relationship("Meeting", back_populates="deals")
\ No newline at end of file
+    meeting = relationship("Meeting", back_populates="deals")
+
+class FunnelRollup(Base):
+    """
+    Precomputed funnel stage counts per (outreach week, product, deal owner).
+    Rebuilt by routers.analytics.refresh_funnel_rollups; read by /analytics/funnel and /cohorts.
+    """
+    __tablename__ = "funnel_rollups"
+
+    id = Column(Integer, primary_key=True)
+    week_start = Column(String(10), index=True)  # 'YYYY-MM-DD' (Monday)
+    product_id = Column(Integer, index=True)
+    assigned_to = Column(String(255), index=True)
+    outreach = Column(Integer, default=0)
+    responded = Column(Integer, default=0)
+    interested = Column(Integer, default=0)
+    meeting = Column(Integer, default=0)
+    deal = Column(Integer, default=0)
+    established = Column(Integer, default=0)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+class TableVersion(Base):
+    """
+    Monotonic change counter per table, bumped in the same transaction as the write.
+    Used to build cheap ETags for list/analytics endpoints (see routers/etag.py).
+    """
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class ProviderCall(Base):
+    """
+    One row per external API call (Hunter, OpenAI, Proxycurl, HubSpot, Calendly, Gmail, Google CSE).
+    Written by services/instrumentation.py from any process (backend or Streamlit);
+    aggregated by /analytics/providers. Errors keep only the exception type, never the message.
+    """
+    __tablename__ = "provider_calls"
+
+    id = Column(Integer, primary_key=True)
+    provider = Column(String(30), nullable=False)
+    operation = Column(String(50), nullable=False)
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    duration_ms = Column(Float, nullable=False)
+    ok = Column(Boolean, nullable=False, default=True)
+    status_code = Column(Integer)
+    error = Column(String(100))
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    quota_units = Column(Float, default=0)
+
+    __table_args__ = (Index("ix_provider_calls_provider_started_at", "provider", "started_at"),)
+
+class RateLimitBucket(Base):
+    """
+    Shared token bucket per provider (services/ratelimit.py), so every process draws from one budget.
+    updated_at is epoch seconds (a float keeps the refill arithmetic in SQL dialect-neutral).
+    """
+    __tablename__ = "rate_limit_buckets"
+
+    provider = Column(String(30), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)
+
+class HubSpotContactSync(Base):
+    """
+    Last state pushed to HubSpot per stakeholder (hubspot_sync.py). content_hash covers the synced
+    contact properties, so a re-run only sends stakeholders whose hash changed.
+    """
+    __tablename__ = "hubspot_contact_sync"
+
+    stakeholder_id = Column(Integer, ForeignKey("stakeholders.id", ondelete="CASCADE"), primary_key=True)
+    hubspot_id = Column(String(50), nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    synced_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class OutboxEvent(Base):
+    """
+    External side effect (email, HubSpot sync, ...) recorded in the same transaction as the domain change
+    and delivered later by the outbox dispatcher (outbox.py). status: pending -> processing -> done | failed;
+    available_at is the next attempt time, or the lease expiry while processing.
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    claimed_by = Column(String(32))
+    last_error = Column(String(500))
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    processed_at = Column(DateTime)
+
+    __table_args__ = (Index("ix_outbox_events_status_available_at", "status", "available_at"),)
+
+class LinkedInProfile(Base):
+    """
+    Proxycurl profile cache keyed by normalized LinkedIn URL (linkedin_cache.py).
+    The full JSON is stored compressed (codec: zstd or zlib) and deferred; the projected columns are
+    what stakeholder lists read.
+    """
+    __tablename__ = "linkedin_profiles"
+
+    url = Column(String(255), primary_key=True)
+    full_name = Column(String(255))
+    headline = Column(String(500))
+    company = Column(String(255))
+    location = Column(String(255))
+    codec = Column(String(10), nullable=False)
+    payload = deferred(Column(LargeBinary, nullable=False))
+    raw_bytes = Column(Integer, nullable=False)
+    fetched_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class EmailTemplate(Base):
+    """
+    AI-generated email template per campaign segment (campaigns.py): one LLM call serves every recipient
+    of a (kind, product, role, industry) segment, and the {{placeholders}} are filled in locally.
+    key: campaigns.segment_key() (hash of the segment and the prompt version).
+    """
+    __tablename__ = "email_templates"
+
+    key = Column(String(64), primary_key=True)
+    kind = Column(String(20), nullable=False)  # outreach | follow-up
+    product = Column(String(255))
+    role = Column(String(50))
+    industry = Column(String(255))
+    body = Column(Text, nullable=False)
+    generated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class OutreachThread(Base):
+    """
+    Gmail thread of an email sent for an outreach (first email and follow-ups), recorded by the outbox
+    when Gmail accepts it, so replies.py can match an incoming reply to its outreach by thread id.
+    """
+    __tablename__ = "outreach_threads"
+
+    thread_id = Column(String(64), primary_key=True)
+    outreach_id = Column(Integer, ForeignKey("outreaches.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class GmailSyncState(Base):
+    """
+    Reply-ingestion cursor per mailbox (replies.py): the Gmail historyId the next sync starts from,
+    and when the last sync finished (bounds the catch-up search if Gmail has expired that history).
+    """
+    __tablename__ = "gmail_sync_state"
+
+    mailbox = Column(String(255), primary_key=True)
+    history_id = Column(String(30), nullable=False)  # Gmail's uint64, kept as the string it sends
+    synced_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class GmailReplyAttempt(Base):
+    """
+    Failed classifications of one reply (replies.py), so a reply OpenAI keeps refusing is given up on after
+    REPLY_MAX_ATTEMPTS syncs instead of holding the mailbox's historyId back. Cleared when a sync completes.
+    """
+    __tablename__ = "gmail_reply_attempts"
+
+    message_id = Column(String(64), primary_key=True)
+    mailbox = Column(String(255), nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+class ChangeEvent(Base):
+    """
+    Append-only log of row changes to the live tables (FEED_TABLES), written by the ORM flush hook
+    below in the same transaction. id is the cursor clients resume from (see change_feed.py).
+    """
+    __tablename__ = "change_events"
+
+    id = Column(Integer, primary_key=True)
+    table_name = Column(String(50), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    op = Column(String(10), nullable=False)  # created | updated | deleted
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+# Tables whose changes are published on the /events feed
+FEED_TABLES = ("outreaches", "meetings", "deals")
+
+def bump_table_versions(connection, table_names):
+    """
+    Increment the version of each table in `table_names` (creating missing rows).
+    ORM flushes call this automatically; call it yourself after Core/bulk writes.
+    """
+    table = TableVersion.__table__
+    names = sorted(set(table_names))
+    if not names:
+        return
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(table).values([{"table_name": name, "version": 1} for name in names])
+        stmt = stmt.on_conflict_do_update(index_elements=[table.c.table_name], set_={"version": table.c.version + 1})
+        connection.execute(stmt)
+        return
+    result = connection.execute(
+        update(table).where(table.c.table_name.in_(names)).values(version=table.c.version + 1)
+    )
+    if result.rowcount < len(names):
+        existing = {row[0] for row in connection.execute(table.select().with_only_columns(table.c.table_name))}
+        missing = [name for name in names if name not in existing]
+        connection.execute(table.insert(), [{"table_name": name, "version": 1} for name in missing])
+
+def record_changes(connection, table_name: str, row_ids: list, op: str = "updated"):
+    """After Core writes ORM flushes do not see: bump the table version and add change_events (feed tables)."""
+    if not row_ids:
+        return
+    bump_table_versions(connection, [table_name])
+    if table_name in FEED_TABLES:
+        now = datetime.utcnow()
+        connection.execute(ChangeEvent.__table__.insert(), [
+            {"table_name": table_name, "row_id": row_id, "op": op, "created_at": now} for row_id in row_ids
+        ])
+
+def _row_changed(session, obj) -> bool:
+    """Dirty objects include same-value writes and one-to-many appends, which leave their own row unchanged."""
+    return session.is_modified(obj, include_collections=False)
+
+@event.listens_for(Session, "after_flush")
+def _bump_versions_after_flush(session, flush_context):
+    """Bump table_versions for every table whose rows this flush changed (same transaction)."""
+    touched = {
+        obj.__table__.name
+        for obj in chain(session.new, (obj for obj in session.dirty if _row_changed(session, obj)), session.deleted)
+        if hasattr(obj, "__table__") and not isinstance(obj, TableVersion)
+    }
+    if touched:
+        bump_table_versions(session.connection(), touched)
+    changes = [
+        {"table_name": obj.__table__.name, "row_id": obj.id, "op": op, "created_at": datetime.utcnow()}
+        for op, objects in (("created", session.new), ("updated", session.dirty), ("deleted", session.deleted))
+        for obj in objects
+        if getattr(obj, "__tablename__", None) in FEED_TABLES and (op != "updated" or _row_changed(session, obj))
+    ]
+    if changes:
+        session.connection().execute(ChangeEvent.__table__.insert(), changes)
@@ -0,0 +1,244 @@
+"""
+Transactional outbox: request handlers record external side effects with enqueue() in the same
+transaction as the domain change, so API latency depends only on the local DB and a commit never
+leaves an email or HubSpot update half done. A separate dispatcher process delivers them:
+    python outbox.py            # poll forever
+    python outbox.py --once     # deliver what is due and exit (cron)
+Each poll claims up to OUTBOX_BATCH_SIZE due events under a lease (several dispatchers can run),
+hands them to the handler registered for their type (batch handlers get all events of their type
+at once), and retries failures with exponential backoff up to OUTBOX_MAX_ATTEMPTS.
+Delivery is at-least-once: a dispatcher dying mid-batch means its events are retried once the lease expires.
+The dispatcher also prunes delivered events and expired change_events (change_feed.py) hourly, or on each --once run.
+Easy to change: Register a new side effect with @handler("type"), or tune the OUTBOX_* env vars.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+import change_feed
+import database
+import metrics
+from models import OutboxEvent, OutreachThread
+
+BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+RETRY_BASE_SECONDS = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "10"))  # doubles per attempt
+RETRY_MAX_SECONDS = 3600
+LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "1"))
+RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "7"))
+
+class DeliveryError(Exception):
+    """A handler could not deliver its event(s); they are retried."""
+
+class PermanentError(DeliveryError):
+    """Retrying would not help (a rejected request) or could repeat the side effect: the event(s) fail at once."""
+
+HANDLERS = {}  # event_type -> (function, batch)
+
+def handler(event_type: str, batch: bool = False):
+    """
+    Register the delivery function for an event type.
+    batch=False: fn(bind, payload) per event. batch=True: fn(bind, [payload, ...]) once per poll.
+    Raise to have the event(s) retried; raise PermanentError to fail them without retrying.
+    """
+    def register(fn):
+        HANDLERS[event_type] = (fn, batch)
+        return fn
+    return register
+
+def enqueue(db: Session, event_type: str, payload: dict) -> OutboxEvent:
+    """Add an event to the caller's session; it is committed (or rolled back) with the domain change."""
+    if event_type not in HANDLERS:
+        raise ValueError(f"No outbox handler for {event_type!r}")
+    event = OutboxEvent(event_type=event_type, payload=json.dumps(payload), status="pending", attempts=0,
+                        available_at=datetime.utcnow())
+    db.add(event)
+    return event
+
+def claim_batch(bind, batch_size: int = BATCH_SIZE) -> list:
+    """Lease up to batch_size due events (pending, or processing with an expired lease). Returns: row list."""
+    table = OutboxEvent.__table__
+    token = uuid.uuid4().hex
+    now = datetime.utcnow()
+    due = (table.c.status.in_(("pending", "processing")), table.c.available_at <= now)
+    candidates = select(table.c.id).where(*due).order_by(table.c.id).limit(batch_size).scalar_subquery()
+    with bind.begin() as connection:
+        connection.execute(
+            update(table).where(table.c.id.in_(candidates), *due)
+            .values(status="processing", claimed_by=token, available_at=now + timedelta(seconds=LEASE_SECONDS))
+        )
+        return connection.execute(select(table).where(table.c.claimed_by == token).order_by(table.c.id)).all()
+
+def dispatch_once(bind=None, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Claim and deliver one batch.
+    Returns: {'claimed', 'delivered', 'retrying', 'failed'} counts.
+    """
+    bind = bind or database.engine
+    events = claim_batch(bind, batch_size)
+    counts = {"claimed": len(events), "delivered": 0, "retrying": 0, "failed": 0}
+    by_type = {}
+    for event in events:
+        by_type.setdefault(event.event_type, []).append(event)
+    for event_type, group in by_type.items():
+        fn, batch = HANDLERS.get(event_type, (None, False))
+        if fn is None:
+            _finish(bind, group, DeliveryError(f"no handler for {event_type}"), counts)
+        elif batch:
+            _finish(bind, group, _run(fn, bind, [json.loads(event.payload) for event in group]), counts)
+        else:
+            for event in group:
+                _finish(bind, [event], _run(fn, bind, json.loads(event.payload)), counts)
+    return counts
+
+def run_dispatcher(bind=None, poll_seconds: float = POLL_SECONDS, stop: threading.Event = None):
+    """Deliver events until `stop` is set; sleeps poll_seconds only when there was nothing to do."""
+    bind = bind or database.engine
+    stop = stop or threading.Event()
+    last_prune = 0.0
+    while not stop.is_set():
+        try:
+            counts = dispatch_once(bind)
+            if time.monotonic() - last_prune > 3600:
+                last_prune = time.monotonic()
+                prune(bind)
+                change_feed.prune(bind)
+        except Exception as e:  # DB hiccup: keep the dispatcher alive
+            print(f"Outbox dispatcher error: {e}")
+            counts = {"claimed": 0}
+        if counts["claimed"] < BATCH_SIZE:
+            stop.wait(poll_seconds)
+
+def prune(bind=None, days: int = RETENTION_DAYS) -> int:
+    """Delete delivered events older than `days`. Returns: rows deleted."""
+    table = OutboxEvent.__table__
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    with (bind or database.engine).begin() as connection:
+        return connection.execute(delete(table).where(table.c.status == "done", table.c.processed_at < cutoff)).rowcount
+
+def outbox_stats(db: Session) -> dict:
+    """Return event counts by (event_type, status) and the age of the oldest undelivered event."""
+    counts = {}
+    for event_type, status, count in db.query(OutboxEvent.event_type, OutboxEvent.status, func.count()).group_by(
+            OutboxEvent.event_type, OutboxEvent.status):
+        counts.setdefault(event_type, {})[status] = count
+    oldest = db.query(func.min(OutboxEvent.created_at)).filter(OutboxEvent.status.in_(("pending", "processing"))).scalar()
+    return {
+        "events": counts,
+        "oldest_pending_seconds": round((datetime.utcnow() - oldest).total_seconds(), 1) if oldest else None,
+    }
+
+def _run(fn, bind, payload):
+    try:
+        fn(bind, payload)
+        return None
+    except Exception as e:
+        return e
+
+def _finish(bind, events: list, error: Exception, counts: dict):
+    table = OutboxEvent.__table__
+    now = datetime.utcnow()
+    with bind.begin() as connection:
+        for event in events:
+            if error is None:
+                values = {"status": "done", "processed_at": now, "last_error": None}
+                outcome = "delivered"
+            else:
+                attempts = event.attempts + 1
+                delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+                outcome = "failed" if attempts >= MAX_ATTEMPTS or isinstance(error, PermanentError) else "retrying"
+                values = {
+                    "status": "failed" if outcome == "failed" else "pending", "attempts": attempts,
+                    "available_at": now + timedelta(seconds=delay), "last_error": _describe(error),
+                }
+            # claimed_by guard: skip rows whose lease expired and were re-claimed by another dispatcher
+            connection.execute(update(table).where(table.c.id == event.id, table.c.claimed_by == event.claimed_by).values(**values))
+            counts[outcome] += 1
+            metrics.OUTBOX_EVENTS.inc((event.event_type, outcome))
+
+def _describe(error: Exception) -> str:
+    # Provider exception messages can carry addresses/keys; keep only our own messages
+    if isinstance(error, DeliveryError):
+        return f"{type(error).__name__}: {error}"[:500]
+    return type(error).__name__
+
+@handler("email.send")
+def send_email_event(bind, payload: dict):
+    """
+    payload: {'to', 'subject', 'body', 'outreach_id'?}. Records the outreach's Gmail thread for replies.py.
+    Retried only if Gmail never got the message; a rejected one, or one that may have gone out, fails at once.
+    """
+    from services import gmail_service  # Google client libraries load only in the dispatcher
+    from services.ratelimit import send_outcome
+    try:
+        service = gmail_service.get_gmail_service()
+    except Exception as e:  # credentials / discovery: nothing was sent
+        raise DeliveryError(f"Gmail unavailable ({type(e).__name__})") from e
+    try:
+        sent = gmail_service.send_message(payload["to"], payload["subject"], payload["body"], service=service)
+    except Exception as e:
+        outcome = send_outcome(e)
+        if outcome == "not_sent":
+            raise DeliveryError(f"Gmail send not accepted ({type(e).__name__})") from e
+        if outcome == "rejected":
+            raise PermanentError(f"Gmail rejected the message ({type(e).__name__})") from e
+        raise PermanentError(f"Gmail send outcome unknown ({type(e).__name__}): check the Sent folder before requeueing") from e
+    thread_id = sent.get("threadId") if isinstance(sent, dict) else None
+    if payload.get("outreach_id") and thread_id:
+        table = OutreachThread.__table__
+        try:  # the email is out: failing here would redeliver it, so only lose the thread match (sender fallback remains)
+            with bind.begin() as connection:
+                if connection.execute(select(table.c.thread_id).where(table.c.thread_id == thread_id)).first() is None:
+                    connection.execute(table.insert().values(thread_id=thread_id, outreach_id=payload["outreach_id"],
+                                                             created_at=datetime.utcnow()))
+        except Exception as e:
+            print(f"Outreach {payload['outreach_id']}: Gmail thread {thread_id} not recorded: {e}")
+
+@handler("hubspot.sync_contacts", batch=True)
+def sync_contacts_event(bind, payloads: list):
+    """payloads: [{'stakeholder_ids': [...]}, ...], pushed with one incremental batch sync."""
+    from hubspot_sync import sync_stakeholders
+    from services import hubspot_service
+    if not hubspot_service.API_KEY:
+        print("HubSpot API key missing - skipping.")
+        return
+    stakeholder_ids = sorted({stakeholder_id for payload in payloads for stakeholder_id in payload["stakeholder_ids"]})
+    with Session(bind=bind) as db:
+        result = sync_stakeholders(db, stakeholder_ids=stakeholder_ids)
+    if result["failed"]:
+        raise DeliveryError(f"{result['failed']} HubSpot contact(s) not synced")
+
+@handler("linkedin.fetch_profile")
+def fetch_profile_event(bind, payload: dict):
+    """payload: {'url'} (normalized). Warms the profile cache; cached profiles cost no Proxycurl call."""
+    from linkedin_cache import get_profile
+    from services import linkedin_service
+    if not linkedin_service.API_KEY:
+        print("Proxycurl API key missing - skipping.")
+        return
+    with Session(bind=bind) as db:
+        if not get_profile(db, payload["url"]):
+            raise DeliveryError("Proxycurl profile fetch failed")
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Deliver outbox events (emails, HubSpot syncs).")
+    parser.add_argument("--once", action="store_true", help="deliver due events and exit")
+    args = parser.parse_args()
+    if args.once:
+        while True:
+            counts = dispatch_once()
+            print(counts)
+            if counts["claimed"] < BATCH_SIZE:
+                break
+        print({"pruned": prune(), "change_events_pruned": change_feed.prune()})
+    else:
+        run_dispatcher()
@@ -0,0 +1,266 @@
+"""
+Reply ingestion: read what arrived in the Gmail inbox since the last sync, match each reply to its
+outreach, classify it with OpenAI and record the result on Outreach.response.
+A sync costs O(new messages), never a mailbox scan:
+  - history.list from the stored historyId (gmail_sync_state) lists only messages added since;
+    if Gmail has expired that history, a search bounded by the last sync time catches up instead;
+  - messages are fetched GMAIL_BATCH_SIZE per batch request;
+  - a reply matches its outreach by Gmail thread (outreach_threads, recorded when the outbox sent the
+    email), else by the sender's address (the stakeholder's latest outreach) if it is marked as a reply
+    (In-Reply-To / References, or a "Re:" subject); any other email from a stakeholder only adds a note;
+  - only the latest reply per outreach is classified, REPLY_BATCH_SIZE replies at a time,
+    OPENAI_CONCURRENCY calls in flight;
+  - the responses are written with one bulk update per batch (committed per batch, so SQLite is not
+    locked during the next batch's API calls), and the new historyId is stored last.
+The first sync of a mailbox only records where to start from. A sync that fails keeps its old historyId and
+is simply run again; a reply read twice sets the same response and does not repeat its note. That includes
+a reply OpenAI could not classify: the batch's other replies are saved, then UnclassifiedReplies is raised.
+Failures are counted per message (gmail_reply_attempts); after REPLY_MAX_ATTEMPTS syncs the reply is only
+added to the notes as not classified, so one reply OpenAI keeps refusing cannot hold the historyId back.
+Run: python replies.py [--once]   (polls every REPLY_SYNC_SECONDS; needs the gmail.readonly scope)
+Easy to change: reply_text() decides what part of an email is sent for classification.
+"""
+import asyncio
+import base64
+import calendar
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from email.utils import parseaddr
+
+from sqlalchemy import bindparam, case, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from models import GmailReplyAttempt, GmailSyncState, Outreach, OutreachResponse, OutreachThread, Stakeholder, record_changes
+from services import gmail_service, openai_service
+
+BATCH_SIZE = int(os.getenv("REPLY_BATCH_SIZE", "500"))  # messages matched and classified per round
+SYNC_SECONDS = float(os.getenv("REPLY_SYNC_SECONDS", "60"))
+MAX_ATTEMPTS = int(os.getenv("REPLY_MAX_ATTEMPTS", "3"))  # syncs that try to classify a reply before it is only noted
+MAX_REPLY_CHARS = 2000  # of the reply itself, quoted text removed
+CATCH_UP_MARGIN = timedelta(hours=1)  # catch-up search overlap with the last sync (re-reading a reply is harmless)
+_QUOTE_START = re.compile(r"^(On .+ wrote:|-+ ?Original Message ?-+)$", re.IGNORECASE)
+_REPLY_SUBJECT = re.compile(r"^\s*re\s*:", re.IGNORECASE)
+
+class UnclassifiedReplies(Exception):
+    """OpenAI failed on some replies: the sync stopped before storing its historyId, so they are read again."""
+
+def reply_text(body: str) -> str:
+    """Return the new part of a reply: quoted lines and everything after 'On ... wrote:' dropped, truncated."""
+    lines = []
+    for line in body.splitlines():
+        if _QUOTE_START.match(line.strip()):
+            break
+        if not line.startswith(">"):
+            lines.append(line)
+    return "\n".join(lines).strip()[:MAX_REPLY_CHARS]
+
+def _body(message: dict) -> str:
+    """The first text/plain part of a Gmail message resource, else its snippet."""
+    parts = [message.get("payload") or {}]
+    while parts:
+        part = parts.pop(0)
+        data = (part.get("body") or {}).get("data")
+        if part.get("mimeType") == "text/plain" and data:
+            return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4)).decode("utf-8", "replace")
+        parts.extend(part.get("parts") or [])
+    return message.get("snippet", "")
+
+def _header(message: dict, name: str) -> str:
+    headers = (message.get("payload") or {}).get("headers") or []
+    return next((header["value"] for header in headers if header["name"].lower() == name), "")
+
+def _sender(message: dict) -> str:
+    return parseaddr(_header(message, "from"))[1]
+
+def is_reply(message: dict) -> bool:
+    """Whether the message says it answers an earlier one: In-Reply-To / References, or a "Re:" subject."""
+    return bool(_header(message, "in-reply-to") or _header(message, "references")
+                or _REPLY_SUBJECT.match(_header(message, "subject")))
+
+def match_outreaches(db: Session, messages: list) -> tuple:
+    """
+    Match messages to outreaches by Gmail thread first, then by sender address (that stakeholder's latest outreach).
+    Returns: ({message id: outreach id} of the replies, {message id: outreach id} of other emails from a
+    stakeholder, i.e. sender matches that are not marked as replies).
+    """
+    threads = dict(db.execute(select(OutreachThread.thread_id, OutreachThread.outreach_id).where(
+        OutreachThread.thread_id.in_({message["threadId"] for message in messages}))).all())
+    matched, senders = {}, {}
+    for message in messages:
+        if message["threadId"] in threads:
+            matched[message["id"]] = threads[message["threadId"]]
+        elif _sender(message):
+            senders[message["id"]] = _sender(message)
+    others = {}
+    if senders:
+        addresses = set(senders.values()) | {address.lower() for address in senders.values()}
+        latest = dict(db.execute(
+            select(func.lower(Stakeholder.email), func.max(Outreach.id))
+            .join(Outreach, Outreach.stakeholder_id == Stakeholder.id)
+            .where(Stakeholder.email.in_(addresses))  # exact and lower-case forms, so the index is used
+            .group_by(func.lower(Stakeholder.email))
+        ).all())
+        by_message = {message["id"]: message for message in messages}
+        for message_id, address in senders.items():
+            if address.lower() in latest:
+                (matched if is_reply(by_message[message_id]) else others)[message_id] = latest[address.lower()]
+    return matched, others
+
+def _appended_note():
+    """Outreach notes with :note added on a new line, unless they already end with it (a message read twice)."""
+    notes, note = Outreach.__table__.c.notes, bindparam("note")
+    return case((notes.endswith(note), notes), else_=func.coalesce(notes + "\n", "") + note)
+
+def record_replies(db: Session, replies: dict) -> tuple:
+    """
+    Classify {outreach id: reply message} (one batch) and bulk-update those outreaches; the caller commits.
+    'interested' / 'not-interested' also end the follow-up schedule; an unclear reply changes nothing, nor
+    does one OpenAI failed to classify.
+    Returns: (outreaches updated, [outreach ids whose reply was not classified]).
+    """
+    ids = list(replies)
+    labels = asyncio.run(openai_service.gather_limited(
+        [openai_service.aclassify_response(reply_text(_body(replies[outreach_id]))) for outreach_id in ids]))
+    table = Outreach.__table__
+    notes = _appended_note()
+    final, ongoing = [], []
+    for outreach_id, label in zip(ids, labels):
+        if label is None:
+            continue
+        response = OutreachResponse(label)
+        if response is OutreachResponse.NO_RESPONSE:
+            continue
+        row = {"outreach_id": outreach_id, "new_response": response,
+               "note": f"Reply (Gmail): {replies[outreach_id].get('snippet', '')[:200]}"}
+        (ongoing if response is OutreachResponse.FOLLOW_UP_NEEDED else final).append(row)
+    where = table.c.id == bindparam("outreach_id")
+    if final:
+        db.execute(update(table).where(where).values(response=bindparam("new_response"), notes=notes, next_action_at=None), final)
+    if ongoing:  # keeps its follow-up schedule
+        db.execute(update(table).where(where).values(response=bindparam("new_response"), notes=notes), ongoing)
+    updated = [row["outreach_id"] for row in final + ongoing]
+    record_changes(db.connection(), "outreaches", updated)
+    return len(updated), [outreach_id for outreach_id, label in zip(ids, labels) if label is None]
+
+def record_emails(db: Session, emails: dict, prefix: str = "Email (Gmail)") -> int:
+    """
+    Add {outreach id: email that is not a reply} to those outreaches' notes; response and follow-ups are unchanged.
+    Returns: outreaches noted.
+    """
+    table = Outreach.__table__
+    db.execute(update(table).where(table.c.id == bindparam("outreach_id")).values(notes=_appended_note()), [
+        {"outreach_id": outreach_id, "note": f"{prefix}: {message.get('snippet', '')[:200]}"}
+        for outreach_id, message in emails.items()])
+    record_changes(db.connection(), "outreaches", list(emails))
+    return len(emails)
+
+def count_failures(db: Session, mailbox: str, message_ids: list) -> dict:
+    """
+    Add one failed classification to each message (gmail_reply_attempts); the caller commits.
+    Returns: {message id: failed attempts so far}.
+    """
+    table = GmailReplyAttempt.__table__
+    attempts = dict(db.execute(select(table.c.message_id, table.c.attempts)
+                               .where(table.c.message_id.in_(message_ids))).all())
+    now = datetime.utcnow()
+    if attempts:
+        db.execute(update(table).where(table.c.message_id == bindparam("b_message_id"))
+                   .values(attempts=table.c.attempts + 1, updated_at=now),
+                   [{"b_message_id": message_id} for message_id in attempts])
+    new = [message_id for message_id in message_ids if message_id not in attempts]
+    if new:
+        db.execute(insert(table), [{"message_id": message_id, "mailbox": mailbox, "attempts": 1, "updated_at": now}
+                                   for message_id in new])
+    return {message_id: attempts.get(message_id, 0) + 1 for message_id in message_ids}
+
+def _new_messages(state: GmailSyncState, service) -> tuple:
+    """Returns: (message refs added to the inbox since `state`, oldest first, the historyId to store, caught up?)."""
+    try:
+        refs, history_id = gmail_service.list_history(state.history_id, service=service)
+        return refs, history_id, False
+    except gmail_service.HistoryExpired:
+        history_id = gmail_service.get_profile(service)["historyId"]  # before the search, so nothing falls between
+        since = calendar.timegm((state.synced_at - CATCH_UP_MARGIN).timetuple())
+        return list(reversed(gmail_service.list_messages(f"in:inbox after:{since}", service=service))), history_id, True
+
+def sync_replies(db: Session, mailbox: str = "me", service=None, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Ingest the replies that arrived since the last sync of `mailbox`.
+    Returns: {'messages', 'replies', 'matched', 'updated', 'noted', 'unclassified', 'caught_up'}; 'unclassified'
+    counts the replies given up on after MAX_ATTEMPTS failed classifications (noted as not classified).
+    Raises: UnclassifiedReplies after the batch in which OpenAI failed on a reply that still has attempts left
+    (its other replies are saved).
+    """
+    if openai_service.get_client() is None:
+        raise RuntimeError("OPENAI_API_KEY not set: replies could not be classified")
+    service = service or gmail_service.get_gmail_service()
+    stats = {"messages": 0, "replies": 0, "matched": 0, "updated": 0, "noted": 0, "unclassified": 0,
+             "caught_up": False}
+    state = db.get(GmailSyncState, mailbox)
+    if state is None:
+        db.add(GmailSyncState(mailbox=mailbox, history_id=gmail_service.get_profile(service)["historyId"],
+                              synced_at=datetime.utcnow()))
+        db.commit()
+        return stats
+    refs, history_id, stats["caught_up"] = _new_messages(state, service)
+    message_ids = list(dict.fromkeys(ref["id"] for ref in refs if "SENT" not in ref.get("labelIds", ())))
+    stats["messages"] = len(message_ids)
+    for start in range(0, len(message_ids), batch_size):
+        messages = [message for message in gmail_service.get_messages(message_ids[start:start + batch_size], service=service)
+                    if "SENT" not in message.get("labelIds", ())]
+        stats["replies"] += len(messages)
+        matched, others = match_outreaches(db, messages)
+        stats["matched"] += len(matched) + len(others)
+        latest = {matched[message["id"]]: message for message in messages if message["id"] in matched}  # oldest first
+        emails = {others[message["id"]]: message for message in messages if message["id"] in others}
+        retrying = 0
+        if latest:
+            updated, unclassified = record_replies(db, latest)
+            stats["updated"] += updated
+            if unclassified:
+                attempts = count_failures(db, mailbox, [latest[outreach_id]["id"] for outreach_id in unclassified])
+                given_up = {outreach_id: latest[outreach_id] for outreach_id in unclassified
+                            if attempts[latest[outreach_id]["id"]] >= MAX_ATTEMPTS}
+                if given_up:
+                    stats["unclassified"] += record_emails(db, given_up, prefix="Reply (Gmail, not classified)")
+                retrying = len(unclassified) - len(given_up)
+        if emails:
+            stats["noted"] += record_emails(db, emails)
+        db.commit()
+        if retrying:
+            raise UnclassifiedReplies(f"{retrying} replies could not be classified; the next sync reads them again")
+    state.history_id, state.synced_at = str(history_id), datetime.utcnow()
+    db.execute(delete(GmailReplyAttempt).where(GmailReplyAttempt.mailbox == mailbox))
+    db.commit()
+    return stats
+
+def run_worker(poll_seconds: float = SYNC_SECONDS, stop: threading.Event = None):
+    """Sync every poll_seconds until `stop` is set."""
+    from database import SessionLocal
+    stop = stop or threading.Event()
+    service = None
+    while not stop.is_set():
+        try:
+            service = service or gmail_service.get_gmail_service()
+            with SessionLocal() as session:
+                stats = sync_replies(session, service=service)
+            if stats["updated"]:
+                print(f"Replies: {stats}")
+        except Exception as e:  # Gmail or DB hiccup: keep the worker alive
+            print(f"Reply sync error: {e}")
+        stop.wait(poll_seconds)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingest Gmail replies to outreaches.")
+    parser.add_argument("--once", action="store_true", help="sync once and exit (cron)")
+    args = parser.parse_args()
+    if args.once:
+        from database import SessionLocal
+        with SessionLocal() as session:
+            print(sync_replies(session))
+    else:
+        run_worker()
@@ -0,0 +1,301 @@
+"""
+PDF report engine: table-layout reports rendered straight from a DB cursor.
+Every page holds a fixed number of rows, so page N is rows [(N-1)*rows_per_page, N*rows_per_page)
+and page ranges can be rendered independently in a process pool and stitched in order.
+Reports run as background jobs (submit_report returns a handle; poll get_job) and are written
+to REPORTS_DIR, never the working directory.
+Easy to change: Tune REPORT_ROWS_PER_PAGE / REPORT_WORKERS / REPORT_PAGES_PER_TASK, or column weights in TableLayout.
+"""
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import Integer, DateTime, Enum as SQLEnum, create_engine, func, select
+from sqlalchemy.orm import Session
+
+from models import readable_select  # importing models registers every table on Base.metadata, also in worker processes
+from database import Base
+from utils import iter_query_chunks, raw_export_select
+
+REPORTS_DIR = os.getenv("REPORTS_DIR", os.path.join(tempfile.gettempdir(), "jv_reports"))
+ROWS_PER_PAGE = int(os.getenv("REPORT_ROWS_PER_PAGE", "40"))
+# Processes rendering page ranges (1 = render in the job thread, no stitching)
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", str(os.cpu_count() or 1)))
+# Pages per process-pool task; smaller reports are rendered in one pass
+PAGES_PER_TASK = int(os.getenv("REPORT_PAGES_PER_TASK", "50"))
+# Reports generated at the same time (each may use REPORT_WORKERS processes)
+JOB_CONCURRENCY = int(os.getenv("REPORT_JOB_CONCURRENCY", "2"))
+
+PAGE_SIZE = (792.0, 612.0)  # landscape US letter in points (reportlab's landscape(letter))
+MARGIN = 36
+FONT_SIZE = 8
+ROW_HEIGHT = 12.5
+
+@dataclass
+class TableLayout:
+    """Column positions and widths for a table report (wide text columns get more room)."""
+    columns: list
+    weights: list
+
+    @classmethod
+    def for_table(cls, statement):
+        """Layout for the columns of a whole-table select (models.readable_select)."""
+        columns = statement.selected_columns
+        return cls([column.name for column in columns], [_column_weight(column.type) for column in columns])
+
+    def __post_init__(self):
+        usable = PAGE_SIZE[0] - 2 * MARGIN
+        total = sum(self.weights)
+        self.widths = [usable * weight / total for weight in self.weights]
+        self.offsets = [MARGIN + sum(self.widths[:i]) for i in range(len(self.widths))]
+        # Helvetica averages ~0.5em per character; cheaper than measuring every cell
+        self.max_chars = [max(3, int(width / (FONT_SIZE * 0.52))) for width in self.widths]
+
+class PageWriter:
+    """
+    Draws fixed-height table pages onto a reportlab canvas. Rows are buffered per page and each
+    column is drawn as one text object (one origin, fixed leading), which is several times
+    cheaper than a drawString per cell.
+    """
+    def __init__(self, target, layout: TableLayout, title: str, total_pages: int, rows_per_page: int = ROWS_PER_PAGE):
+        from reportlab.pdfgen import canvas  # imported on first report, not with the API
+
+        self.canvas = canvas.Canvas(target, pagesize=PAGE_SIZE, pageCompression=1)
+        self.layout = layout
+        self.title = title
+        self.total_pages = total_pages
+        self.rows_per_page = rows_per_page
+        self.pages = 0
+        self._page_number = None
+        self._rows = []
+
+    def write_row(self, page_number: int, values):
+        if page_number != self._page_number:
+            self._flush()
+            self._page_number = page_number
+        self._rows.append(values)
+
+    def close(self):
+        if self._page_number is None:  # empty table: still produce a page with the header
+            self._page_number = 1
+        self._flush()
+        self.canvas.save()
+
+    def _flush(self):
+        if self._page_number is None:
+            return
+        from reportlab.lib import colors
+
+        width, height = PAGE_SIZE
+        c = self.canvas
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(MARGIN, height - MARGIN, self.title)
+        c.setFont("Helvetica", FONT_SIZE)
+        c.drawRightString(width - MARGIN, MARGIN / 2, f"Page {self._page_number} of {self.total_pages}")
+        top = height - MARGIN - 24
+        c.setFillColor(colors.lightsteelblue)
+        c.rect(MARGIN, top - 3, width - 2 * MARGIN, ROW_HEIGHT, stroke=0, fill=1)
+        c.setFillColor(colors.whitesmoke)
+        for row in range(1, len(self._rows), 2):
+            c.rect(MARGIN, top - ROW_HEIGHT * (row + 1) - 3, width - 2 * MARGIN, ROW_HEIGHT, stroke=0, fill=1)
+        c.setFillColor(colors.black)
+        for column, (x, max_chars, name) in enumerate(zip(self.layout.offsets, self.layout.max_chars, self.layout.columns)):
+            text = c.beginText(x + 2, top)
+            text.setFont("Helvetica-Bold", FONT_SIZE, ROW_HEIGHT)
+            text.textLine(_cell_text(name, max_chars))
+            text.setFont("Helvetica", FONT_SIZE, ROW_HEIGHT)
+            for values in self._rows:
+                text.textLine(_cell_text(values[column], max_chars))
+            c.drawText(text)
+        c.showPage()
+        self.pages += 1
+        self._rows = []
+
+def render_rows(target, columns: list, rows, title: str, rows_per_page: int = ROWS_PER_PAGE, total_rows: int = None) -> int:
+    """
+    Render an iterable of row tuples as a table PDF (target: path or binary file).
+    Used for small in-memory reports (utils.export_to_pdf). Returns: pages written.
+    """
+    if total_rows is None:
+        rows = list(rows)
+        total_rows = len(rows)
+    writer = PageWriter(target, TableLayout(columns, [1] * len(columns)), title, _page_count(total_rows, rows_per_page), rows_per_page)
+    for index, row in enumerate(rows):
+        writer.write_row(index // rows_per_page + 1, row)
+    writer.close()
+    return writer.pages
+
+def generate_report(bind, table_name: str, path: str, title: str = None, workers: int = REPORT_WORKERS,
+                    rows_per_page: int = ROWS_PER_PAGE, pages_per_task: int = PAGES_PER_TASK, progress=None) -> int:
+    """
+    Render `table_name` (ordered by id) to a PDF at `path`.
+    bind: Engine/Connection to read from. Reports bigger than one task are split into page ranges
+    rendered by `workers` processes (each with its own connection) and stitched with pypdf;
+    otherwise, or for in-memory databases, rows stream from a single cursor.
+    progress: optional callback(pages_done, total_pages). Returns: total pages.
+    """
+    table = Base.metadata.tables[table_name]
+    title = title or f"{table_name.title()} report"
+    with Session(bind=bind) as db:
+        total_rows = db.execute(select(func.count()).select_from(table)).scalar()
+    total_pages = _page_count(total_rows, rows_per_page)
+    url = _database_url(bind)
+    ranges = [(first, min(first + pages_per_task - 1, total_pages)) for first in range(1, total_pages + 1, pages_per_task)]
+
+    if workers <= 1 or len(ranges) == 1 or url is None or not _has_pypdf():
+        with Session(bind=bind) as db:
+            _render_pages(db, table, path, title, 1, total_pages, total_pages, rows_per_page, progress)
+        return total_pages
+
+    parts_dir = tempfile.mkdtemp(prefix="report-parts-", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        parts = [os.path.join(parts_dir, f"{first:08d}.pdf") for first, _ in ranges]
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+            futures = [
+                pool.submit(_render_range, url, table_name, part, title, first, last, total_pages, rows_per_page)
+                for part, (first, last) in zip(parts, ranges)
+            ]
+            done = 0
+            for future in futures:
+                done += future.result()
+                if progress:
+                    progress(done, total_pages)
+        _stitch(parts, path)
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+    return total_pages
+
+@dataclass
+class ReportJob:
+    """Handle for a background report; poll get_job(id) until status is done or failed."""
+    table: str
+    title: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued | running | done | failed
+    pages_done: int = 0
+    total_pages: int = None
+    path: str = None
+    error: str = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    seconds: float = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id, "table": self.table, "title": self.title, "status": self.status,
+            "pages_done": self.pages_done, "total_pages": self.total_pages, "error": self.error,
+            "created_at": self.created_at.isoformat(), "seconds": self.seconds,
+            "pages_per_second": round(self.total_pages / self.seconds, 1) if self.seconds and self.total_pages else None,
+        }
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+_job_executor = ThreadPoolExecutor(max_workers=JOB_CONCURRENCY, thread_name_prefix="report-job")
+
+def submit_report(bind, table_name: str, title: str = None, workers: int = REPORT_WORKERS) -> ReportJob:
+    """Start generating a report in the background. Returns: the job handle (status 'queued')."""
+    job = ReportJob(table=table_name, title=title or f"{table_name.title()} report")
+    with _jobs_lock:
+        _jobs[job.id] = job
+    _job_executor.submit(_run_job, job, bind, workers)
+    return job
+
+def get_job(job_id: str) -> ReportJob:
+    """Returns: the job handle, or None for unknown ids (jobs live in this process only)."""
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+def _run_job(job: ReportJob, bind, workers: int):
+    def progress(done, total):
+        job.pages_done, job.total_pages = done, total
+
+    started = time.perf_counter()
+    job.status = "running"
+    try:
+        os.makedirs(REPORTS_DIR, exist_ok=True)
+        path = os.path.join(REPORTS_DIR, f"{job.table}-{job.id}.pdf")
+        job.total_pages = generate_report(bind, job.table, path, job.title, workers=workers, progress=progress)
+        job.pages_done, job.path, job.status = job.total_pages, path, "done"
+    except Exception as e:
+        print(f"Report job {job.id} failed: {e}")
+        job.error, job.status = str(e), "failed"
+    finally:
+        job.seconds = round(time.perf_counter() - started, 3)
+
+def _render_range(url: str, table_name: str, path: str, title: str, first_page: int, last_page: int,
+                  total_pages: int, rows_per_page: int) -> int:
+    """Process-pool task: render pages first..last into their own PDF. Returns: pages rendered."""
+    engine = create_engine(url)
+    try:
+        with Session(bind=engine) as db:
+            _render_pages(db, Base.metadata.tables[table_name], path, title, first_page, last_page, total_pages, rows_per_page)
+    finally:
+        engine.dispose()
+    return last_page - first_page + 1
+
+def _render_pages(db: Session, table, path: str, title: str, first_page: int, last_page: int,
+                  total_pages: int, rows_per_page: int, progress=None):
+    """Stream the rows of pages first..last from one cursor onto a PageWriter."""
+    first_row = (first_page - 1) * rows_per_page
+    statement = readable_select(table).order_by(table.c.id)
+    if first_row:
+        # Seek to the range by id instead of OFFSET-ing over every wide row
+        start_id = select(table.c.id).order_by(table.c.id).offset(first_row).limit(1).scalar_subquery()
+        statement = statement.where(table.c.id >= start_id)
+    statement = statement.limit((last_page - first_page + 1) * rows_per_page)
+
+    writer = PageWriter(path, TableLayout.for_table(statement), title, total_pages, rows_per_page)
+    index = first_row
+    for _, rows in iter_query_chunks(db, raw_export_select(statement)):
+        for row in rows:
+            writer.write_row(index // rows_per_page + 1, row)
+            index += 1
+        if progress:
+            progress(writer.pages, total_pages)
+    writer.close()
+    if progress:
+        progress(writer.pages, total_pages)
+
+def _stitch(parts: list, path: str):
+    """Concatenate rendered page ranges, in order, into one PDF."""
+    from pypdf import PdfWriter  # Optional dependency; only needed for parallel rendering
+
+    merged = PdfWriter()
+    for part in parts:
+        merged.append(part)
+    with open(path, "wb") as f:
+        merged.write(f)
+
+def _has_pypdf() -> bool:
+    try:
+        import pypdf  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _database_url(bind):
+    """URL worker processes can connect to, or None when the data is only visible to this process."""
+    engine = getattr(bind, "engine", bind)
+    if engine.url.get_backend_name() == "sqlite" and engine.url.database in (None, "", ":memory:"):
+        return None
+    return engine.url.render_as_string(hide_password=False)
+
+def _page_count(rows: int, rows_per_page: int) -> int:
+    return max(1, math.ceil(rows / rows_per_page))
+
+def _column_weight(sql_type) -> float:
+    if isinstance(sql_type, Integer):
+        return 1
+    if isinstance(sql_type, (SQLEnum, DateTime)):
+        return 2.2
+    return 3
+
+def _cell_text(value, max_chars: int) -> str:
+    text = "" if value is None else str(value).replace("\n", " ")
+    return text if len(text) <= max_chars else text[:max_chars - 3] + "..."
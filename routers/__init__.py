@@ -6,10 +6,16 @@ Import in backend.py like: from routers import deals, outreaches, etc.
 
 # Import all routers to make them available at package level
 # (e.g., routers.deals.router or from routers import deals)
+from .products import router as products_router
+from .companies import router as companies_router
+from .stakeholders import router as stakeholders_router
 from .deals import router as deals_router
 from .outreaches import router as outreaches_router
 from .meetings import router as meetings_router
 from .analytics import router as analytics_router
+from .exports import router as exports_router
+from .reports import router as reports_router
+from .events import router as events_router
 
 # Optional: Create a combined router for all endpoints (useful for mounting)
 # Uncomment if you want a single entry point
@@ -22,9 +28,15 @@ from .analytics import router as analytics_router
 
 # Make individual routers available directly (e.g., routers.deals_router)
 __all__ = [
+    'products_router',
+    'companies_router',
+    'stakeholders_router',
     'deals_router',
     'outreaches_router',
     'meetings_router',
     'analytics_router',
+    'exports_router',
+    'reports_router',
+    'events_router',
     # 'combined_router',  # Uncomment if using combined
 ]
\ No newline at end of file
@@ -1,12 +1,51 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import os
+import threading
+from itertools import groupby
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import DateTime, case, exists, func, insert, literal, select
+from sqlalchemy.orm import Session, aliased
+import database
 from database import get_db
-from models import Outreach, OutreachResponse, Meeting
+from models import (
+    Outreach, OutreachResponse, Meeting, Deal, DealStage, Stakeholder, TargetCompany,
+    ProductTechnology, FunnelRollup, ProviderCall, bump_table_versions
+)
+from outbox import outbox_stats
+from routers.etag import versioned
+from routers.serialization import json_response
+from services.instrumentation import QUOTAS
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
-@router.get("/kpis")
+# Funnel stages in pipeline order (column names in funnel_rollups)
+FUNNEL_STAGES = ["outreach", "responded", "interested", "meeting", "deal", "established"]
+COHORT_DIMENSIONS = ("week", "product", "assigned_to")
+# How old precomputed funnel rollups may get before a background refresh is started
+ROLLUP_TTL_SECONDS = int(os.getenv("ANALYTICS_ROLLUP_TTL", "300"))
+# Responses that are actual replies (FOLLOW_UP_NEEDED only means we sent a follow-up)
+REPLIED = (OutreachResponse.INTERESTED, OutreachResponse.NOT_INTERESTED)
+_refresh_lock = threading.Lock()
+# Workflow step -> model probed by /progress
+WORKFLOW_STEPS = {
+    "products": ProductTechnology, "companies": TargetCompany, "stakeholders": Stakeholder,
+    "outreach": Outreach, "meetings": Meeting, "deals": Deal,
+}
+WORKFLOW_TABLES = [model.__tablename__ for model in WORKFLOW_STEPS.values()]
+
+def fresh_rollups(refresh: bool = False, db: Session = Depends(get_db)):
+    """
+    Dependency: refresh rollups first when forced (?refresh=true) or missing. Rollups older than
+    ANALYTICS_ROLLUP_TTL seconds are served as they are while a background thread recomputes them,
+    so the request never waits for a full rebuild. Runs before the ETag check.
+    """
+    last_refresh = db.query(func.max(FunnelRollup.refreshed_at)).scalar()
+    if refresh or last_refresh is None:
+        refresh_funnel_rollups(db.get_bind())
+    elif datetime.utcnow() - last_refresh > timedelta(seconds=ROLLUP_TTL_SECONDS) and not _refresh_lock.locked():
+        threading.Thread(target=refresh_funnel_rollups, args=(db.get_bind(),), kwargs={"wait": False}, daemon=True).start()
+
+@router.get("/kpis", dependencies=[Depends(versioned("outreaches", "meetings"))])
 def get_kpis(db: Session = Depends(get_db)):
     """
     Return key performance indicators:
@@ -16,7 +55,7 @@ def get_kpis(db: Session = Depends(get_db)):
     - Meetings scheduled count
     """
     total_outreach = db.query(Outreach).count()
-    responded = db.query(Outreach).filter(Outreach.response != OutreachResponse.NO_RESPONSE).count()
+    responded = db.query(Outreach).filter(Outreach.response.in_(REPLIED)).count()
     interested = db.query(Outreach).filter(Outreach.response == OutreachResponse.INTERESTED).count()
     meetings_scheduled = db.query(Meeting).filter(Meeting.status == "scheduled").count()
 
@@ -29,31 +68,237 @@ def get_kpis(db: Session = Depends(get_db)):
         "meetings_scheduled": meetings_scheduled,
     }
 
-@router.get("/outreach_breakdown")
+@router.get("/outreach_breakdown", dependencies=[Depends(versioned("outreaches"))])
 def outreach_response_breakdown(db: Session = Depends(get_db)):
     """
     Return counts of outreach responses by category.
     """
-    counts = {}
-    for response in OutreachResponse:
-        counts[response.value] = db.query(Outreach).filter(Outreach.response == response).count()
+    counts = {response.value: 0 for response in OutreachResponse}
+    rows = db.query(Outreach.response, func.count(Outreach.id)).group_by(Outreach.response).all()
+    for response, count in rows:
+        if response is not None:
+            counts[response.value] = count
     return counts
 
-@router.get("/outreach_over_time")
-def outreach_over_time(days: int = 30, db: Session = Depends(get_db)):
+@router.get("/outreach_over_time", dependencies=[Depends(versioned("outreaches", extra=lambda: datetime.utcnow().date()))])
+def outreach_over_time(response: Response, days: int = 30, db: Session = Depends(get_db)):
     """
-    Return outreach counts per day for the last `days` days.
+    Return outreach counts per day for the last `days` days (grouped in SQL: one row per day).
     """
     cutoff = datetime.utcnow() - timedelta(days=days)
-    results = (
-        db.query(Outreach.date)
+    day = func.date(Outreach.date)
+    rows = (
+        db.query(day.label("date"), func.count(Outreach.id).label("count"))
         .filter(Outreach.date >= cutoff)
+        .group_by(day)
+        .order_by(day)
         .all()
     )
-    # Aggregate counts per day
-    counts = {}
-    for (date,) in results:
-        day = date.date().isoformat()
-        counts[day] = counts.get(day, 0) + 1
-    # Return sorted list of dicts
-    return [{"date": day, "count": count} for day, count in sorted(counts.items())]
\ No newline at end of file
+    return json_response([{"date": date, "count": count} for date, count in rows], response)
+
+@router.get("/progress", dependencies=[Depends(versioned(*WORKFLOW_TABLES))])
+def workflow_progress(db: Session = Depends(get_db)):
+    """
+    Return which workflow steps already have data (drives the UI progress sidebar).
+    One statement of EXISTS probes, so the cost does not grow with table size.
+    """
+    row = db.execute(select(*[exists(select(model.id)).label(step) for step, model in WORKFLOW_STEPS.items()])).one()
+    return {step: bool(value) for step, value in row._mapping.items()}
+
+@router.get("/funnel", dependencies=[Depends(fresh_rollups), Depends(versioned("funnel_rollups"))])
+def funnel(db: Session = Depends(get_db)):
+    """
+    Return the outreach → responded → interested → meeting → deal → established funnel.
+    Each stage has its count, conversion from the previous stage and from the top (%).
+    Served from funnel_rollups; pass refresh=true to recompute them first.
+    """
+    row = db.query(*[func.coalesce(func.sum(getattr(FunnelRollup, stage)), 0) for stage in FUNNEL_STAGES]).one()
+    counts = dict(zip(FUNNEL_STAGES, row))
+    top = counts["outreach"]
+    stages = []
+    previous = top
+    for stage in FUNNEL_STAGES:
+        count = counts[stage]
+        stages.append({
+            "stage": stage,
+            "count": count,
+            "conversion_percent": _percent(count, previous),
+            "overall_percent": _percent(count, top),
+        })
+        previous = count
+    return {"stages": stages}
+
+@router.get("/cohorts", dependencies=[Depends(fresh_rollups), Depends(versioned("funnel_rollups"))])
+def cohorts(response: Response, by: str = "week", db: Session = Depends(get_db)):
+    """
+    Return funnel stage counts per cohort.
+    by: 'week' (outreach week, Monday start), 'product' or 'assigned_to' (latest deal owner).
+    """
+    if by not in COHORT_DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown cohort dimension: {by}")
+
+    sums = [func.sum(getattr(FunnelRollup, stage)) for stage in FUNNEL_STAGES]
+    if by == "product":
+        keys = [FunnelRollup.product_id, ProductTechnology.name]
+        query = db.query(*keys, *sums).outerjoin(ProductTechnology, ProductTechnology.id == FunnelRollup.product_id)
+    else:
+        keys = [FunnelRollup.week_start if by == "week" else FunnelRollup.assigned_to]
+        query = db.query(*keys, *sums)
+
+    result = []
+    for row in query.group_by(*keys).all():
+        counts = row[len(keys):]
+        entry = {"cohort": row[len(keys) - 1]}
+        if by == "product":
+            entry["product_id"] = row[0]
+        entry.update(zip(FUNNEL_STAGES, counts))
+        result.append(entry)
+    result.sort(key=lambda entry: (entry["cohort"] is None, str(entry["cohort"])))
+    return json_response({"by": by, "cohorts": result}, response)
+
+@router.get("/providers", dependencies=[Depends(versioned("provider_calls", extra=lambda: datetime.utcnow().strftime("%Y-%m-%dT%H")))])
+def providers(response: Response, days: int = 7, db: Session = Depends(get_db)):
+    """
+    Return external API usage per provider over the last `days` days: calls, error rate,
+    latency percentiles (ms), OpenAI tokens, and quota used within each provider's own window.
+    Busiest providers first: they are the ones worth caching or batching.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    totals = (
+        db.query(
+            ProviderCall.provider, ProviderCall.operation, func.count(ProviderCall.id),
+            func.sum(case((ProviderCall.ok.is_(False), 1), else_=0)),
+            func.coalesce(func.sum(ProviderCall.prompt_tokens), 0),
+            func.coalesce(func.sum(ProviderCall.completion_tokens), 0),
+        )
+        .filter(ProviderCall.started_at >= cutoff)
+        .group_by(ProviderCall.provider, ProviderCall.operation)
+        .all()
+    )
+    durations = (
+        db.query(ProviderCall.provider, ProviderCall.operation, ProviderCall.duration_ms)
+        .filter(ProviderCall.started_at >= cutoff)
+        .order_by(ProviderCall.provider, ProviderCall.operation)
+        .all()
+    )
+    latencies = {key: [row[2] for row in rows] for key, rows in groupby(durations, key=lambda row: row[:2])}
+
+    result = {}
+    for provider, operation, calls, errors, prompt_tokens, completion_tokens in totals:
+        entry = result.setdefault(provider, {
+            "provider": provider, "calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            "operations": [], "_latencies": [],
+        })
+        operation_latencies = latencies.get((provider, operation), [])
+        entry["operations"].append({
+            "operation": operation, "calls": calls, "errors": errors,
+            "error_rate_percent": _percent(errors, calls), "latency_ms": _latency_percentiles(operation_latencies),
+        })
+        entry["_latencies"] += operation_latencies
+        entry["calls"] += calls
+        entry["errors"] += errors
+        entry["prompt_tokens"] += prompt_tokens
+        entry["completion_tokens"] += completion_tokens
+
+    for provider, policy in QUOTAS.items():
+        used = (
+            db.query(func.coalesce(func.sum(ProviderCall.quota_units), 0))
+            .filter(ProviderCall.provider == provider, ProviderCall.started_at >= datetime.utcnow() - timedelta(days=policy.window_days))
+            .scalar()
+        )
+        if provider in result or used:
+            entry = result.setdefault(provider, {"provider": provider, "calls": 0, "errors": 0, "operations": [], "_latencies": []})
+            entry["quota"] = {
+                "used": used, "limit": policy.limit, "unit": policy.unit, "window_days": policy.window_days,
+                "used_percent": _percent(used, policy.limit),
+            }
+
+    for entry in result.values():
+        entry["error_rate_percent"] = _percent(entry["errors"], entry["calls"])
+        entry["latency_ms"] = _latency_percentiles(entry.pop("_latencies"))
+        entry.setdefault("quota", None)
+    return json_response({"days": days, "providers": sorted(result.values(), key=lambda entry: -entry["calls"])}, response)
+
+@router.get("/outbox")
+def outbox(db: Session = Depends(get_db)):
+    """
+    Return outbox delivery state: event counts by type and status, and the age of the oldest
+    undelivered event (a growing age means the dispatcher is down or a provider keeps failing).
+    Not ETag-cached: the dispatcher updates rows outside the ORM.
+    """
+    return outbox_stats(db)
+
+def refresh_funnel_rollups(bind=None, wait: bool = True) -> int:
+    """
+    Recompute funnel_rollups from the base tables with a single INSERT ... SELECT, on its own session.
+    Meetings and deals are pre-aggregated per outreach so the join never fans out;
+    each outreach lands in exactly one (week, product, owner) bucket.
+    Callers queued behind a running refresh reuse its result; wait=False returns at once if one is running.
+    Call from cron/workers too. Returns: number of rollup rows written (0 if another refresh covered this call).
+    """
+    requested = datetime.utcnow()
+    if not _refresh_lock.acquire(blocking=wait):
+        return 0
+    try:
+        with Session(bind=bind or database.engine) as db:
+            last_refresh = db.query(func.max(FunnelRollup.refreshed_at)).scalar()
+            if last_refresh is not None and last_refresh >= requested:
+                return 0  # refreshed while we waited for the lock
+            per_outreach = (
+                db.query(
+                    Meeting.outreach_id.label("outreach_id"),
+                    func.count(Deal.id).label("deals"),
+                    func.sum(case((Deal.stage == DealStage.ESTABLISHED, 1), else_=0)).label("established"),
+                    func.max(Deal.id).label("last_deal_id"),
+                )
+                .outerjoin(Deal, Deal.meeting_id == Meeting.id)
+                .group_by(Meeting.outreach_id)
+                .subquery()
+            )
+            last_deal = aliased(Deal)
+            week = _week_start(db, Outreach.date)
+            keys = [week, TargetCompany.product_technology_id, last_deal.assigned_to]
+            rollup_select = (
+                db.query(
+                    *keys,
+                    func.count(Outreach.id),
+                    func.sum(case((Outreach.response.in_(REPLIED), 1), else_=0)),
+                    func.sum(case((Outreach.response == OutreachResponse.INTERESTED, 1), else_=0)),
+                    func.count(per_outreach.c.outreach_id),
+                    func.sum(case((per_outreach.c.deals > 0, 1), else_=0)),
+                    func.sum(case((per_outreach.c.established > 0, 1), else_=0)),
+                    literal(datetime.utcnow(), DateTime),
+                )
+                .select_from(Outreach)
+                .outerjoin(per_outreach, per_outreach.c.outreach_id == Outreach.id)
+                .outerjoin(last_deal, last_deal.id == per_outreach.c.last_deal_id)
+                .outerjoin(Stakeholder, Stakeholder.id == Outreach.stakeholder_id)
+                .outerjoin(TargetCompany, TargetCompany.id == Stakeholder.company_id)
+                .group_by(*keys)
+            )
+            columns = ["week_start", "product_id", "assigned_to", *FUNNEL_STAGES, "refreshed_at"]
+            deleted = db.query(FunnelRollup).delete()
+            result = db.execute(insert(FunnelRollup).from_select(columns, rollup_select.statement))
+            if deleted or result.rowcount:
+                # Bulk statements skip the ORM flush hook, so bump the ETag version here
+                bump_table_versions(db.connection(), ["funnel_rollups"])
+            db.commit()
+            return result.rowcount
+    finally:
+        _refresh_lock.release()
+
+def _week_start(db: Session, column):
+    """Truncate a datetime column to its week's Monday as 'YYYY-MM-DD' (dialect specific)."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.date(column, "weekday 0", "-6 days")
+    return func.to_char(func.date_trunc("week", column), "YYYY-MM-DD")
+
+def _percent(part: int, whole: int) -> float:
+    return round(part / whole * 100, 2) if whole else 0
+
+def _latency_percentiles(values: list) -> dict:
+    """Nearest-rank p50/p95/p99 of a list of latencies (ms)."""
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    ordered = sorted(values)
+    return {f"p{p}": round(ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))], 1) for p in (50, 95, 99)}
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from typing import List, Optional, Union
+
+from database import get_db
+from models import TargetCompany, CompanySize
+from routers.etag import versioned
+from routers.pagination import PageParams, paginate
+from routers.serialization import ColumnarPage, ListFormat, json_rows
+
+router = APIRouter(prefix="/companies", tags=["Companies"])
+
+class CompanyCreate(BaseModel):
+    name: str
+    product_technology_id: Optional[int] = None
+    industry: str = ""
+    size: CompanySize = CompanySize.MEDIUM
+    revenue: str = ""
+    contact_info: str = ""
+
+class CompanyOut(BaseModel):
+    id: int
+    name: str
+    product_technology_id: Optional[int]
+    industry: Optional[str]
+    size: Optional[CompanySize]
+    revenue: Optional[str]
+    status: Optional[str]
+
+@router.post("/", response_model=dict)
+def create_company(company: CompanyCreate, db: Session = Depends(get_db)):
+    new_company = TargetCompany(**company.model_dump())
+    db.add(new_company)
+    db.commit()
+    db.refresh(new_company)
+    return {"id": new_company.id, "message": "Company created"}
+
+@router.get("/", response_model=Union[List[CompanyOut], ColumnarPage], dependencies=[Depends(versioned("companies"))])
+def list_companies(
+    response: Response,
+    q: str = "",
+    product_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    format: ListFormat = "json",
+    db: Session = Depends(get_db),
+):
+    query = db.query(
+        TargetCompany.id, TargetCompany.name, TargetCompany.product_technology_id, TargetCompany.industry,
+        TargetCompany.size, TargetCompany.revenue, TargetCompany.status,
+    )
+    if q:
+        query = query.filter(TargetCompany.name.ilike(f"%{q}%"))
+    if product_id is not None:
+        query = query.filter(TargetCompany.product_technology_id == product_id)
+    return json_rows(paginate(query, TargetCompany.id, page, response), response, format, query)
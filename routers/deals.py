@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional, Union
 from datetime import datetime
 
 from database import get_db
-from models import Deal, Meeting, DealStage
+from models import Deal, Meeting, Outreach, DealStage
+from outbox import enqueue
+from routers.etag import versioned
+from routers.pagination import PageParams, paginate
+from routers.serialization import ColumnarPage, ListFormat, json_rows
 
 router = APIRouter(prefix="/deals", tags=["Deals"])
 
@@ -18,6 +22,14 @@ class DealCreate(BaseModel):
 class DealUpdateStage(BaseModel):
     stage: DealStage
 
+class DealOut(BaseModel):
+    id: int
+    meeting_id: Optional[int]
+    stage: Optional[DealStage]
+    notes: Optional[str]
+    assigned_to: Optional[str]
+    assigned_at: Optional[datetime]
+
 @router.post("/", response_model=dict)
 def create_deal(deal: DealCreate, db: Session = Depends(get_db)):
     meeting = db.query(Meeting).filter(Meeting.id == deal.meeting_id).first()
@@ -31,24 +43,23 @@ def create_deal(deal: DealCreate, db: Session = Depends(get_db)):
         assigned_at=datetime.utcnow()
     )
     db.add(new_deal)
+    _queue_hubspot_sync(db, deal.meeting_id)
     db.commit()
     db.refresh(new_deal)
     return {"id": new_deal.id, "message": "Deal created"}
 
-@router.get("/", response_model=List[dict])
-def list_deals(db: Session = Depends(get_db)):
-    deals = db.query(Deal).all()
-    return [
-        {
-            "id": d.id,
-            "meeting_id": d.meeting_id,
-            "stage": d.stage.value,
-            "notes": d.notes,
-            "assigned_to": d.assigned_to,
-            "assigned_at": d.assigned_at.isoformat() if d.assigned_at else None,
-        }
-        for d in deals
-    ]
+@router.get("/", response_model=Union[List[DealOut], ColumnarPage], dependencies=[Depends(versioned("deals"))])
+def list_deals(
+    response: Response,
+    stage: Optional[DealStage] = None,
+    page: PageParams = Depends(),
+    format: ListFormat = "json",
+    db: Session = Depends(get_db),
+):
+    query = db.query(Deal.id, Deal.meeting_id, Deal.stage, Deal.notes, Deal.assigned_to, Deal.assigned_at)
+    if stage is not None:
+        query = query.filter(Deal.stage == stage)
+    return json_rows(paginate(query, Deal.id, page, response), response, format, query)
 
 @router.put("/{deal_id}/stage")
 def update_deal_stage(deal_id: int, stage_update: DealUpdateStage, db: Session = Depends(get_db)):
@@ -56,5 +67,15 @@ def update_deal_stage(deal_id: int, stage_update: DealUpdateStage, db: Session =
     if not deal:
         raise HTTPException(status_code=404, detail="Deal not found")
     deal.stage = stage_update.stage
+    _queue_hubspot_sync(db, deal.meeting_id)
     db.commit()
-    return {"message": "Deal stage updated"}
\ No newline at end of file
+    return {"message": "Deal stage updated"}
+
+def _queue_hubspot_sync(db: Session, meeting_id: int):
+    """Queue the deal's stakeholder for HubSpot (its lifecycle stage follows the deal stage)."""
+    stakeholder_id = (
+        db.query(Outreach.stakeholder_id).join(Meeting, Meeting.outreach_id == Outreach.id)
+        .filter(Meeting.id == meeting_id).scalar()
+    )
+    if stakeholder_id is not None:
+        enqueue(db, "hubspot.sync_contacts", {"stakeholder_ids": [stakeholder_id]})
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+ETag support for list/analytics endpoints.
+The tag is derived from table_versions (bumped on every write, see models.py) plus
+the request path and query string, so it can be checked before running the real query:
+a matching If-None-Match gets an empty 304 after a single primary-key lookup.
+Usage: @router.get("/", dependencies=[Depends(versioned("deals"))])
+"""
+import hashlib
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models import TableVersion
+
+def compute_etag(db: Session, tables, *extra) -> str:
+    """Weak ETag over the current versions of `tables` and any extra request details."""
+    versions = db.query(TableVersion.table_name, TableVersion.version).filter(TableVersion.table_name.in_(tables)).all()
+    raw = repr((sorted(versions), extra))
+    return 'W/"' + hashlib.blake2b(raw.encode(), digest_size=12).hexdigest() + '"'
+
+def versioned(*tables, extra=None):
+    """
+    Build a dependency that answers 304 when If-None-Match matches, else sets ETag.
+    tables: table names the response is derived from.
+    extra: optional callable returning additional tag input (e.g., today's date).
+    """
+    def check_etag(request: Request, response: Response, db: Session = Depends(get_db)):
+        etag = compute_etag(db, tables, request.url.path, request.url.query, extra() if extra else None)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in request.headers.get("if-none-match", ""):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+    return check_etag
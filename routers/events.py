@@ -0,0 +1,47 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from change_feed import long_poll, sse_stream
+from models import FEED_TABLES
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+def _tables(tables: Optional[List[str]]):
+    unknown = set(tables or []) - set(FEED_TABLES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Not on the feed: {', '.join(sorted(unknown))}")
+    return tables or None
+
+@router.get("/")
+async def stream_events(
+    request: Request,
+    cursor: Optional[int] = None,
+    tables: Optional[List[str]] = Query(None),
+    last_event_id: Optional[int] = Header(None),
+):
+    """
+    Server-Sent Events stream of outreach/meeting/deal changes: {"id", "table", "op", "row_id"}.
+    Resume with ?cursor=<last id> or the Last-Event-ID header (browsers' EventSource sends it on reconnect);
+    without either the stream starts at the current head.
+    """
+    start = cursor if cursor is not None else last_event_id
+    return StreamingResponse(
+        sse_stream(start, _tables(tables), request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/changes")
+async def poll_events(
+    cursor: Optional[int] = None,
+    tables: Optional[List[str]] = Query(None),
+    wait: float = Query(0, ge=0, le=30),
+):
+    """
+    Long-poll alternative to the stream: events after `cursor`, waiting up to `wait` seconds for one.
+    Returns: {"cursor": resume from here, "events": [...], "reset": reload everything}.
+    """
+    batch = await long_poll(cursor, _tables(tables), wait)
+    return {"cursor": batch.cursor, "events": batch.events, "reset": batch.reset}
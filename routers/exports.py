@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models import ProductTechnology, TargetCompany, Stakeholder, Outreach, Meeting, Deal, readable_select
+from utils import stream_csv, stream_columnar
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+EXPORTABLE = {model.__tablename__: model for model in (ProductTechnology, TargetCompany, Stakeholder, Outreach, Meeting, Deal)}
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+@router.get("/{table}")
+def export_table(table: str, format: str = "csv", db: Session = Depends(get_db)):
+    """
+    Stream a whole table as a download: csv, parquet (one row group per chunk) or arrow (IPC stream).
+    Rows are read and written in EXPORT_CHUNK_SIZE chunks, so memory does not grow with table size.
+    """
+    model = EXPORTABLE.get(table)
+    if model is None:
+        raise HTTPException(status_code=404, detail=f"Unknown table: {table}")
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    if format != "csv":
+        try:
+            import pyarrow  # noqa: F401  (optional dependency)
+        except ImportError:
+            raise HTTPException(status_code=501, detail="pyarrow is required for parquet/arrow exports")
+
+    statement = readable_select(model.__table__).order_by(model.__table__.c.id)
+    media_type, extension = FORMATS[format]
+    body = stream_csv(db, statement) if format == "csv" else stream_columnar(db, statement, format)
+    headers = {"Content-Disposition": f'attachment; filename="{table}.{extension}"'}
+    return StreamingResponse(body, media_type=media_type, headers=headers)
@@ -1,54 +1,129 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import List
-from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
+from datetime import datetime, timedelta, timezone
 
+from calendly_scheduler import WINDOW_DAYS, available_slots, resolve_event_type, schedule_outreaches
 from database import get_db
-from models import Meeting, Outreach, MeetingStatus
+from meeting_index import INDEX, overlapping_meetings, participant_keys
+from models import Meeting, Outreach, MeetingStatus, Stakeholder
+from routers.etag import versioned
+from routers.pagination import PageParams, paginate
+from routers.serialization import ColumnarPage, ListFormat, json_response, json_rows
 
 router = APIRouter(prefix="/meetings", tags=["Meetings"])
 
 class MeetingCreate(BaseModel):
     outreach_id: int
     scheduled_date: datetime
+    duration_minutes: int = Field(30, gt=0, le=24 * 60)
     participants: str
     agenda: str
+    allow_conflicts: bool = False  # save anyway and return the overlaps instead of 409
+
+class MeetingReschedule(BaseModel):
+    scheduled_date: datetime
+    duration_minutes: Optional[int] = Field(None, gt=0, le=24 * 60)
+    allow_conflicts: bool = False
 
 class MeetingUpdateStatus(BaseModel):
     status: MeetingStatus
 
+class MeetingOut(BaseModel):
+    id: int
+    outreach_id: Optional[int]
+    scheduled_date: Optional[datetime]
+    duration_minutes: int
+    participants: Optional[str]
+    agenda: Optional[str]
+    status: Optional[MeetingStatus]
+
+def _utc_naive(moment: datetime) -> datetime:
+    """Aware datetimes -> naive UTC (how DateTime columns are stored here)."""
+    return moment if moment.tzinfo is None else moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+def check_conflicts(db: Session, participants: str, stakeholder_email: str, start: datetime, minutes: int,
+                    allow: bool, exclude_id: int = None) -> list:
+    """
+    Return overlapping meetings for the participants; raises 409 listing them unless `allow`.
+    Call under INDEX.booking() and commit before releasing it; an empty index result is confirmed in the database.
+    """
+    INDEX.sync(db)
+    keys, end = participant_keys(participants, stakeholder_email), start + timedelta(minutes=minutes)
+    found = (INDEX.conflicts(keys, start, end, exclude_id=exclude_id)
+             or overlapping_meetings(db, keys, start, end, exclude_id=exclude_id))
+    conflicts = [{**c, "start": c["start"].isoformat(), "end": c["end"].isoformat()} for c in found]
+    if conflicts and not allow:
+        raise HTTPException(status_code=409, detail={"message": "Meeting overlaps existing meetings", "conflicts": conflicts})
+    return conflicts
+
+class CalendlySchedule(BaseModel):
+    outreach_ids: Optional[List[int]] = None  # default: every interested outreach without a meeting
+    event_type_uri: Optional[str] = None
+    days: int = WINDOW_DAYS
+
 @router.post("/", response_model=dict)
 def create_meeting(meeting: MeetingCreate, db: Session = Depends(get_db)):
     outreach = db.query(Outreach).filter(Outreach.id == meeting.outreach_id).first()
     if not outreach:
         raise HTTPException(status_code=404, detail="Outreach not found")
-    new_meeting = Meeting(
-        outreach_id=meeting.outreach_id,
-        scheduled_date=meeting.scheduled_date,
-        participants=meeting.participants,
-        agenda=meeting.agenda,
-        status=MeetingStatus.SCHEDULED
-    )
-    db.add(new_meeting)
-    db.commit()
+    scheduled_date = _utc_naive(meeting.scheduled_date)
+    stakeholder_email = db.query(Stakeholder.email).filter(Stakeholder.id == outreach.stakeholder_id).scalar()
+    with INDEX.booking():
+        conflicts = check_conflicts(db, meeting.participants, stakeholder_email, scheduled_date,
+                                    meeting.duration_minutes, meeting.allow_conflicts)
+        new_meeting = Meeting(
+            outreach_id=meeting.outreach_id,
+            scheduled_date=scheduled_date,
+            duration_minutes=meeting.duration_minutes,
+            participants=meeting.participants,
+            agenda=meeting.agenda,
+            status=MeetingStatus.SCHEDULED
+        )
+        db.add(new_meeting)
+        db.commit()
     db.refresh(new_meeting)
-    return {"id": new_meeting.id, "message": "Meeting scheduled"}
-
-@router.get("/", response_model=List[dict])
-def list_meetings(db: Session = Depends(get_db)):
-    meetings = db.query(Meeting).all()
-    return [
-        {
-            "id": m.id,
-            "outreach_id": m.outreach_id,
-            "scheduled_date": m.scheduled_date.isoformat(),
-            "participants": m.participants,
-            "agenda": m.agenda,
-            "status": m.status.value,
-        }
-        for m in meetings
-    ]
+    return {"id": new_meeting.id, "message": "Meeting scheduled", "conflicts": conflicts}
+
+@router.get("/free-slots", response_model=List[dict])
+def free_slots(
+    participants: List[str] = Query(..., description="emails or names; repeat the parameter or comma-separate"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    duration_minutes: int = Query(30, gt=0, le=24 * 60),
+    day_start: int = Query(9, ge=0, le=23),
+    day_end: int = Query(17, ge=1, le=24),
+    weekdays_only: bool = True,
+    limit: int = Query(20, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    """Common free time of all participants within working hours (UTC), default window: the next 7 days."""
+    window_start = _utc_naive(start) if start else datetime.utcnow().replace(second=0, microsecond=0)
+    window_end = _utc_naive(end) if end else window_start + timedelta(days=7)
+    if window_end <= window_start or day_end <= day_start:
+        raise HTTPException(status_code=400, detail="Empty time window")
+    keys = set().union(*(participant_keys(p) for p in participants))
+    INDEX.sync(db)
+    gaps = INDEX.free_slots(keys, window_start, window_end, timedelta(minutes=duration_minutes),
+                            day_start=day_start, day_end=day_end, weekdays_only=weekdays_only, limit=limit)
+    return json_response([{"start": gap_start, "end": gap_end} for gap_start, gap_end in gaps])
+
+@router.get("/", response_model=Union[List[MeetingOut], ColumnarPage], dependencies=[Depends(versioned("meetings"))])
+def list_meetings(
+    response: Response,
+    status: Optional[MeetingStatus] = None,
+    page: PageParams = Depends(),
+    format: ListFormat = "json",
+    db: Session = Depends(get_db),
+):
+    query = db.query(
+        Meeting.id, Meeting.outreach_id, Meeting.scheduled_date, Meeting.duration_minutes, Meeting.participants,
+        Meeting.agenda, Meeting.status,
+    )
+    if status is not None:
+        query = query.filter(Meeting.status == status)
+    return json_rows(paginate(query, Meeting.id, page, response), response, format, query)
 
 @router.put("/{meeting_id}/status")
 def update_meeting_status(meeting_id: int, update: MeetingUpdateStatus, db: Session = Depends(get_db)):
@@ -57,4 +132,37 @@ def update_meeting_status(meeting_id: int, update: MeetingUpdateStatus, db: Sess
         raise HTTPException(status_code=404, detail="Meeting not found")
     meeting.status = update.status
     db.commit()
-    return {"message": "Meeting status updated"}
\ No newline at end of file
+    return {"message": "Meeting status updated"}
+
+@router.put("/{meeting_id}/schedule", response_model=dict)
+def reschedule_meeting(meeting_id: int, update: MeetingReschedule, db: Session = Depends(get_db)):
+    """Move a meeting (and optionally change its length); 409 on overlaps unless allow_conflicts."""
+    meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    scheduled_date = _utc_naive(update.scheduled_date)
+    minutes = update.duration_minutes or meeting.duration_minutes
+    stakeholder_email = (
+        db.query(Stakeholder.email).join(Outreach, Outreach.stakeholder_id == Stakeholder.id)
+        .filter(Outreach.id == meeting.outreach_id).scalar()
+    )
+    with INDEX.booking():
+        conflicts = check_conflicts(db, meeting.participants, stakeholder_email, scheduled_date, minutes,
+                                    update.allow_conflicts, exclude_id=meeting.id)
+        meeting.scheduled_date, meeting.duration_minutes = scheduled_date, minutes
+        db.commit()
+    return {"message": "Meeting rescheduled", "conflicts": conflicts}
+
+@router.get("/calendly/availability", response_model=dict)
+def calendly_availability(event_type_uri: Optional[str] = None, days: int = WINDOW_DAYS, limit: int = 20):
+    """Free Calendly slots for the event type (cached briefly, so repeated renders cost no API calls)."""
+    event_type = resolve_event_type(event_type_uri)
+    if not event_type:
+        raise HTTPException(status_code=502, detail="No Calendly event type available")
+    slots = available_slots(event_type["uri"], days)
+    return {"event_type": event_type, "count": len(slots), "slots": slots[:limit]}
+
+@router.post("/calendly/schedule", response_model=dict)
+def calendly_schedule(request: CalendlySchedule, db: Session = Depends(get_db)):
+    """Book Calendly slots for interested outreaches in one pass and add their meetings; returns counts."""
+    return schedule_outreaches(db, outreach_ids=request.outreach_ids, event_type_uri=request.event_type_uri, days=request.days)
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional, Union
 from datetime import datetime
 
+import campaigns
 from database import get_db
-from models import Outreach, Stakeholder, OutreachResponse
+from models import MessageBody, Outreach, Stakeholder, OutreachResponse
+from outbox import enqueue
+from routers.etag import versioned
+from routers.pagination import PageParams, paginate
+from routers.serialization import ColumnarPage, ListFormat, json_rows
 
 router = APIRouter(prefix="/outreaches", tags=["Outreaches"])
 
@@ -13,16 +19,44 @@ class OutreachCreate(BaseModel):
     stakeholder_id: int
     message: str
     notes: str = ""
+    send_email: bool = False  # queue the message to the stakeholder's email (delivered by outbox.py)
+    subject: str = "JV Opportunity"
 
 class OutreachUpdateResponse(BaseModel):
     response: OutreachResponse
     notes: str = ""
 
+class CampaignCreate(BaseModel):
+    product_id: Optional[int] = None  # audience: stakeholders of companies matched to this product
+    stakeholder_ids: Optional[List[int]] = None  # or exactly these stakeholders (default: everyone)
+    product: Optional[str] = None  # product to pitch (default: each company's matched product)
+    subject: str = campaigns.DEFAULT_SUBJECT  # may use the same {{placeholders}} as the body
+    send_email: bool = False
+    dry_run: bool = False
+
+class DraftRequest(BaseModel):
+    stakeholder_id: int
+    product: Optional[str] = None
+
+class OutreachOut(BaseModel):
+    id: int
+    stakeholder_id: Optional[int]
+    stakeholder: Optional[str]
+    message: Optional[str] = None  # only with ?include_message=true
+    notes: Optional[str]
+    date: Optional[datetime]
+    response: Optional[OutreachResponse]
+    follow_up_date: Optional[datetime]
+    follow_up_count: int
+    next_action_at: Optional[datetime]
+
 @router.post("/", response_model=dict)
 def create_outreach(outreach: OutreachCreate, db: Session = Depends(get_db)):
     stakeholder = db.query(Stakeholder).filter(Stakeholder.id == outreach.stakeholder_id).first()
     if not stakeholder:
         raise HTTPException(status_code=404, detail="Stakeholder not found")
+    if outreach.send_email and not stakeholder.email:
+        raise HTTPException(status_code=400, detail="Stakeholder has no email")
     new_outreach = Outreach(
         stakeholder_id=outreach.stakeholder_id,
         message=outreach.message,
@@ -31,25 +65,60 @@ def create_outreach(outreach: OutreachCreate, db: Session = Depends(get_db)):
         response=OutreachResponse.NO_RESPONSE
     )
     db.add(new_outreach)
+    if outreach.send_email:
+        db.flush()  # the event carries the outreach id, so the outbox can record the email's Gmail thread
+        enqueue(db, "email.send", {"to": stakeholder.email, "subject": outreach.subject, "body": outreach.message,
+                                   "outreach_id": new_outreach.id})
     db.commit()
     db.refresh(new_outreach)
-    return {"id": new_outreach.id, "message": "Outreach created"}
-
-@router.get("/", response_model=List[dict])
-def list_outreaches(db: Session = Depends(get_db)):
-    outreaches = db.query(Outreach).all()
-    return [
-        {
-            "id": o.id,
-            "stakeholder_id": o.stakeholder_id,
-            "message": o.message,
-            "notes": o.notes,
-            "date": o.date.isoformat(),
-            "response": o.response.value,
-            "follow_up_date": o.follow_up_date.isoformat() if o.follow_up_date else None,
-        }
-        for o in outreaches
-    ]
+    return {"id": new_outreach.id, "message": "Outreach created", "email_queued": outreach.send_email}
+
+@router.post("/campaign", response_model=dict)
+def create_campaign(campaign: CampaignCreate, db: Session = Depends(get_db)):
+    """One AI template per segment (product × role × industry), personalized locally for every recipient."""
+    return campaigns.run_campaign(db, **campaign.model_dump())
+
+@router.post("/draft", response_model=dict)
+def draft_outreach(draft: DraftRequest, db: Session = Depends(get_db)):
+    """Subject and body for one stakeholder from their segment's (cached) template."""
+    result = campaigns.draft_email(db, draft.stakeholder_id, draft.product)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Stakeholder not found")
+    return result
+
+@router.post("/draft/stream")
+def stream_draft(draft: DraftRequest, db: Session = Depends(get_db)):
+    """The draft body as plain text, sent as it is written (a new segment's template streams from OpenAI)."""
+    body = campaigns.draft_stream(db, draft.stakeholder_id, draft.product)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Stakeholder not found")
+    return StreamingResponse(body, media_type="text/plain; charset=utf-8", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/", response_model=Union[List[OutreachOut], ColumnarPage], dependencies=[Depends(versioned("outreaches", "stakeholders"))])
+def list_outreaches(
+    response: Response,
+    stakeholder_id: Optional[int] = None,
+    status: Optional[OutreachResponse] = None,
+    page: PageParams = Depends(),
+    format: ListFormat = "json",
+    include_message: bool = False,
+    db: Session = Depends(get_db),
+):
+    """Message bodies live in message_bodies and are left out unless include_message=true."""
+    columns = [Outreach.id, Outreach.stakeholder_id, Stakeholder.name.label("stakeholder")]
+    if include_message:
+        columns.append(MessageBody.body.label("message"))
+    query = db.query(
+        *columns, Outreach.notes, Outreach.date, Outreach.response, Outreach.follow_up_date, Outreach.follow_up_count,
+        Outreach.next_action_at,
+    ).outerjoin(Stakeholder, Stakeholder.id == Outreach.stakeholder_id)
+    if include_message:
+        query = query.outerjoin(MessageBody, MessageBody.sha256 == Outreach.message_sha256)
+    if stakeholder_id is not None:
+        query = query.filter(Outreach.stakeholder_id == stakeholder_id)
+    if status is not None:
+        query = query.filter(Outreach.response == status)
+    return json_rows(paginate(query, Outreach.id, page, response), response, format, query)
 
 @router.put("/{outreach_id}/response")
 def update_outreach_response(outreach_id: int, update: OutreachUpdateResponse, db: Session = Depends(get_db)):
@@ -0,0 +1,36 @@
+"""
+Keyset pagination shared by the list endpoints.
+Clients pass ?limit=&after_id=; the cursor for the next page comes back in the
+X-Next-Cursor header (absent on the last page). Each page costs O(limit) via the
+primary-key index, no matter how deep into the table the client is.
+"""
+from typing import Optional
+from fastapi import Query, Response
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class PageParams:
+    """FastAPI dependency: ?limit=50&after_id=<last id of the previous page>."""
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after_id: Optional[int] = Query(None, ge=0),
+    ):
+        self.limit = limit
+        self.after_id = after_id
+
+def paginate(query, id_column, page: PageParams, response: Response, cursor_of=lambda row: row.id) -> list:
+    """
+    Apply the keyset window to `query` (ordered by `id_column`) and set X-Next-Cursor.
+    Fetches one extra row to know whether another page exists.
+    cursor_of: extracts the id from a result row (override for multi-entity rows).
+    """
+    if page.after_id is not None:
+        query = query.filter(id_column > page.after_id)
+    rows = query.order_by(id_column).limit(page.limit + 1).all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = str(cursor_of(rows[-1]))
+    return rows
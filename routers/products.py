@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from typing import List, Optional, Union
+
+from database import get_db
+from models import ProductTechnology, MarketAlignment
+from routers.etag import versioned
+from routers.pagination import PageParams, paginate
+from routers.serialization import ColumnarPage, ListFormat, json_rows
+
+router = APIRouter(prefix="/products", tags=["Products"])
+
+class ProductCreate(BaseModel):
+    name: str
+    description: str = ""
+    market_alignment: MarketAlignment = MarketAlignment.MEDIUM
+    manufacturing_suitability: Optional[MarketAlignment] = None
+    revenue_potential: str = ""
+    status: str = "research"
+
+class ProductOut(BaseModel):
+    id: int
+    name: str
+    description: Optional[str]
+    market_alignment: Optional[MarketAlignment]
+    revenue_potential: Optional[str]
+    status: Optional[str]
+
+@router.post("/", response_model=dict)
+def create_product(product: ProductCreate, db: Session = Depends(get_db)):
+    new_product = ProductTechnology(**product.model_dump())
+    db.add(new_product)
+    db.commit()
+    db.refresh(new_product)
+    return {"id": new_product.id, "message": "Product created"}
+
+@router.get("/", response_model=Union[List[ProductOut], ColumnarPage], dependencies=[Depends(versioned("products"))])
+def list_products(
+    response: Response,
+    q: str = "",
+    page: PageParams = Depends(),
+    format: ListFormat = "json",
+    db: Session = Depends(get_db),
+):
+    query = db.query(
+        ProductTechnology.id, ProductTechnology.name, ProductTechnology.description, ProductTechnology.market_alignment,
+        ProductTechnology.revenue_potential, ProductTechnology.status,
+    )
+    if q:
+        query = query.filter(ProductTechnology.name.ilike(f"%{q}%"))
+    return json_rows(paginate(query, ProductTechnology.id, page, response), response, format, query)
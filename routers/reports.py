@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from database import get_db
+from reports import submit_report, get_job
+from routers.exports import EXPORTABLE
+
+router = APIRouter(prefix="/reports", tags=["Reports"])
+
+@router.post("/{table}", status_code=202)
+def create_report(table: str, request: Request, title: str = None, db: Session = Depends(get_db)):
+    """
+    Start a PDF report of a whole table in the background.
+    Returns a job handle immediately; poll status_url, then fetch download_url once done.
+    """
+    if table not in EXPORTABLE:
+        raise HTTPException(status_code=404, detail=f"Unknown table: {table}")
+    job = submit_report(db.get_bind(), table, title)
+    return {
+        **job.to_dict(),
+        "status_url": str(request.url_for("report_status", job_id=job.id)),
+        "download_url": str(request.url_for("download_report", job_id=job.id)),
+    }
+
+@router.get("/jobs/{job_id}")
+def report_status(job_id: str):
+    """Return a report job's status and progress (pages_done / total_pages)."""
+    return _job_or_404(job_id).to_dict()
+
+@router.get("/jobs/{job_id}/download")
+def download_report(job_id: str):
+    """Download a finished report (409 while it is still running)."""
+    job = _job_or_404(job_id)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Report is {job.status}")
+    return FileResponse(job.path, media_type="application/pdf", filename=f"{job.table}.pdf")
+
+def _job_or_404(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
@@ -0,0 +1,95 @@
+"""
+Fast JSON path for list and analytics endpoints.
+Endpoints select just the columns they return and hand the rows to json_rows()/json_response(): the
+content is encoded once by orjson (datetimes as ISO 8601, enums by value), skipping FastAPI's
+response_model validation and jsonable_encoder pass. The endpoint's response_model still documents
+the shape in OpenAPI. Falls back to the stdlib json module when orjson (optional) is not installed.
+?format=columnar returns {"columns": [names], "data": [one array per column], "dictionaries": {name: [values]}}
+instead of a list of objects: keys are sent once, and enum columns are sent as integer codes into their
+dictionary (the enum's declaration order, so codes are stable across pages; -1 is null). api_client.to_frame()
+decodes it into a pandas DataFrame.
+Usage: return json_rows(rows, response, format, query)  # response: the endpoint's Response parameter
+"""
+import enum
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Literal
+
+from fastapi import Response
+from pydantic import BaseModel
+
+try:
+    import orjson  # optional dependency: several times faster than json for row lists
+except ImportError:
+    orjson = None
+
+ListFormat = Literal["json", "columnar"]  # ?format= of the list endpoints
+
+class ColumnarPage(BaseModel):
+    """?format=columnar body (documents the OpenAPI schema; responses are not validated against it)."""
+    columns: List[str]
+    data: List[list]
+    dictionaries: Dict[str, List[str]]
+
+# Headers a dependency may have set on the injected Response (ETag, X-Next-Cursor, Cache-Control)
+_SKIP_HEADERS = ("content-length", "content-type")
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content) -> bytes:
+    """Encode content to JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+def json_response(content, response: Response = None) -> FastJSONResponse:
+    """Return content as JSON, keeping the headers dependencies set on `response` (returning a Response drops them)."""
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key not in _SKIP_HEADERS}
+    return FastJSONResponse(content, headers=headers)
+
+def json_rows(rows, response: Response = None, format: ListFormat = "json", query=None) -> FastJSONResponse:
+    """
+    Return column rows (select(...) / query(col, ...) results) as a JSON list of objects keyed by column label,
+    or in the columnar layout. query: the rows' Query, whose column types name the enum columns.
+    """
+    if format == "columnar":
+        return json_response(columnar(rows, query), response)
+    return json_response([dict(row._mapping) for row in rows], response)
+
+def columnar(rows, query=None) -> dict:
+    """Return {'columns', 'data', 'dictionaries'} for column rows (see module docstring)."""
+    columns = [description["name"] for description in query.column_descriptions] if query is not None else (
+        list(rows[0]._fields) if rows else [])
+    data = [list(values) for values in zip(*rows)] if rows else [[] for _ in columns]
+    dictionaries = {}
+    for position, name in enumerate(columns):
+        enum_class = _enum_class(query, position) or next(
+            (type(value) for value in data[position] if isinstance(value, enum.Enum)), None)
+        if enum_class is None:
+            continue
+        members = list(enum_class)
+        codes = {member: code for code, member in enumerate(members)}
+        data[position] = [-1 if value is None else codes[value] for value in data[position]]
+        dictionaries[name] = [member.value for member in members]
+    return {"columns": columns, "data": data, "dictionaries": dictionaries}
+
+def _enum_class(query, position: int):
+    if query is None:
+        return None
+    return getattr(query.column_descriptions[position]["type"], "enum_class", None)
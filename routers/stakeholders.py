@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, field_validator
+from typing import List, Optional, Union
+
+from database import get_db
+from models import LinkedInProfile, Stakeholder, TargetCompany, StakeholderRole
+from hubspot_sync import sync_stakeholders
+from linkedin_cache import get_profile, normalize_url
+from outbox import enqueue
+from routers.etag import versioned
+from routers.pagination import PageParams, paginate
+from routers.serialization import ColumnarPage, ListFormat, json_rows
+
+router = APIRouter(prefix="/stakeholders", tags=["Stakeholders"])
+
+class StakeholderCreate(BaseModel):
+    company_id: int
+    name: str
+    title: str = ""
+    email: str = ""
+    phone: str = ""
+    role: StakeholderRole = StakeholderRole.DECISION_MAKER
+    status: str = "identified"
+    linkedin_url: Optional[str] = None
+
+    @field_validator("linkedin_url")
+    @classmethod
+    def normalize_linkedin_url(cls, value):
+        return normalize_url(value) if value else None
+
+class StakeholderOut(BaseModel):
+    id: int
+    company_id: Optional[int]
+    company: Optional[str]
+    name: str
+    title: Optional[str]
+    email: Optional[str]
+    role: Optional[StakeholderRole]
+    status: Optional[str]
+    linkedin_url: Optional[str]
+    linkedin_headline: Optional[str]
+    linkedin_company: Optional[str]
+    linkedin_location: Optional[str]
+
+@router.post("/", response_model=dict)
+def create_stakeholder(stakeholder: StakeholderCreate, db: Session = Depends(get_db)):
+    company = db.query(TargetCompany).filter(TargetCompany.id == stakeholder.company_id).first()
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    new_stakeholder = Stakeholder(**stakeholder.model_dump())
+    db.add(new_stakeholder)
+    db.flush()
+    enqueue(db, "hubspot.sync_contacts", {"stakeholder_ids": [new_stakeholder.id]})
+    if new_stakeholder.linkedin_url:
+        enqueue(db, "linkedin.fetch_profile", {"url": new_stakeholder.linkedin_url})
+    db.commit()
+    db.refresh(new_stakeholder)
+    return {"id": new_stakeholder.id, "message": "Stakeholder created"}
+
+@router.get("/", response_model=Union[List[StakeholderOut], ColumnarPage], dependencies=[Depends(versioned("stakeholders", "companies", "linkedin_profiles"))])
+def list_stakeholders(
+    response: Response,
+    q: str = "",
+    company_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    format: ListFormat = "json",
+    db: Session = Depends(get_db),
+):
+    # Only the projected profile columns are selected; the compressed payload is never loaded here
+    query = (
+        db.query(
+            Stakeholder.id, Stakeholder.company_id, TargetCompany.name.label("company"), Stakeholder.name,
+            Stakeholder.title, Stakeholder.email, Stakeholder.role, Stakeholder.status, Stakeholder.linkedin_url,
+            LinkedInProfile.headline.label("linkedin_headline"), LinkedInProfile.company.label("linkedin_company"),
+            LinkedInProfile.location.label("linkedin_location"),
+        )
+        .outerjoin(TargetCompany, TargetCompany.id == Stakeholder.company_id)
+        .outerjoin(LinkedInProfile, LinkedInProfile.url == Stakeholder.linkedin_url)
+    )
+    if q:
+        query = query.filter(Stakeholder.name.ilike(f"%{q}%"))
+    if company_id is not None:
+        query = query.filter(Stakeholder.company_id == company_id)
+    return json_rows(paginate(query, Stakeholder.id, page, response), response, format, query)
+
+@router.post("/hubspot-sync", response_model=dict)
+def sync_to_hubspot(force: bool = False, db: Session = Depends(get_db)):
+    """Push new/changed stakeholders to HubSpot in batches; a re-run without changes makes no API calls."""
+    return sync_stakeholders(db, force=force)
+
+@router.get("/linkedin-profile", response_model=dict)
+def linkedin_profile(url: str, refresh: bool = False, db: Session = Depends(get_db)):
+    """Return the Proxycurl profile for a LinkedIn URL, served from the cache while fresh (refresh=true refetches)."""
+    try:
+        profile = get_profile(db, url, refresh=refresh)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not profile:
+        raise HTTPException(status_code=502, detail="LinkedIn profile unavailable")
+    return profile
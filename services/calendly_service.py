@@ -1,14 +1,83 @@
 """
 Calendly service for scheduling meetings.
+All calls share one pooled requests.Session, so a campaign reuses connections instead of a TLS handshake per invite.
 Easy to change: Add custom questions or webhooks here.
 """
 import os
 import requests
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+import config
+from services.ratelimit import provider_call, checked, ProviderUnavailable
 
-load_dotenv()
+config.load()
 TOKEN = os.getenv("CALENDLY_TOKEN")
-BASE_URL = "https://api.calendly.com"
+BASE_URL = os.getenv("CALENDLY_BASE_URL", "https://api.calendly.com")
+TIMEOUT = 30
+POOL_SIZE = 10
+
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
+_session.mount("https://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
+
+def _headers() -> dict:
+    return {
+        'Authorization': f'Bearer {TOKEN}',
+        'Content-Type': 'application/json'
+    }
+
+def get_current_user() -> dict:
+    """
+    The token owner.
+    Returns: {'uri', 'timezone', ...} or {} on error.
+    """
+    return _get("get_current_user", "/users/me").get("resource", {})
+
+def list_event_types(user_uri: str) -> list:
+    """
+    Active event types owned by `user_uri`.
+    Returns: [{'uri', 'name', 'duration', 'scheduling_url', ...}] or [] on error.
+    """
+    return _get("list_event_types", "/event_types", {"user": user_uri, "active": "true"}).get("collection", [])
+
+def list_available_times(event_type_uri: str, start_time: str, end_time: str) -> list:
+    """
+    Open slots of an event type between two ISO-8601 UTC times (Calendly allows at most 7 days per call).
+    Returns: [{'status', 'start_time', 'invitees_remaining', ...}] or [] on error.
+    """
+    params = {"event_type": event_type_uri, "start_time": start_time, "end_time": end_time}
+    return _get("list_available_times", "/event_type_available_times", params).get("collection", [])
+
+def create_invitee(event_type_uri: str, start_time: str, email: str, name: str, timezone: str = "UTC") -> dict:
+    """
+    Book `start_time` of an event type for one invitee (Scheduling API).
+    Returns: {'uri', 'event', 'email', ...} or {} on error (e.g. the slot was just taken).
+    """
+    if not TOKEN:
+        return {}
+    try:
+        return book_invitee(event_type_uri, start_time, email, name, timezone)
+    except (requests.RequestException, ProviderUnavailable, ValueError) as e:
+        print(f"Calendly error: {e}")
+        return {}
+
+def book_invitee(event_type_uri: str, start_time: str, email: str, name: str, timezone: str = "UTC") -> dict:
+    """
+    create_invitee() that raises the error, so the caller can tell (ratelimit.send_outcome) whether it was booked.
+    Returns: {'uri', 'event', 'email', ...}.
+    """
+    if not TOKEN:
+        raise ProviderUnavailable("CALENDLY_API_TOKEN not set")
+    data = {
+        'event_type': event_type_uri,
+        'start_time': start_time,
+        'invitee': {'email': email, 'name': name, 'timezone': timezone}
+    }
+    response = provider_call(
+        "calendly", "create_invitee",
+        lambda: checked(_session.post(f"{BASE_URL}/invitees", json=data, headers=_headers(), timeout=TIMEOUT)),
+        idempotent=False
+    )
+    return response.json().get("resource", {})
 
 def schedule_meeting(email: str, name: str, event_uri: str) -> dict:
     """
@@ -18,16 +87,32 @@ def schedule_meeting(email: str, name: str, event_uri: str) -> dict:
     """
     if not TOKEN:
         return {}
-    
-    headers = {
-        'Authorization': f'Bearer {TOKEN}',
-        'Content-Type': 'application/json'
-    }
+
     data = {
         'invitee': {'email': email, 'name': name, 'create': 1},
         'event_type': event_uri
     }
-    
+
     try:
-        response = requests.post(f"{BASE_URL}/scheduled_events", json=data, headers=headers)
-        response.raise_for_status()
\ No newline at end of file
+        response = provider_call(
+            "calendly", "schedule_meeting",
+            lambda: checked(_session.post(f"{BASE_URL}/scheduled_events", json=data, headers=_headers(), timeout=TIMEOUT)),
+            idempotent=False
+        )
+        return response.json()
+    except (requests.RequestException, ProviderUnavailable) as e:
+        print(f"Calendly error: {e}")
+        return {}
+
+def _get(operation: str, path: str, params: dict = None) -> dict:
+    if not TOKEN:
+        return {}
+    try:
+        response = provider_call(
+            "calendly", operation,
+            lambda: checked(_session.get(f"{BASE_URL}{path}", params=params, headers=_headers(), timeout=TIMEOUT))
+        )
+        return response.json()
+    except (requests.RequestException, ProviderUnavailable, ValueError) as e:
+        print(f"Calendly error: {e}")
+        return {}
@@ -1,26 +1,43 @@
 """
-Gmail service for sending emails via Google API.
+Gmail service for sending emails via Google API, and for reading what arrived since a historyId
+(replies.py): history pages, a bounded catch-up search, and message gets in batch requests.
 Easy to change: Add templates or attachments here.
-Requires credentials.json and token.json (auto-generated on first run).
+Requires credentials.json and token.json (auto-generated on first run), unless GMAIL_BASE_URL points at
+a stand-in such as fake_providers.py (then no credentials are used).
 """
 import base64
 import os
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from dotenv import load_dotenv
-
-load_dotenv()
-SCOPES = ['https://www.googleapis.com/auth/gmail.send']
+import config
+from services.ratelimit import provider_call
+
+config.load()
+# readonly is for reply ingestion; an older token.json with only gmail.send must be deleted to re-consent
+SCOPES = ['https://www.googleapis.com/auth/gmail.send', 'https://www.googleapis.com/auth/gmail.readonly']
 CREDS_FILE = 'credentials.json'
 TOKEN_FILE = 'token.json'
+BASE_URL = os.getenv("GMAIL_BASE_URL")  # e.g. http://localhost:9000 for fake_providers.py
+BATCH_SIZE = int(os.getenv("GMAIL_BATCH_SIZE", "50"))  # message gets per batch request (Gmail allows 100)
+PAGE_SIZE = 500  # history / message list page size (Gmail's maximum)
+
+class HistoryExpired(Exception):
+    """Gmail no longer has history from the requested historyId (404): catch up with list_messages()."""
 
 def get_gmail_service():
     """
     Authenticate and return Gmail service.
     Auto-handles OAuth flow and token refresh.
     """
+    # Google client libraries are slow to import: load them only when Gmail is actually used
+    from googleapiclient.discovery import build
+    if BASE_URL:
+        from google.auth.credentials import AnonymousCredentials
+        return build('gmail', 'v1', credentials=AnonymousCredentials(), static_discovery=True,
+                     client_options={"api_endpoint": BASE_URL.rstrip("/") + "/"})
+
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+
     creds = None
     if os.path.exists(TOKEN_FILE):
         creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
@@ -37,19 +54,90 @@ def get_gmail_service():
     
     return build('gmail', 'v1', credentials=creds)
 
-def send_email(to_email: str, subject: str, body: str) -> bool:
+def send_email(to_email: str, subject: str, body: str) -> dict:
     """
     Send an email.
-    Returns: True on success, False on error.
+    Returns: the sent message ({'id', 'threadId', 'labelIds'}) on success, None on error.
     """
     try:
-        service = get_gmail_service()
-        message = f"From: me\nTo: {to_email}\nSubject: {subject}\n\n{body}"
-        message_bytes = base64.urlsafe_b64encode(message.encode('utf-8')).decode()
-        
-        body_msg = {'raw': message_bytes}
-        service.users().messages().send(userId='me', body=body_msg).execute()
-        return True
+        return send_message(to_email, subject, body)
     except Exception as e:
         print(f"Gmail send error: {e}")
-        return False
\ No newline at end of file
+        return None
+
+def send_message(to_email: str, subject: str, body: str, service=None) -> dict:
+    """
+    send_email() that raises the provider's error, so the caller can tell (ratelimit.send_outcome) whether it was sent.
+    Returns: the sent message ({'id', 'threadId', 'labelIds'}).
+    """
+    service = service or get_gmail_service()
+    message = f"From: me\nTo: {to_email}\nSubject: {subject}\n\n{body}"
+    body_msg = {'raw': base64.urlsafe_b64encode(message.encode('utf-8')).decode()}
+    return provider_call("gmail", "send", service.users().messages().send(userId='me', body=body_msg).execute, quota=1,
+                         idempotent=False)
+
+def get_profile(service=None) -> dict:
+    """Return the mailbox profile ({'emailAddress', 'historyId', ...})."""
+    service = service or get_gmail_service()
+    return provider_call("gmail", "profile", service.users().getProfile(userId='me').execute, quota=1)
+
+def list_history(start_history_id: str, label_id: str = "INBOX", service=None) -> tuple:
+    """
+    Messages added to `label_id` after start_history_id, oldest first (pages of PAGE_SIZE records).
+    Returns: ([{'id', 'threadId', 'labelIds'}, ...], the mailbox's current historyId). Raises: HistoryExpired.
+    """
+    from googleapiclient.errors import HttpError
+    service = service or get_gmail_service()
+    messages, page_token = [], None
+    while True:
+        request = service.users().history().list(userId='me', startHistoryId=start_history_id, labelId=label_id,
+                                                 historyTypes=["messageAdded"], maxResults=PAGE_SIZE, pageToken=page_token)
+        try:
+            page = provider_call("gmail", "history", request.execute, quota=2)
+        except HttpError as e:
+            if e.resp.status == 404:
+                raise HistoryExpired(start_history_id) from e
+            raise
+        for record in page.get("history", []):
+            messages.extend(added["message"] for added in record.get("messagesAdded", []))
+        page_token = page.get("nextPageToken")
+        if not page_token:
+            return messages, page["historyId"]
+
+def list_messages(query: str, service=None) -> list:
+    """Return [{'id', 'threadId'}, ...] matching a Gmail search (e.g. 'in:inbox after:1767225600'), all pages."""
+    service = service or get_gmail_service()
+    messages, page_token = [], None
+    while True:
+        request = service.users().messages().list(userId='me', q=query, maxResults=PAGE_SIZE, pageToken=page_token)
+        page = provider_call("gmail", "list", request.execute, quota=5)
+        messages.extend(page.get("messages", []))
+        page_token = page.get("nextPageToken")
+        if not page_token:
+            return messages
+
+def get_messages(message_ids: list, message_format: str = "full", service=None) -> list:
+    """
+    Fetch messages BATCH_SIZE per HTTP request (Gmail batch endpoint). Messages deleted meanwhile (404)
+    are skipped; any other failed get raises, so the caller's run can be retried.
+    Returns: message resources, in the order of message_ids.
+    """
+    from googleapiclient.http import BatchHttpRequest
+    service = service or get_gmail_service()
+    fetched = {}
+    for start in range(0, len(message_ids), BATCH_SIZE):
+        chunk = message_ids[start:start + BATCH_SIZE]
+        errors = []
+
+        def collect(request_id, response, exception):
+            if exception is None:
+                fetched[response["id"]] = response
+            elif getattr(getattr(exception, "resp", None), "status", None) != 404:
+                errors.append(exception)
+        batch = BatchHttpRequest(callback=collect, batch_uri=(BASE_URL or "https://gmail.googleapis.com").rstrip("/") + "/batch/gmail/v1")
+        for message_id in chunk:
+            batch.add(service.users().messages().get(userId='me', id=message_id, format=message_format))
+        provider_call("gmail", "batch_get", batch.execute, quota=5 * len(chunk))
+        if errors:
+            raise errors[0]
+    return [fetched[message_id] for message_id in message_ids if message_id in fetched]
\ No newline at end of file
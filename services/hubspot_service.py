@@ -1,14 +1,25 @@
 """
 HubSpot CRM integration for pushing contacts.
-Easy to change: Add more properties or associations.
+Single contacts go through create_contact(); bulk sync (hubspot_sync.py) uses the batch endpoints,
+100 contacts per call.
+Easy to change: Add more properties or associations; point HUBSPOT_BASE_URL at a stand-in (fake_providers.py) for testing.
 """
 import os
 import requests
-from dotenv import load_dotenv
+import config
+from services.ratelimit import provider_call, checked, ProviderUnavailable
 
-load_dotenv()
+config.load()
 API_KEY = os.getenv("HUBSPOT_API_KEY")
-BASE_URL = "https://api.hubapi.com/crm/v3"
+BASE_URL = os.getenv("HUBSPOT_BASE_URL", "https://api.hubapi.com/crm/v3")
+BATCH_LIMIT = 100  # HubSpot's maximum inputs per batch call
+TIMEOUT = 30
+
+def _headers() -> dict:
+    return {
+        'Authorization': f'Bearer {API_KEY}',
+        'Content-Type': 'application/json'
+    }
 
 def create_contact(properties: dict) -> bool:
     """
@@ -20,16 +31,57 @@ def create_contact(properties: dict) -> bool:
         print("HubSpot API key missing - skipping.")
         return False
     
-    headers = {
-        'Authorization': f'Bearer {API_KEY}',
-        'Content-Type': 'application/json'
-    }
+    headers = _headers()
     
     try:
-        response = requests.post(f"{BASE_URL}/objects/contacts", json={'properties': properties}, headers=headers)
-        response.raise_for_status()
+        provider_call(
+            "hubspot", "create_contact",
+            lambda: checked(requests.post(f"{BASE_URL}/objects/contacts", json={'properties': properties}, headers=headers)), quota=1,
+            idempotent=False
+        )
         print("Contact pushed to HubSpot.")
         return True
-    except requests.RequestException as e:
+    except (requests.RequestException, ProviderUnavailable) as e:
         print(f"HubSpot error: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def batch_read_contacts_by_email(emails: list) -> dict:
+    """
+    Look up existing contacts by email (up to BATCH_LIMIT).
+    Returns: HubSpot batch response ({'results': [{'id': ..., 'properties': {'email': ...}}]}) or {} on error.
+    """
+    payload = {'idProperty': 'email', 'properties': ['email'], 'inputs': [{'id': email} for email in emails]}
+    return _batch("read", payload)
+
+def batch_create_contacts(contacts: list) -> dict:
+    """
+    Create contacts from a list of property dicts (up to BATCH_LIMIT).
+    Returns: HubSpot batch response ({'results': [...], 'errors': [...] on partial failure}) or {} on error.
+    """
+    return _batch("create", {'inputs': [{'properties': properties} for properties in contacts]})
+
+def batch_update_contacts(updates: dict) -> dict:
+    """
+    Update contacts, given {hubspot_id: properties} (up to BATCH_LIMIT).
+    Returns: HubSpot batch response or {} on error.
+    """
+    return _batch("update", {'inputs': [{'id': hubspot_id, 'properties': properties} for hubspot_id, properties in updates.items()]})
+
+def _batch(action: str, payload: dict) -> dict:
+    if not API_KEY:
+        print("HubSpot API key missing - skipping.")
+        return {}
+    if len(payload['inputs']) > BATCH_LIMIT:
+        raise ValueError(f"HubSpot batch {action} takes at most {BATCH_LIMIT} inputs")
+    url = f"{BASE_URL}/objects/contacts/batch/{action}"
+    headers = _headers()
+    try:
+        response = provider_call(
+            "hubspot", f"batch_{action}_contacts",
+            lambda: checked(requests.post(url, json=payload, headers=headers, timeout=TIMEOUT)), quota=1,
+            idempotent=action != "create"  # a retried create could add the contacts twice; read/update are safe
+        )
+        return response.json()
+    except (requests.RequestException, ProviderUnavailable, ValueError) as e:
+        print(f"HubSpot batch {action} error: {e}")
+        return {}
@@ -4,11 +4,12 @@ Easy to change: Update API endpoint or add caching here.
 """
 import os
 import requests
-from dotenv import load_dotenv
+import config
+from services.ratelimit import provider_call, checked, ProviderUnavailable
 
-load_dotenv()
+config.load()
 API_KEY = os.getenv("HUNTER_API_KEY")
-BASE_URL = "https://api.hunter.io/v2"
+BASE_URL = os.getenv("HUNTER_BASE_URL", "https://api.hunter.io/v2")
 
 def verify_email(email: str) -> dict:
     """
@@ -22,10 +23,9 @@ def verify_email(email: str) -> dict:
     params = {"email": email, "api_key": API_KEY}
     
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
+        response = provider_call("hunter", "verify_email", lambda: checked(requests.get(url, params=params)), quota=0.5)
         return response.json()
-    except requests.RequestException as e:
+    except (requests.RequestException, ProviderUnavailable) as e:
         print(f"Hunter.io verification error: {e}")
         return {}
 
@@ -41,9 +41,8 @@ def search_domain_emails(domain: str) -> dict:
     params = {"domain": domain, "api_key": API_KEY}
     
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
+        response = provider_call("hunter", "domain_search", lambda: checked(requests.get(url, params=params)), quota=1)
         return response.json()
-    except requests.RequestException as e:
+    except (requests.RequestException, ProviderUnavailable) as e:
         print(f"Hunter.io domain search error: {e}")
         return {}
\ No newline at end of file
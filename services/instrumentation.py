@@ -0,0 +1,123 @@
+"""
+Uniform instrumentation for external API calls (Hunter, OpenAI, Proxycurl, HubSpot, Calendly, Gmail, Google CSE).
+Wrap the remote call in track_call(); it records latency, outcome, OpenAI token usage and quota units to
+the Prometheus registry (metrics.py) and to the provider_calls table, which /analytics/providers reads,
+so calls made by the Streamlit process show up too.
+Easy to change: Adjust QUOTAS (or their env vars) when a plan changes; PROVIDER_CALL_LOG=false skips the DB log.
+"""
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert
+
+import database
+import metrics
+from models import ProviderCall, bump_table_versions
+
+CALL_LOG_ENABLED = os.getenv("PROVIDER_CALL_LOG", "true").lower() != "false"
+RETENTION_DAYS = int(os.getenv("PROVIDER_CALL_RETENTION_DAYS", "90"))
+
+@dataclass(frozen=True)
+class QuotaPolicy:
+    limit: float
+    window_days: int
+    unit: str
+
+# Budgets per provider (free/entry plans by default); OpenAI is budgeted in tokens
+QUOTAS = {
+    "hunter": QuotaPolicy(float(os.getenv("HUNTER_QUOTA", "50")), 30, "credits"),
+    "proxycurl": QuotaPolicy(float(os.getenv("PROXYCURL_QUOTA", "100")), 30, "credits"),
+    "google_cse": QuotaPolicy(float(os.getenv("GOOGLE_CSE_QUOTA", "100")), 1, "queries"),
+    "gmail": QuotaPolicy(float(os.getenv("GMAIL_QUOTA", "500")), 1, "messages"),
+    "hubspot": QuotaPolicy(float(os.getenv("HUBSPOT_QUOTA", "250000")), 1, "calls"),
+    "openai": QuotaPolicy(float(os.getenv("OPENAI_TOKEN_BUDGET", "1000000")), 30, "tokens"),
+}
+
+# Engine the call log is written to (None = database.engine); tests point this elsewhere
+call_log_bind = None
+_last_prune = 0.0
+
+@dataclass
+class ExternalCall:
+    """One external call in flight; the caller may add token usage before the block ends."""
+    provider: str
+    operation: str
+    quota_units: float = 0
+    started_at: datetime = None
+    duration_ms: float = None
+    ok: bool = True
+    status_code: int = None
+    error: str = None
+    model: str = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    def add_usage(self, response):
+        """Record token usage from an OpenAI response; tokens also count as OpenAI quota."""
+        usage = getattr(response, "usage", None)
+        self.model = _as_str(getattr(response, "model", None)) or self.model
+        self.prompt_tokens += _as_int(getattr(usage, "prompt_tokens", 0))
+        self.completion_tokens += _as_int(getattr(usage, "completion_tokens", 0))
+        self.quota_units = self.prompt_tokens + self.completion_tokens
+
+@contextmanager
+def track_call(provider: str, operation: str, quota: float = 0):
+    """
+    Time and record the external call made inside the block.
+    quota: units the call consumes when it succeeds (failed calls are not billed by these providers).
+    Exceptions are recorded (type and HTTP status only; messages can carry keys/emails) and re-raised.
+    """
+    call = ExternalCall(provider, operation, quota_units=quota, started_at=datetime.utcnow())
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception as e:
+        call.ok = False
+        call.error = type(e).__name__
+        call.status_code = getattr(getattr(e, "response", None), "status_code", None)
+        raise
+    finally:
+        call.duration_ms = (time.perf_counter() - started) * 1000
+        record_call(call)
+
+def record_call(call: ExternalCall):
+    """Publish a finished call to Prometheus and the provider_calls log. Never raises."""
+    quota = call.quota_units if call.ok else 0
+    metrics.EXTERNAL_CALL_LATENCY.observe((call.provider, call.operation, "ok" if call.ok else "error"), call.duration_ms / 1000)
+    if quota:
+        metrics.EXTERNAL_QUOTA.inc((call.provider,), quota)
+    for kind, tokens in (("prompt", call.prompt_tokens), ("completion", call.completion_tokens)):
+        if tokens:
+            metrics.EXTERNAL_TOKENS.inc((call.provider, call.model or "unknown", kind), tokens)
+    if not CALL_LOG_ENABLED:
+        return
+    try:
+        with (call_log_bind or database.engine).begin() as connection:
+            connection.execute(insert(ProviderCall), {
+                "provider": call.provider, "operation": call.operation, "started_at": call.started_at,
+                "duration_ms": round(call.duration_ms, 2), "ok": call.ok, "status_code": call.status_code,
+                "error": call.error, "prompt_tokens": call.prompt_tokens,
+                "completion_tokens": call.completion_tokens, "quota_units": quota,
+            })
+            bump_table_versions(connection, ["provider_calls"])
+            _prune_if_due(connection)
+    except Exception as e:
+        print(f"Provider call log error: {e}")
+
+def _prune_if_due(connection):
+    """Drop log rows older than PROVIDER_CALL_RETENTION_DAYS, at most once an hour per process."""
+    global _last_prune
+    if time.monotonic() - _last_prune < 3600:
+        return
+    _last_prune = time.monotonic()
+    cutoff = datetime.utcnow() - timedelta(days=RETENTION_DAYS)
+    connection.execute(delete(ProviderCall).where(ProviderCall.started_at < cutoff))
+
+def _as_int(value) -> int:
+    return value if isinstance(value, int) else 0
+
+def _as_str(value):
+    return value if isinstance(value, str) else None
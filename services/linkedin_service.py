@@ -4,11 +4,12 @@ Easy to change: Switch to official LinkedIn API if available.
 """
 import os
 import requests
-from dotenv import load_dotenv
+import config
+from services.ratelimit import provider_call, checked, ProviderUnavailable
 
-load_dotenv()
+config.load()
 API_KEY = os.getenv("PROXYCURL_API_KEY")
-BASE_URL = "https://nubela.co/proxycurl/api/linkedin"
+BASE_URL = os.getenv("PROXYCURL_BASE_URL", "https://nubela.co/proxycurl/api/linkedin")
 
 def fetch_profile(linkedin_url: str) -> dict:
     """
@@ -22,11 +23,11 @@ def fetch_profile(linkedin_url: str) -> dict:
     params = {'linkedin_profile_url': linkedin_url, 'use_post_plus': 'true'}
     
     try:
-        response = requests.get(BASE_URL + '/profile', headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
-        # Store as JSON string in DB
-        return json.dumps(data)
-    except requests.RequestException as e:
+        response = provider_call(
+            "proxycurl", "fetch_profile",
+            lambda: checked(requests.get(BASE_URL + '/profile', headers=headers, params=params)), quota=1
+        )
+        return response.json()
+    except (requests.RequestException, ValueError, ProviderUnavailable) as e:
         print(f"Proxycurl error: {e}")
-        return '{}'
\ No newline at end of file
+        return {}
\ No newline at end of file
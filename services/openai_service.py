@@ -1,50 +1,215 @@
 """
 OpenAI service for AI features (emails, summaries, classification).
+Every helper has an async twin (agenerate_ai_email, ...) for use on an event loop; gather_limited() runs a
+batch of them OPENAI_CONCURRENCY at a time, and stream_email_template() yields a template as it is generated.
 Easy to change: Swap model or add prompts here.
 """
+import asyncio
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
+import threading
+import weakref
+import config
+from services.ratelimit import provider_call, provider_call_async
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+config.load()
+client = None  # created by get_client() on first use: importing openai alone takes ~0.5 s
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> AsyncOpenAI (its connection pool belongs to that loop)
+# Async calls in flight per gather_limited() batch (the shared rate limit still applies)
+CONCURRENCY = int(os.getenv("OPENAI_CONCURRENCY", "8"))
+DEFAULT_EMAIL = "Dear [Name],\nWe're interested in JV opportunities with [Company] on [Product].\nBest,\nYour Team"
+
+def get_client():
+    """Return the shared OpenAI client, or None when OPENAI_API_KEY is not set."""
+    global client
+    if client is None and os.getenv("OPENAI_API_KEY"):
+        with _client_lock:
+            if client is None:
+                from openai import OpenAI
+                client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=os.getenv("OPENAI_BASE_URL") or None,
+                                max_retries=0)  # retries/backoff live in services.ratelimit
+    return client
+
+def get_async_client():
+    """Return the AsyncOpenAI client of the running event loop, or None when OPENAI_API_KEY is not set."""
+    if not os.getenv("OPENAI_API_KEY"):
+        return None
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        from openai import AsyncOpenAI
+        _async_clients[loop] = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"),
+                                           base_url=os.getenv("OPENAI_BASE_URL") or None, max_retries=0)
+    return _async_clients[loop]
+
+def _complete(op: str, **params):
+    """Chat completion through the shared rate limit; raises if OpenAI is not configured."""
+    openai_client = get_client()
+    if openai_client is None:
+        raise RuntimeError("OPENAI_API_KEY not set")
+    return provider_call("openai", op, lambda: openai_client.chat.completions.create(**params))
+
+async def _acomplete(op: str, **params):
+    """Async _complete(); with stream=True returns the opened stream of chunks."""
+    openai_client = get_async_client()
+    if openai_client is None:
+        raise RuntimeError("OPENAI_API_KEY not set")
+    return await provider_call_async("openai", op, lambda: openai_client.chat.completions.create(**params))
+
+async def gather_limited(calls, limit: int = None) -> list:
+    """
+    Await coroutines (e.g. agenerate_email_template(...) calls) at most `limit` (default CONCURRENCY) at a time.
+    Returns: their results, in order.
+    """
+    semaphore = asyncio.Semaphore(limit or CONCURRENCY)
+
+    async def bounded(call):
+        async with semaphore:
+            return await call
+    return await asyncio.gather(*(bounded(call) for call in calls))
+
+def _email_params(stakeholder_name: str, company_name: str, product_name: str) -> dict:
+    return dict(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "You are a professional BD expert. Write concise, personalized JV outreach emails (under 200 words)."},
+            {"role": "user", "content": f"Email to {stakeholder_name} ({company_name}) about JV on {product_name}. Highlight mutual benefits."}
+        ],
+        max_tokens=250,
+        temperature=0.7
+    )
+
+def _template_params(kind: str, product: str, role: str, industry: str) -> dict:
+    purpose = "a first JV outreach email" if kind == "outreach" else "a short follow-up to an unanswered JV outreach email"
+    return dict(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "You are a professional BD expert. Write concise JV email templates (under 200 words) "
+             "for a whole audience segment. Use these placeholders exactly where personal details go: "
+             "{{first_name}}, {{company}}, {{title}}, {{product}}. Use no other placeholders."},
+            {"role": "user", "content": f"Write {purpose} about our {product or 'technology'} to {role or 'senior'} "
+             f"stakeholders at {industry or 'manufacturing'} companies. Highlight mutual benefits."}
+        ],
+        max_tokens=300,
+        temperature=0.7
+    )
+
+def _summary_params(product_desc: str, company_industry: str) -> dict:
+    return dict(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "Provide 3-5 sentence summaries of JV fit."},
+            {"role": "user", "content": f"Product desc: {product_desc}. Company industry: {company_industry}."}
+        ],
+        max_tokens=150
+    )
+
+def _classify_params(response_text: str) -> dict:
+    return dict(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "Classify JV responses briefly."},
+            {"role": "user", "content": f"Classify: {response_text}. Output only: interested/not-interested/no-response/follow-up-needed."}
+        ],
+        max_tokens=10
+    )
+
+def _label(tag: str) -> str:
+    tag = tag.strip().lower()
+    if 'not' in tag:  # before 'interested', which 'not-interested' also contains
+        return 'not-interested'
+    elif 'interested' in tag:
+        return 'interested'
+    elif 'follow' in tag:
+        return 'follow-up-needed'
+    return 'no-response'
 
 def generate_ai_email(stakeholder_name: str, company_name: str, product_name: str) -> str:
     """
     Generate personalized outreach email.
     Returns: Email text or default on error.
     """
-    if not client.api_key:
-        return "Dear [Name],\nWe're interested in JV opportunities with [Company] on [Product].\nBest,\nYour Team"
-    
+    openai_client = get_client()
+    if openai_client is None or not openai_client.api_key:
+        return DEFAULT_EMAIL
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional BD expert. Write concise, personalized JV outreach emails (under 200 words)."},
-                {"role": "user", "content": f"Email to {stakeholder_name} ({company_name}) about JV on {product_name}. Highlight mutual benefits."}
-            ],
-            max_tokens=250,
-            temperature=0.7
-        )
+        response = _complete("generate_email", **_email_params(stakeholder_name, company_name, product_name))
         return response.choices[0].message.content.strip()
     except Exception as e:
         print(f"OpenAI email generation error: {e}")
         return "Default email template."
 
+async def agenerate_ai_email(stakeholder_name: str, company_name: str, product_name: str) -> str:
+    """Async generate_ai_email()."""
+    if get_async_client() is None:
+        return DEFAULT_EMAIL
+    try:
+        response = await _acomplete("generate_email", **_email_params(stakeholder_name, company_name, product_name))
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        print(f"OpenAI email generation error: {e}")
+        return "Default email template."
+
+def generate_email_template(kind: str, product: str, role: str, industry: str) -> str:
+    """
+    Generate one email template for a whole campaign segment, with {{placeholders}} for the
+    per-recipient details (filled in locally by campaigns.py).
+    kind: 'outreach' (first contact) or 'follow-up'. Returns: template text, or None if unavailable.
+    """
+    openai_client = get_client()
+    if openai_client is None or not openai_client.api_key:
+        return None
+    try:
+        response = _complete("generate_email_template", **_template_params(kind, product, role, industry))
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        print(f"OpenAI template generation error: {e}")
+        return None
+
+async def agenerate_email_template(kind: str, product: str, role: str, industry: str) -> str:
+    """Async generate_email_template()."""
+    if get_async_client() is None:
+        return None
+    try:
+        response = await _acomplete("generate_email_template", **_template_params(kind, product, role, industry))
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        print(f"OpenAI template generation error: {e}")
+        return None
+
+async def stream_email_template(kind: str, product: str, role: str, industry: str):
+    """
+    Yield generate_email_template()'s text as OpenAI produces it (a few characters per chunk).
+    Yields nothing when OpenAI is unavailable or the stream cannot be opened; an error after the
+    first chunk is raised, since the caller has already used part of the text.
+    """
+    if get_async_client() is None:
+        return
+    try:
+        stream = await _acomplete("stream_email_template", stream=True, **_template_params(kind, product, role, industry))
+    except Exception as e:
+        print(f"OpenAI template generation error: {e}")
+        return
+    async for chunk in stream:
+        text = chunk.choices[0].delta.content if chunk.choices else None
+        if text:
+            yield text
+
 def summarize_jv_fit(product_desc: str, company_industry: str) -> str:
     """
     Summarize why JV makes sense.
     """
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "Provide 3-5 sentence summaries of JV fit."},
-                {"role": "user", "content": f"Product desc: {product_desc}. Company industry: {company_industry}."}
-            ],
-            max_tokens=150
-        )
+        response = _complete("summarize_jv_fit", **_summary_params(product_desc, company_industry))
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        print(f"OpenAI summary error: {e}")
+        return "Strong alignment due to complementary capabilities."
+
+async def asummarize_jv_fit(product_desc: str, company_industry: str) -> str:
+    """Async summarize_jv_fit()."""
+    try:
+        response = await _acomplete("summarize_jv_fit", **_summary_params(product_desc, company_industry))
         return response.choices[0].message.content.strip()
     except Exception as e:
         print(f"OpenAI summary error: {e}")
@@ -55,22 +220,17 @@ def classify_response(response_text: str) -> str:
     Classify response: 'interested', 'not-interested', 'no-response', 'follow-up-needed'.
     """
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "Classify JV responses briefly."},
-                {"role": "user", "content": f"Classify: {response_text}. Output only: interested/not-interested/no-response/follow-up-needed."}
-            ],
-            max_tokens=10
-        )
-        tag = response.choices[0].message.content.strip().lower()
-        if 'interested' in tag:
-            return 'interested'
-        elif 'not' in tag:
-            return 'not-interested'
-        elif 'follow' in tag:
-            return 'follow-up-needed'
+        response = _complete("classify_response", **_classify_params(response_text))
+        return _label(response.choices[0].message.content)
+    except Exception as e:
+        print(f"OpenAI classification error: {e}")
         return 'no-response'
+
+async def aclassify_response(response_text: str) -> str:
+    """Async classify_response(), except that a failed call returns None (not 'no-response'), so callers can retry it."""
+    try:
+        response = await _acomplete("classify_response", **_classify_params(response_text))
+        return _label(response.choices[0].message.content)
     except Exception as e:
         print(f"OpenAI classification error: {e}")
-        return 'no-response'
\ No newline at end of file
+        return None
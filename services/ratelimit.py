@@ -0,0 +1,373 @@
+"""
+Rate limiting, retries and circuit breaking for external API calls, configurable per provider.
+provider_call() runs one remote call through: circuit breaker (fail fast while a provider is down) ->
+token bucket (callers queue up to max_wait instead of failing) -> instrumentation.track_call ->
+retry with backoff on 429/5xx/connection errors (honouring Retry-After). Calls that create something
+(idempotent=False: an email sent, a contact or booking created) are retried only when the provider cannot
+have acted on them: 429, or a connection that failed before the request was sent.
+Buckets live in the rate_limit_buckets table by default, so the backend, the Streamlit UI and
+background jobs share one budget per provider; RATE_LIMIT_BACKEND=memory keeps them per process.
+Breakers are per process. provider_call_async() is the same pipeline for coroutines (async OpenAI calls):
+its token waits and backoff sleep without blocking the event loop.
+Easy to change: Edit POLICIES, or override a rate with e.g. RATE_LIMIT_HUNTER="5/10" (calls per second / burst).
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+import requests
+from sqlalchemy import case, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+import database
+import metrics
+from models import RateLimitBucket
+from services.instrumentation import track_call
+
+BACKEND = os.getenv("RATE_LIMIT_BACKEND", "db")  # db | memory
+# Engine holding rate_limit_buckets (None = database.engine)
+bucket_bind = None
+
+class ProviderUnavailable(Exception):
+    """The call was not attempted: the provider's breaker is open or its queue wait ran out."""
+
+class CircuitOpenError(ProviderUnavailable):
+    pass
+
+class RateLimitTimeout(ProviderUnavailable):
+    pass
+
+@dataclass(frozen=True)
+class ProviderPolicy:
+    rate: float                   # sustained calls per second
+    burst: float                  # bucket size
+    max_wait: float = 60.0        # longest a caller queues for a token (seconds)
+    retries: int = 3              # extra attempts on 429/5xx/connection errors
+    backoff: float = 1.0          # first retry delay (doubles, with jitter) when there is no Retry-After
+    failure_threshold: int = 5    # consecutive transient failures that open the breaker
+    reset_timeout: float = 30.0   # seconds open before a single trial call is let through
+
+def _policy(name: str, rate: float, burst: float, **kwargs) -> ProviderPolicy:
+    override = os.getenv(f"RATE_LIMIT_{name.upper()}")
+    if override:
+        rate, _, burst_text = override.partition("/")
+        rate, burst = float(rate), float(burst_text or rate)
+    return ProviderPolicy(rate, burst, **kwargs)
+
+# Defaults sit under each provider's published per-second limits
+POLICIES = {
+    "hunter": _policy("hunter", 5, 5),
+    "openai": _policy("openai", 3, 10),
+    "proxycurl": _policy("proxycurl", 4, 5),
+    "hubspot": _policy("hubspot", 9, 10),
+    "calendly": _policy("calendly", 2, 5),
+    "gmail": _policy("gmail", 2, 2),
+    "google_cse": _policy("google_cse", 1, 5),
+}
+DEFAULT_POLICY = ProviderPolicy(rate=1, burst=5)
+
+# Indirection so tests can drive time
+_clock = time.time
+_sleep = time.sleep
+_async_sleep = asyncio.sleep
+
+class TokenBucket:
+    """In-process token bucket. try_acquire() returns 0 when a token was taken, else seconds to wait."""
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = _clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        with self._lock:
+            now = _clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+class SQLTokenBucket:
+    """
+    Token bucket stored in rate_limit_buckets and shared by every process using the database.
+    Refill and take happen in one conditional UPDATE, so concurrent processes cannot both spend the last token.
+    """
+    def __init__(self, bind, provider: str, rate: float, burst: float):
+        self.bind = bind
+        self.provider = provider
+        self.rate = rate
+        self.burst = burst
+        self._fallback = None
+
+    def try_acquire(self) -> float:
+        try:
+            return self._try_acquire()
+        except IntegrityError:
+            return 0.001  # another process created the row first; go again
+        except SQLAlchemyError as e:
+            # Never let the limiter take the integrations down: degrade to a per-process bucket
+            if self._fallback is None:
+                print(f"Rate limit DB error ({self.provider}), using in-process bucket: {e}")
+                self._fallback = TokenBucket(self.rate, self.burst)
+            return self._fallback.try_acquire()
+
+    def _try_acquire(self) -> float:
+        table = RateLimitBucket.__table__
+        now = _clock()
+        refilled = table.c.tokens + (literal(now) - table.c.updated_at) * self.rate
+        available = case((refilled > self.burst, literal(self.burst)), else_=refilled)
+        with self.bind.begin() as connection:
+            taken = connection.execute(
+                update(table)
+                .where(table.c.provider == self.provider, available >= 1)
+                .values(tokens=available - 1, updated_at=now)
+            ).rowcount
+            if taken:
+                return 0
+            row = connection.execute(select(table.c.tokens, table.c.updated_at).where(table.c.provider == self.provider)).first()
+            if row is None:
+                connection.execute(insert(table).values(provider=self.provider, tokens=self.burst - 1, updated_at=now))
+                return 0
+        tokens = min(self.burst, row.tokens + (now - row.updated_at) * self.rate)
+        return max((1 - tokens) / self.rate, 0.001)
+
+class CircuitBreaker:
+    """closed -> (failure_threshold transient failures) -> open -> (reset_timeout) -> half-open trial."""
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_until = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.failure_threshold:
+            return "closed"
+        return "open" if _clock() < self.opened_until else "half_open"
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half_open" and self._trial_running):
+                raise CircuitOpenError(f"circuit open for {max(self.opened_until - _clock(), 0):.0f}s more")
+            self._trial_running = state == "half_open"
+
+    def release(self):
+        """Give back a half-open trial slot without recording an outcome."""
+        with self._lock:
+            self._trial_running = False
+
+    def record(self, transient_failure: bool, retry_after: float = None):
+        with self._lock:
+            self._trial_running = False
+            if not transient_failure:
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_until = _clock() + max(self.reset_timeout, retry_after or 0)
+
+_buckets = {}
+_breakers = {}
+_registry_lock = threading.Lock()
+
+def policy_for(provider: str) -> ProviderPolicy:
+    return POLICIES.get(provider, DEFAULT_POLICY)
+
+def breaker_for(provider: str) -> CircuitBreaker:
+    with _registry_lock:
+        if provider not in _breakers:
+            policy = policy_for(provider)
+            _breakers[provider] = CircuitBreaker(policy.failure_threshold, policy.reset_timeout)
+        return _breakers[provider]
+
+def bucket_for(provider: str):
+    with _registry_lock:
+        if provider not in _buckets:
+            policy = policy_for(provider)
+            if BACKEND == "memory":
+                _buckets[provider] = TokenBucket(policy.rate, policy.burst)
+            else:
+                _buckets[provider] = SQLTokenBucket(bucket_bind or database.engine, provider, policy.rate, policy.burst)
+        return _buckets[provider]
+
+def reset_limits():
+    """Forget all buckets and breakers (tests, or after changing POLICIES/BACKEND)."""
+    with _registry_lock:
+        _buckets.clear()
+        _breakers.clear()
+
+def acquire(provider: str, max_wait: float = None):
+    """Block until `provider` has a token. Raises RateLimitTimeout if that would take longer than max_wait."""
+    max_wait = policy_for(provider).max_wait if max_wait is None else max_wait
+    bucket = bucket_for(provider)
+    started = _clock()
+    while True:
+        wait = bucket.try_acquire()
+        if not wait:
+            metrics.EXTERNAL_CALL_WAIT.observe((provider,), _clock() - started)
+            return
+        if _clock() - started + wait > max_wait:
+            metrics.EXTERNAL_CALLS_REJECTED.inc((provider, "rate_limit_timeout"))
+            raise RateLimitTimeout(f"{provider}: no rate-limit token within {max_wait:.0f}s")
+        _sleep(wait)
+
+async def acquire_async(provider: str, max_wait: float = None):
+    """acquire() for coroutines: bucket checks run in a worker thread (they may hit the database), waits on the loop."""
+    max_wait = policy_for(provider).max_wait if max_wait is None else max_wait
+    bucket = bucket_for(provider)
+    started = _clock()
+    while True:
+        wait = await asyncio.to_thread(bucket.try_acquire)
+        if not wait:
+            metrics.EXTERNAL_CALL_WAIT.observe((provider,), _clock() - started)
+            return
+        if _clock() - started + wait > max_wait:
+            metrics.EXTERNAL_CALLS_REJECTED.inc((provider, "rate_limit_timeout"))
+            raise RateLimitTimeout(f"{provider}: no rate-limit token within {max_wait:.0f}s")
+        await _async_sleep(wait)
+
+def provider_call(provider: str, operation: str, request, quota: float = 0, idempotent: bool = True):
+    """
+    Run `request()` (one remote call that raises on failure, e.g. via checked()) under the provider's
+    breaker, bucket and instrumentation, retrying transient failures. OpenAI responses' token usage is recorded.
+    idempotent=False: a timeout or 5xx may come after the provider acted, so only unsent calls are retried.
+    Returns: whatever request() returns. Raises: its last exception, or ProviderUnavailable.
+    """
+    policy = policy_for(provider)
+    breaker = breaker_for(provider)
+    for attempt in range(policy.retries + 1):
+        _before_call(provider, breaker)
+        try:
+            acquire(provider, policy.max_wait)
+        except RateLimitTimeout:
+            breaker.release()  # the provider itself did not fail
+            raise
+        try:
+            with track_call(provider, operation, quota) as call:
+                result = request()
+                if hasattr(result, "usage"):
+                    call.add_usage(result)
+        except Exception as e:
+            delay = _retry_delay(provider, policy, breaker, attempt, e, idempotent)
+            if delay is None:
+                raise
+            _sleep(delay)
+            continue
+        breaker.record(False)
+        return result
+
+async def provider_call_async(provider: str, operation: str, request, quota: float = 0, idempotent: bool = True):
+    """
+    provider_call() for coroutines: `request()` returns an awaitable (e.g. an AsyncOpenAI call).
+    For a streamed completion only opening the stream is retried and timed.
+    """
+    policy = policy_for(provider)
+    breaker = breaker_for(provider)
+    for attempt in range(policy.retries + 1):
+        _before_call(provider, breaker)
+        try:
+            await acquire_async(provider, policy.max_wait)
+        except RateLimitTimeout:
+            breaker.release()
+            raise
+        try:
+            with track_call(provider, operation, quota) as call:
+                result = await request()
+                if hasattr(result, "usage"):
+                    call.add_usage(result)
+        except Exception as e:
+            delay = _retry_delay(provider, policy, breaker, attempt, e, idempotent)
+            if delay is None:
+                raise
+            await _async_sleep(delay)
+            continue
+        breaker.record(False)
+        return result
+
+def _before_call(provider: str, breaker: "CircuitBreaker"):
+    try:
+        breaker.before_call()
+    except CircuitOpenError:
+        metrics.EXTERNAL_CALLS_REJECTED.inc((provider, "circuit_open"))
+        raise
+
+def _retry_delay(provider: str, policy: ProviderPolicy, breaker: "CircuitBreaker", attempt: int, error: Exception,
+                 idempotent: bool = True):
+    """Record a failed attempt. Returns: seconds to wait before retrying, or None to give up (re-raise)."""
+    transient = is_transient(error)
+    retry_after = _retry_after(error)
+    breaker.record(transient, retry_after)
+    delay = retry_after if retry_after is not None else policy.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+    retryable = transient if idempotent else _status_code(error) == 429 or not_sent(error)
+    if not retryable or attempt == policy.retries or breaker.state != "closed" or delay > policy.max_wait:
+        return None
+    metrics.EXTERNAL_CALL_RETRIES.inc((provider,))
+    return delay
+
+def checked(response):
+    """raise_for_status() and return the response, for use inside provider_call lambdas."""
+    response.raise_for_status()
+    return response
+
+def is_transient(error: Exception) -> bool:
+    """429, 5xx and connection/timeout errors are worth retrying (and count against the breaker)."""
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    # the builtin ConnectionError (e.g. a broken pipe on a stale keep-alive) is what httplib2 (Google) raises
+    return isinstance(error, (requests.ConnectionError, requests.Timeout, ConnectionError)) or type(error).__name__ in (
+        "APIConnectionError", "APITimeoutError",  # openai
+    )
+
+def not_sent(error: Exception) -> bool:
+    """Whether the call failed before the provider could have received it (any call may then be retried)."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        # ConnectTimeout / NewConnectionError: no connection at all (requests, urllib3);
+        # BrokenPipeError: httplib2 writing to a keep-alive connection the server had already closed
+        if isinstance(error, (requests.ConnectTimeout, ConnectionRefusedError, BrokenPipeError)) or \
+                type(error).__name__ in ("NewConnectionError", "NameResolutionError", "ConnectTimeoutError"):
+            return True
+        wrapped = getattr(error, "reason", None)  # urllib3 MaxRetryError, inside requests' ConnectionError args
+        if wrapped is None and error.args and isinstance(error.args[0], BaseException):
+            wrapped = error.args[0]
+        error = wrapped if isinstance(wrapped, BaseException) else error.__cause__ or error.__context__
+    return False
+
+def send_outcome(error: Exception) -> str:
+    """
+    What a failed non-idempotent call (e.g. an email send) did, for deciding whether to try it again:
+    'not_sent' (never reached or refused before acting: 429, 401/403/408, ProviderUnavailable, no connection),
+    'rejected' (any other 4xx: the provider will refuse it again) or
+    'unknown' (5xx, timeout, dropped connection: it may have been carried out).
+    """
+    status = _status_code(error)
+    if isinstance(error, ProviderUnavailable) or status in (401, 403, 408, 429) or (status is None and not_sent(error)):
+        return "not_sent"
+    if status is not None and 400 <= status < 500:
+        return "rejected"
+    return "unknown"
+
+def _status_code(error: Exception):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+def _retry_after(error: Exception):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    resp = getattr(error, "resp", None)  # googleapiclient HttpError: httplib2 response, lower-case keys
+    try:
+        return float(headers.get("Retry-After") or (resp or {}).get("retry-after"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,248 @@
+"""
+Synthetic data for load tests and the benchmark suite (benchmarks/bench_suite.py).
+generate() bulk-loads products, companies, stakeholders, outreaches, meetings and deals with realistic
+shapes: skewed response mix, follow-up rounds on the FOLLOW_UP_CADENCE_DAYS schedule, meetings for
+interested outreaches (past ones completed or cancelled), deals moving through stages with owners.
+`scale` is the number of outreaches; the other tables follow RATIOS. The same scale, seed and `now`
+give the same rows. Rows go in with Core executemany, CHUNK_SIZE at a time, so memory stays flat.
+Run: python synthetic_data.py --scale 100000 [--seed 42] [--database-url sqlite:///./load.db]
+Easy to change: RATIOS, the *_WEIGHTS tables and the name lists below.
+"""
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from models import (
+    CompanySize, Deal, DealStage, MarketAlignment, Meeting, MeetingStatus, Outreach, OutreachResponse,
+    ProductTechnology, Stakeholder, StakeholderRole, TargetCompany, AWAITING_REPLY,
+    bump_table_versions, message_hash, next_follow_up_at, store_message_bodies,
+)
+
+CHUNK_SIZE = 20_000
+HISTORY_DAYS = 365  # outreaches are spread over the past year
+# Rows per outreach for the parent tables (with small floors so tiny scales still have variety)
+RATIOS = {"products": (1 / 2000, 5), "companies": (1 / 100, 10), "stakeholders": (1 / 5, 20)}
+MEETING_RATE = 0.6  # share of interested outreaches that got a meeting
+DEAL_RATE = 0.5  # share of completed meetings that became a deal
+FOLLOW_UP_BACKLOG_RATE = 0.02  # chance a due follow-up round is still unsent
+
+# No reply yet: NO_RESPONSE or FOLLOW_UP_NEEDED depending on the rounds already sent
+RESPONSE_WEIGHTS = {OutreachResponse.NO_RESPONSE: 65, OutreachResponse.NOT_INTERESTED: 20, OutreachResponse.INTERESTED: 15}
+ROLE_WEIGHTS = {StakeholderRole.DECISION_MAKER: 3, StakeholderRole.INFLUENCER: 4, StakeholderRole.TECHNICAL: 3}
+SIZE_WEIGHTS = {CompanySize.SMALL: 5, CompanySize.MEDIUM: 3, CompanySize.LARGE: 2}
+STAGE_WEIGHTS = {DealStage.INTRO: 4, DealStage.NEGOTIATION: 3, DealStage.MOU: 2, DealStage.ESTABLISHED: 1}
+
+TECHNOLOGIES = ["Solid-state battery", "Carbon fiber layup", "Biodegradable packaging", "Edge AI sensor",
+                "Modular heat pump", "Hydrogen electrolyzer", "3D-printed alloy", "Smart glass film",
+                "Water purification membrane", "Precision fermentation", "Recycled textile fiber", "LiDAR module"]
+COMPANY_PREFIXES = ["Apex", "Blue", "Nordic", "Summit", "Vertex", "Pioneer", "Atlas", "Crescent", "Granite",
+                    "Harbor", "Ironwood", "Keystone", "Meridian", "Orion", "Pacific", "Redwood", "Sterling"]
+COMPANY_CORES = ["Dynamics", "Materials", "Systems", "Manufacturing", "Industries", "Technologies", "Components",
+                 "Fabrication", "Labs", "Robotics", "Energy", "Polymers"]
+COMPANY_SUFFIXES = ["Inc", "Ltd", "GmbH", "Group", "Corp", "Co", "AG", "LLC"]
+INDUSTRIES = ["Automotive", "Aerospace", "Consumer goods", "Energy", "Medical devices", "Packaging",
+              "Construction", "Electronics", "Food & beverage", "Textiles", "Chemicals", "Logistics"]
+FIRST_NAMES = ["Anna", "Ben", "Carla", "David", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas", "Kate",
+               "Luis", "Maya", "Noah", "Olga", "Priya", "Quinn", "Raj", "Sara", "Tom", "Uma", "Victor", "Wei", "Zoe"]
+LAST_NAMES = ["Andersen", "Brown", "Chen", "Dubois", "Evans", "Fischer", "Garcia", "Hansen", "Ito", "Jensen",
+              "Kowalski", "Lopez", "Muller", "Nakamura", "Okafor", "Patel", "Rossi", "Schmidt", "Tanaka", "Weber"]
+TITLES = {StakeholderRole.DECISION_MAKER: ["CEO", "COO", "VP Business Development", "Managing Director"],
+          StakeholderRole.INFLUENCER: ["Head of Partnerships", "Procurement Manager", "Strategy Lead"],
+          StakeholderRole.TECHNICAL: ["CTO", "Head of R&D", "Production Engineer", "Plant Manager"]}
+DEAL_OWNERS = ["alex@ourco.com", "bea@ourco.com", "chris@ourco.com", "dana@ourco.com", "eli@ourco.com"]
+# Campaign texts: every outreach sends one of these (bodies are stored once, in message_bodies)
+MESSAGES = [f"Hello, we'd like to explore a joint venture around our {technology.lower()} technology." for technology in TECHNOLOGIES]
+MESSAGE_HASHES = [message_hash(message) for message in MESSAGES]
+
+def counts_for(scale: int) -> dict:
+    """Return the planned row counts for products, companies and stakeholders at `scale` outreaches."""
+    return {table: max(floor, round(scale * ratio)) for table, (ratio, floor) in RATIOS.items()}
+
+def generate(engine, scale: int, seed: int = 42, now: datetime = None) -> dict:
+    """
+    Append a synthetic data set with `scale` outreaches (ids continue after existing rows).
+    Returns: rows inserted per table.
+    """
+    rng = random.Random(seed)
+    now = (now or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+    planned = counts_for(scale)
+    inserted = dict.fromkeys(("products", "companies", "stakeholders", "outreaches", "meetings", "deals"), 0)
+    with engine.begin() as conn:
+        first_id = {model.__tablename__: (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+                    for model in (ProductTechnology, TargetCompany, Stakeholder, Outreach, Meeting, Deal)}
+        writer = _ChunkWriter(conn, inserted)
+        store_message_bodies(conn, MESSAGES)
+
+        for i in range(planned["products"]):
+            writer.add(ProductTechnology, _product(rng, first_id["products"] + i, now))
+        for i in range(planned["companies"]):
+            product_id = first_id["products"] + rng.randrange(planned["products"])
+            writer.add(TargetCompany, _company(rng, first_id["companies"] + i, product_id, now))
+        for i in range(planned["stakeholders"]):
+            company_id = first_id["companies"] + rng.randrange(planned["companies"])
+            writer.add(Stakeholder, _stakeholder(rng, first_id["stakeholders"] + i, company_id, now))
+
+        meeting_id, deal_id = first_id["meetings"], first_id["deals"]
+        for i in range(scale):
+            stakeholder_id = first_id["stakeholders"] + rng.randrange(planned["stakeholders"])
+            outreach = _outreach(rng, first_id["outreaches"] + i, stakeholder_id, now)
+            writer.add(Outreach, outreach)
+            if outreach["response"] != OutreachResponse.INTERESTED or rng.random() >= MEETING_RATE:
+                continue
+            meeting = _meeting(rng, meeting_id, outreach, now)
+            writer.add(Meeting, meeting)
+            meeting_id += 1
+            if meeting["status"] == MeetingStatus.COMPLETED and rng.random() < DEAL_RATE:
+                writer.add(Deal, _deal(rng, deal_id, meeting, now))
+                deal_id += 1
+        writer.flush()
+        bump_table_versions(conn, [table for table, rows in inserted.items() if rows])
+    return inserted
+
+class _ChunkWriter:
+    """Buffers rows per table and writes them CHUNK_SIZE at a time, parents before children."""
+    ORDER = (ProductTechnology, TargetCompany, Stakeholder, Outreach, Meeting, Deal)
+
+    def __init__(self, conn, inserted: dict):
+        self.conn = conn
+        self.inserted = inserted
+        self.buffers = {model: [] for model in self.ORDER}
+
+    def add(self, model, row: dict):
+        self.buffers[model].append(row)
+        if len(self.buffers[model]) >= CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        for model in self.ORDER:
+            rows = self.buffers[model]
+            if rows:
+                self.conn.execute(insert(model.__table__), rows)
+                self.inserted[model.__tablename__] += len(rows)
+                rows.clear()
+
+def _pick(rng, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+def _product(rng, product_id: int, now: datetime) -> dict:
+    technology = rng.choice(TECHNOLOGIES)
+    return {
+        "id": product_id,
+        "name": f"{technology} G{product_id}",
+        "description": f"{technology} platform ready for licensing or co-manufacturing.",
+        "market_alignment": rng.choice(list(MarketAlignment)),
+        "manufacturing_suitability": rng.choice(list(MarketAlignment)),
+        "revenue_potential": f"${rng.choice((1, 2, 5, 10, 25, 50))}M",
+        "status": rng.choice(("research", "research", "validated", "launched")),
+        "created_at": now - timedelta(days=HISTORY_DAYS + rng.randrange(180)),
+    }
+
+def _company(rng, company_id: int, product_id: int, now: datetime) -> dict:
+    prefix, core = rng.choice(COMPANY_PREFIXES), rng.choice(COMPANY_CORES)
+    size = _pick(rng, SIZE_WEIGHTS)
+    revenue = {CompanySize.SMALL: (1, 20), CompanySize.MEDIUM: (20, 250), CompanySize.LARGE: (250, 5000)}[size]
+    return {
+        "id": company_id,
+        "name": f"{prefix} {core} {rng.choice(COMPANY_SUFFIXES)}",
+        "product_technology_id": product_id,
+        "industry": rng.choice(INDUSTRIES),
+        "size": size,
+        "revenue": f"${rng.randint(*revenue)}M",
+        "contact_info": f"info@{prefix.lower()}{core.lower()}{company_id}.com",
+        "status": rng.choice(("identified", "identified", "contacted", "qualified")),
+        "created_at": now - timedelta(days=HISTORY_DAYS + rng.randrange(90)),
+    }
+
+def _stakeholder(rng, stakeholder_id: int, company_id: int, now: datetime) -> dict:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    role = _pick(rng, ROLE_WEIGHTS)
+    handle = f"{first.lower()}.{last.lower()}{stakeholder_id}"
+    return {
+        "id": stakeholder_id,
+        "company_id": company_id,
+        "name": f"{first} {last}",
+        "title": rng.choice(TITLES[role]),
+        "email": f"{handle}@company{company_id}.example.com" if rng.random() < 0.9 else None,
+        "phone": f"+1-555-{rng.randrange(10_000):04d}" if rng.random() < 0.5 else None,
+        "role": role,
+        "status": rng.choice(("identified", "identified", "contacted", "engaged")),
+        "linkedin_url": f"https://www.linkedin.com/in/{handle.replace('.', '-')}" if rng.random() < 0.3 else None,
+        "created_at": now - timedelta(days=HISTORY_DAYS + rng.randrange(30)),
+    }
+
+def _outreach(rng, outreach_id: int, stakeholder_id: int, now: datetime) -> dict:
+    sent = now - timedelta(days=rng.random() * HISTORY_DAYS)
+    response = _pick(rng, RESPONSE_WEIGHTS)
+    awaiting = response in AWAITING_REPLY
+    rounds, last_follow_up = 0, None
+    if awaiting:
+        # Rounds followups.py would have sent by `now`; a few are left unsent (the scanner's backlog)
+        due = next_follow_up_at(sent, 0)
+        while due is not None and due <= now and rng.random() >= FOLLOW_UP_BACKLOG_RATE:
+            rounds, last_follow_up = rounds + 1, due
+            due = next_follow_up_at(sent, rounds, last_follow_up)
+        response = OutreachResponse.FOLLOW_UP_NEEDED if rounds else OutreachResponse.NO_RESPONSE
+    return {
+        "id": outreach_id,
+        "stakeholder_id": stakeholder_id,
+        "date": sent,
+        "message_sha256": MESSAGE_HASHES[outreach_id % len(MESSAGE_HASHES)],
+        "response": response,
+        "notes": "" if awaiting else rng.choice(("Replied by email", "Call notes in CRM", "Forwarded to CTO")),
+        "follow_up_date": last_follow_up,
+        "follow_up_count": rounds,
+        # Core inserts bypass the ORM hook in models.py, so set the schedule here
+        "next_action_at": next_follow_up_at(sent, rounds, last_follow_up) if awaiting else None,
+        "created_at": sent,
+    }
+
+def _meeting(rng, meeting_id: int, outreach: dict, now: datetime) -> dict:
+    day = (outreach["date"] + timedelta(days=rng.randint(3, 21))).replace(hour=0, minute=0, second=0, microsecond=0)
+    scheduled = day + timedelta(hours=rng.randint(9, 16), minutes=rng.choice((0, 30)))
+    if scheduled > now:
+        status = MeetingStatus.SCHEDULED
+    else:
+        status = MeetingStatus.COMPLETED if rng.random() < 0.9 else MeetingStatus.CANCELLED
+    return {
+        "id": meeting_id,
+        "outreach_id": outreach["id"],
+        "scheduled_date": scheduled,
+        "duration_minutes": rng.choice((30, 30, 45, 60, 90)),
+        "participants": f"stakeholder{outreach['stakeholder_id']}@example.com, {rng.choice(DEAL_OWNERS)}",
+        "agenda": "JV scope, volumes and next steps",
+        "status": status,
+        "created_at": outreach["date"] + timedelta(days=1),
+    }
+
+def _deal(rng, deal_id: int, meeting: dict, now: datetime) -> dict:
+    assigned_at = min(now, meeting["scheduled_date"] + timedelta(days=rng.randint(1, 7)))
+    return {
+        "id": deal_id,
+        "meeting_id": meeting["id"],
+        "stage": _pick(rng, STAGE_WEIGHTS),
+        "notes": "Term sheet under review",
+        "assigned_to": rng.choice(DEAL_OWNERS),
+        "assigned_at": assigned_at,
+        "created_at": assigned_at,
+    }
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from sqlalchemy import create_engine
+
+    import database
+
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic JV data.")
+    parser.add_argument("--scale", type=int, default=10_000, help="number of outreaches (other tables scale with it)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="load into this DB (tables are created); default: DATABASE_URL")
+    args = parser.parse_args()
+    if args.database_url:
+        target = create_engine(args.database_url)
+        database.Base.metadata.create_all(target)
+    else:
+        target = database.engine
+    started = time.perf_counter()
+    print(generate(target, args.scale, args.seed), f"in {time.perf_counter() - started:.1f} s")
@@ -6,10 +6,11 @@ Easy to change: Add new fixtures here for reuse.
 import pytest
 import sys
 import os
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
+import database
 from database import Base
 from models import (
     ProductTechnology, TargetCompany, Stakeholder, Outreach, Meeting, Deal,
@@ -137,12 +138,36 @@ def sample_deal(db_session, sample_meeting):
     db_session.commit()
     return deal
 
+@pytest.fixture(autouse=True)
+def no_provider_call_log(monkeypatch):
+    """Keep external-call instrumentation out of the real DB (tests that need it use call_log_engine)."""
+    monkeypatch.setattr("services.instrumentation.CALL_LOG_ENABLED", False)
+
+@pytest.fixture(autouse=True)
+def in_process_rate_limits(monkeypatch):
+    """Fresh in-memory buckets and breakers per test (no shared limiter state, no real DB)."""
+    from services.ratelimit import reset_limits
+    monkeypatch.setattr("services.ratelimit.BACKEND", "memory")
+    reset_limits()
+    yield
+    reset_limits()
+
+@pytest.fixture
+def call_log_engine(tmp_path, monkeypatch):
+    """Separate SQLite DB receiving the provider_calls log."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'calls.db'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr("services.instrumentation.CALL_LOG_ENABLED", True)
+    monkeypatch.setattr("services.instrumentation.call_log_bind", engine)
+    yield engine
+    engine.dispose()
+
 # Mock external services (used in utils and endpoints tests)
 @pytest.fixture
 def mock_openai():
     """Mock OpenAI client for AI services."""
     with patch('services.openai_service.client') as mock_client:
-        mock_response = Mock()
+        mock_response = MagicMock()
         mock_response.choices[0].message.content = "Mock AI response"
         mock_client.chat.completions.create.return_value = mock_response
         yield mock_client
@@ -162,19 +187,94 @@ def mock_hunter():
         yield mock_verify
 
 @pytest.fixture
-def test_client():
+def test_client(db_session):
     """FastAPI TestClient for endpoint tests (with mocked DB)."""
     from fastapi.testclient import TestClient
     from backend import app  # Import your FastAPI app
 
-    # Override get_db for tests (use in-memory session)
+    # Override get_db for tests (share the per-test session so fixtures are visible)
     def override_get_db():
-        test_db = TestingSessionLocal()
-        try:
-            yield test_db
-        finally:
-            test_db.close()
+        yield db_session
 
     app.dependency_overrides[database.get_db] = override_get_db  # Note: Import database if needed
     with TestClient(app) as client:
-        yield client
\ No newline at end of file
+        yield client
+@pytest.fixture(scope="session")
+def fake_providers_url():
+    """fake_providers.app served over real HTTP on a free port for the whole session."""
+    import threading
+    import time
+    import uvicorn
+    from fake_providers import app as fake_app
+    server = uvicorn.Server(uvicorn.Config(fake_app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(timeout=5)
+
+@pytest.fixture
+def fake_hubspot(fake_providers_url, monkeypatch):
+    """Point services.hubspot_service at the stand-in (emptied per test); yields its base URL."""
+    import requests
+    requests.post(f"{fake_providers_url}/_reset")
+    monkeypatch.setattr("services.hubspot_service.API_KEY", "test-key")
+    monkeypatch.setattr("services.hubspot_service.BASE_URL", f"{fake_providers_url}/hubspot/crm/v3")
+    yield fake_providers_url
+
+@pytest.fixture
+def fake_proxycurl(fake_providers_url, monkeypatch):
+    """Point services.linkedin_service at the Proxycurl stand-in; yields its base URL."""
+    import requests
+    requests.post(f"{fake_providers_url}/_reset")
+    monkeypatch.setattr("services.linkedin_service.API_KEY", "test-key")
+    monkeypatch.setattr("services.linkedin_service.BASE_URL", f"{fake_providers_url}/proxycurl/api/linkedin")
+    yield fake_providers_url
+
+@pytest.fixture
+def fake_calendly(fake_providers_url, monkeypatch):
+    """Point services.calendly_service at the Calendly stand-in (empty caches, no rate-limit waits); yields its base URL."""
+    import requests
+    from calendly_scheduler import CACHE
+    from services.ratelimit import POLICIES, ProviderPolicy
+    requests.post(f"{fake_providers_url}/_reset")
+    CACHE.discard()
+    monkeypatch.setitem(POLICIES, "calendly", ProviderPolicy(rate=1000, burst=1000))
+    monkeypatch.setattr("services.calendly_service.TOKEN", "test-token")
+    monkeypatch.setattr("services.calendly_service.BASE_URL", f"{fake_providers_url}/calendly")
+    yield fake_providers_url
+    CACHE.discard()
+
+@pytest.fixture
+def fake_hunter(fake_providers_url, monkeypatch):
+    """Point services.hunter_service at the Hunter stand-in; yields its base URL."""
+    import requests
+    requests.post(f"{fake_providers_url}/_reset")
+    monkeypatch.setattr("services.hunter_service.API_KEY", "test-key")
+    monkeypatch.setattr("services.hunter_service.BASE_URL", f"{fake_providers_url}/hunter/v2")
+    yield fake_providers_url
+
+@pytest.fixture
+def fake_openai(fake_providers_url, monkeypatch):
+    """Fresh OpenAI clients (sync and async) aimed at the stand-in, created lazily from the env; yields its base URL."""
+    import requests
+    requests.post(f"{fake_providers_url}/_reset")
+    import weakref
+    monkeypatch.setattr("services.openai_service.client", None)
+    monkeypatch.setattr("services.openai_service._async_clients", weakref.WeakKeyDictionary())
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{fake_providers_url}/openai/v1")
+    yield fake_providers_url
+
+@pytest.fixture
+def fake_gmail(fake_providers_url, monkeypatch):
+    """Point services.gmail_service at the Gmail stand-in (no OAuth, no rate-limit waits); yields its base URL."""
+    import requests
+    from services.ratelimit import POLICIES, ProviderPolicy
+    requests.post(f"{fake_providers_url}/_reset")
+    monkeypatch.setitem(POLICIES, "gmail", ProviderPolicy(rate=1000, burst=1000))
+    monkeypatch.setattr("services.gmail_service.BASE_URL", fake_providers_url)
+    yield fake_providers_url
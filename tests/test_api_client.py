@@ -0,0 +1,68 @@
+"""
+Tests for api_client.ApiClient (the Streamlit UI's HTTP layer).
+Tests: GET-only caching, ETag revalidation (304), invalidation on writes.
+Uses the FastAPI TestClient as the HTTP session.
+Run: pytest tests/test_api_client.py -v
+"""
+import pytest
+from api_client import ApiClient
+
+class TestApiClient:
+    @pytest.fixture
+    def api(self, test_client):
+        # max_age=0: always revalidate, so every get() exercises If-None-Match
+        return ApiClient("/api/v1", session=test_client, max_age=0)
+
+    def test_list_endpoint_sets_etag_and_answers_304(self, test_client, sample_deal):
+        """Unchanged table -> 304 with the same ETag, no body."""
+        first = test_client.get("/api/v1/deals/")
+        etag = first.headers["ETag"]
+        again = test_client.get("/api/v1/deals/", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.content == b""
+        other_page = test_client.get("/api/v1/deals/", params={"limit": 1}, headers={"If-None-Match": etag})
+        assert other_page.status_code == 200
+
+    def test_get_revalidates_and_reuses_cached_body(self, api, sample_product):
+        """Second GET is a 304 served from the cache."""
+        products, _ = api.get("/products/")
+        cached, _ = api.get("/products/")
+        assert cached == products
+        assert api.stats["fetched"] == 1
+        assert api.stats["not_modified"] == 1
+
+    def test_write_invalidates_and_is_not_cached(self, api, sample_company):
+        """POSTs always hit the server; the affected list is refetched afterwards."""
+        assert api.get("/stakeholders/")[0] == []
+        payload = {"company_id": sample_company.id, "name": "Jane Roe"}
+        first = api.write("POST", "/stakeholders/", payload)
+        second = api.write("POST", "/stakeholders/", payload)
+        assert first["id"] != second["id"]
+        names = [s["name"] for s in api.get("/stakeholders/")[0]]
+        assert names == ["Jane Roe", "Jane Roe"]
+        assert api.stats["fetched"] == 2
+
+    def test_version_bump_from_other_session_is_seen(self, api, test_client, sample_product):
+        """A write made elsewhere changes the ETag, so the cached copy is replaced."""
+        api.get("/products/")
+        test_client.post("/api/v1/products/", json={"name": "Other Tech"})
+        products, _ = api.get("/products/")
+        assert {p["name"] for p in products} == {"Test Tech", "Other Tech"}
+        assert api.stats["not_modified"] == 0
+
+    def test_get_many_fetches_concurrently_and_records_timings(self, test_client, sample_deal):
+        """get_many() returns every result by name, warms the cache, and times each call."""
+        # One worker: the test DB session is shared and sessions are not thread-safe
+        api = ApiClient("/api/v1", session=test_client, max_age=0, pool_size=1)
+        results = api.get_many({
+            "deals": ("/deals/", None),
+            "meetings": ("/meetings/", {"limit": 5}),
+            "kpis": ("/analytics/kpis", None),
+        })
+        assert results["deals"][0][0]["id"] == sample_deal.id
+        assert results["kpis"][0]["total_outreach"] == 1
+        assert [t["name"] for t in api.last_load["calls"]] == ["deals", "meetings", "kpis"]
+        assert all(t["outcome"] == "200" for t in api.last_load["calls"])
+        assert api.last_load["wall_ms"] >= 0
+        api.get("/deals/")
+        assert api.stats["not_modified"] == 1
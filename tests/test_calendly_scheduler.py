@@ -0,0 +1,123 @@
+"""
+Tests for calendly_scheduler.py against the fake_providers.py Calendly stand-in (real HTTP).
+Run: pytest tests/test_calendly_scheduler.py -v
+"""
+import pytest
+import requests
+
+import calendly_scheduler
+from models import Meeting, Outreach, OutreachResponse, Stakeholder
+
+def _calls(url, path):
+    return requests.get(f"{url}/_stats").json()["calls"].get(path, 0)
+
+def _interested(db_session, company, count):
+    people = [Stakeholder(company_id=company.id, name=f"Person {i}", email=f"p{i}@example.com") for i in range(count)]
+    db_session.add_all(people)
+    db_session.flush()
+    outreaches = [Outreach(stakeholder_id=p.id, message="Hi", response=OutreachResponse.INTERESTED) for p in people]
+    db_session.add_all(outreaches)
+    db_session.commit()
+    return outreaches
+
+class TestCalendlyScheduler:
+    def test_ttl_cache(self):
+        cache = calendly_scheduler.TTLCache()
+        loads = []
+        load = lambda: loads.append(1) or ["slot"]
+        assert cache.get_or_load("k", 60, load) == cache.get_or_load("k", 60, load) == ["slot"]
+        assert len(loads) == 1
+        cache.get_or_load("expired", -1, load)
+        cache.get_or_load("expired", 60, load)
+        assert len(loads) == 3
+        cache.discard("k")
+        cache.get_or_load("k", 60, load)
+        assert len(loads) == 4
+        assert cache.get_or_load("empty", 60, list) == [] and cache.get_or_load("empty", 60, lambda: [1]) == [1]
+
+    def test_campaign_books_distinct_slots_in_one_pass(self, db_session, sample_company, fake_calendly):
+        """20 interested outreaches -> 20 invites and meetings; event types and availability are fetched once."""
+        outreaches = _interested(db_session, sample_company, 20)
+        result = calendly_scheduler.schedule_outreaches(db_session, days=14)
+        assert (result["candidates"], result["scheduled"], result["failed"], result["no_slot"]) == (20, 20, 0, 0)
+
+        meetings = db_session.query(Meeting).order_by(Meeting.scheduled_date).all()
+        assert sorted(m.outreach_id for m in meetings) == [o.id for o in outreaches]
+        assert len({m.scheduled_date for m in meetings}) == 20
+        assert meetings[0].participants.endswith("@example.com>") and "Calendly event:" in meetings[0].agenda
+        assert _calls(fake_calendly, "GET /calendly/event_types") == 1
+        assert _calls(fake_calendly, "GET /calendly/event_type_available_times") == 2  # 14 days in 7-day chunks
+        assert _calls(fake_calendly, "POST /calendly/invitees") == 20
+
+        again = calendly_scheduler.schedule_outreaches(db_session)
+        assert again["candidates"] == 0 and _calls(fake_calendly, "POST /calendly/invitees") == 20
+
+    def test_taken_slot_fails_and_availability_is_refetched(self, db_session, sample_company, fake_calendly):
+        """A slot booked elsewhere after caching fails that invite only; the next run sees fresh availability."""
+        _interested(db_session, sample_company, 2)
+        event_type = calendly_scheduler.resolve_event_type()
+        first_slot = calendly_scheduler.available_slots(event_type["uri"])[0]
+        requests.post(f"{fake_calendly}/calendly/invitees", json={
+            "event_type": event_type["uri"], "start_time": first_slot, "invitee": {"email": "x@other.com"}})
+
+        result = calendly_scheduler.schedule_outreaches(db_session)
+        assert (result["scheduled"], result["failed"]) == (1, 1)
+        retry = calendly_scheduler.schedule_outreaches(db_session)
+        assert (retry["candidates"], retry["scheduled"]) == (1, 1)
+        assert db_session.query(Meeting).count() == 2
+
+    def test_run_dying_midway_keeps_booked_meetings(self, db_session, sample_company, fake_calendly, monkeypatch):
+        """Meetings are committed before their invites: nothing Calendly booked is lost or booked again."""
+        _interested(db_session, sample_company, 3)
+        book_invitee = calendly_scheduler.calendly_service.book_invitee
+        booked = []
+
+        def crash_after_first(*args):
+            if booked:
+                raise KeyboardInterrupt  # the process is stopped mid-run
+            booked.append(book_invitee(*args))
+            return booked[-1]
+        monkeypatch.setattr(calendly_scheduler.calendly_service, "book_invitee", crash_after_first)
+        with pytest.raises(KeyboardInterrupt):
+            calendly_scheduler.schedule_outreaches(db_session, workers=1)
+        db_session.rollback()
+        meetings = db_session.query(Meeting).order_by(Meeting.id).all()
+        assert len(meetings) == 3 and "Calendly event: pending" not in meetings[0].agenda
+        again = calendly_scheduler.schedule_outreaches(db_session)
+        assert again["candidates"] == 0 and again["unconfirmed"] == [meetings[1].id, meetings[2].id]
+        assert _calls(fake_calendly, "POST /calendly/invitees") == 1
+
+    def test_only_certain_failures_release_the_outreach(self, db_session, sample_company, fake_calendly, monkeypatch):
+        """A timeout may have booked the invite: that meeting stays pending and is reported, not rebooked."""
+        _interested(db_session, sample_company, 3)
+        book_invitee = calendly_scheduler.calendly_service.book_invitee
+
+        def flaky(event_type, start_time, email, name):
+            if email == "p1@example.com":
+                raise requests.ReadTimeout()
+            if email == "p2@example.com":
+                raise requests.ConnectionError(ConnectionRefusedError(111, "Connection refused"))
+            return book_invitee(event_type, start_time, email, name)
+        monkeypatch.setattr(calendly_scheduler.calendly_service, "book_invitee", flaky)
+        result = calendly_scheduler.schedule_outreaches(db_session)
+        assert (result["scheduled"], result["failed"]) == (1, 2)
+        timed_out = db_session.query(Meeting).filter(Meeting.participants.contains("p1@")).one()
+        assert result["unconfirmed"] == [timed_out.id]
+        retry = calendly_scheduler.schedule_outreaches(db_session)
+        assert retry["candidates"] == 1 and retry["unconfirmed"] == [timed_out.id]  # only the refused one is rebooked
+
+    def test_only_interested_outreaches_with_email(self, db_session, sample_outreach, sample_company, fake_calendly):
+        no_email = Stakeholder(company_id=sample_company.id, name="No Email")
+        db_session.add(no_email)
+        db_session.flush()
+        db_session.add(Outreach(stakeholder_id=no_email.id, message="Hi", response=OutreachResponse.INTERESTED))
+        db_session.commit()
+        assert calendly_scheduler.schedule_outreaches(db_session)["candidates"] == 0
+
+    def test_endpoints(self, test_client, db_session, sample_company, fake_calendly):
+        _interested(db_session, sample_company, 3)
+        availability = test_client.get("/api/v1/meetings/calendly/availability", params={"limit": 5}).json()
+        assert availability["event_type"]["name"] == "JV Intro Call" and len(availability["slots"]) == 5
+        response = test_client.post("/api/v1/meetings/calendly/schedule", json={})
+        assert response.status_code == 200 and response.json()["scheduled"] == 3
+        assert len(test_client.get("/api/v1/meetings/").json()) == 3
@@ -0,0 +1,136 @@
+"""
+Tests for segment-level email generation (campaigns.py): compiled templates, the template cache, campaigns.
+Run: pytest tests/test_campaigns.py -v
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import campaigns
+from campaigns import CompiledTemplate, Segment, recipient_fields
+from services import openai_service
+from models import EmailTemplate, OutboxEvent, Outreach, Stakeholder, StakeholderRole
+
+@pytest.fixture
+def generations(monkeypatch):
+    """Count template generations instead of calling OpenAI. Yields: the list of segments generated."""
+    calls = []
+
+    async def generate(segment):
+        calls.append(segment)
+        return f"Hi {{{{first_name}}}} ({{{{title}}}}) at {{{{company}}}}: {segment.role} pitch for {{{{product}}}}."
+    monkeypatch.setattr(campaigns, "generate_template", generate)
+    yield calls
+
+@pytest.fixture
+def audience(db_session, sample_stakeholder, sample_company):
+    """Five stakeholders of one company in two roles (one without email)."""
+    people = [Stakeholder(company_id=sample_company.id, name=f"Person {n}", title="CTO", role=StakeholderRole.TECHNICAL,
+                          email=f"p{n}@testcorp.com" if n else None) for n in range(4)]
+    db_session.add_all(people)
+    db_session.commit()
+    return [sample_stakeholder, *people]
+
+def _collect(stream) -> list:
+    async def collect():
+        return [text async for text in stream]
+    return asyncio.run(collect())
+
+class TestCompiledTemplate:
+    def test_renders_fields_and_keeps_literal_braces(self):
+        template = CompiledTemplate("Hi {{ first_name }}, {json: 1} {{unknown}}re {{product}}")
+        assert template.render(recipient_fields("Jane Roe", product="Widgets")) == "Hi Jane, {json: 1} re Widgets"
+
+    def test_defaults_for_missing_details(self):
+        fields = recipient_fields(None)
+        assert set(fields) == set(campaigns.FIELDS) and fields["first_name"] == "there"
+
+class TestTemplateCache:
+    def test_one_generation_per_segment_then_cached(self, db_session, audience, generations):
+        stats = campaigns.run_campaign(db_session, dry_run=True)
+        assert stats["recipients"] == 5 and stats["segments"] == 2 and stats["generated"] == 2
+        assert {segment.role for segment in generations} == {"decision-maker", "technical"}
+        assert stats["sample"] == {"stakeholder_id": audience[0].id, "subject": "JV Opportunity: Test Tech",
+                                   "body": "Hi John (CEO) at Test Corp: decision-maker pitch for Test Tech."}
+        assert db_session.query(Outreach).count() == 0  # dry run
+
+        again = campaigns.run_campaign(db_session, dry_run=True)
+        assert again["cached"] == 2 and again["generated"] == 0 and len(generations) == 2
+
+    def test_expired_templates_are_regenerated(self, db_session, audience, generations):
+        campaigns.run_campaign(db_session, dry_run=True)
+        db_session.query(EmailTemplate).update({"generated_at": datetime.utcnow() - timedelta(days=campaigns.TEMPLATE_TTL_DAYS + 1)})
+        db_session.commit()
+        assert campaigns.run_campaign(db_session, dry_run=True)["generated"] == 2
+        assert db_session.query(EmailTemplate).count() == 2
+
+    def test_fallback_is_used_but_not_cached(self, db_session, sample_stakeholder, monkeypatch):
+        async def unavailable(segment):
+            return None
+        monkeypatch.setattr(campaigns, "generate_template", unavailable)
+        draft = campaigns.draft_email(db_session, sample_stakeholder.id)
+        assert draft["body"].startswith("Dear John,") and "Test Tech" in draft["body"]
+        assert db_session.query(EmailTemplate).count() == 0
+
+class TestCampaign:
+    def test_creates_outreaches_and_queues_emails(self, db_session, audience, generations):
+        stats = campaigns.run_campaign(db_session, send_email=True, product="Solar film")
+        assert stats["outreaches"] == 5 and stats["emails_queued"] == 4
+        outreaches = db_session.query(Outreach).order_by(Outreach.stakeholder_id).all()
+        assert [outreach.message for outreach in outreaches][:2] == [
+            "Hi John (CEO) at Test Corp: decision-maker pitch for Solar film.",
+            "Hi Person (CTO) at Test Corp: technical pitch for Solar film."]
+        assert outreaches[1].notes == "Not emailed: stakeholder has no email"
+        assert all(outreach.next_action_at is not None for outreach in outreaches)  # follow-ups scheduled
+        payloads = [json.loads(event.payload) for event in db_session.query(OutboxEvent).order_by(OutboxEvent.id)]
+        assert payloads[0] == {"to": "john@testcorp.com", "subject": "JV Opportunity: Solar film",
+                               "body": "Hi John (CEO) at Test Corp: decision-maker pitch for Solar film.",
+                               "outreach_id": outreaches[0].id}
+
+    def test_endpoints(self, test_client, audience, generations):
+        response = test_client.post("/api/v1/outreaches/campaign", json={"stakeholder_ids": [audience[0].id, audience[1].id]})
+        assert response.status_code == 200 and response.json()["outreaches"] == 2
+        draft = test_client.post("/api/v1/outreaches/draft", json={"stakeholder_id": audience[0].id}).json()
+        assert draft["cached"] and draft["segment"] == {"kind": "outreach", "product": "Test Tech",
+                                                        "role": "decision-maker", "industry": "Tech"}
+        assert test_client.post("/api/v1/outreaches/draft", json={"stakeholder_id": 9999}).status_code == 404
+
+    def test_against_openai_stand_in(self, db_session, sample_stakeholder, fake_openai):
+        draft = campaigns.draft_email(db_session, sample_stakeholder.id)
+        assert draft["body"].startswith("Dear John,") and "Test Corp and our Test Tech." in draft["body"]
+        assert campaigns.draft_email(db_session, sample_stakeholder.id)["cached"]
+
+    def test_segment_key_changes_with_prompt_version(self, monkeypatch):
+        segment = Segment("outreach", "Tech", "technical", "Energy")
+        key = campaigns.segment_key(segment)
+        monkeypatch.setattr(campaigns, "PROMPT_VERSION", campaigns.PROMPT_VERSION + 1)
+        assert campaigns.segment_key(segment) != key
+
+class TestDraftStream:
+    def test_placeholders_split_across_chunks_render_whole(self, db_session, sample_stakeholder, monkeypatch):
+        async def pieces(*segment):
+            for text in ("Hi {", "{first", "_name}} at {{ company }", "}, re {{product}}."):
+                yield text
+        monkeypatch.setattr(openai_service, "stream_email_template", pieces)
+        chunks = _collect(campaigns.draft_stream(db_session, sample_stakeholder.id))
+        assert chunks == ["Hi ", "John at ", "Test Corp, re Test Tech."]
+        assert db_session.query(EmailTemplate.body).scalar() == "Hi {{first_name}} at {{ company }}, re {{product}}."
+        assert campaigns.draft_email(db_session, sample_stakeholder.id)["cached"]
+
+    def test_broken_stream_is_not_cached(self, db_session, sample_stakeholder, monkeypatch):
+        async def broken(*segment):
+            yield "Dear {{first_name}}, "
+            raise ConnectionError("stream reset")
+        monkeypatch.setattr(openai_service, "stream_email_template", broken)
+        assert _collect(campaigns.draft_stream(db_session, sample_stakeholder.id)) == ["Dear John, "]
+        assert db_session.query(EmailTemplate).count() == 0
+
+    def test_endpoint_against_openai_stand_in(self, test_client, sample_stakeholder, fake_openai):
+        streamed = test_client.post("/api/v1/outreaches/draft/stream", json={"stakeholder_id": sample_stakeholder.id})
+        assert streamed.status_code == 200 and streamed.headers["content-type"].startswith("text/plain")
+        assert streamed.text.startswith("Dear John,") and "Test Corp and our Test Tech." in streamed.text
+        draft = test_client.post("/api/v1/outreaches/draft", json={"stakeholder_id": sample_stakeholder.id}).json()
+        assert draft["cached"] and draft["body"] == streamed.text
+        assert test_client.post("/api/v1/outreaches/draft/stream", json={"stakeholder_id": 9999}).status_code == 404
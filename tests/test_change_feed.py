@@ -0,0 +1,154 @@
+"""
+Tests for the live change feed: change_events written on flush, cursor replay/reset (change_feed.py),
+the /events endpoints, and ApiClient.sync_changes().
+Run: pytest tests/test_change_feed.py -v
+"""
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import change_feed
+from api_client import ApiClient
+from database import Base
+from models import ChangeEvent, Deal, DealStage, TableVersion
+
+@pytest.fixture
+def feed_engine(tmp_path, monkeypatch):
+    """File-backed SQLite read by the feed (its own connections must see committed events)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'feed.db'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(change_feed, "feed_bind", engine)
+    yield engine
+    engine.dispose()
+
+def _add_events(engine, *changes):
+    with engine.begin() as connection:
+        connection.execute(ChangeEvent.__table__.insert(), [
+            {"table_name": table, "row_id": row_id, "op": "updated", "created_at": datetime.utcnow()}
+            for table, row_id in changes
+        ])
+
+class FakeSession:
+    """Session-compatible stub answering /events/changes with queued batches and lists with ETags."""
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.requests = []
+
+    def request(self, method, url, params=None, headers=None, json=None):
+        self.requests.append(url)
+        if url.endswith("/events/changes"):
+            return _Response(200, self.batches.pop(0))
+        return _Response(200, [{"url": url}], {"ETag": 'W/"1"'})
+
+class _Response:
+    def __init__(self, status_code, data, headers=None):
+        self.status_code, self._data, self.headers = status_code, data, headers or {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+class TestChangeFeed:
+    def test_flush_records_changes_to_feed_tables_only(self, db_session, sample_deal, sample_product):
+        events = db_session.query(ChangeEvent).order_by(ChangeEvent.id).all()
+        assert [(e.table_name, e.op) for e in events] == [("outreaches", "created"), ("meetings", "created"), ("deals", "created")]
+        sample_deal.stage = DealStage.MOU
+        sample_product.name = "Renamed"  # not a feed table
+        db_session.commit()
+        last = db_session.query(ChangeEvent).order_by(ChangeEvent.id.desc()).first()
+        assert (last.table_name, last.row_id, last.op) == ("deals", sample_deal.id, "updated")
+        assert db_session.query(ChangeEvent).count() == 4
+
+    def test_unchanged_rows_bump_no_table_version(self, db_session, sample_deal, sample_product):
+        """Same-value writes and appends to a parent's collection leave the parent's table version (ETags) alone."""
+        versions = lambda: dict(db_session.query(TableVersion.table_name, TableVersion.version))
+        before = versions()
+        sample_product.name = sample_product.name
+        sample_deal.meeting.deals.append(Deal(stage=DealStage.INTRO))
+        db_session.commit()
+        after = versions()
+        assert after["deals"] == before["deals"] + 1
+        assert (after["meetings"], after["products"]) == (before["meetings"], before["products"])
+
+    def test_read_changes_replays_filters_and_resets(self, feed_engine):
+        assert change_feed.read_changes(None).cursor == 0
+        _add_events(feed_engine, ("deals", 1), ("outreaches", 2), ("deals", 3))
+        start = change_feed.read_changes(None)
+        assert (start.cursor, start.events) == (3, [])  # no cursor: start at head, no replay
+        batch = change_feed.read_changes(0)
+        assert [e["row_id"] for e in batch.events] == [1, 2, 3] and batch.cursor == 3
+        deals = change_feed.read_changes(1, tables=["deals"])
+        assert [e["row_id"] for e in deals.events] == [3] and deals.cursor == 3
+        assert change_feed.read_changes(0, limit=2).cursor == 2
+        assert change_feed.read_changes(99).reset  # past the head (DB was reset)
+
+        with feed_engine.begin() as connection:
+            connection.execute(ChangeEvent.__table__.update().values(created_at=datetime.utcnow() - timedelta(days=2)))
+        assert change_feed.prune() == 2  # the newest row is kept so ids are never reused
+        assert change_feed.read_changes(0).reset
+        assert not change_feed.read_changes(2).reset
+
+    def test_long_poll_wakes_on_new_event(self, feed_engine):
+        feed = change_feed.ChangeFeed(poll_seconds=0.02)
+
+        async def scenario():
+            timer = threading.Timer(0.1, _add_events, (feed_engine, ("meetings", 7)))
+            timer.start()
+            started = asyncio.get_running_loop().time()
+            batch = await change_feed.long_poll(0, wait=5, feed=feed)
+            return batch, asyncio.get_running_loop().time() - started
+
+        batch, elapsed = asyncio.run(scenario())
+        assert [e["row_id"] for e in batch.events] == [7]
+        assert elapsed < 2
+        empty = asyncio.run(change_feed.long_poll(batch.cursor, wait=0.1, feed=feed))
+        assert empty.events == [] and empty.cursor == batch.cursor
+
+    def test_sse_stream_replays_from_cursor(self, feed_engine):
+        _add_events(feed_engine, ("deals", 1), ("deals", 2))
+        feed = change_feed.ChangeFeed(poll_seconds=0.02)
+
+        async def first_chunks(count):
+            async def connected():
+                return False
+            stream = change_feed.sse_stream(1, None, connected, feed=feed, heartbeat=0.05)
+            chunks = [await stream.__anext__() for _ in range(count)]
+            await stream.aclose()
+            return chunks
+
+        retry, change, ping = asyncio.run(first_chunks(3))
+        assert retry == "retry: 3000\n\n"
+        assert change == 'id: 2\nevent: change\ndata: {"id":2,"table":"deals","op":"updated","row_id":2}\n\n'
+        assert ping == ": ping\n\n"
+
+    def test_changes_endpoint(self, test_client, feed_engine):
+        assert test_client.get("/api/v1/events/changes").json() == {"cursor": 0, "events": [], "reset": False}
+        _add_events(feed_engine, ("outreaches", 5))
+        body = test_client.get("/api/v1/events/changes", params={"cursor": 0, "tables": ["outreaches"]}).json()
+        assert body["events"] == [{"id": 1, "table": "outreaches", "op": "updated", "row_id": 5}]
+        assert test_client.get("/api/v1/events/changes", params={"tables": ["products"]}).status_code == 400
+
+    def test_api_client_refreshes_only_changed_tables(self):
+        session = FakeSession([
+            {"cursor": 10, "events": [], "reset": False},
+            {"cursor": 11, "events": [{"id": 11, "table": "deals", "op": "updated", "row_id": 1}], "reset": False},
+        ])
+        api = ApiClient("/api/v1", session=session, max_age=0, feed_max_age=60)
+        assert api.sync_changes() == []
+        for endpoint in ("/deals/", "/meetings/", "/analytics/kpis", "/products/"):
+            api.get(endpoint)
+        session.requests.clear()
+        for endpoint in ("/deals/", "/meetings/"):
+            api.get(endpoint)
+        assert session.requests == []  # feed tables are trusted while the feed is followed
+
+        assert len(api.sync_changes()) == 1 and api.feed_cursor == 11
+        for endpoint in ("/deals/", "/meetings/", "/analytics/kpis"):
+            api.get(endpoint)
+        assert session.requests == ["/api/v1/events/changes", "/api/v1/deals/", "/api/v1/analytics/kpis"]
@@ -0,0 +1,84 @@
+"""
+Tests for negotiated response compression (compression.py) and the columnar list format.
+"""
+import gzip
+import zlib
+
+import pytest
+from sqlalchemy import update
+
+import compression
+from api_client import to_frame
+from compression import CompressionMiddleware, negotiate
+from models import Outreach, OutreachResponse
+
+@pytest.fixture
+def many_outreaches(db_session, sample_stakeholder):
+    responses = list(OutreachResponse)
+    db_session.add_all([Outreach(stakeholder_id=sample_stakeholder.id, message=f"Hello number {n}", notes="",
+                                 response=responses[n % len(responses)]) for n in range(40)])
+    db_session.commit()
+    db_session.execute(update(Outreach.__table__).where(Outreach.__table__.c.id % 7 == 0).values(response=None))
+    db_session.commit()
+
+class TestCompression:
+    def test_negotiate(self, monkeypatch):
+        monkeypatch.setattr(compression, "_brotli", lambda: None)
+        assert negotiate("gzip, deflate, br") == "gzip"
+        assert negotiate("br;q=1.0, gzip;q=0") is None
+        assert negotiate("identity") is None and negotiate("") is None
+        assert negotiate("*") == "gzip"
+        monkeypatch.setattr(compression, "_brotli", lambda: object())
+        assert negotiate("gzip, br") == "br"
+
+    def test_large_json_is_gzipped_small_is_not(self, test_client, many_outreaches):
+        plain = test_client.get("/api/v1/outreaches/", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        compressed = test_client.get("/api/v1/outreaches/", headers={"Accept-Encoding": "gzip"})
+        assert compressed.headers["content-encoding"] == "gzip" and "Accept-Encoding" in compressed.headers["vary"]
+        assert compressed.num_bytes_downloaded < len(plain.content) / 3
+        assert compressed.json() == plain.json() and compressed.headers["ETag"] == plain.headers["ETag"]
+        small = test_client.get("/api/v1/products/", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers
+
+    def test_streamed_csv_is_compressed_chunk_by_chunk(self):
+        from starlette.applications import Starlette
+        from starlette.responses import StreamingResponse
+        from starlette.routing import Route
+        from starlette.testclient import TestClient
+
+        def rows(request):
+            return StreamingResponse((f"{n},row {n}\n".encode() * 50 for n in range(20)), media_type="text/csv")
+        app = CompressionMiddleware(Starlette(routes=[Route("/csv", rows)]), minimum_size=10_000)
+        response = TestClient(app).get("/csv", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip" and "content-length" not in response.headers
+        assert response.text.count("\n") == 1000
+
+    def test_compressor_output_is_valid_gzip(self):
+        compressor = compression._Compressor("gzip")
+        body = compressor.compress(b"a" * 5000, final=False) + compressor.compress(b"b" * 5000, final=True)
+        assert gzip.decompress(body) == b"a" * 5000 + b"b" * 5000
+        assert zlib.decompress(body, 31)
+
+class TestColumnar:
+    def test_columnar_page_matches_json_rows(self, test_client, many_outreaches):
+        rows = test_client.get("/api/v1/outreaches/", params={"limit": 25}).json()
+        page = test_client.get("/api/v1/outreaches/", params={"limit": 25, "format": "columnar"})
+        payload = page.json()
+        assert page.headers["X-Next-Cursor"] == str(rows[-1]["id"])
+        assert payload["columns"] == list(rows[0])
+        assert payload["dictionaries"] == {"response": [response.value for response in OutreachResponse]}
+        codes = payload["data"][payload["columns"].index("response")]
+        assert -1 in codes and all(isinstance(code, int) for code in codes)
+
+        frame = to_frame(payload, test_client.get("/api/v1/outreaches/", params={
+            "limit": 25, "after_id": page.headers["X-Next-Cursor"], "format": "columnar"}).json())
+        everything = test_client.get("/api/v1/outreaches/", params={"limit": 100}).json()
+        assert len(frame) == len(everything) == 40
+        assert frame["id"].tolist() == [row["id"] for row in everything]
+        assert [None if value != value else value for value in frame["response"].tolist()] == [
+            row["response"] for row in everything]
+        assert str(frame["response"].dtype) == "category" and str(frame["id"].dtype) == "int64"
+
+    def test_unknown_format_is_rejected(self, test_client):
+        assert test_client.get("/api/v1/deals/", params={"format": "xml"}).status_code == 422
@@ -4,18 +4,22 @@ Uses TestClient to simulate HTTP requests.
 Mocks DB/services.
 Run: pytest tests/test_endpoints.py -v
 """
+import json
+import time
+from datetime import datetime
 import pytest
 from fastapi.testclient import TestClient
 from fastapi import status
 from routers import deals, outreaches, meetings, analytics  # Import routers
 from backend import app  # Your main app
-from models import DealStage, OutreachResponse, MeetingStatus
+from models import DealStage, OutreachResponse, MeetingStatus, ProviderCall
+from routers import serialization
 
 class TestEndpoints:
     def setup_method(self):
         """Setup: Include routers in test app if not already."""
         # Ensure routers are included (for test isolation)
-        if not any(r.prefix == "/api/v1/deals" for r in app.routes):
+        if not any(getattr(r, "path", "").startswith("/api/v1/deals") for r in app.routes):
             app.include_router(deals.router, prefix="/api/v1")
             app.include_router(outreaches.router, prefix="/api/v1")
             app.include_router(meetings.router, prefix="/api/v1")
@@ -71,4 +75,165 @@ class TestEndpoints:
     def test_create_outreach_success(self, client, sample_stakeholder):
         """Test POST /api/v1/outreaches/ - Success."""
         payload = {
-            "stakeholder
\ No newline at end of file
+            "stakeholder_id": sample_stakeholder.id,
+            "message": "Hello from test",
+            "notes": "First touch"
+        }
+        response = client.post("/api/v1/outreaches/", json=payload)
+        assert response.status_code == 200
+        assert response.json()["message"] == "Outreach created"
+
+    def test_analytics_funnel(self, client, sample_deal):
+        """Test GET /api/v1/analytics/funnel - Stage counts from rollups."""
+        response = client.get("/api/v1/analytics/funnel", params={"refresh": True})
+        assert response.status_code == 200
+        stages = {s["stage"]: s for s in response.json()["stages"]}
+        assert list(stages) == ["outreach", "responded", "interested", "meeting", "deal", "established"]
+        assert stages["outreach"]["count"] == 1
+        assert stages["responded"]["count"] == 0
+        assert stages["meeting"]["count"] == 1
+        assert stages["deal"]["count"] == 1
+        assert stages["deal"]["overall_percent"] == 100.0
+
+    def test_analytics_funnel_stale_rollups_refresh_in_background(self, client, db_session, sample_outreach, monkeypatch):
+        """Stale rollups are served as they are while a refresh is started; follow-ups sent are not replies."""
+        from datetime import timedelta
+        from models import FunnelRollup
+        sample_outreach.response = OutreachResponse.FOLLOW_UP_NEEDED
+        db_session.commit()
+        stages = client.get("/api/v1/analytics/funnel", params={"refresh": True}).json()["stages"]
+        assert stages[1] == {**stages[1], "stage": "responded", "count": 0}
+
+        started = []
+
+        class DeferredThread:
+            """Record the background refresh instead of running it on another thread."""
+            def __init__(self, target, args, kwargs, daemon):
+                self.run = lambda: target(*args, **kwargs)
+
+            def start(self):
+                started.append(self.run)
+        monkeypatch.setattr(analytics.threading, "Thread", DeferredThread)
+        sample_outreach.response = OutreachResponse.NOT_INTERESTED
+        db_session.query(FunnelRollup).update({"refreshed_at": datetime.utcnow() - timedelta(seconds=analytics.ROLLUP_TTL_SECONDS + 1)})
+        db_session.commit()
+        assert client.get("/api/v1/analytics/funnel").json()["stages"][1]["count"] == 0  # served stale, not rebuilt inline
+        assert len(started) == 1
+        assert started[0]() == 1
+        assert client.get("/api/v1/analytics/funnel").json()["stages"][1]["count"] == 1
+
+        db_session.query(FunnelRollup).update({"refreshed_at": datetime.utcnow() + timedelta(seconds=5)})
+        db_session.commit()
+        assert analytics.refresh_funnel_rollups(db_session.get_bind()) == 0  # covered by a refresh that finished meanwhile
+
+    def test_analytics_cohorts(self, client, sample_deal, sample_product):
+        """Test GET /api/v1/analytics/cohorts - Grouped by product and deal owner."""
+        by_product = client.get("/api/v1/analytics/cohorts", params={"by": "product", "refresh": True}).json()
+        assert by_product["cohorts"][0]["cohort"] == sample_product.name
+        assert by_product["cohorts"][0]["deal"] == 1
+        by_owner = client.get("/api/v1/analytics/cohorts", params={"by": "assigned_to"}).json()
+        assert by_owner["cohorts"][0]["cohort"] == "user@example.com"
+        by_week = client.get("/api/v1/analytics/cohorts", params={"by": "week"}).json()
+        assert sum(c["outreach"] for c in by_week["cohorts"]) == 1
+        assert client.get("/api/v1/analytics/cohorts", params={"by": "region"}).status_code == 400
+
+    def test_create_and_list_products_paginated(self, client):
+        """Test POST/GET /api/v1/products/ - Keyset pagination via X-Next-Cursor."""
+        ids = [client.post("/api/v1/products/", json={"name": f"Tech {i}", "market_alignment": "high"}).json()["id"] for i in range(3)]
+        first = client.get("/api/v1/products/", params={"limit": 2})
+        assert [p["id"] for p in first.json()] == ids[:2]
+        assert first.headers["X-Next-Cursor"] == str(ids[1])
+        last = client.get("/api/v1/products/", params={"limit": 2, "after_id": first.headers["X-Next-Cursor"]})
+        assert [p["id"] for p in last.json()] == ids[2:]
+        assert "X-Next-Cursor" not in last.headers
+
+    def test_create_stakeholder_and_search(self, client, sample_company):
+        """Test POST/GET /api/v1/stakeholders/ - Company name joined, ?q= filters."""
+        payload = {"company_id": sample_company.id, "name": "Jane Roe", "email": "jane@testcorp.com", "role": "influencer"}
+        assert client.post("/api/v1/stakeholders/", json=payload).status_code == 200
+        found = client.get("/api/v1/stakeholders/", params={"q": "Jane"}).json()
+        assert [s["name"] for s in found] == ["Jane Roe"]
+        assert found[0]["company"] == sample_company.name
+        missing = client.post("/api/v1/stakeholders/", json={"company_id": 999, "name": "Nobody"})
+        assert missing.status_code == 404
+
+    def test_workflow_progress(self, client, sample_outreach):
+        """Test GET /api/v1/analytics/progress - EXISTS flags per step."""
+        progress = client.get("/api/v1/analytics/progress").json()
+        assert progress["stakeholders"] and progress["outreach"]
+        assert not progress["deals"]
+
+    def test_analytics_providers(self, client, db_session):
+        """Test GET /api/v1/analytics/providers - Per-provider calls, errors, percentiles, quota."""
+        db_session.add_all(
+            [ProviderCall(provider="openai", operation="generate_email", duration_ms=ms, prompt_tokens=10,
+                          completion_tokens=20, quota_units=30) for ms in (100, 200, 300, 400)]
+            + [ProviderCall(provider="hunter", operation="verify_email", duration_ms=900, ok=False, error="HTTPError", status_code=429)]
+        )
+        db_session.commit()
+        data = client.get("/api/v1/analytics/providers").json()
+        providers = {p["provider"]: p for p in data["providers"]}
+        assert data["providers"][0]["provider"] == "openai"  # busiest first
+        openai = providers["openai"]
+        assert (openai["calls"], openai["errors"], openai["completion_tokens"]) == (4, 0, 80)
+        assert openai["latency_ms"] == {"p50": 200, "p95": 400, "p99": 400}
+        assert openai["quota"]["used"] == 120 and openai["quota"]["unit"] == "tokens"
+        assert providers["hunter"]["error_rate_percent"] == 100
+        assert providers["hunter"]["quota"]["used"] == 0
+
+    def test_export_table_streams_csv(self, client, sample_outreach):
+        """Test GET /api/v1/exports/{table} - CSV download."""
+        response = client.get("/api/v1/exports/outreaches")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        lines = response.text.strip().split("\n")
+        assert lines[0].startswith("id,stakeholder_id,date,message,response")
+        assert len(lines) == 2
+        assert client.get("/api/v1/exports/secrets").status_code == 404
+
+    def test_report_job_lifecycle(self, client, sample_outreach, tmp_path, monkeypatch):
+        """Test POST /api/v1/reports/{table} - background job, status polling, download."""
+        monkeypatch.setattr("reports.REPORTS_DIR", str(tmp_path))
+        response = client.post("/api/v1/reports/outreaches")
+        assert response.status_code == 202
+        job = response.json()
+        for _ in range(500):
+            state = client.get(job["status_url"]).json()
+            if state["status"] in ("done", "failed"):
+                break
+            time.sleep(0.02)
+        assert state["status"] == "done"
+        download = client.get(job["download_url"])
+        assert download.headers["content-type"] == "application/pdf"
+        assert download.content.startswith(b"%PDF")
+        assert client.get("/api/v1/reports/jobs/missing").status_code == 404
+        assert client.post("/api/v1/reports/secrets").status_code == 404
+
+    def test_list_outreaches_fast_path(self, client, sample_outreach):
+        """Test GET /api/v1/outreaches/ - column rows encoded directly, ETag and cursor headers kept."""
+        first = client.get("/api/v1/outreaches/", params={"limit": 1})
+        assert first.headers["content-type"] == "application/json"
+        row = first.json()[0]
+        assert row["date"] == sample_outreach.date.isoformat() and row["response"] == "no-response"
+        assert row["stakeholder"] == "John Doe" and row["follow_up_count"] == 0
+        assert first.headers["ETag"]
+        cached = client.get("/api/v1/outreaches/", params={"limit": 1}, headers={"If-None-Match": first.headers["ETag"]})
+        assert cached.status_code == 304
+        over_time = client.get("/api/v1/analytics/outreach_over_time").json()
+        assert over_time == [{"date": sample_outreach.date.date().isoformat(), "count": 1}]
+
+    def test_list_outreaches_omits_message_unless_asked(self, client, sample_outreach):
+        """Test GET /api/v1/outreaches/?include_message=true - bodies come from message_bodies on request only."""
+        assert "message" not in client.get("/api/v1/outreaches/").json()[0]
+        row = client.get("/api/v1/outreaches/", params={"include_message": True}).json()[0]
+        assert row["message"] == "Test outreach message" and list(row)[:4] == ["id", "stakeholder_id", "stakeholder", "message"]
+
+class TestSerialization:
+    CONTENT = [{"at": datetime(2030, 6, 3, 12, 0, 5, 250), "day": datetime(2030, 6, 3).date(),
+                "stage": DealStage.MOU, "count": 3, "name": "Zoë", "none": None}]
+
+    def test_orjson_and_stdlib_agree(self, monkeypatch):
+        fast = serialization.dumps(self.CONTENT)
+        monkeypatch.setattr(serialization, "orjson", None)
+        assert json.loads(serialization.dumps(self.CONTENT)) == json.loads(fast) == [
+            {"at": "2030-06-03T12:00:05.000250", "day": "2030-06-03", "stage": "mou", "count": 3, "name": "Zoë", "none": None}]
@@ -0,0 +1,72 @@
+"""
+Tests for the provider stand-ins added for load testing (fake_providers.py): latency, error and
+rate-limit knobs, and the Hunter, OpenAI and Gmail endpoints driven through the real service clients.
+Run: pytest tests/test_fake_providers.py -v
+"""
+import time
+
+import requests
+
+from benchmarks.load_test import percentile
+from services import gmail_service, hunter_service, openai_service
+from services.ratelimit import POLICIES, ProviderPolicy
+
+class TestKnobs:
+    def test_config_round_trip_and_reset(self, fake_providers_url):
+        requests.post(f"{fake_providers_url}/_reset")
+        config = requests.post(f"{fake_providers_url}/_config", json={"hunter": {"latency_ms": 40, "error_rate": 0.5}}).json()
+        assert config["hunter"] == {"latency_ms": 40.0, "jitter_ms": 0.0, "error_rate": 0.5, "rate_limit": 0.0,
+                                  "token_ms": 0.0}
+        assert requests.post(f"{fake_providers_url}/_config", json={"hunter": {"bogus": 1}}).status_code == 400
+        requests.post(f"{fake_providers_url}/_reset")
+        assert requests.get(f"{fake_providers_url}/_config").json() == {}
+
+    def test_latency_is_added(self, fake_providers_url):
+        requests.post(f"{fake_providers_url}/_reset")
+        requests.post(f"{fake_providers_url}/_config", json={"hunter": {"latency_ms": 150}})
+        started = time.perf_counter()
+        requests.get(f"{fake_providers_url}/hunter/v2/email-verifier", params={"email": "a@b.com", "api_key": "k"})
+        assert time.perf_counter() - started >= 0.15
+        requests.post(f"{fake_providers_url}/_reset")
+
+    def test_rate_limit_answers_429_with_retry_after(self, fake_providers_url):
+        requests.post(f"{fake_providers_url}/_reset")
+        requests.post(f"{fake_providers_url}/_config", json={"proxycurl": {"rate_limit": 2}})
+        url = f"{fake_providers_url}/proxycurl/api/linkedin/profile"
+        statuses = [requests.get(url, params={"url": "https://www.linkedin.com/in/x"}).status_code for _ in range(4)]
+        assert statuses.count(429) >= 1 and statuses[:2] != [429, 429]
+        throttled = requests.get(url, params={"url": "https://www.linkedin.com/in/x"})
+        assert throttled.status_code == 429 and int(throttled.headers["Retry-After"]) >= 1
+        assert requests.get(f"{fake_providers_url}/_stats").json()["injected"]["proxycurl"]["throttled"] >= 2
+        requests.post(f"{fake_providers_url}/_reset")
+
+    def test_injected_errors_are_retried_by_the_client(self, fake_hunter, monkeypatch):
+        monkeypatch.setitem(POLICIES, "hunter", ProviderPolicy(
+            rate=1000, burst=1000, retries=8, backoff=0.001, failure_threshold=100))
+        requests.post(f"{fake_hunter}/_config", json={"hunter": {"error_rate": 0.3}})
+        results = [hunter_service.verify_email(f"user{n}@example.com") for n in range(10)]
+        assert all(result["data"]["result"] == "deliverable" for result in results)
+        assert requests.get(f"{fake_hunter}/_stats").json()["injected"]["hunter"]["errors"] > 0
+
+class TestStandIns:
+    def test_hunter(self, fake_hunter):
+        assert hunter_service.verify_email("bounce@example.com")["data"]["result"] == "undeliverable"
+        emails = hunter_service.search_domain_emails("acme.com")["data"]["emails"]
+        assert emails and all(email["value"].endswith("@acme.com") for email in emails)
+        assert requests.get(f"{fake_hunter}/hunter/v2/email-verifier", params={"email": "a@b.com"}).status_code == 401
+
+    def test_openai(self, fake_openai):
+        assert openai_service.classify_response("Sounds great, let's talk") in (
+            "interested", "not-interested", "no-response", "follow-up-needed")
+        email = openai_service.generate_ai_email("Jane", "Acme", "Widgets")
+        assert email and email == openai_service.generate_ai_email("Jane", "Acme", "Widgets")  # deterministic
+        assert requests.get(f"{fake_openai}/_stats").json()["calls"]["POST /openai/v1/chat/completions"] == 3
+
+    def test_gmail(self, fake_gmail):
+        assert gmail_service.send_email("jane@acme.com", "Hello", "Body")
+        assert requests.get(f"{fake_gmail}/_stats").json()["gmail_sent"] == 1
+
+class TestLoadTest:
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        assert (percentile(samples, 0.5), percentile(samples, 0.99), percentile([], 0.5)) == (51, 99, 0.0)
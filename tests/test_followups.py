@@ -0,0 +1,105 @@
+"""
+Tests for the follow-up schedule (next_action_at kept by models.py) and the due-date scanner in followups.py.
+Run: pytest tests/test_followups.py -v
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import campaigns
+import followups
+from models import FOLLOW_UP_CADENCE_DAYS, ChangeEvent, OutboxEvent, Outreach, OutreachResponse, next_follow_up_at
+
+@pytest.fixture(autouse=True)
+def canned_message(monkeypatch):
+    """No OpenAI calls: a fixed template per segment."""
+    async def template(segment):
+        return "{{name}} round {{round}}"
+    monkeypatch.setattr(campaigns, "generate_template", template)
+
+def _outreach(db_session, stakeholder, days_ago, response=OutreachResponse.NO_RESPONSE):
+    outreach = Outreach(stakeholder_id=stakeholder.id if stakeholder else None, message="Hello",
+                        date=datetime.utcnow() - timedelta(days=days_ago), response=response)
+    db_session.add(outreach)
+    db_session.commit()
+    return outreach
+
+class TestFollowUpSchedule:
+    def test_cadence_rounds_then_stops(self):
+        sent = datetime(2030, 1, 1)
+        assert next_follow_up_at(sent, 0) == sent + timedelta(days=FOLLOW_UP_CADENCE_DAYS[0])
+        last = sent + timedelta(days=6)
+        assert next_follow_up_at(sent, 1, last) == last + timedelta(days=FOLLOW_UP_CADENCE_DAYS[1])
+        assert next_follow_up_at(sent, len(FOLLOW_UP_CADENCE_DAYS), last) is None
+
+    def test_orm_writes_keep_next_action_at(self, db_session, sample_outreach):
+        assert sample_outreach.next_action_at == sample_outreach.date + timedelta(days=FOLLOW_UP_CADENCE_DAYS[0])
+        sample_outreach.date = sample_outreach.date - timedelta(days=10)
+        db_session.commit()
+        assert sample_outreach.next_action_at == sample_outreach.date + timedelta(days=FOLLOW_UP_CADENCE_DAYS[0])
+
+        sample_outreach.notes = "unrelated edit"
+        db_session.commit()
+        assert sample_outreach.next_action_at is not None
+
+        sample_outreach.response = OutreachResponse.INTERESTED  # replied: nothing more to send
+        db_session.commit()
+        assert sample_outreach.next_action_at is None
+
+class TestDueScanner:
+    def test_queues_due_rows_and_advances_them(self, db_session, sample_stakeholder):
+        due = _outreach(db_session, sample_stakeholder, days_ago=6)
+        _outreach(db_session, sample_stakeholder, days_ago=1)
+        _outreach(db_session, sample_stakeholder, days_ago=30, response=OutreachResponse.INTERESTED)
+
+        stats = followups.run_due_followups(db_session)
+        assert stats == {"batches": 1, "claimed": 1, "queued": 1, "skipped": 0, "superseded": 0}
+        db_session.refresh(due)
+        assert due.response == OutreachResponse.FOLLOW_UP_NEEDED and due.follow_up_count == 1
+        assert due.next_action_at == due.follow_up_date + timedelta(days=FOLLOW_UP_CADENCE_DAYS[1])
+        event = db_session.query(OutboxEvent).one()
+        assert json.loads(event.payload) == {"to": "john@testcorp.com", "subject": followups.SUBJECT,
+                                             "body": "John Doe round 1", "outreach_id": due.id}
+        assert followups.run_due_followups(db_session)["claimed"] == 0  # nothing due until the next round
+
+    def test_batches_only_read_due_rows(self, db_session, sample_stakeholder):
+        for _ in range(5):
+            _outreach(db_session, sample_stakeholder, days_ago=10)
+        for _ in range(20):
+            _outreach(db_session, sample_stakeholder, days_ago=0)
+        stats = followups.run_due_followups(db_session, batch_size=2)
+        assert (stats["batches"], stats["claimed"], stats["queued"]) == (3, 5, 5)
+
+    def test_lease_keeps_concurrent_runs_apart(self, db_session, sample_stakeholder):
+        _outreach(db_session, sample_stakeholder, days_ago=6)
+        now = datetime.utcnow()
+        lease_until, ids, _ = followups.claim_due(db_session, now)
+        assert len(ids) == 1
+        assert followups.claim_due(db_session, now)[1] == []  # another scanner finds nothing
+        # the first scanner died: the row comes back once its lease runs out
+        later = lease_until + timedelta(seconds=1)
+        assert followups.claim_due(db_session, later)[1] == ids
+
+    def test_reply_during_run_supersedes_follow_up(self, db_session, sample_stakeholder):
+        outreach = _outreach(db_session, sample_stakeholder, days_ago=6)
+        lease_until, ids, _ = followups.claim_due(db_session, datetime.utcnow())
+        outreach.response = OutreachResponse.INTERESTED
+        db_session.commit()
+        assert followups.process_batch(db_session, lease_until, ids) == {"queued": 0, "skipped": 0, "superseded": 1}
+        assert db_session.query(OutboxEvent).count() == 0
+
+    def test_rows_without_email_are_dropped(self, db_session):
+        outreach = _outreach(db_session, None, days_ago=6)
+        stats = followups.run_due_followups(db_session)
+        assert (stats["skipped"], stats["queued"]) == (1, 0)
+        db_session.refresh(outreach)
+        assert outreach.next_action_at is None
+
+    def test_scanner_writes_reach_the_change_feed(self, db_session, sample_stakeholder):
+        """The lease and the round/drop updates are Core writes: each must record its change_events."""
+        sent, dropped = _outreach(db_session, sample_stakeholder, days_ago=6), _outreach(db_session, None, days_ago=6)
+        followups.run_due_followups(db_session)
+        updates = db_session.query(ChangeEvent.row_id).filter(ChangeEvent.table_name == "outreaches",
+                                                               ChangeEvent.op == "updated").all()
+        assert sorted(row_id for (row_id,) in updates) == [sent.id, sent.id, dropped.id, dropped.id]  # claim + write
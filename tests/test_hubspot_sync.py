@@ -0,0 +1,96 @@
+"""
+Tests for hubspot_sync.py against the fake_providers.py HubSpot stand-in (real HTTP).
+Run: pytest tests/test_hubspot_sync.py -v
+"""
+import requests
+
+from hubspot_sync import contact_properties, content_hash, sync_stakeholders
+from models import DealStage, HubSpotContactSync, Stakeholder
+
+def _stats(url):
+    return requests.get(f"{url}/_stats").json()
+
+def _add_stakeholders(db_session, company, count, start=0):
+    db_session.add_all([
+        Stakeholder(company_id=company.id, name=f"Person {i} Example", title="CTO", email=f"person{i}@example.com")
+        for i in range(start, start + count)
+    ])
+    db_session.commit()
+
+class TestHubSpotSync:
+    def test_content_hash_ignores_key_order(self):
+        """Same properties -> same hash; any property change -> new hash."""
+        properties = contact_properties("Jane Roe", "CEO", " Jane@Example.com ", "", "ABC")
+        assert properties["email"] == "jane@example.com" and properties["lastname"] == "Roe"
+        assert content_hash(properties) == content_hash(dict(reversed(list(properties.items()))))
+        assert content_hash(properties) != content_hash({**properties, "jobtitle": "CTO"})
+
+    def test_first_sync_batches_and_rerun_is_noop(self, db_session, sample_company, fake_hubspot):
+        """150 new stakeholders -> 2 lookups + 2 batch creates; the re-run makes no API calls."""
+        _add_stakeholders(db_session, sample_company, 150)
+        first = sync_stakeholders(db_session)
+        assert (first["created"], first["failed"], first["api_calls"]) == (150, 0, 4)
+        server = _stats(fake_hubspot)
+        assert server["hubspot_contacts"] == 150
+        assert server["calls"]["POST /hubspot/crm/v3/objects/contacts/batch/create"] == 2
+        assert db_session.query(HubSpotContactSync).count() == 150
+
+        again = sync_stakeholders(db_session)
+        assert again["unchanged"] == 150 and again["api_calls"] == 0
+        assert _stats(fake_hubspot)["calls"] == server["calls"]
+
+    def test_only_changed_stakeholders_are_updated(self, db_session, sample_company, fake_hubspot):
+        """Editing one stakeholder sends one batch update with just that contact."""
+        _add_stakeholders(db_session, sample_company, 5)
+        sync_stakeholders(db_session)
+        stakeholder = db_session.query(Stakeholder).filter_by(email="person3@example.com").one()
+        stakeholder.title = "VP Engineering"
+        db_session.commit()
+
+        result = sync_stakeholders(db_session)
+        assert (result["updated"], result["created"], result["unchanged"], result["api_calls"]) == (1, 0, 4, 1)
+        state = db_session.get(HubSpotContactSync, stakeholder.id)
+        contact = requests.post(
+            f"{fake_hubspot}/hubspot/crm/v3/objects/contacts/batch/read", json={"inputs": [{"id": state.hubspot_id}]}
+        ).json()["results"][0]
+        assert contact["properties"]["jobtitle"] == "VP Engineering"
+
+    def test_existing_hubspot_contact_is_updated_not_duplicated(self, db_session, sample_stakeholder, fake_hubspot):
+        """A contact already in HubSpot (same email) is matched by email and updated."""
+        requests.post(f"{fake_hubspot}/hubspot/crm/v3/objects/contacts", json={"properties": {"email": "JOHN@testcorp.com"}})
+        result = sync_stakeholders(db_session)
+        assert (result["created"], result["updated"]) == (0, 1)
+        assert _stats(fake_hubspot)["hubspot_contacts"] == 1
+        assert db_session.get(HubSpotContactSync, sample_stakeholder.id).hubspot_id == "1"
+
+    def test_failed_batch_is_retried_next_run(self, db_session, sample_stakeholder, fake_hubspot, monkeypatch):
+        """No state is written when HubSpot rejects a batch, so the next run sends it again."""
+        monkeypatch.setattr("services.hubspot_service.API_KEY", None)
+        assert sync_stakeholders(db_session)["failed"] == 1
+        assert db_session.query(HubSpotContactSync).count() == 0
+        monkeypatch.setattr("services.hubspot_service.API_KEY", "test-key")
+        assert sync_stakeholders(db_session)["created"] == 1
+
+    def test_deal_stage_sets_lifecycle_stage(self, db_session, sample_deal, fake_hubspot):
+        """The furthest deal stage becomes the contact's lifecyclestage; advancing it re-syncs the contact."""
+        sync_stakeholders(db_session)
+        assert _stats(fake_hubspot)["hubspot_contacts"] == 1
+        sample_deal.stage = DealStage.ESTABLISHED
+        db_session.commit()
+        result = sync_stakeholders(db_session, stakeholder_ids=[sample_deal.meeting.outreach.stakeholder_id])
+        assert (result["checked"], result["updated"]) == (1, 1)
+        found = requests.post(f"{fake_hubspot}/hubspot/crm/v3/objects/contacts/batch/read", json={"inputs": [{"id": "1"}]}).json()
+        assert found["results"][0]["properties"]["lifecyclestage"] == "customer"
+
+    def test_stakeholders_without_email_are_skipped(self, db_session, sample_company, fake_hubspot):
+        db_session.add(Stakeholder(company_id=sample_company.id, name="No Email"))
+        db_session.commit()
+        result = sync_stakeholders(db_session)
+        assert (result["skipped"], result["api_calls"]) == (1, 0)
+
+    def test_sync_endpoint(self, test_client, sample_stakeholder, fake_hubspot):
+        """POST /api/v1/stakeholders/hubspot-sync returns the sync counts."""
+        response = test_client.post("/api/v1/stakeholders/hubspot-sync")
+        assert response.status_code == 200
+        assert response.json()["created"] == 1
+        assert test_client.post("/api/v1/stakeholders/hubspot-sync").json()["unchanged"] == 1
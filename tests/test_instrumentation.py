@@ -0,0 +1,61 @@
+"""
+Tests for external API instrumentation (services/instrumentation.py) and the wrapped services.
+"""
+import pytest
+import requests
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from sqlalchemy import select
+import metrics
+from models import ProviderCall
+from services.instrumentation import track_call
+
+def _logged_calls(engine):
+    with engine.connect() as connection:
+        return connection.execute(select(ProviderCall).order_by(ProviderCall.id)).all()
+
+class TestInstrumentation:
+    def test_track_call_logs_success_with_quota(self, call_log_engine):
+        metrics.reset_metrics()
+        with track_call("google_cse", "search", quota=1):
+            pass
+        [call] = _logged_calls(call_log_engine)
+        assert (call.provider, call.operation, call.ok, call.quota_units) == ("google_cse", "search", True, 1)
+        assert call.duration_ms >= 0
+        exposition = metrics.render_prometheus()
+        assert 'external_call_duration_seconds_count{provider="google_cse",operation="search",outcome="ok"} 1' in exposition
+        assert 'external_quota_units_total{provider="google_cse"} 1' in exposition
+
+    def test_failed_call_keeps_type_and_status_only(self, call_log_engine):
+        """Request errors embed URLs (with api_key=...), so only the type and status are stored."""
+        response = requests.Response()
+        response.status_code = 403
+        with patch("services.hunter_service.API_KEY", "key"), \
+             patch("services.hunter_service.requests.get", return_value=response):
+            from services.hunter_service import verify_email
+            assert verify_email("john@testcorp.com") == {}
+        [call] = _logged_calls(call_log_engine)
+        assert not call.ok
+        assert (call.error, call.status_code, call.quota_units) == ("HTTPError", 403, 0)
+
+    def test_exceptions_are_reraised(self, call_log_engine):
+        with pytest.raises(ValueError):
+            with track_call("calendly", "schedule_meeting"):
+                raise ValueError("boom")
+        assert _logged_calls(call_log_engine)[0].error == "ValueError"
+
+    def test_openai_token_usage(self, call_log_engine):
+        metrics.reset_metrics()
+        completion = SimpleNamespace(
+            model="gpt-3.5-turbo",
+            usage=SimpleNamespace(prompt_tokens=42, completion_tokens=80),
+            choices=[SimpleNamespace(message=SimpleNamespace(content=" Hello John "))],
+        )
+        client = MagicMock(api_key="sk-test")
+        client.chat.completions.create.return_value = completion
+        with patch("services.openai_service.client", client):
+            from services.openai_service import generate_ai_email
+            assert generate_ai_email("John", "Test Corp", "Test Tech") == "Hello John"
+        [call] = _logged_calls(call_log_engine)
+        assert (call.prompt_tokens, call.completion_tokens, call.quota_units) == (42, 80, 122)
+        assert 'external_tokens_total{provider="openai",model="gpt-3.5-turbo",kind="completion"} 80' in metrics.render_prometheus()
@@ -0,0 +1,85 @@
+"""
+Tests for linkedin_cache.py (URL normalization, compressed storage, TTL) against the fake_providers.py
+Proxycurl stand-in, plus the stakeholder list projection.
+Run: pytest tests/test_linkedin_cache.py -v
+"""
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+
+import linkedin_cache
+from models import LinkedInProfile, Stakeholder
+
+PROFILE_CALL = "GET /proxycurl/api/linkedin/profile"
+
+def _profile_calls(url):
+    return requests.get(f"{url}/_stats").json()["calls"].get(PROFILE_CALL, 0)
+
+class TestLinkedInCache:
+    @pytest.mark.parametrize("url", [
+        "https://www.linkedin.com/in/Jane-Doe/",
+        "linkedin.com/in/jane-doe?utm_source=share",
+        " http://de.linkedin.com/in/jane-doe/details/experience ",
+    ])
+    def test_normalize_url(self, url):
+        assert linkedin_cache.normalize_url(url) == "https://www.linkedin.com/in/jane-doe"
+
+    @pytest.mark.parametrize("url", ["https://www.linkedin.com/company/acme", "https://example.com/in/jane", ""])
+    def test_normalize_rejects_non_profiles(self, url):
+        with pytest.raises(ValueError):
+            linkedin_cache.normalize_url(url)
+
+    def test_compress_round_trip(self):
+        data = {"full_name": "Jane Doe", "summary": "Energy storage partnerships. " * 200}
+        codec, payload, raw_bytes = linkedin_cache.compress(data)
+        assert len(payload) < raw_bytes / 5
+        assert linkedin_cache.decompress(codec, payload) == data
+        with pytest.raises(ValueError):
+            linkedin_cache.decompress("lz4", payload)
+
+    def test_cache_hit_ttl_and_refresh(self, db_session, fake_proxycurl, monkeypatch):
+        """Variants of one URL share a row; expired or refreshed entries refetch; failures serve stale data."""
+        profile = linkedin_cache.get_profile(db_session, "https://linkedin.com/in/Jane-Doe")
+        assert profile["full_name"] == "Jane Doe"
+        assert linkedin_cache.get_profile(db_session, "linkedin.com/in/jane-doe/") == profile
+        assert _profile_calls(fake_proxycurl) == 1
+
+        row = db_session.get(LinkedInProfile, "https://www.linkedin.com/in/jane-doe")
+        assert (row.full_name, row.company) == ("Jane Doe", profile["experiences"][0]["company"])
+        assert row.location == "Berlin, Germany" and len(row.payload) < row.raw_bytes / 3
+
+        linkedin_cache.get_profile(db_session, row.url, refresh=True)
+        row.fetched_at = datetime.utcnow() - timedelta(days=linkedin_cache.PROFILE_TTL_DAYS + 1)
+        db_session.commit()
+        linkedin_cache.get_profile(db_session, row.url)
+        assert _profile_calls(fake_proxycurl) == 3
+
+        row.fetched_at = datetime.utcnow() - timedelta(days=linkedin_cache.PROFILE_TTL_DAYS + 1)
+        db_session.commit()
+        monkeypatch.setattr("services.linkedin_service.BASE_URL", f"{fake_proxycurl}/proxycurl/down")
+        assert linkedin_cache.get_profile(db_session, row.url) == profile
+
+    def test_unknown_profile_is_not_cached(self, db_session, fake_proxycurl):
+        assert linkedin_cache.get_profile(db_session, "linkedin.com/in/missing-person") == {}
+        assert db_session.query(LinkedInProfile).count() == 0
+
+    def test_profile_endpoint(self, test_client, fake_proxycurl):
+        response = test_client.get("/api/v1/stakeholders/linkedin-profile", params={"url": "linkedin.com/in/jane-doe"})
+        assert response.status_code == 200 and response.json()["public_identifier"] == "jane-doe"
+        assert test_client.get("/api/v1/stakeholders/linkedin-profile", params={"url": "example.com"}).status_code == 400
+
+    def test_list_projects_profile_columns(self, test_client, db_session, sample_company, fake_proxycurl):
+        """Creating with a LinkedIn URL normalizes it and queues a fetch; the list shows projected columns."""
+        response = test_client.post("/api/v1/stakeholders/", json={
+            "company_id": sample_company.id, "name": "Jane Doe", "linkedin_url": "linkedin.com/in/Jane-Doe/"})
+        stakeholder = db_session.get(Stakeholder, response.json()["id"])
+        assert stakeholder.linkedin_url == "https://www.linkedin.com/in/jane-doe"
+        linkedin_cache.get_profile(db_session, stakeholder.linkedin_url)
+
+        row = test_client.get("/api/v1/stakeholders/").json()[0]
+        cached = db_session.get(LinkedInProfile, stakeholder.linkedin_url)
+        assert (row["linkedin_headline"], row["linkedin_company"], row["linkedin_location"]) == (
+            cached.headline, cached.company, "Berlin, Germany")
+        assert test_client.post("/api/v1/stakeholders/", json={
+            "company_id": sample_company.id, "name": "X", "linkedin_url": "https://example.com"}).status_code == 422
@@ -0,0 +1,121 @@
+"""
+Tests for meeting_index.py (per-participant interval arrays, change-feed sync, free slots) and the
+conflict checks on POST /meetings/ and PUT /meetings/{id}/schedule.
+Run: pytest tests/test_meeting_index.py -v
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+import meeting_index
+from meeting_index import MeetingIndex, overlapping_meetings, participant_keys
+from models import Meeting, MeetingStatus
+
+MONDAY = datetime(2030, 1, 7)  # far enough ahead to stay "upcoming"
+
+def _at(day: int, hour: int, minute: int = 0) -> datetime:
+    return MONDAY + timedelta(days=day, hours=hour, minutes=minute)
+
+def _meeting(db_session, outreach, start, minutes=30, participants="Ann <ann@x.com>, Bob"):
+    meeting = Meeting(outreach_id=outreach.id, scheduled_date=start, duration_minutes=minutes,
+                      participants=participants, agenda="", status=MeetingStatus.SCHEDULED)
+    db_session.add(meeting)
+    db_session.commit()
+    return meeting
+
+@pytest.fixture
+def index(db_session):
+    index = MeetingIndex()
+    index.sync(db_session)
+    return index
+
+class TestMeetingIndex:
+    def test_participant_keys(self):
+        assert participant_keys("Ann Lee <Ann@X.com>,  bob  SMITH , ", "john@testcorp.com") == {
+            "ann@x.com", "bob smith", "john@testcorp.com"}
+
+    def test_conflicts_use_durations(self, db_session, sample_outreach, index):
+        long_one = _meeting(db_session, sample_outreach, _at(0, 9), minutes=180)  # 09:00-12:00
+        _meeting(db_session, sample_outreach, _at(0, 13), participants="Carol")
+        index.sync(db_session)
+        ann = {"ann@x.com"}
+        assert [c["meeting_id"] for c in index.conflicts(ann, _at(0, 11, 30), _at(0, 12))] == [long_one.id]
+        assert index.conflicts(ann, _at(0, 12), _at(0, 13)) == []  # back-to-back is fine
+        assert index.conflicts(ann, _at(0, 8), _at(0, 9)) == []
+        assert index.conflicts(ann, _at(0, 10), _at(0, 11), exclude_id=long_one.id) == []
+        # the outreach's stakeholder takes part in every meeting of the outreach
+        assert len(index.conflicts({"john@testcorp.com"}, _at(0, 9), _at(0, 14))) == 2
+
+    def test_sync_applies_changes_and_detects_resets(self, db_session, sample_outreach, index):
+        meeting = _meeting(db_session, sample_outreach, _at(0, 9))
+        index.sync(db_session)
+        assert len(index) == 1
+        meeting.scheduled_date = _at(0, 15)
+        db_session.commit()
+        index.sync(db_session)
+        assert index.conflicts({"bob"}, _at(0, 9), _at(0, 10)) == []
+        assert len(index.conflicts({"bob"}, _at(0, 15), _at(0, 16))) == 1
+        meeting.status = MeetingStatus.CANCELLED
+        db_session.commit()
+        index.sync(db_session)
+        assert len(index) == 0
+
+        index._stamp = (index._stamp[0], datetime(2000, 1, 1))  # e.g. the DB was recreated
+        _meeting(db_session, sample_outreach, _at(1, 9))
+        index.sync(db_session)
+        assert len(index) == 1
+
+    def test_free_slots_merge_all_participants(self, db_session, sample_outreach, index):
+        _meeting(db_session, sample_outreach, _at(0, 9), minutes=60, participants="ann@x.com")
+        _meeting(db_session, sample_outreach, _at(0, 9, 30), minutes=90, participants="bob@x.com")
+        _meeting(db_session, sample_outreach, _at(0, 14), minutes=60, participants="bob@x.com")
+        index.sync(db_session)
+        gaps = index.free_slots({"ann@x.com", "bob@x.com"}, _at(0, 0), _at(3, 0), timedelta(minutes=60))
+        assert gaps[:3] == [(_at(0, 11), _at(0, 14)), (_at(0, 15), _at(0, 17)), (_at(1, 9), _at(1, 17))]
+        saturday = index.free_slots({"ann@x.com"}, _at(5, 0), _at(7, 0), timedelta(minutes=30))
+        assert saturday == []
+        assert index.free_slots({"ann@x.com"}, _at(0, 9), _at(0, 17), timedelta(hours=8)) == []
+
+    def test_create_and_reschedule_reject_overlaps(self, test_client, sample_outreach):
+        body = {"outreach_id": sample_outreach.id, "scheduled_date": _at(0, 10).isoformat(),
+                "duration_minutes": 60, "participants": "Ann <ann@x.com>", "agenda": "JV"}
+        first = test_client.post("/api/v1/meetings/", json=body)
+        assert first.status_code == 200 and first.json()["conflicts"] == []
+
+        clash = test_client.post("/api/v1/meetings/", json={**body, "scheduled_date": _at(0, 10, 30).isoformat(),
+                                                            "participants": "ann@x.com"})
+        assert clash.status_code == 409
+        assert clash.json()["detail"]["conflicts"][0]["meeting_id"] == first.json()["id"]
+        flagged = test_client.post("/api/v1/meetings/", json={
+            **body, "scheduled_date": _at(0, 10, 30).isoformat(), "participants": "Dan", "allow_conflicts": True})
+        assert flagged.status_code == 200 and flagged.json()["conflicts"][0]["participant"] == "john@testcorp.com"
+
+        second = test_client.post("/api/v1/meetings/", json={**body, "scheduled_date": _at(0, 13).isoformat()}).json()
+        moved = test_client.put(f"/api/v1/meetings/{second['id']}/schedule", json={"scheduled_date": _at(0, 10).isoformat()})
+        assert moved.status_code == 409
+        assert test_client.put(f"/api/v1/meetings/{second['id']}/schedule",
+                               json={"scheduled_date": _at(0, 16).isoformat(), "duration_minutes": 45}).status_code == 200
+
+    def test_database_recheck_catches_what_the_index_missed(self, test_client, db_session, sample_outreach, monkeypatch):
+        """Another process booked the slot after this index synced: the check inside the transaction still sees it."""
+        booked = _meeting(db_session, sample_outreach, _at(0, 10), minutes=60, participants="ann@x.com")
+        found = overlapping_meetings(db_session, {"ann@x.com"}, _at(0, 10, 30), _at(0, 11))
+        assert [(c["meeting_id"], c["participant"]) for c in found] == [(booked.id, "ann@x.com")]
+        assert overlapping_meetings(db_session, {"ann@x.com"}, _at(0, 11), _at(0, 12)) == []
+        assert overlapping_meetings(db_session, {"ann@x.com"}, _at(0, 10), _at(0, 11), exclude_id=booked.id) == []
+
+        monkeypatch.setattr(meeting_index.INDEX, "conflicts", lambda *args, **kwargs: [])  # stale index
+        clash = test_client.post("/api/v1/meetings/", json={
+            "outreach_id": sample_outreach.id, "scheduled_date": _at(0, 10, 30).isoformat(),
+            "participants": "Ann <ann@x.com>", "agenda": "JV"})
+        assert clash.status_code == 409 and clash.json()["detail"]["conflicts"][0]["meeting_id"] == booked.id
+
+    def test_free_slots_endpoint(self, test_client, sample_outreach):
+        test_client.post("/api/v1/meetings/", json={
+            "outreach_id": sample_outreach.id, "scheduled_date": _at(0, 9).isoformat(), "duration_minutes": 120,
+            "participants": "ann@x.com", "agenda": ""})
+        response = test_client.get("/api/v1/meetings/free-slots", params={
+            "participants": ["ann@x.com", "Bob"], "start": _at(0, 0).isoformat(), "end": _at(1, 0).isoformat()})
+        assert response.json() == [{"start": _at(0, 11).isoformat(), "end": _at(0, 17).isoformat()}]
+        assert test_client.get("/api/v1/meetings/free-slots", params={
+            "participants": ["ann@x.com"], "start": _at(1, 0).isoformat(), "end": _at(0, 0).isoformat()}).status_code == 400
@@ -0,0 +1,65 @@
+"""
+Tests for request/SQL instrumentation (metrics.py) and the /metrics endpoint.
+"""
+import logging
+import pytest
+from sqlalchemy import text
+from metrics import Histogram, instrument_engine, reset_metrics, redact_parameters
+from tests.conftest import test_engine
+
+@pytest.fixture
+def metrics_client(test_client):
+    instrument_engine(test_engine)
+    reset_metrics()
+    yield test_client
+    reset_metrics()
+
+class TestMetrics:
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("demo_seconds", "Demo.", ("route",), (0.1, 1))
+        for value in (0.05, 0.5, 0.5, 3):
+            histogram.observe(("/x",), value)
+        samples = {(name, labels[-1][1] if name.endswith("bucket") else None): value
+                   for name, labels, value in histogram.samples()}
+        assert samples[("demo_seconds_bucket", "0.1")] == 1
+        assert samples[("demo_seconds_bucket", "1")] == 3
+        assert samples[("demo_seconds_bucket", "+Inf")] == 4
+        assert samples[("demo_seconds_count", None)] == 4
+        assert samples[("demo_seconds_sum", None)] == pytest.approx(4.05)
+
+    def test_request_latency_and_sql_per_route_template(self, metrics_client, sample_deal):
+        metrics_client.get("/api/v1/deals/")
+        metrics_client.put(f"/api/v1/deals/{sample_deal.id}/stage", json={"stage": "negotiation"})
+        body = metrics_client.get("/metrics").text
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/deals/",status="200"} 1' in body
+        # Path parameters stay templated, so every deal shares one series
+        assert 'route="/api/v1/deals/{deal_id}/stage",status="200"} 1' in body
+        assert f"/deals/{sample_deal.id}/" not in body
+        queries = next(line for line in body.splitlines()
+                       if line.startswith('http_request_sql_queries_sum{method="GET",route="/api/v1/deals/"}'))
+        assert float(queries.split()[-1]) >= 1
+        assert 'sql_query_duration_seconds_count{route="/api/v1/deals/",operation="SELECT"}' in body
+
+    def test_slow_query_log_redacts_parameters(self, db_session, caplog, monkeypatch):
+        instrument_engine(test_engine)
+        monkeypatch.setattr("metrics.SLOW_QUERY_SECONDS", 0)
+        with caplog.at_level(logging.WARNING, logger="jv.sql.slow"):
+            db_session.execute(text("SELECT :secret, :count"), {"secret": "hunter2@example.com", "count": 3})
+        assert "Slow query" in caplog.text and "route <background>" in caplog.text
+        assert "hunter2" not in caplog.text
+        assert "str[19]" in caplog.text
+
+    def test_failed_statement_leaves_no_timing_behind(self, db_session, caplog, monkeypatch):
+        instrument_engine(test_engine)
+        monkeypatch.setattr("metrics.SLOW_QUERY_SECONDS", 0)
+        with pytest.raises(Exception):
+            db_session.execute(text("SELECT * FROM no_such_table"))
+        db_session.rollback()
+        with caplog.at_level(logging.WARNING, logger="jv.sql.slow"):
+            db_session.execute(text("SELECT 1"))
+        assert "SELECT 1" in caplog.text
+        assert not db_session.connection().info.get("metrics_started")
+
+    def test_redact_parameters_executemany(self):
+        assert redact_parameters([(1, "a"), (2, "b")]) == "2 x (int, str[1])"
+        assert redact_parameters({"id": None}) == "(None)"
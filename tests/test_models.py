@@ -4,10 +4,12 @@ Tests: Creation, enums, relationships, basic queries.
 Run: pytest tests/test_models.py -v
 """
 import pytest
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from models import (
-    ProductTechnology, TargetCompany, Stakeholder, Outreach, Meeting, Deal,
-    MarketAlignment, CompanySize, StakeholderRole, OutreachResponse, MeetingStatus, DealStage
+    ProductTechnology, TargetCompany, Stakeholder, Outreach, Meeting, Deal, MessageBody,
+    MarketAlignment, CompanySize, StakeholderRole, OutreachResponse, MeetingStatus, DealStage,
+    message_hash, readable_select, store_message_bodies
 )
 
 class TestModels:
@@ -70,4 +72,28 @@ class TestModels:
         # Delete company (in real, add ondelete='CASCADE' in models if needed)
         db_session.delete(sample_company)
         db_session.commit()
-        assert db_session.query(Stakeholder).count() == 0  # Assuming no cascade; adjust if added
\ No newline at end of file
+        assert db_session.query(Stakeholder).count() == 0  # Assuming no cascade; adjust if added
+
+class TestMessageBodies:
+    def test_same_text_is_stored_once(self, db_session, sample_stakeholder):
+        db_session.add_all([Outreach(stakeholder_id=sample_stakeholder.id, message=text) for text in ("Hi", "Hi", "Bye")])
+        db_session.commit()
+        assert db_session.query(MessageBody).count() == 2
+        db_session.expunge_all()
+        outreaches = db_session.query(Outreach).order_by(Outreach.id).all()
+        assert [outreach.message for outreach in outreaches] == ["Hi", "Hi", "Bye"]
+        assert outreaches[0].message_sha256 == outreaches[1].message_sha256 == message_hash("Hi")
+
+    def test_message_is_queryable_and_changeable(self, db_session, sample_outreach):
+        sample_outreach.message = "Edited"
+        db_session.commit()
+        assert db_session.execute(select(Outreach.message).where(Outreach.id == sample_outreach.id)).scalar() == "Edited"
+        assert db_session.get(MessageBody, message_hash("Test outreach message")) is not None  # bodies are immutable
+        row = db_session.execute(readable_select(Outreach.__table__)).mappings().one()
+        assert row["message"] == "Edited" and "message_sha256" not in row
+
+    def test_store_message_bodies_is_idempotent(self, db_session):
+        connection = db_session.connection()
+        assert store_message_bodies(connection, ["a", "b", "a"]) == [message_hash("a"), message_hash("b"), message_hash("a")]
+        store_message_bodies(connection, ["a"])
+        assert db_session.query(MessageBody).count() == 2
@@ -0,0 +1,186 @@
+"""
+Tests for outbox.py: transactional enqueue, batch claiming with leases, retries and the built-in handlers.
+Run: pytest tests/test_outbox.py -v
+"""
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import change_feed
+import outbox
+from database import Base
+from models import ChangeEvent, OutboxEvent, Outreach, OutreachThread, Stakeholder, TargetCompany
+
+@pytest.fixture
+def outbox_engine(tmp_path):
+    """File-backed SQLite so the dispatcher's own connections see committed events."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def recorder(monkeypatch):
+    """Register test handlers: 'test.ok' records payloads, 'test.fail' always raises, 'test.batch' batches."""
+    calls = []
+    handlers = dict(outbox.HANDLERS)
+    monkeypatch.setattr(outbox, "HANDLERS", handlers)
+    outbox.handler("test.ok")(lambda bind, payload: calls.append(payload))
+    outbox.handler("test.batch", batch=True)(lambda bind, payloads: calls.append(payloads))
+
+    def fail(bind, payload):
+        raise outbox.DeliveryError("provider down")
+    outbox.handler("test.fail")(fail)
+    return calls
+
+def _events(engine):
+    with Session(bind=engine) as db:
+        return db.query(OutboxEvent).order_by(OutboxEvent.id).all()
+
+class TestOutbox:
+    def test_enqueue_commits_and_rolls_back_with_domain_change(self, outbox_engine, recorder):
+        with Session(bind=outbox_engine) as db:
+            outbox.enqueue(db, "test.ok", {"n": 1})
+            db.rollback()
+            outbox.enqueue(db, "test.ok", {"n": 2})
+            db.commit()
+        assert [json.loads(e.payload) for e in _events(outbox_engine)] == [{"n": 2}]
+        with pytest.raises(ValueError):
+            outbox.enqueue(Session(), "unknown.type", {})
+
+    def test_dispatch_delivers_and_batches(self, outbox_engine, recorder):
+        """Per-event handlers run once per event; batch handlers once per poll with every payload."""
+        with Session(bind=outbox_engine) as db:
+            for n in range(3):
+                outbox.enqueue(db, "test.batch", {"n": n})
+            outbox.enqueue(db, "test.ok", {"n": "single"})
+            db.commit()
+        counts = outbox.dispatch_once(outbox_engine)
+        assert counts == {"claimed": 4, "delivered": 4, "retrying": 0, "failed": 0}
+        assert [{"n": 0}, {"n": 1}, {"n": 2}] in recorder and {"n": "single"} in recorder
+        assert {e.status for e in _events(outbox_engine)} == {"done"}
+        assert outbox.dispatch_once(outbox_engine)["claimed"] == 0
+
+    def test_failures_back_off_then_fail(self, outbox_engine, recorder, monkeypatch):
+        monkeypatch.setattr(outbox, "MAX_ATTEMPTS", 2)
+        with Session(bind=outbox_engine) as db:
+            outbox.enqueue(db, "test.fail", {})
+            db.commit()
+        assert outbox.dispatch_once(outbox_engine)["retrying"] == 1
+        event = _events(outbox_engine)[0]
+        assert (event.status, event.attempts, event.last_error) == ("pending", 1, "DeliveryError: provider down")
+        assert event.available_at > datetime.utcnow()
+        assert outbox.dispatch_once(outbox_engine)["claimed"] == 0  # not due yet
+
+        with outbox_engine.begin() as connection:
+            connection.execute(OutboxEvent.__table__.update().values(available_at=datetime.utcnow()))
+        assert outbox.dispatch_once(outbox_engine)["failed"] == 1
+        assert _events(outbox_engine)[0].status == "failed"
+
+    def test_expired_lease_is_reclaimed(self, outbox_engine, recorder):
+        """Events held by a dispatcher that died are picked up again once the lease runs out."""
+        with Session(bind=outbox_engine) as db:
+            outbox.enqueue(db, "test.ok", {"n": 1})
+            db.commit()
+        assert len(outbox.claim_batch(outbox_engine)) == 1
+        assert outbox.claim_batch(outbox_engine) == []  # leased
+        with outbox_engine.begin() as connection:
+            connection.execute(OutboxEvent.__table__.update().values(available_at=datetime.utcnow() - timedelta(seconds=1)))
+        assert outbox.dispatch_once(outbox_engine)["delivered"] == 1
+
+    def test_dispatcher_prunes_old_change_events(self, outbox_engine, monkeypatch):
+        """The feed's clients may all be gone; the dispatcher still keeps change_events bounded."""
+        old = datetime.utcnow() - timedelta(hours=change_feed.RETENTION_HOURS + 1)
+        with outbox_engine.begin() as connection:
+            connection.execute(ChangeEvent.__table__.insert(), [
+                {"table_name": "deals", "row_id": n, "op": "updated", "created_at": old} for n in range(3)])
+        stop = threading.Event()
+        monkeypatch.setattr(outbox, "dispatch_once", lambda bind: stop.set() or {"claimed": 0})
+        outbox.run_dispatcher(outbox_engine, stop=stop)
+        with Session(bind=outbox_engine) as db:
+            assert db.query(ChangeEvent).count() == 1  # the newest is kept
+
+    def test_hubspot_events_share_one_batch_sync(self, outbox_engine, fake_hubspot):
+        with Session(bind=outbox_engine) as db:
+            company = TargetCompany(name="Acme")
+            db.add(company)
+            db.flush()
+            people = [Stakeholder(company_id=company.id, name=f"P {i}", email=f"p{i}@acme.com") for i in range(3)]
+            db.add_all(people)
+            db.flush()
+            for person in people:
+                outbox.enqueue(db, "hubspot.sync_contacts", {"stakeholder_ids": [person.id]})
+            db.commit()
+        assert outbox.dispatch_once(outbox_engine)["delivered"] == 3
+        stats = requests.get(f"{fake_hubspot}/_stats").json()
+        assert stats["hubspot_contacts"] == 3
+        assert stats["calls"]["POST /hubspot/crm/v3/objects/contacts/batch/create"] == 1
+
+    def test_sent_email_records_outreach_thread(self, outbox_engine, fake_gmail):
+        """The Gmail thread of a sent outreach email is kept so replies.py can match replies to it."""
+        with Session(bind=outbox_engine) as db:
+            outreach = Outreach(message="Hi")
+            db.add(outreach)
+            db.flush()
+            outreach_id = outreach.id
+            for _ in range(2):  # the same outreach emailed twice: one row per thread
+                outbox.enqueue(db, "email.send", {"to": "jane@acme.com", "subject": "JV", "body": "Hi",
+                                                  "outreach_id": outreach_id})
+            outbox.enqueue(db, "email.send", {"to": "joe@acme.com", "subject": "JV", "body": "Hi"})
+            db.commit()
+        assert outbox.dispatch_once(outbox_engine)["delivered"] == 3
+        with Session(bind=outbox_engine) as db:
+            assert [thread.outreach_id for thread in db.query(OutreachThread)] == [outreach_id, outreach_id]
+
+    def test_sent_email_is_delivered_even_if_thread_not_recorded(self, outbox_engine, fake_gmail):
+        """Gmail accepted it: failing the event would send the email again."""
+        with Session(bind=outbox_engine) as db:
+            outbox.enqueue(db, "email.send", {"to": "jane@acme.com", "subject": "JV", "body": "Hi", "outreach_id": 1})
+            db.commit()
+        OutreachThread.__table__.drop(outbox_engine)
+        assert outbox.dispatch_once(outbox_engine)["delivered"] == 1
+        assert requests.get(f"{fake_gmail}/_stats").json()["calls"]["POST /gmail/v1/users/me/messages/send"] == 1
+
+    def test_email_failures_retry_only_when_unsent(self, outbox_engine, fake_gmail, monkeypatch):
+        """Unsent: retried. Rejected (4xx): failed at once. Maybe sent (5xx, timeout): failed, never re-sent."""
+        with Session(bind=outbox_engine) as db:
+            outbox.enqueue(db, "email.send", {"to": "", "subject": "JV", "body": "Hi"})  # Gmail answers 400
+            db.commit()
+        assert outbox.dispatch_once(outbox_engine)["failed"] == 1
+        assert _events(outbox_engine)[0].last_error == "PermanentError: Gmail rejected the message (HttpError)"
+
+        requests.post(f"{fake_gmail}/_config", json={"gmail": {"error_rate": 1}})
+        with Session(bind=outbox_engine) as db:
+            outbox.enqueue(db, "email.send", {"to": "jane@acme.com", "subject": "JV", "body": "Hi"})
+            db.commit()
+        assert outbox.dispatch_once(outbox_engine)["failed"] == 1
+        assert "check the Sent folder" in _events(outbox_engine)[1].last_error
+        assert requests.get(f"{fake_gmail}/_stats").json()["calls"]["POST /gmail/v1/users/me/messages/send"] == 2
+
+        from services import gmail_service
+
+        def refused(*args, **kwargs):
+            raise ConnectionRefusedError(111, "Connection refused")
+        monkeypatch.setattr(gmail_service, "send_message", refused)
+        with Session(bind=outbox_engine) as db:
+            outbox.enqueue(db, "email.send", {"to": "joe@acme.com", "subject": "JV", "body": "Hi"})
+            db.commit()
+        assert outbox.dispatch_once(outbox_engine)["retrying"] == 1
+
+    def test_endpoints_enqueue_instead_of_calling_providers(self, test_client, db_session, sample_deal, sample_stakeholder):
+        """POST /outreaches/ queues the email; deal stage changes queue a HubSpot sync."""
+        response = test_client.post("/api/v1/outreaches/", json={
+            "stakeholder_id": sample_stakeholder.id, "message": "Hi", "send_email": True, "subject": "JV"})
+        assert response.json()["email_queued"] is True
+        test_client.put(f"/api/v1/deals/{sample_deal.id}/stage", json={"stage": "negotiation"})
+        events = db_session.query(OutboxEvent).order_by(OutboxEvent.id).all()
+        assert [e.event_type for e in events] == ["email.send", "hubspot.sync_contacts"]
+        assert json.loads(events[0].payload) == {"to": "john@testcorp.com", "subject": "JV", "body": "Hi",
+                                                 "outreach_id": response.json()["id"]}
+        assert json.loads(events[1].payload) == {"stakeholder_ids": [sample_stakeholder.id]}
+        assert test_client.get("/api/v1/analytics/outbox").json()["events"]["email.send"] == {"pending": 1}
@@ -0,0 +1,198 @@
+"""
+Tests for rate limiting, retries and circuit breaking (services/ratelimit.py).
+Time is simulated: sleeping advances a fake clock, so nothing here actually waits.
+"""
+import asyncio
+
+import pytest
+import requests
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from database import Base
+from services.ratelimit import (
+    ProviderPolicy, TokenBucket, SQLTokenBucket, CircuitOpenError, RateLimitTimeout,
+    acquire, acquire_async, breaker_for, checked, is_transient, provider_call, provider_call_async,
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds):
+        self.sleep(seconds)
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr("services.ratelimit._clock", fake)
+    monkeypatch.setattr("services.ratelimit._sleep", fake.sleep)
+    monkeypatch.setattr("services.ratelimit._async_sleep", fake.async_sleep)
+    return fake
+
+@pytest.fixture
+def policy(monkeypatch):
+    """A 'demo' provider: 2 calls/s, burst 2, 2 retries, breaker opens after 3 transient failures."""
+    demo = ProviderPolicy(rate=2, burst=2, max_wait=5, retries=2, backoff=1, failure_threshold=3, reset_timeout=30)
+    monkeypatch.setitem(__import__("services.ratelimit", fromlist=["POLICIES"]).POLICIES, "demo", demo)
+    return demo
+
+def _http_error(status, retry_after=None):
+    response = requests.Response()
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+    return requests.HTTPError(f"{status} for url https://api.example.com/?api_key=secret", response=response)
+
+class TestRateLimit:
+    def test_token_bucket_bursts_then_paces(self, clock):
+        bucket = TokenBucket(rate=2, burst=2)
+        assert bucket.try_acquire() == 0 and bucket.try_acquire() == 0
+        assert bucket.try_acquire() == pytest.approx(0.5)
+        clock.now += 0.5
+        assert bucket.try_acquire() == 0
+
+    def test_callers_queue_instead_of_failing(self, clock, policy):
+        for _ in range(4):
+            acquire("demo")
+        assert clock.sleeps == [pytest.approx(0.5), pytest.approx(0.5)]
+
+    def test_queue_wait_is_bounded(self, clock, policy):
+        acquire("demo")
+        acquire("demo")
+        with pytest.raises(RateLimitTimeout):
+            acquire("demo", max_wait=0.1)
+
+    def test_sql_bucket_is_shared_between_processes(self, clock, tmp_path):
+        """Two engines on one database file stand in for two processes."""
+        url = f"sqlite:///{tmp_path / 'limits.db'}"
+        first, second = create_engine(url), create_engine(url)
+        Base.metadata.create_all(first)
+        a = SQLTokenBucket(first, "hunter", rate=1, burst=2)
+        b = SQLTokenBucket(second, "hunter", rate=1, burst=2)
+        assert a.try_acquire() == 0
+        assert b.try_acquire() == 0
+        assert a.try_acquire() == pytest.approx(1)
+        clock.now += 1
+        assert b.try_acquire() == 0
+        first.dispose()
+        second.dispose()
+
+    def test_retries_transient_errors_honouring_retry_after(self, clock, policy):
+        responses = iter([_http_error(429, retry_after=3), _http_error(503)])
+
+        def flaky():
+            error = next(responses, None)
+            if error:
+                raise error
+            return "ok"
+
+        with patch("services.ratelimit.random.uniform", return_value=1):
+            assert provider_call("demo", "op", flaky) == "ok"
+        assert clock.sleeps == [3, 2]  # Retry-After, then 1s backoff doubled
+        assert breaker_for("demo").state == "closed"
+
+    def test_non_idempotent_calls_retry_only_when_unsent(self, clock, policy):
+        calls = []
+
+        def send(*errors):
+            responses = iter(errors)
+
+            def request():
+                calls.append(1)
+                error = next(responses, None)
+                if error:
+                    raise error
+                return "sent"
+            return request
+
+        unsent = requests.ConnectionError(ConnectionRefusedError(111, "Connection refused"))
+        assert provider_call("demo", "send", send(_http_error(429, retry_after=1), unsent), idempotent=False) == "sent"
+        assert len(calls) == 3
+        with pytest.raises(requests.HTTPError):  # the provider may have acted before failing
+            provider_call("demo", "send", send(_http_error(503)), idempotent=False)
+        with pytest.raises(requests.ReadTimeout):
+            provider_call("demo", "send", send(requests.ReadTimeout()), idempotent=False)
+        assert len(calls) == 5
+
+    def test_dropped_connections_are_transient(self):
+        assert is_transient(BrokenPipeError()) and is_transient(ConnectionResetError())  # httplib2 (Gmail)
+        assert not is_transient(ValueError())
+
+    def test_async_calls_queue_and_retry_like_sync_ones(self, clock, policy):
+        responses = iter([_http_error(429, retry_after=3)])
+
+        async def flaky():
+            error = next(responses, None)
+            if error:
+                raise error
+            return "ok"
+
+        async def burst():
+            return [await provider_call_async("demo", "op", flaky) for _ in range(3)]
+
+        assert asyncio.run(burst()) == ["ok"] * 3
+        assert clock.sleeps == [3, pytest.approx(0.5)]  # Retry-After, then waiting for the third token
+        with pytest.raises(RateLimitTimeout):
+            asyncio.run(acquire_async("demo", max_wait=0.1))
+
+    def test_retry_after_beyond_max_wait_gives_up(self, clock, policy):
+        def throttled():
+            raise _http_error(429, retry_after=3600)
+
+        with pytest.raises(requests.HTTPError):
+            provider_call("demo", "op", throttled)
+        assert clock.sleeps == []
+
+    def test_client_errors_are_not_retried(self, clock, policy):
+        calls = []
+
+        def forbidden():
+            calls.append(1)
+            raise _http_error(403)
+
+        with pytest.raises(requests.HTTPError):
+            provider_call("demo", "op", forbidden)
+        assert len(calls) == 1 and breaker_for("demo").failures == 0
+
+    def test_breaker_fails_fast_then_half_opens(self, clock, policy):
+        calls = []
+
+        def down():
+            calls.append(1)
+            raise requests.ConnectionError("connection refused")
+
+        with pytest.raises(requests.ConnectionError):
+            provider_call("demo", "op", down)  # 1 try + 2 retries = 3 failures -> open
+        assert breaker_for("demo").state == "open"
+        with pytest.raises(CircuitOpenError):
+            provider_call("demo", "op", down)
+        assert len(calls) == 3  # the open breaker did not touch the provider
+
+        clock.now += policy.reset_timeout
+        assert breaker_for("demo").state == "half_open"
+        assert provider_call("demo", "op", lambda: "recovered") == "recovered"
+        assert breaker_for("demo").state == "closed"
+
+    def test_service_returns_empty_while_circuit_open(self, clock):
+        breaker = breaker_for("hunter")
+        for _ in range(breaker.failure_threshold):
+            breaker.record(True)
+        with patch("services.hunter_service.API_KEY", "key"), \
+             patch("services.hunter_service.requests.get") as get:
+            from services.hunter_service import verify_email
+            assert verify_email("john@testcorp.com") == {}
+        get.assert_not_called()
+
+    def test_checked_raises_for_status(self):
+        response = requests.Response()
+        response.status_code = 500
+        with pytest.raises(requests.HTTPError):
+            checked(response)
@@ -0,0 +1,198 @@
+"""
+Tests for reply ingestion (replies.py) against the Gmail stand-in in fake_providers.py.
+Run: pytest tests/test_replies.py -v
+"""
+import base64
+from datetime import datetime
+
+import pytest
+import requests
+
+import fake_providers
+import replies
+from models import GmailReplyAttempt, GmailSyncState, Outreach, OutreachResponse, OutreachThread, Stakeholder
+from services import openai_service
+
+@pytest.fixture
+def classified(monkeypatch):
+    """Classify replies by keyword instead of calling OpenAI. Yields: the texts classified."""
+    texts = []
+
+    async def classify(text):
+        texts.append(text)
+        lowered = text.lower()
+        if "not interested" in lowered:
+            return "not-interested"
+        if "interested" in lowered:
+            return "interested"
+        return "follow-up-needed" if "later" in lowered else "no-response"
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(openai_service, "client", None)
+    monkeypatch.setattr(openai_service, "aclassify_response", classify)
+    yield texts
+
+def _receive(base_url: str, sender: str, body: str, thread_id: str = None, subject: str = "Re: JV Opportunity") -> dict:
+    raw = f"From: {sender}\nTo: me@example.com\nSubject: {subject}\n\n{body}"
+    message = {"raw": base64.urlsafe_b64encode(raw.encode()).decode(), "threadId": thread_id}
+    return requests.post(f"{base_url}/gmail/v1/users/me/messages", json=message).json()
+
+def _batch_calls(base_url: str) -> int:
+    return requests.get(f"{base_url}/_stats").json()["calls"].get("POST /batch/gmail/v1", 0)
+
+class TestReplyText:
+    def test_drops_quoted_text_and_truncates(self):
+        body = "Sounds good, let's talk.\n> earlier line\n\nOn Mon, 5 Jan 2026, Team <me@example.com> wrote:\n> Dear John"
+        assert replies.reply_text(body) == "Sounds good, let's talk."
+        assert len(replies.reply_text("x" * 5000)) == replies.MAX_REPLY_CHARS
+
+    def test_not_interested_is_not_read_as_interested(self):
+        assert openai_service._label("Not-interested") == "not-interested"
+        assert openai_service._label("interested") == "interested"
+
+class TestSyncReplies:
+    def test_first_sync_only_records_the_cursor(self, db_session, fake_gmail, classified):
+        _receive(fake_gmail, "old@acme.com", "Already here before the first sync")
+        assert replies.sync_replies(db_session)["messages"] == 0
+        profile = requests.get(f"{fake_gmail}/gmail/v1/users/me/profile").json()
+        assert db_session.get(GmailSyncState, "me").history_id == profile["historyId"]
+        assert classified == []
+
+    def test_reply_in_thread_updates_outreach_once(self, db_session, sample_outreach, fake_gmail, classified):
+        db_session.add(OutreachThread(thread_id="thread-1", outreach_id=sample_outreach.id))
+        db_session.commit()
+        replies.sync_replies(db_session)
+        _receive(fake_gmail, "assistant@testcorp.com", "We are interested!\n\nOn Mon, Team wrote:\n> Test outreach", "thread-1")
+        _receive(fake_gmail, "stranger@elsewhere.com", "Unrelated newsletter")
+
+        stats = replies.sync_replies(db_session)
+        assert stats == {"messages": 2, "replies": 2, "matched": 1, "updated": 1, "noted": 0,
+                         "unclassified": 0, "caught_up": False}
+        assert classified == ["We are interested!"]
+        outreach = db_session.get(Outreach, sample_outreach.id)
+        assert outreach.response == OutreachResponse.INTERESTED and outreach.next_action_at is None
+        assert outreach.notes.startswith("Initial contact\nReply (Gmail): We are interested!")
+
+        batches = _batch_calls(fake_gmail)
+        assert replies.sync_replies(db_session)["messages"] == 0  # nothing new: no gets, no classification
+        assert _batch_calls(fake_gmail) == batches and len(classified) == 1
+
+    def test_sender_fallback_matches_latest_outreach_and_latest_reply(self, db_session, sample_outreach, fake_gmail,
+                                                                      classified):
+        newer = Outreach(stakeholder_id=sample_outreach.stakeholder_id, message="Second pitch", date=datetime.utcnow())
+        db_session.add(newer)
+        db_session.commit()
+        replies.sync_replies(db_session)
+        _receive(fake_gmail, "John Doe <JOHN@testcorp.com>", "Ask me again later")
+        _receive(fake_gmail, "john@testcorp.com", "Actually, we are not interested.")
+
+        assert replies.sync_replies(db_session)["updated"] == 1
+        assert classified == ["Actually, we are not interested."]  # only the latest reply per outreach
+        assert db_session.get(Outreach, newer.id).response == OutreachResponse.NOT_INTERESTED
+        assert db_session.get(Outreach, sample_outreach.id).response == OutreachResponse.NO_RESPONSE
+
+    def test_follow_up_reply_keeps_schedule_and_unclear_reply_changes_nothing(self, db_session, sample_outreach,
+                                                                             fake_gmail, classified):
+        due = sample_outreach.next_action_at
+        replies.sync_replies(db_session)
+        _receive(fake_gmail, "john@testcorp.com", "Out of office")
+        assert replies.sync_replies(db_session)["updated"] == 0
+        assert db_session.get(Outreach, sample_outreach.id).notes == "Initial contact"
+
+        _receive(fake_gmail, "john@testcorp.com", "Busy this quarter, write again later")
+        assert replies.sync_replies(db_session)["updated"] == 1
+        outreach = db_session.get(Outreach, sample_outreach.id)
+        assert outreach.response == OutreachResponse.FOLLOW_UP_NEEDED and outreach.next_action_at == due
+
+    def test_sender_email_that_is_not_a_reply_is_only_noted(self, db_session, sample_outreach, fake_gmail, classified):
+        due = sample_outreach.next_action_at
+        replies.sync_replies(db_session)
+        _receive(fake_gmail, "john@testcorp.com", "We are interested in your other product", subject="New enquiry")
+
+        stats = replies.sync_replies(db_session)
+        assert (stats["matched"], stats["updated"], stats["noted"]) == (1, 0, 1) and classified == []
+        outreach = db_session.get(Outreach, sample_outreach.id)
+        assert outreach.response == OutreachResponse.NO_RESPONSE and outreach.next_action_at == due
+        assert outreach.notes == "Initial contact\nEmail (Gmail): We are interested in your other product"
+
+    def test_unclassified_reply_is_read_again(self, db_session, sample_outreach, sample_stakeholder, fake_gmail,
+                                              classified, monkeypatch):
+        other = Stakeholder(company_id=sample_stakeholder.company_id, name="Jane", email="jane@testcorp.com")
+        db_session.add(other)
+        db_session.flush()
+        db_session.add(Outreach(stakeholder_id=other.id, message="Hi"))
+        db_session.commit()
+        replies.sync_replies(db_session)
+        cursor = db_session.get(GmailSyncState, "me").history_id
+        _receive(fake_gmail, "john@testcorp.com", "Write again later")
+        _receive(fake_gmail, "jane@testcorp.com", "We are interested")
+        classify = openai_service.aclassify_response
+
+        async def failing_for_john(text):
+            return None if "later" in text else await classify(text)
+        monkeypatch.setattr(openai_service, "aclassify_response", failing_for_john)
+        with pytest.raises(replies.UnclassifiedReplies):
+            replies.sync_replies(db_session)
+        db_session.expire_all()
+        assert db_session.get(GmailSyncState, "me").history_id == cursor  # not past the unclassified reply
+        assert db_session.query(Outreach).filter_by(response=OutreachResponse.INTERESTED).count() == 1
+
+        monkeypatch.setattr(openai_service, "aclassify_response", classify)  # OpenAI is back
+        stats = replies.sync_replies(db_session)
+        assert stats["messages"] == 2 and stats["updated"] == 2
+        assert db_session.get(Outreach, sample_outreach.id).response == OutreachResponse.FOLLOW_UP_NEEDED
+
+    def test_reply_openai_keeps_refusing_is_given_up_on(self, db_session, sample_outreach, fake_gmail, classified,
+                                                        monkeypatch):
+        """After MAX_ATTEMPTS failed syncs the reply is noted as not classified and the cursor moves past it."""
+        monkeypatch.setattr(replies, "MAX_ATTEMPTS", 2)
+        replies.sync_replies(db_session)
+        cursor = db_session.get(GmailSyncState, "me").history_id
+        _receive(fake_gmail, "john@testcorp.com", "Interested, but see attachment")
+
+        async def refused(text):
+            return None
+        monkeypatch.setattr(openai_service, "aclassify_response", refused)
+        with pytest.raises(replies.UnclassifiedReplies):
+            replies.sync_replies(db_session)
+        db_session.expire_all()
+        assert db_session.get(GmailSyncState, "me").history_id == cursor
+        assert [row.attempts for row in db_session.query(GmailReplyAttempt)] == [1]
+
+        stats = replies.sync_replies(db_session)
+        assert (stats["messages"], stats["updated"], stats["unclassified"]) == (1, 0, 1)
+        db_session.expire_all()
+        assert db_session.get(GmailSyncState, "me").history_id != cursor
+        assert db_session.query(GmailReplyAttempt).count() == 0
+        outreach = db_session.get(Outreach, sample_outreach.id)
+        assert outreach.response == OutreachResponse.NO_RESPONSE
+        assert outreach.notes == "Initial contact\nReply (Gmail, not classified): Interested, but see attachment"
+        assert replies.sync_replies(db_session)["messages"] == 0
+
+    def test_expired_history_catches_up_with_bounded_search(self, db_session, sample_outreach, fake_gmail, classified,
+                                                            monkeypatch):
+        monkeypatch.setattr(fake_providers, "GMAIL_HISTORY_RETENTION", 2)
+        replies.sync_replies(db_session)
+        _receive(fake_gmail, "john@testcorp.com", "Interested, send details")
+        for n in range(3):
+            _receive(fake_gmail, f"news{n}@elsewhere.com", "Newsletter")
+
+        stats = replies.sync_replies(db_session)
+        assert stats["caught_up"] and stats["messages"] == 4 and stats["updated"] == 1
+        assert db_session.get(Outreach, sample_outreach.id).response == OutreachResponse.INTERESTED
+        assert replies.sync_replies(db_session) == {"messages": 0, "replies": 0, "matched": 0, "updated": 0,
+                                                    "noted": 0, "unclassified": 0, "caught_up": False}
+
+    def test_requires_openai(self, db_session, monkeypatch):
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        monkeypatch.setattr(openai_service, "client", None)
+        with pytest.raises(RuntimeError):
+            replies.sync_replies(db_session)
+        assert db_session.get(GmailSyncState, "me") is None
+
+    def test_against_openai_stand_in(self, db_session, sample_outreach, fake_gmail, fake_openai):
+        replies.sync_replies(db_session)
+        _receive(fake_gmail, "john@testcorp.com", "Happy to talk next week.")
+        stats = replies.sync_replies(db_session)
+        assert stats["matched"] == 1
+        label = db_session.get(Outreach, sample_outreach.id).response
+        assert stats["updated"] == (label != OutreachResponse.NO_RESPONSE)
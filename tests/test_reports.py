@@ -0,0 +1,66 @@
+"""
+Tests for the PDF report engine (reports.py): table layout, page ranges, stitching, jobs.
+"""
+import time
+import pytest
+from pypdf import PdfReader
+from sqlalchemy import create_engine, insert
+from database import Base
+from models import Outreach, OutreachResponse, store_message_bodies
+from reports import render_rows, generate_report, submit_report, get_job
+from datetime import datetime
+
+def _add_outreaches(connection, count):
+    hashes = store_message_bodies(connection, [f"message {i:03d}" for i in range(count)])
+    connection.execute(insert(Outreach), [
+        {"stakeholder_id": 1, "message_sha256": hashes[i], "response": OutreachResponse.INTERESTED, "date": datetime(2024, 1, 1)}
+        for i in range(count)
+    ])
+
+class TestReports:
+    def test_render_rows_paginates_table(self, tmp_path):
+        path = tmp_path / "rows.pdf"
+        pages = render_rows(str(path), ["name", "stage"], [(f"Deal {i}", "intro") for i in range(25)], "Deals", rows_per_page=10)
+        reader = PdfReader(str(path))
+        assert pages == len(reader.pages) == 3
+        text = reader.pages[0].extract_text()
+        assert "Deals" in text and "stage" in text and "Page 1 of 3" in text
+
+    def test_generate_report_streams_single_pass(self, db_session, sample_outreach, tmp_path):
+        """In-memory DBs are invisible to worker processes, so the report renders in one pass."""
+        path = tmp_path / "outreaches.pdf"
+        progress = []
+        pages = generate_report(db_session.get_bind(), "outreaches", str(path), workers=4, rows_per_page=5,
+                                progress=lambda done, total: progress.append((done, total)))
+        text = PdfReader(str(path)).pages[0].extract_text()
+        assert pages == 1
+        assert "Test outreach message" in text and "no-response" in text  # enum values, not names
+        assert progress[-1] == (1, 1)
+
+    def test_generate_report_parallel_ranges_stitched_in_order(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'reports.db'}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            _add_outreaches(connection, 23)
+        path = tmp_path / "parallel.pdf"
+        pages = generate_report(engine, "outreaches", str(path), workers=2, rows_per_page=5, pages_per_task=2)
+        reader = PdfReader(str(path))
+        assert pages == len(reader.pages) == 5
+        for number, page in enumerate(reader.pages, start=1):
+            text = page.extract_text()
+            assert f"Page {number} of 5" in text
+            assert f"message {(number - 1) * 5:03d}" in text
+        assert list(tmp_path.glob("report-parts-*")) == []  # range files cleaned up
+        engine.dispose()
+
+    def test_submit_report_returns_handle(self, db_session, sample_outreach, tmp_path, monkeypatch):
+        monkeypatch.setattr("reports.REPORTS_DIR", str(tmp_path))
+        job = submit_report(db_session.get_bind(), "outreaches")
+        assert get_job(job.id) is job
+        deadline = time.time() + 10
+        while job.status not in ("done", "failed") and time.time() < deadline:
+            time.sleep(0.02)
+        assert job.status == "done", job.error
+        assert job.total_pages == job.pages_done == 1
+        assert job.to_dict()["pages_per_second"] > 0
+        assert job.path.startswith(str(tmp_path))
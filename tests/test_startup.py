@@ -0,0 +1,33 @@
+"""
+Cold-start budget for the API and worker entry points (see benchmarks/bench_startup.py), and the lazy
+OpenAI client. Set STARTUP_BUDGET_SCALE (e.g. 2) on slow machines.
+Run: pytest tests/test_startup.py -v
+"""
+import os
+
+import pytest
+
+from benchmarks.bench_startup import BUDGET_MS, heavy_imports, import_ms
+
+SCALE = float(os.getenv("STARTUP_BUDGET_SCALE", "1"))
+
+class TestStartup:
+    @pytest.mark.parametrize("module", sorted(BUDGET_MS))
+    def test_import_budget(self, module):
+        elapsed, profile = import_ms(module, runs=1)
+        assert heavy_imports(profile) == [], f"{module} imports heavy dependencies eagerly"
+        if elapsed > BUDGET_MS[module] * SCALE:  # one slow sample may be noise: use the median of three
+            elapsed, _ = import_ms(module, runs=3)
+        assert elapsed <= BUDGET_MS[module] * SCALE, f"{module} took {elapsed:.0f} ms to import"
+
+    def test_openai_client_is_created_on_first_use(self, monkeypatch):
+        from services import openai_service
+        monkeypatch.setattr(openai_service, "client", None)
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        assert openai_service.get_client() is None
+        assert openai_service.generate_ai_email("John", "Test Corp", "Tech").startswith("Dear [Name]")
+        assert openai_service.classify_response("Sounds good") == "no-response"
+
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        client = openai_service.get_client()
+        assert client.api_key == "sk-test" and openai_service.get_client() is client
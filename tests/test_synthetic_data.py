@@ -0,0 +1,82 @@
+"""
+Tests for synthetic_data.py (bulk generator) and the regression check of benchmarks/bench_suite.py.
+Run: pytest tests/test_synthetic_data.py -v
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from benchmarks.bench_suite import cases, compare, run_suite
+from database import Base
+from models import AWAITING_REPLY, Deal, Meeting, MeetingStatus, Outreach, OutreachResponse, Stakeholder, next_follow_up_at
+from synthetic_data import counts_for, generate
+
+NOW = datetime(2030, 6, 3, 12)
+
+@pytest.fixture
+def make_engine(tmp_path):
+    engines = []
+
+    def make(name="synthetic.db"):
+        engine = create_engine(f"sqlite:///{tmp_path / name}")
+        Base.metadata.create_all(engine)
+        engines.append(engine)
+        return engine
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+def _rows(engine, model):
+    with engine.connect() as conn:
+        return conn.execute(select(model.__table__).order_by(model.id)).all()
+
+class TestSyntheticData:
+    def test_same_seed_same_rows(self, make_engine):
+        first, second = make_engine("a.db"), make_engine("b.db")
+        assert generate(first, 500, seed=3, now=NOW) == generate(second, 500, seed=3, now=NOW)
+        for model in (Stakeholder, Outreach, Meeting, Deal):
+            assert _rows(first, model) == _rows(second, model)
+
+    def test_rows_are_consistent(self, make_engine):
+        engine = make_engine()
+        counts = generate(engine, 2000, seed=1, now=NOW)
+        assert counts["outreaches"] == 2000
+        assert counts["stakeholders"] == counts_for(2000)["stakeholders"]
+        assert 0 < counts["deals"] < counts["meetings"] < 2000
+
+        stakeholder_ids = {row.id for row in _rows(engine, Stakeholder)}
+        outreaches = {row.id: row for row in _rows(engine, Outreach)}
+        assert {row.stakeholder_id for row in outreaches.values()} <= stakeholder_ids
+        for row in outreaches.values():
+            expected = next_follow_up_at(row.date, row.follow_up_count, row.follow_up_date) if row.response in AWAITING_REPLY else None
+            assert row.next_action_at == expected  # same schedule the ORM hook would have set
+            assert (row.response == OutreachResponse.FOLLOW_UP_NEEDED) == (row.follow_up_count > 0)
+
+        meetings = {row.id: row for row in _rows(engine, Meeting)}
+        for meeting in meetings.values():
+            outreach = outreaches[meeting.outreach_id]
+            assert outreach.response == OutreachResponse.INTERESTED and meeting.scheduled_date > outreach.date
+            assert (meeting.status == MeetingStatus.SCHEDULED) == (meeting.scheduled_date > NOW)
+        assert all(meetings[deal.meeting_id].status == MeetingStatus.COMPLETED for deal in _rows(engine, Deal))
+
+    def test_appends_after_existing_rows(self, make_engine):
+        engine = make_engine()
+        generate(engine, 300, seed=1, now=NOW)
+        generate(engine, 300, seed=2, now=NOW)
+        assert [row.id for row in _rows(engine, Outreach)] == list(range(1, 601))
+
+class TestBenchSuite:
+    def test_compare_flags_regressions_beyond_thresholds(self):
+        baseline = {"GET /x": {"latency_ms": 10.0, "queries": 2, "peak_kb": 100.0}}
+        assert compare(baseline, {"GET /x": {"latency_ms": 16.0, "queries": 2, "peak_kb": 300.0}}) == []
+        assert compare(baseline, {"GET /new": {"latency_ms": 99.0, "queries": 9, "peak_kb": None}}) == []
+        regressions = compare(baseline, {"GET /x": {"latency_ms": 30.0, "queries": 3, "peak_kb": None}})
+        assert regressions == ["GET /x: latency_ms 10.0 -> 30.0", "GET /x: queries 2 -> 3"]
+
+    def test_every_case_runs(self, make_engine):
+        engine = make_engine()
+        generate(engine, 300, seed=7)
+        results = run_suite(engine, runs=1, memory=False)
+        assert list(results) == [case.name for case in cases()]
+        assert all(result["queries"] > 0 for result in results.values())
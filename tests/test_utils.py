@@ -4,6 +4,7 @@ Tests: Exports (CSV/PDF), follow-ups, date formatting.
 Mocks external services.
 Run: pytest tests/test_utils.py -v
 """
+import json
 import pytest
 from unittest.mock import patch, MagicMock
 from io import StringIO
@@ -12,7 +13,7 @@ from utils import (
     check_and_send_followups, export_to_csv, export_to_pdf, format_date,
     push_to_hubspot
 )
-from models import Outreach, OutreachResponse
+from models import OutboxEvent, Outreach, OutreachResponse
 from datetime import datetime, timedelta
 
 class TestUtils:
@@ -51,7 +52,7 @@ class TestUtils:
         assert sent_count == 0
 
     def test_check_and_send_followups_sends_email(self, db_session, sample_outreach, mock_openai, mock_gmail):
-        """Test follow-ups: Old outreach → AI email sent, status updated."""
+        """Test follow-ups: Old outreach → AI email queued in the outbox, status updated."""
         # Make outreach old (>5 days)
         sample_outreach.date = datetime.utcnow() - timedelta(days=6)
         sample_outreach.response = OutreachResponse.NO_RESPONSE
@@ -69,11 +70,42 @@ class TestUtils:
         db_session.refresh(sample_outreach)
         assert sample_outreach.response == OutreachResponse.FOLLOW_UP_NEEDED
         assert sample_outreach.follow_up_date is not None
-        mock_gmail.assert_called_once()  # Email sent
+        assert sample_outreach.follow_up_count == 1
+        queued = db_session.query(OutboxEvent).filter_by(event_type="email.send").one()  # sent by outbox.py
+        assert json.loads(queued.payload)["to"] == "test@email.com"
+        mock_gmail.assert_not_called()
 
     @patch('utils.push_to_hubspot')  # Mock HubSpot service
     def test_push_to_hubspot(self, mock_hubspot):
         """Test HubSpot push (mocks service call)."""
         contact_data = {'email': 'test@example.com', 'firstname': 'John'}
         push_to_hubspot(contact_data)
-        mock_hubspot.assert_called_once_with(contact_data)  # From services.hubspot_service
\ No newline at end of file
+        mock_hubspot.assert_called_once_with(contact_data)  # From services.hubspot_service
+
+    def test_stream_csv_chunks_and_enum_values(self, db_session, sample_stakeholder):
+        """Test streaming CSV export: header once, enum values, chunked output."""
+        from sqlalchemy import select
+        from utils import stream_csv
+        for i in range(5):
+            db_session.add(Outreach(stakeholder_id=sample_stakeholder.id, message=f"Msg {i}", response=OutreachResponse.INTERESTED))
+        db_session.commit()
+        statement = select(Outreach.id, Outreach.message, Outreach.response).order_by(Outreach.id)
+        chunks = list(stream_csv(db_session, statement, chunk_size=2))
+        assert len(chunks) == 3
+        df = pd.read_csv(StringIO(b"".join(chunks).decode()))
+        assert list(df.columns) == ["id", "message", "response"]
+        assert len(df) == 5
+        assert set(df["response"]) == {"interested"}
+
+    def test_stream_columnar_parquet_roundtrip(self, db_session, sample_outreach):
+        """Test Parquet export: typed columns, enums dictionary-encoded."""
+        pa = pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+        from sqlalchemy import select
+        from utils import stream_columnar
+        data = b"".join(stream_columnar(db_session, select(Outreach.__table__), "parquet", chunk_size=1))
+        table = pq.read_table(pa.BufferReader(data))
+        assert table.num_rows == 1
+        assert table.column("response").to_pylist() == ["no-response"]
+        assert pa.types.is_dictionary(table.schema.field("response").type)
+        assert pa.types.is_timestamp(table.schema.field("date").type)
@@ -3,70 +3,155 @@ Shared utilities: Exports, follow-up checks, date helpers, etc.
 Easy to change: Add new functions here for cross-service use.
 """
 import os
-import json
-import pandas as pd
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
+import io
+import csv
+from datetime import date, datetime
+import config
 from sqlalchemy.orm import Session
-from models import Outreach, OutreachResponse
-from services.gmail_service import send_email
-from services.openai_service import generate_ai_email
+from sqlalchemy import Date, DateTime, String, case, type_coerce, Enum as SQLEnum
+from followups import run_due_followups
 
-load_dotenv()
+config.load()
+
+# Rows fetched per DB round trip (and per CSV write / Parquet row group) in streaming exports
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "10000"))
 
 def check_and_send_followups(db: Session):
     """
-    Check outreaches >5 days old with no response and send AI-generated follow-up.
-    Call from backend cron or manually.
-    Returns: Number of follow-ups sent.
-    """
-    five_days_ago = datetime.utcnow() - timedelta(days=5)
-    old_outreaches = db.query(Outreach).filter(
-        Outreach.response == OutreachResponse.NO_RESPONSE,
-        Outreach.date < five_days_ago
-    ).all()
-    
-    sent_count = 0
-    for outreach in old_outreaches:
-        stakeholder = outreach.stakeholder  # Assume relationship loaded
-        if stakeholder and stakeholder.email:
-            follow_up_msg = generate_ai_email(
-                stakeholder.name, stakeholder.company.name if stakeholder.company else '', 'Follow-up JV Opportunity'
-            )
-            if send_email(stakeholder.email, 'Follow-up: JV Partnership', follow_up_msg):
-                outreach.response = OutreachResponse.FOLLOW_UP_NEEDED
-                outreach.follow_up_date = datetime.utcnow()
-                db.commit()
-                sent_count += 1
-    
-    return sent_count
+    Queue AI-generated follow-ups for every outreach whose next follow-up is due (see followups.py).
+    Call from backend cron or manually; the outbox dispatcher sends the emails.
+    Returns: Number of follow-ups queued.
+    """
+    return run_due_followups(db)["queued"]
 
 def export_to_csv(data: list[dict], filename: str = "jv_data"):
     """
     Export list of dicts to CSV download (used in Streamlit/backend).
+    For DB tables use stream_csv() instead: it never materialises the rows.
     """
-    df = pd.DataFrame(data)
-    csv = df.to_csv(index=False)
-    return csv  # Streamlit can st.download_button with this
+    fieldnames = list(dict.fromkeys(key for row in data for key in row))
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(data)
+    return buffer.getvalue()  # Streamlit can st.download_button with this
 
 def export_to_pdf(data: list[dict], filename: str = "jv_report", title: str = "JV Report"):
     """
-    Generate simple PDF report.
-    """
-    c = canvas.Canvas(f"{filename}.pdf", pagesize=letter)
-    c.drawString(100, 750, title)
-    y = 700
-    for item in data:
-        c.drawString(100, y, str(item))
-        y -= 20
-        if y < 50:
-            c.showPage()
-            y = 750
-    c.save()
+    Generate a table-layout PDF report (one column per key).
+    For DB tables use reports.submit_report() instead: it streams rows and runs in the background.
+    """
+    from reports import render_rows  # reports imports this module
+    columns = list(dict.fromkeys(key for row in data for key in row))
+    render_rows(f"{filename}.pdf", columns, [[row.get(column) for column in columns] for row in data], title)
     return f"{filename}.pdf"  # Path for download
 
+def iter_query_chunks(db: Session, statement, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """
+    Execute a SQLAlchemy select and yield (column names, rows) chunks of up to chunk_size rows.
+    Uses a server-side cursor where the driver supports it, so memory stays at one chunk.
+    """
+    # Core execution on the session's connection: plain rows, no ORM loading overhead
+    result = db.connection().execute(statement.execution_options(yield_per=chunk_size, stream_results=True))
+    columns = list(result.keys())
+    for rows in result.partitions(chunk_size):
+        yield columns, rows
+
+def stream_csv(db: Session, statement, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """
+    Yield a CSV export of `statement` as UTF-8 byte chunks (header first).
+    Values are exported raw (see raw_export_select); one chunk of rows is in memory at a time.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow([column.name for column in statement.selected_columns])
+    for _, rows in iter_query_chunks(db, raw_export_select(statement), chunk_size):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def stream_columnar(db: Session, statement, fmt: str = "parquet", chunk_size: int = EXPORT_CHUNK_SIZE):
+    """
+    Yield a Parquet file (one row group per chunk) or an Arrow IPC stream of `statement`.
+    Enum columns are dictionary-encoded strings. Requires pyarrow (optional dependency).
+    """
+    import pyarrow as pa  # Optional dependency; only needed for columnar exports
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column.name, _arrow_type(pa, column.type)) for column in statement.selected_columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema) if fmt == "parquet" else pa.ipc.new_stream(sink, schema)
+    for _, rows in iter_query_chunks(db, raw_export_select(statement), chunk_size):
+        columns = list(zip(*rows))
+        arrays = [_arrow_array(pa, values, field.type) for values, field in zip(columns, schema)]
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last drain() (tell() keeps counting)."""
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+def raw_export_select(statement):
+    """
+    Rewrite a select so rows come back as the driver returns them, skipping SQLAlchemy's
+    per-value result processing (the bulk of export time): Enum names are mapped to their
+    values by a SQL CASE, and date/time columns are passed through as stored.
+    """
+    columns = []
+    for column in statement.selected_columns:
+        if isinstance(column.type, SQLEnum) and column.type.enum_class is not None:
+            mapping = {member.name: member.value for member in column.type.enum_class}
+            column = case(mapping, value=type_coerce(column, String), else_=None)
+        elif isinstance(column.type, (DateTime, Date)):
+            column = type_coerce(column, String)
+        columns.append(column.label(statement.selected_columns[len(columns)].name))
+    return statement.with_only_columns(*columns, maintain_column_froms=True)
+
+def _arrow_type(pa, sql_type):
+    """Arrow type for a SQLAlchemy column type (strings for anything unrecognised)."""
+    if isinstance(sql_type, SQLEnum):
+        return pa.dictionary(pa.int32(), pa.string())
+    try:
+        python_type = sql_type.python_type
+    except NotImplementedError:
+        python_type = None
+    return {
+        int: pa.int64(), float: pa.float64(), bool: pa.bool_(), bytes: pa.binary(),
+        datetime: pa.timestamp("us"), date: pa.date32(),
+    }.get(python_type, pa.string())
+
+def _arrow_array(pa, values, arrow_type):
+    """Build one column; raw text timestamps (SQLite) are parsed by Arrow, not per value in Python."""
+    if pa.types.is_dictionary(arrow_type):
+        return pa.array(values, pa.string()).dictionary_encode()
+    try:
+        return pa.array(values, arrow_type)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        return pa.array(values, pa.string()).cast(arrow_type)
+
 def format_date(date_str: str) -> str:
     """
     Helper: Format ISO date to readable string.